@@ -1,4 +1,4 @@
 
 from .moments import moments_XX, moments_XXXY, moments_block
 from .moments import covar, covars
-from .running_moments import RunningCovar, running_covar
+from .running_moments import RunningCovar, running_covar, Moments, combine_moments
@@ -778,6 +778,163 @@ def moments_block(X, Y, remove_mean=False, modify_data=False,
     return w, [sx, sy], [[Cxx, Cxy], [Cxy.T, Cyy]]
 
 
+def _fused_applicable(X, Y=None, sparse_mode='auto', remove_mean=False, modify_data=False):
+    """ Checks whether moments_fused can replace the sparse aware moment functions.
+
+    moments_fused does not exploit zero or constant columns. In dense mode, it is always used; in
+    automatic mode, only if the sparsity scan finds too few zero or constant columns in X and Y for
+    the sparse computation to pay off (the scan gives up early on dense data). It only pays off if
+    moments of Y are needed, since the moments of X alone are computed by a single BLAS call in
+    moments_XX.
+
+    """
+    if Y is None or not (X.dtype in (np.float32, np.float64) and Y.dtype == X.dtype):
+        return False
+    mode = sparse_mode.lower()
+    if mode == 'dense':
+        return True
+    if mode != 'auto':
+        return False
+    return all(_sparsify(Z, remove_mean=remove_mean, modify_data=modify_data, sparse_mode=mode)[1] is None
+               for Z in (X, Y))
+
+
+def _row_tiles(T, ncols, tile_size=2**22):
+    """ slices of consecutive rows, such that every tile has about tile_size elements """
+    rows = max(1, tile_size // max(ncols, 1))
+    for t0 in range(0, T, rows):
+        yield slice(t0, min(t0 + rows, T))
+
+
+def _mirror_upper(C):
+    """ symmetric matrix from its upper triangle (the strict lower triangle of C has to be zero) """
+    d = C.diagonal().copy()
+    C = C + C.T
+    C.flat[::C.shape[0] + 1] = d
+    return C
+
+
+def moments_fused(X, Y=None, remove_mean=False, symmetrize=False, weights=None,
+                  compute_XX=True, compute_XY=False, compute_YY=False):
+    r""" Computes the first two unnormalized moments of X and Y in a single pass over the data
+
+    Computes the same quantities as moments_XX, moments_XXXY and moments_block
+    in dense mode. The data is processed in tiles of rows, which are converted
+    to float64 and centered, such that neither X nor Y are copied as a whole.
+    Every tile is used for all requested second moment matrices, which are
+    accumulated by BLAS: symmetric matrices (C_XX, C_YY, and both terms of a
+    symmetrized C_XX) by a symmetric rank-k update (SYRK), all others by GEMM.
+    Non-negative weights are applied as their square roots to both tiles, so
+    weighted symmetric matrices are SYRK updates as well. Zero or constant
+    columns are not exploited.
+
+    Parameters
+    ----------
+    X : ndarray (T, M) of type float32 or float64
+        Data matrix
+    Y : ndarray (T, N) of the same type as X or None
+        Second data matrix, required for C_XY, C_YY and symmetrize=True.
+    remove_mean : bool
+        True: remove column mean from the data, False: don't remove mean.
+    symmetrize : bool
+        Computes symmetrized means and moments (see moments_XXXY)
+    weights : None or ndarray(T, )
+        weights assigned to each trajectory point of X. If None, all data points have weight one.
+        If ndarray, each data point is assigned a separate weight.
+    compute_XX : bool
+        compute C_XX
+    compute_XY : bool
+        compute C_XY
+    compute_YY : bool
+        compute C_YY
+
+    Returns
+    -------
+    w : float
+        statistical weight
+    s_x : ndarray (M)
+        x-sum
+    s_y : ndarray (N)
+        y-sum
+    C_XX : ndarray (M, M) or None
+        unnormalized covariance matrix of X
+    C_XY : ndarray (M, N) or None
+        unnormalized covariance matrix of XY
+    C_YY : ndarray (N, N) or None
+        unnormalized covariance matrix of Y
+
+    """
+    from scipy.linalg import blas
+    if weights is not None:
+        assert X.shape[0] == weights.shape[0], 'X and weights_x must have equal length'
+    if (compute_XY or compute_YY or symmetrize) and Y is None:
+        raise ValueError('Y is required for the requested moments.')
+    T, M = X.shape
+    N = Y.shape[1] if Y is not None else M
+    # first moments
+    if weights is None:
+        w = float(T)
+        sx = X.sum(axis=0, dtype=np.float64)
+        sy = Y.sum(axis=0, dtype=np.float64) if Y is not None else np.zeros(N)
+    else:
+        w = np.sum(weights)
+        sx, sy = np.zeros(M), np.zeros(N)
+        for rows in _row_tiles(T, M + N):
+            sx += np.dot(weights[rows], X[rows].astype(np.float64, copy=False))
+            if Y is not None:
+                sy += np.dot(weights[rows], Y[rows].astype(np.float64, copy=False))
+    if symmetrize:
+        sx = sx + sy
+        sy = sx
+        w *= 2
+    mean_x, mean_y = sx / w, sy / w
+
+    def tile(Z, rows, mean):
+        if remove_mean:
+            return np.subtract(Z[rows], mean, dtype=np.float64)
+        return Z[rows].astype(np.float64, copy=False)
+
+    def update(C, A, B):
+        # C += A^T B, only the upper triangle if A is B. Tiles are row major, so their transposes are column major.
+        if A is B:
+            return blas.dsyrk(1.0, A.T, beta=1.0, c=C, overwrite_c=True)
+        return blas.dgemm(1.0, A.T, B.T, beta=1.0, c=C, trans_b=True, overwrite_c=True)
+
+    # X^T diag(w) X = (sqrt(w) X)^T (sqrt(w) X) is a symmetric update for non-negative weights.
+    sqrt_weights = np.sqrt(weights) if weights is not None and np.all(weights >= 0) else None
+    symmetric_updates = weights is None or sqrt_weights is not None
+
+    def scaled_tile(Z, rows, mean):
+        z = tile(Z, rows, mean)
+        if sqrt_weights is not None:
+            z = sqrt_weights[rows, None] * z
+        return z, (z if symmetric_updates else weights[rows, None] * z)
+
+    # second moments, every tile is converted once for all requested matrices.
+    load_Y = compute_XY or compute_YY or (symmetrize and compute_XX)
+    Cxx = np.zeros((M, M), order='F') if compute_XX else None
+    Cxy = np.zeros((M, N), order='F') if compute_XY else None
+    Cyy = np.zeros((N, N), order='F') if compute_YY else None
+    for rows in _row_tiles(T, M + N if load_Y else M):
+        x, wx = scaled_tile(X, rows, mean_x)
+        if load_Y:
+            y, wy = scaled_tile(Y, rows, mean_y)
+        if compute_XX:
+            Cxx = update(Cxx, wx, x)
+            if symmetrize:
+                Cxx = update(Cxx, wy, y)
+        if compute_XY:
+            Cxy = update(Cxy, wx, y)
+        if compute_YY:
+            Cyy = update(Cyy, wy, y)
+    if symmetric_updates:
+        Cxx = _mirror_upper(Cxx) if compute_XX else None
+        Cyy = _mirror_upper(Cyy) if compute_YY else None
+    if compute_XY and symmetrize:
+        Cxy = Cxy + Cxy.T
+    return (w, sx, sy) + tuple(np.ascontiguousarray(C) if C is not None else None for C in (Cxx, Cxy, Cyy))
+
+
 def covar(X, remove_mean=False, modify_data=False, weights=None, sparse_mode='auto', sparse_tol=0.0):
     """ Computes the covariance matrix of X
 
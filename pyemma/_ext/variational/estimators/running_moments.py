@@ -1,7 +1,8 @@
+import io
 import warnings
 import numbers
 import numpy as np
-from .moments import moments_XX, moments_XXXY, moments_block
+from .moments import moments_XX, moments_XXXY, moments_block, moments_fused, _fused_applicable
 
 __author__ = 'noe'
 
@@ -41,7 +42,11 @@ class Moments(object):
         w1 = self.w
         w2 = other.w
         w = w1 + w2
-        # TODO: fix this div by zero error
+        if w2 == 0:
+            return self
+        if w1 == 0:
+            self.w, self.sx, self.sy, self.Mxy = other.w, other.sx.copy(), other.sy.copy(), other.Mxy.copy()
+            return self
         q = w2 / w1
         dsx = q * self.sx - other.sx
         dsy = q * self.sy - other.sy
@@ -80,6 +85,56 @@ class Moments(object):
         else:
             return self.Mxy / self.w
 
+    def to_bytes(self):
+        """ Serializes the moments into a portable byte string (numpy npz format without pickled objects).
+
+        Partial moments can be computed on separate nodes, sent over the wire and reduced with
+        :func:`combine_moments` after restoring them by :meth:`from_bytes`.
+        """
+        buffer = io.BytesIO()
+        np.savez(buffer, w=self.w, sx=self.sx, sy=self.sy, Mxy=self.Mxy)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """ Restores moments serialized by :meth:`to_bytes` """
+        with np.load(io.BytesIO(data), allow_pickle=False) as f:
+            return cls(f['w'], f['sx'], f['sy'], f['Mxy'])
+
+
+def combine_moments(moments, mean_free=False):
+    """ Reduces a list of independently computed Moments by a balanced tree of pairwise merges.
+
+    Every merge uses the pairwise update formulas of [1]_, so the moments can be computed in any order, e.g.
+    by different threads, processes or nodes, and every partial result enters the reduction with an equal
+    number of merges. The input objects are not modified.
+
+    Parameters
+    ----------
+    moments : list of Moments
+        partial moments, all computed with the same mean handling.
+    mean_free : bool, default=False
+        whether the second moments are mean-free (remove_mean=True).
+
+    Returns
+    -------
+    moments : Moments
+        the combined moments
+
+    References
+    ----------
+    .. [1] http://i.stanford.edu/pub/cstr/reports/cs/tr/79/773/CS-TR-79-773.pdf
+    """
+    level = [m.copy() for m in moments]
+    if not level:
+        raise ValueError('need at least one Moments object to combine.')
+    while len(level) > 1:
+        merged = [level[i].combine(level[i + 1], mean_free=mean_free) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            merged.append(level[-1])
+        level = merged
+    return level[0]
+
 
 class MomentsStorage(object):
     """
@@ -143,6 +198,13 @@ class MomentsStorage(object):
         # print 'return first element'
         return self.storage[0]
 
+    def merge(self, other):
+        """ Merges the moments of another storage (e.g. of an independent estimation) into this one. """
+        if self.remove_mean != other.remove_mean:
+            raise ValueError('Can not merge moments with different mean removal settings.')
+        self.storage = [combine_moments(self.storage + other.storage, mean_free=self.remove_mean)]
+        return self
+
 
 class RunningCovar(object):
     """ Running covariance estimator
@@ -246,7 +308,21 @@ class RunningCovar(object):
             else:
                 raise TypeError('weights is of type %s, must be a number or ndarray' % (type(weights)))
         # estimate and add to storage
-        if self.compute_XX and not self.compute_XY and not self.compute_YY:
+        if _fused_applicable(X, Y if self.compute_XY or self.compute_YY else None, sparse_mode=self.sparse_mode,
+                             remove_mean=self.remove_mean, modify_data=self.modify_data):
+            # dense data: all requested moments from a single pass over the chunk
+            w, s_X, s_Y, C_XX, C_XY, C_YY = moments_fused(X, Y if self.compute_XY or self.compute_YY else None,
+                                                          remove_mean=self.remove_mean,
+                                                          symmetrize=self.symmetrize and self.compute_XY,
+                                                          weights=weights, compute_XX=self.compute_XX,
+                                                          compute_XY=self.compute_XY, compute_YY=self.compute_YY)
+            if self.compute_XX:
+                self.storage_XX.store(Moments(w, s_X, s_X, C_XX))
+            if self.compute_XY:
+                self.storage_XY.store(Moments(w, s_X, s_Y, C_XY))
+            if self.compute_YY:
+                self.storage_YY.store(Moments(w, s_Y, s_Y, C_YY))
+        elif self.compute_XX and not self.compute_XY and not self.compute_YY:
             w, s_X, C_XX = moments_XX(X, remove_mean=self.remove_mean, weights=weights, sparse_mode=self.sparse_mode, modify_data=self.modify_data)
             self.storage_XX.store(Moments(w, s_X, s_X, C_XX))
         elif self.compute_XX and self.compute_XY and not self.compute_YY:
@@ -327,6 +403,55 @@ class RunningCovar(object):
     def cov_YY(self, bessel):
         return self.storage_YY.moments.covar(bessel=bessel)
 
+    def _storages(self):
+        return [(name, getattr(self, 'storage_' + name)) for name, computed in
+                (('XX', self.compute_XX), ('XY', self.compute_XY), ('YY', self.compute_YY)) if computed]
+
+    def combine(self, other):
+        """ Combines the moments of another, independently fed running covariance estimator into this one.
+
+        Both estimators need to compute the same moments with the same settings. The estimators can be fed with
+        different parts of the data in any order, e.g. in different threads, processes or on different nodes
+        (see :meth:`to_bytes`).
+        """
+        if (self.compute_XX, self.compute_XY, self.compute_YY, self.remove_mean, self.symmetrize) != \
+                (other.compute_XX, other.compute_XY, other.compute_YY, other.remove_mean, other.symmetrize):
+            raise ValueError('Can not combine running covariance estimators with different settings.')
+        for (_, storage), (_, other_storage) in zip(self._storages(), other._storages()):
+            storage.merge(other_storage)
+        return self
+
+    def to_bytes(self):
+        """ Serializes settings and moments into a portable byte string (numpy npz format without pickled objects).
+
+        The estimator can be restored by :meth:`from_bytes` on another machine and combined with others by
+        :meth:`combine`.
+        """
+        arrays = {'settings': np.array([self.compute_XX, self.compute_XY, self.compute_YY,
+                                        self.remove_mean, self.symmetrize]),
+                  'sparse_mode': np.array(self.sparse_mode)}
+        for name, storage in self._storages():
+            moments = storage.moments
+            arrays.update({name + '_w': moments.w, name + '_sx': moments.sx, name + '_sy': moments.sy,
+                           name + '_M': moments.Mxy})
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data, nsave=5):
+        """ Restores a running covariance estimator serialized by :meth:`to_bytes` """
+        with np.load(io.BytesIO(data), allow_pickle=False) as f:
+            compute_XX, compute_XY, compute_YY, remove_mean, symmetrize = (bool(x) for x in f['settings'])
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                rc = cls(compute_XX=compute_XX, compute_XY=compute_XY, compute_YY=compute_YY,
+                         remove_mean=remove_mean, symmetrize=symmetrize, sparse_mode=str(f['sparse_mode']),
+                         nsave=nsave)
+            for name, storage in rc._storages():
+                storage.store(Moments(f[name + '_w'], f[name + '_sx'], f[name + '_sy'], f[name + '_M']))
+        return rc
+
 
 def running_covar(xx=True, xy=False, yy=False, remove_mean=False, symmetrize=False, sparse_mode='auto',
                   modify_data=False, nsave=5):
@@ -194,6 +194,90 @@ class TestRunningMoments(unittest.TestCase):
         np.testing.assert_allclose(cc.moments_XY(), self.Mxy0)
         np.testing.assert_allclose(cc.moments_YY(), self.Myy0)
 
+    def test_XXXY_float32_sym_meanfree(self):
+        # float32 input is accumulated in double precision by moments_fused
+        X, Y = self.X.astype(np.float32), self.Y.astype(np.float32)
+        X0, Y0 = X.astype(np.float64), Y.astype(np.float64)
+        m = (X0.sum(axis=0) + Y0.sum(axis=0)) / (2 * self.T)
+        cc = running_moments.RunningCovar(compute_XX=True, compute_XY=True, remove_mean=True, symmetrize=True,
+                                          sparse_mode='dense')
+        for i in range(0, self.T, self.L):
+            cc.add(X[i:i+self.L], Y[i:i+self.L])
+        np.testing.assert_allclose(cc.weight_XY(), 2*self.T)
+        np.testing.assert_allclose(cc.mean_X(), m)
+        np.testing.assert_allclose(cc.moments_XX(), np.dot((X0 - m).T, X0 - m) + np.dot((Y0 - m).T, Y0 - m))
+        np.testing.assert_allclose(cc.moments_XY(), np.dot((X0 - m).T, Y0 - m) + np.dot((Y0 - m).T, X0 - m))
+
+    def test_fused_matches_sparse(self):
+        X = np.hstack((self.X, np.ones((self.T, 3)), np.zeros((self.T, 2))))
+        Y = np.hstack((self.Y, np.ones((self.T, 3)), np.zeros((self.T, 2))))
+        for sym, weights in [(False, None), (False, self.weights), (True, None), (True, self.weights)]:
+            dense = running_moments.RunningCovar(compute_XX=True, compute_XY=True, remove_mean=True,
+                                                 symmetrize=sym, sparse_mode='dense')
+            sparse = running_moments.RunningCovar(compute_XX=True, compute_XY=True, remove_mean=True,
+                                                  symmetrize=sym, sparse_mode='sparse')
+            for i in range(0, self.T, self.L):
+                iwe = weights[i:i+self.L] if weights is not None else None
+                dense.add(X[i:i+self.L], Y[i:i+self.L], weights=iwe)
+                sparse.add(X[i:i+self.L], Y[i:i+self.L], weights=iwe)
+            np.testing.assert_allclose(dense.sum_X(), sparse.sum_X())
+            np.testing.assert_allclose(dense.moments_XX(), sparse.moments_XX(), atol=1e-10)
+            np.testing.assert_allclose(dense.moments_XY(), sparse.moments_XY(), atol=1e-10)
+
+    def test_fused_auto(self):
+        from ..moments import _fused_applicable, moments_fused
+        # dense data takes the fused path in automatic mode, data with many constant columns does not
+        self.assertTrue(_fused_applicable(self.X, self.Y, sparse_mode='auto', remove_mean=True))
+        X = np.hstack((self.X, np.ones((self.T, 10))))
+        self.assertFalse(_fused_applicable(X, X, sparse_mode='auto', remove_mean=True))
+        self.assertFalse(_fused_applicable(self.X, self.Y, sparse_mode='sparse'))
+        # symmetric updates with non-negative weights, general ones otherwise
+        for weights in (self.weights, self.weights - 0.5):
+            w, sx, sy, Cxx, Cxy, _ = moments_fused(self.X, self.Y, symmetrize=True, weights=weights, compute_XY=True)
+            wX, wY = weights[:, None] * self.X, weights[:, None] * self.Y
+            np.testing.assert_allclose(Cxx, np.dot(wX.T, self.X) + np.dot(wY.T, self.Y))
+            np.testing.assert_allclose(Cxy, np.dot(wX.T, self.Y) + np.dot(wY.T, self.X))
+
+    def test_combine_serialized_partial_estimates(self):
+        for sym in (False, True):
+            # partial estimates on every chunk, e.g. computed on different nodes
+            parts = []
+            for i in range(0, self.T, self.L):
+                cc = running_moments.RunningCovar(compute_XX=True, compute_XY=True, remove_mean=True, symmetrize=sym)
+                cc.add(self.X[i:i+self.L], self.Y[i:i+self.L])
+                parts.append(cc.to_bytes())
+            # reduce in arbitrary order
+            order = np.random.permutation(len(parts))
+            cc = running_moments.RunningCovar.from_bytes(parts[order[0]])
+            for i in order[1:]:
+                cc.combine(running_moments.RunningCovar.from_bytes(parts[i]))
+            np.testing.assert_allclose(cc.weight_XY(), self.wsym if sym else self.w)
+            if sym:
+                np.testing.assert_allclose(cc.sum_X(), self.s_sym)
+                np.testing.assert_allclose(cc.moments_XX(), self.Mxx0_sym)
+                np.testing.assert_allclose(cc.moments_XY(), self.Mxy0_sym)
+            else:
+                np.testing.assert_allclose(cc.sum_X(), self.sx)
+                np.testing.assert_allclose(cc.moments_XX(), self.Mxx0)
+                np.testing.assert_allclose(cc.moments_XY(), self.Mxy0)
+
+        with self.assertRaises(ValueError):
+            cc.combine(running_moments.RunningCovar(compute_XX=True, remove_mean=True))
+
+    def test_combine_moments_tree(self):
+        moments = [running_moments.Moments(0, np.zeros(2), np.zeros(2), np.zeros((2, 2)))]
+        for i in range(0, self.T, 700):
+            X = self.X[i:i+700]
+            m = X.mean(axis=0)
+            moments.append(running_moments.Moments(len(X), X.sum(axis=0), X.sum(axis=0), np.dot((X - m).T, X - m)))
+        restored = [running_moments.Moments.from_bytes(m.to_bytes()) for m in moments]
+        combined = running_moments.combine_moments(restored[::-1], mean_free=True)
+        np.testing.assert_allclose(combined.w, self.w)
+        np.testing.assert_allclose(combined.sx, self.sx)
+        np.testing.assert_allclose(combined.Mxy, self.Mxx0)
+        # the inputs are left untouched
+        np.testing.assert_equal(restored[1].Mxy, moments[1].Mxy)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -594,7 +594,8 @@ def discretizer(reader,
     return disc
 
 
-def save_traj(traj_inp, indexes, outfile, top=None, stride = 1, chunksize=None, image_molecules=False, verbose=True):
+def save_traj(traj_inp, indexes, outfile, top=None, stride = 1, chunksize=None, image_molecules=False, verbose=True,
+              n_jobs=1):
     r""" Saves a sequence of frames as a single trajectory.
 
     Extracts the specified sequence of time/trajectory indexes from traj_inp
@@ -654,6 +655,10 @@ def save_traj(traj_inp, indexes, outfile, top=None, stride = 1, chunksize=None,
     verbose : boolean, default is True
         Inform about created filenames
 
+    n_jobs : int or None, default is 1
+        Number of trajectory files to read concurrently. If None, all available CPUs will be used.
+        Fragmented trajectories are always read serially.
+
     Returns
     -------
     traj : :py:obj:`mdtraj.Trajectory` object
@@ -704,7 +709,7 @@ def save_traj(traj_inp, indexes, outfile, top=None, stride = 1, chunksize=None,
                          "but indexes will ask for file nr. %u"
                          % (len(trajfiles), indexes[:,0].max()))
 
-    traj = frames_from_files(trajfiles, top, indexes, chunksize, stride, reader=reader)
+    traj = frames_from_files(trajfiles, top, indexes, chunksize, stride, reader=reader, n_jobs=n_jobs)
 
     # Avoid broken molecules
     if image_molecules:
@@ -721,7 +726,7 @@ def save_traj(traj_inp, indexes, outfile, top=None, stride = 1, chunksize=None,
 
 
 def save_trajs(traj_inp, indexes, prefix='set_', fmt=None, outfiles=None,
-               inmemory=False, stride=1, verbose=False):
+               inmemory=False, stride=1, verbose=False, n_jobs=1):
     r""" Saves sequences of frames as multiple trajectories.
 
     Extracts a number of specified sequences of time/trajectory indexes from the
@@ -778,6 +783,12 @@ def save_trajs(traj_inp, indexes, prefix='set_', fmt=None, outfiles=None,
     verbose : boolean, default is False
         Verbose output while looking for "indexes" in the "traj_inp.trajfiles"
 
+    n_jobs : int or None, default is 1
+        Number of trajectory files to read concurrently. If None, all available CPUs will be used.
+        If n_jobs is not 1 and inmemory is False, the requested frames of several index sets are grouped per input
+        file, so every input file is read only once per batch of sets. Batches are limited in size, so that memory
+        consumption stays bounded. Only supported for non-fragmented MD data.
+
     Returns
     -------
     outfiles : list of str
@@ -819,14 +830,25 @@ def save_trajs(traj_inp, indexes, prefix='set_', fmt=None, outfiles=None,
 
     # This implementation looks for "i_indexes" separately, and thus one traj_inp.trajfile
     # might be accessed more than once (less memory intensive)
-    if not inmemory:
+    from pyemma.coordinates.data.feature_reader import FeatureReader
+    if not inmemory and n_jobs != 1 and isinstance(traj_inp, FeatureReader):
+        from pyemma.coordinates.data.util.frames_from_file import save_frames_to_files
+        if n_jobs is None:
+            from pyemma._base.parallel import get_n_jobs
+            n_jobs = get_n_jobs(logger=_logger)
+        save_frames_to_files(traj_inp.filenames, traj_inp.featurizer.topology, indexes, outfiles, stride=stride,
+                             chunksize=traj_inp.chunksize, offsets=traj_inp._offsets, n_jobs=n_jobs,
+                             lengths=traj_inp.trajectory_lengths())
+        if verbose:
+            _logger.info("Created files %s" % outfiles)
+    elif not inmemory:
         for i_indexes, outfile in zip(indexes, outfiles):
             # TODO: use **kwargs to parse to save_traj
-            save_traj(traj_inp, i_indexes, outfile, stride=stride, verbose=verbose)
+            save_traj(traj_inp, i_indexes, outfile, stride=stride, verbose=verbose, n_jobs=n_jobs)
 
     # This implementation is "one file - one pass" but might temporally create huge memory objects
     else:
-        traj = save_traj(traj_inp, indexes, outfile=None, stride=stride, verbose=verbose)
+        traj = save_traj(traj_inp, indexes, outfile=None, stride=stride, verbose=verbose, n_jobs=n_jobs)
         i_idx = 0
         for i_indexes, outfile in zip(indexes, outfiles):
             # Create indices for slicing the mdtraj trajectory object
@@ -846,7 +868,7 @@ def save_trajs(traj_inp, indexes, prefix='set_', fmt=None, outfiles=None,
 #
 # =========================================================================
 
-def pca(data=None, dim=-1, var_cutoff=0.95, stride=1, mean=None, skip=0, chunk_size=None):
+def pca(data=None, dim=-1, var_cutoff=0.95, stride=1, mean=None, skip=0, chunk_size=None, rank=None):
     r""" Principal Component Analysis (PCA).
 
     PCA is a linear transformation method that finds coordinates of maximal
@@ -910,6 +932,11 @@ def pca(data=None, dim=-1, var_cutoff=0.95, stride=1, mean=None, skip=0, chunk_s
         use the default value of the underlying reader/data source. Choose zero to
         disable chunking at all.
 
+    rank : int, optional, default None
+        If given, only the rank dominant principal components are computed in the subspace found by a randomized
+        range finder on the streamed data, so the full covariance matrix is never formed. Meant for very
+        high dimensional inputs.
+
     Returns
     -------
     pca : a :class:`PCA<pyemma.coordinates.transform.PCA>` transformation object
@@ -993,14 +1020,14 @@ def pca(data=None, dim=-1, var_cutoff=0.95, stride=1, mean=None, skip=0, chunk_s
         import warnings
         warnings.warn("provided mean ignored", DeprecationWarning)
 
-    res = PCA(dim=dim, var_cutoff=var_cutoff, mean=None, skip=skip, stride=stride)
+    res = PCA(dim=dim, var_cutoff=var_cutoff, mean=None, skip=skip, stride=stride, rank=rank)
     if data is not None:
         res.estimate(data, chunksize=chunk_size)
     return res
 
 
 def tica(data=None, lag=10, dim=-1, var_cutoff=0.95, kinetic_map=True, commute_map=False, weights='empirical',
-         stride=1, remove_mean=True, skip=0, reversible=True, ncov_max=float('inf'), chunk_size=None):
+         stride=1, remove_mean=True, skip=0, reversible=True, ncov_max=float('inf'), chunk_size=None, rank=None):
     r""" Time-lagged independent component analysis (TICA).
 
     TICA is a linear transformation method. In contrast to PCA, which finds
@@ -1026,8 +1053,15 @@ def tica(data=None, lag=10, dim=-1, var_cutoff=0.95, kinetic_map=True, commute_m
         source function array with the data, if available. When given, the TICA
         transformation is immediately computed and can be used to transform data.
 
-    lag : int, optional, default = 10
-        the lag time, in multiples of the input time step
+    lag : int or list of int, optional, default = 10
+        the lag time, in multiples of the input time step.
+        If a list of lag times is given, the covariance matrices of all lag times are estimated in a single
+        pass over the data (see :func:`covariance_lagged`) and a list of estimated TICA objects is returned,
+        which is useful to choose the lag time. Their timescales are available as usual, VAMP scores of all
+        lag times via :meth:`MultiLagCovariance.vamp_scores
+        <pyemma.coordinates.estimation.covariance.MultiLagCovariance.vamp_scores>`.
+        This requires data, weights='empirical', the default ncov_max and lag times being multiples of stride.
+        As for a single lag time, the mean is always removed.
 
     dim : int, optional, default -1
         the number of dimensions (independent components) to project onto. A
@@ -1090,6 +1124,11 @@ def tica(data=None, lag=10, dim=-1, var_cutoff=0.95, kinetic_map=True, commute_m
         use the default value of the underlying reader/data source. Choose zero to
         disable chunking at all.
 
+    rank : int, optional, default None
+        If given, a low rank TICA is estimated within the dominant subspace of the instantaneous covariance
+        matrix found by a randomized range finder on the streamed data, so the full covariance matrices are
+        never formed. At most rank independent components are returned. Meant for very high dimensional inputs.
+
     Returns
     -------
     tica : a :class:`TICA <pyemma.coordinates.transform.TICA>` transformation object
@@ -1197,6 +1236,27 @@ def tica(data=None, lag=10, dim=-1, var_cutoff=0.95, kinetic_map=True, commute_m
     from pyemma.coordinates.transform.tica import TICA
     from pyemma.coordinates.estimation.koopman import _KoopmanEstimator
     import types
+    if not remove_mean:
+        import warnings
+        user_msg = 'remove_mean option is deprecated. The mean is removed from the data by default, otherwise it' \
+                   'cannot be guaranteed that all eigenvalues will be smaller than one. Some functionalities might' \
+                   'become useless in this case (e.g. commute_maps). Also, not removing the mean will not result in' \
+                   'a significant speed up of calculations.'
+        warnings.warn(
+            user_msg,
+            category=PyEMMA_DeprecationWarning)
+
+    if isinstance(lag, (list, tuple, _np.ndarray)):
+        if data is None:
+            raise ValueError("Data must be supplied for multiple lag times.")
+        if rank is not None:
+            raise ValueError("Multiple lag times are not supported for low rank TICA.")
+        if ncov_max != float('inf'):
+            raise ValueError("Multiple lag times accumulate exact sums and do not support ncov_max, but it was {}."
+                             .format(ncov_max))
+        covars = covariance_lagged(data, lag=lag, remove_data_mean=True, reversible=reversible, bessel=False,
+                                   weights=weights, stride=stride, skip=skip, chunksize=chunk_size)
+        return covars.tica_models(dim=dim, var_cutoff=var_cutoff, kinetic_map=kinetic_map, commute_map=commute_map)
     if isinstance(weights, str):
         if weights == "koopman":
             if data is None:
@@ -1218,18 +1278,8 @@ def tica(data=None, lag=10, dim=-1, var_cutoff=0.95, kinetic_map=True, commute_m
     else:
         raise ValueError("reweighting must be either 'empirical', 'koopman' or an object with a weights(data) method.")
 
-    if not remove_mean:
-        import warnings
-        user_msg = 'remove_mean option is deprecated. The mean is removed from the data by default, otherwise it' \
-                   'cannot be guaranteed that all eigenvalues will be smaller than one. Some functionalities might' \
-                   'become useless in this case (e.g. commute_maps). Also, not removing the mean will not result in' \
-                   'a significant speed up of calculations.'
-        warnings.warn(
-            user_msg,
-            category=PyEMMA_DeprecationWarning)
-
     res = TICA(lag, dim=dim, var_cutoff=var_cutoff, kinetic_map=kinetic_map, commute_map=commute_map, skip=skip, stride=stride,
-               weights=weights, reversible=reversible, ncov_max=ncov_max)
+               weights=weights, reversible=reversible, ncov_max=ncov_max, rank=rank)
     if data is not None:
         res.estimate(data, chunksize=chunk_size)
     return res
@@ -1268,8 +1318,12 @@ def covariance_lagged(data=None, c00=True, c0t=True, ctt=False, remove_constant_
             symmetrize correlations.
         bessel : bool, optional, default=True
             use Bessel's correction for correlations in order to use an unbiased estimator
-        lag : int, optional, default=0
+        lag : int or list of int, optional, default=0
             lag time. Does not work with xy=True or yy=True.
+            If a list of lag times is given, the covariances of all lag times are computed in a single pass over the
+            data and a :class:`MultiLagCovariance <pyemma.coordinates.estimation.covariance.MultiLagCovariance>`
+            object is returned, which always provides C00_, C0t_ and Ctt_. This is only supported without weights
+            and remove_constant_mean. All lag times have to be multiples of stride.
         weights : optional, default="empirical"
              Re-weighting strategy to be used in order to compute equilibrium covariances from non-equilibrium data.
                 * "empirical":  no re-weighting
@@ -1289,7 +1343,9 @@ def covariance_lagged(data=None, c00=True, c0t=True, ctt=False, remove_constant_
 
         Returns
         -------
-        lc : a :class:`LaggedCovariance <pyemma.coordinates.estimation.covariance.LaggedCovariance>` object.
+        lc : a :class:`LaggedCovariance <pyemma.coordinates.estimation.covariance.LaggedCovariance>` object or a
+            :class:`MultiLagCovariance <pyemma.coordinates.estimation.covariance.MultiLagCovariance>` object for
+            multiple lag times.
 
 
         .. [1] Wu, H., Nueske, F., Paul, F., Klus, S., Koltai, P., and Noe, F. 2016. Bias reduced variational
@@ -1297,9 +1353,18 @@ def covariance_lagged(data=None, c00=True, c0t=True, ctt=False, remove_constant_
 
         """
 
-    from pyemma.coordinates.estimation.covariance import LaggedCovariance
+    from pyemma.coordinates.estimation.covariance import LaggedCovariance, MultiLagCovariance
     from pyemma.coordinates.estimation.koopman import _KoopmanEstimator
     import types
+    if isinstance(lag, (list, tuple, _np.ndarray)):
+        if not (isinstance(weights, str) and weights == "empirical") or remove_constant_mean is not None:
+            raise ValueError("Multiple lag times are only supported with weights='empirical' "
+                             "and remove_constant_mean=None.")
+        lc = MultiLagCovariance(lags=lag, remove_data_mean=remove_data_mean, reversible=reversible, bessel=bessel,
+                                stride=stride, skip=skip)
+        if data is not None:
+            lc.estimate(data, chunksize=chunksize)
+        return lc
     if isinstance(weights, str):
         if weights== "koopman":
             if data is None:
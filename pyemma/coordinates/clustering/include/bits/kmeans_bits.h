@@ -45,13 +45,23 @@ KMeans<dtype>::cluster(const np_array &np_chunk, const np_array &np_centers, int
     std::fill(return_new_centers.mutable_data(), return_new_centers.mutable_data() + return_new_centers.size(), 0.0);
     std::vector<std::size_t> centers_counter(n_centers, 0);
 
+    /* prepare (e.g. center) frames and centers once, so the metric does not repeat it for every pair */
+    std::vector<dtype> chunk_buffer, centers_buffer;
+    std::vector<float> chunk_traces, centers_traces;
+    const dtype* p_chunk = parent_t::metric->prepare(np_chunk.data(), n_frames, chunk_buffer, chunk_traces);
+    const dtype* p_centers = parent_t::metric->prepare(np_centers.data(), n_centers, centers_buffer, centers_traces);
+    auto distance = [&](std::size_t i, std::size_t j) {
+        return parent_t::metric->compute_prepared(p_chunk + i * dim, chunk_traces[i],
+                                                  p_centers + j * dim, centers_traces[j]);
+    };
+
     /* do the clustering */
     if (n_threads == 0) {
         std::size_t closest_center_index = 0;
         for (std::size_t i = 0; i < n_frames; ++i) {
             auto mindist = std::numeric_limits<dtype>::max();
             for(std::size_t j = 0; j < n_centers; ++j) {
-                auto d = parent_t::metric->compute(&chunk(i, 0), &centers(j, 0));
+                auto d = distance(i, j);
                 if(d < mindist) {
                     mindist = d;
                     closest_center_index = j;
@@ -70,7 +80,7 @@ KMeans<dtype>::cluster(const np_array &np_chunk, const np_array &np_centers, int
         for (std::size_t i = 0; i < n_frames; ++i) {
             std::vector<dtype> dists(n_centers);
             for (std::size_t j = 0; j < n_centers; ++j) {
-                dists[j] = parent_t::metric->compute(&chunk(i, 0), &centers(j, 0));
+                dists[j] = distance(i, j);
             }
 #pragma omp flush(dists)
 
@@ -97,9 +107,9 @@ KMeans<dtype>::cluster(const np_array &np_chunk, const np_array &np_centers, int
                 for (auto i = begin; i < end; ++i) {
                     std::size_t argMinDist = 0;
                     {
-                        dtype minDist = parent_t::metric->compute(&chunk(i, 0), &centers(0, 0));
+                        dtype minDist = distance(i, 0);
                         for (std::size_t j = 1; j < n_centers; ++j) {
-                            auto dist = parent_t::metric->compute(&chunk(i, 0), &centers(j, 0));
+                            auto dist = distance(i, j);
                             if(dist < minDist) {
                                 minDist = dist;
                                 argMinDist = j;
@@ -173,19 +183,24 @@ typename KMeans<dtype>::cluster_res KMeans<dtype>::cluster_loop(const np_array&
 
 template<typename dtype>
 dtype KMeans<dtype>::costFunction(const np_array &np_data, const np_array &np_centers, int n_threads) const {
-    auto data = np_data.template unchecked<2>();
-    auto centers = np_centers.template unchecked<2>();
-
     dtype value = 0.0;
     auto n_frames = static_cast<std::size_t>(np_data.shape(0));
+    auto n_centers = static_cast<std::size_t>(np_centers.shape(0));
+    auto dim = static_cast<std::size_t>(np_data.shape(1));
+
+    std::vector<dtype> data_buffer, centers_buffer;
+    std::vector<float> data_traces, centers_traces;
+    const dtype* p_data = parent_t::metric->prepare(np_data.data(), n_frames, data_buffer, data_traces);
+    const dtype* p_centers = parent_t::metric->prepare(np_centers.data(), n_centers, centers_buffer, centers_traces);
 #ifdef USE_OPENMP
     omp_set_num_threads(n_threads);
 #endif
 
 #pragma omp parallel for reduction(+:value)
     for (std::size_t i = 0; i < n_frames; i++) {
-        for (std::size_t r = 0; r < np_centers.shape(0); r++) {
-            auto l = parent_t::metric->compute(&data(i, 0), &centers(r, 0));
+        for (std::size_t r = 0; r < n_centers; r++) {
+            auto l = parent_t::metric->compute_prepared(p_data + i * dim, data_traces[i],
+                                                        p_centers + r * dim, centers_traces[r]);
             {
                 value += l;
             }
@@ -239,6 +254,13 @@ initCentersKMpp(const np_array &np_data, unsigned int random_seed, int n_threads
                 static_cast<std::size_t>(init_centers.size() * init_centers.itemsize()));
 
     const auto data = np_data.template unchecked<2>();
+    /* prepare (e.g. center) the data once, distances are then evaluated between prepared frames */
+    std::vector<dtype> data_buffer;
+    std::vector<float> data_traces;
+    const dtype* p_data = parent_t::metric->prepare(np_data.data(), n_frames, data_buffer, data_traces);
+    auto distance = [&](std::size_t i, std::size_t j) {
+        return parent_t::metric->compute_prepared(p_data + i * dim, data_traces[i], p_data + j * dim, data_traces[j]);
+    };
     /* initialize random device and pick first center randomly */
     std::default_random_engine generator(random_seed);
     std::uniform_int_distribution<size_t> uniform_dist(0, n_frames - 1);
@@ -266,7 +288,7 @@ initCentersKMpp(const np_array &np_data, unsigned int random_seed, int n_threads
     #pragma omp parallel for reduction(+:dist_sum)
         for (std::size_t i = 0; i < n_frames; i++) {
             if (i != first_center_index) {
-                auto value = parent_t::metric->compute(&data(i, 0), &data(first_center_index, 0));
+                auto value = distance(i, first_center_index);
                 value = value * value;
                 squared_distances[i] = value;
                 /* build up dist_sum which keeps the sum of all squared distances */
@@ -322,8 +344,7 @@ initCentersKMpp(const np_array &np_data, unsigned int random_seed, int n_threads
                     #pragma omp critical
                     {
                         if (next_center_candidates.at(j) != i) {
-                            auto value = parent_t::metric->compute(&data(i, 0),
-                                                                   &data(next_center_candidates.at(j), 0));
+                            auto value = distance(i, next_center_candidates.at(j));
                             auto d = value * value;
                             if (d < squared_distances.at(i)) {
                                 next_center_candidates_potential[j] += d;
@@ -383,7 +404,7 @@ initCentersKMpp(const np_array &np_data, unsigned int random_seed, int n_threads
 #pragma omp parallel for
                 for (std::size_t i = 0; i < n_frames; ++i) {
                     if (taken_points[i] == 0) {
-                        auto value = parent_t::metric->compute(&data(i, 0), &data(best_candidate, 0));
+                        auto value = distance(i, static_cast<std::size_t>(best_candidate));
                         auto d = value * value;
 #pragma omp critical
                         {
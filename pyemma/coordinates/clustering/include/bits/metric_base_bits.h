@@ -83,6 +83,19 @@ inline py::array_t<int> metric_base<dtype>::assign_chunk_to_centers(const np_arr
     return dtraj;
 }
 
+template <typename dtype>
+inline const dtype* metric_base<dtype>::prepare(const dtype *frames, std::size_t n, std::vector<dtype> &/*buffer*/,
+                                                std::vector<float> &traces) {
+    traces.assign(n, 0);
+    return frames;
+}
+
+template <typename dtype>
+inline dtype metric_base<dtype>::compute_prepared(const dtype *a, float /*trace_a*/, const dtype *b,
+                                                  float /*trace_b*/) {
+    return compute(a, b);
+}
+
 /**
  * euclidean distance method
  * @tparam dtype
@@ -107,44 +120,109 @@ inline dtype euclidean_metric<dtype>::compute(const dtype *const a, const dtype
 
 /**
  * minRMSD distance function
- * a: centers
- * b: frames
- * n: dimension of one frame
- * buffer_a: pre-allocated buffer to store a copy of centers
- * buffer_b: pre-allocated buffer to store a copy of frames
- * trace_a_precalc: pre-calculated trace to centers (pointer to one value)
+ * a: first frame
+ * b: second frame
+ * Both frames are centered in buffers, which are reused by all calls of the same thread.
  */
 template <typename dtype>
 inline dtype min_rmsd_metric<dtype>::compute(const dtype *a, const dtype *b) {
     float trace_a, trace_b;
     auto dim3 = static_cast<const int>(parent_t::dim / 3);
-    std::vector<float> buffer_b (b, b + parent_t::dim);
+    static thread_local std::vector<float> buffer_a, buffer_b;
+    buffer_a.assign(a, a + parent_t::dim);
+    buffer_b.assign(b, b + parent_t::dim);
 
-    if (!has_trace_a_been_precalculated) {
-        std::vector<float> buffer_a (a, a + parent_t::dim);
-        inplace_center_and_trace_atom_major(buffer_a.data(), &trace_a, 1, dim3);
-        inplace_center_and_trace_atom_major(buffer_b.data(), &trace_b, 1, dim3);
+    inplace_center_and_trace_atom_major(buffer_a.data(), &trace_a, 1, dim3);
+    inplace_center_and_trace_atom_major(buffer_b.data(), &trace_b, 1, dim3);
 
-    } else {
-        inplace_center_and_trace_atom_major(buffer_b.data(), &trace_b, 1, dim3);
-        trace_a = *trace_centers.data();
-    }
+    float msd = msd_atom_major(dim3, dim3, buffer_a.data(), buffer_b.data(), trace_a, trace_b, 0, nullptr);
+    return std::sqrt(msd);
+}
+
+template <typename dtype>
+inline const dtype* min_rmsd_metric<dtype>::prepare(const dtype *frames, std::size_t n, std::vector<dtype> &buffer,
+                                                    std::vector<float> &traces) {
+    buffer.assign(frames, frames + n * parent_t::dim);
+    traces.resize(n);
+    inplace_center_and_trace_atom_major(buffer.data(), traces.data(), static_cast<int>(n),
+                                        static_cast<int>(parent_t::dim / 3));
+    return buffer.data();
+}
 
-    float msd = msd_atom_major(dim3, dim3, a, buffer_b.data(), trace_a, trace_b, 0, nullptr);
+template <typename dtype>
+inline dtype min_rmsd_metric<dtype>::compute_prepared(const dtype *a, float trace_a, const dtype *b, float trace_b) {
+    auto dim3 = static_cast<const int>(parent_t::dim / 3);
+    float msd = msd_atom_major(dim3, dim3, a, b, trace_a, trace_b, 0, nullptr);
     return std::sqrt(msd);
 }
 
+template <typename dtype>
+inline py::array_t<int> min_rmsd_metric<dtype>::assign_chunk_to_centers(const typename parent_t::np_array& chunk,
+                                                                        const typename parent_t::np_array& centers,
+                                                                        unsigned int n_threads) {
+    if (chunk.ndim() != 2) {
+        throw std::invalid_argument("provided chunk does not have two dimensions.");
+    }
+
+    if (centers.ndim() != 2) {
+        throw std::invalid_argument("provided centers does not have two dimensions.");
+    }
+    auto N_centers = static_cast<std::size_t>(centers.shape(0));
+    auto N_frames = static_cast<std::size_t>(chunk.shape(0));
+    auto input_dim = static_cast<std::size_t>(chunk.shape(1));
+    auto dim = parent_t::dim;
+    auto dim3 = static_cast<const int>(dim / 3);
+
+    if ((input_dim != dim) || (input_dim != centers.shape(1))) {
+        throw std::invalid_argument("input dimension mismatch");
+    }
+    std::vector<size_t> shape = {N_frames};
+    py::array_t<int> dtraj(shape);
+    int *dtraj_p = dtraj.mutable_data();
+    const float *chunk_p = chunk.data();
+
+    /* center the centers once (a copy, they might already be precentered) */
+    std::vector<float> centers_centered(centers.data(), centers.data() + N_centers * dim);
+    std::vector<float> traces_centers(N_centers);
+    inplace_center_and_trace_atom_major(centers_centered.data(), traces_centers.data(),
+                                        static_cast<int>(N_centers), dim3);
+    {
+        py::gil_scoped_release release;
+#ifdef USE_OPENMP
+        omp_set_num_threads(n_threads);
+#endif
+        #pragma omp parallel
+        {
+            /* every frame is centered only once, in a buffer of the thread */
+            std::vector<float> frame(dim);
+            float trace_frame;
+
+            #pragma omp for
+            for (std::size_t i = 0; i < N_frames; ++i) {
+                std::copy(chunk_p + i * dim, chunk_p + (i + 1) * dim, frame.begin());
+                inplace_center_and_trace_atom_major(frame.data(), &trace_frame, 1, dim3);
+
+                float mindist = std::numeric_limits<float>::max();
+                int argmin = -1;
+                for (std::size_t j = 0; j < N_centers; ++j) {
+                    float msd = msd_atom_major(dim3, dim3, &centers_centered[j * dim], frame.data(),
+                                               traces_centers[j], trace_frame, 0, nullptr);
+                    if (msd < mindist) {
+                        mindist = msd;
+                        argmin = static_cast<int>(j);
+                    }
+                }
+                dtraj_p[i] = argmin;
+            }
+        }
+    }
+    return dtraj;
+}
+
 template<typename dtype>
 inline void min_rmsd_metric<dtype>::precenter_centers(float *centers, std::size_t N_centers) {
-    trace_centers.resize(N_centers);
-    float *trace_centers_p = trace_centers.data();
-
-    /* Parallelize centering of cluster generators */
-    /* Note that this is already OpenMP-enabled */
-    for (std::size_t j = 0; j < N_centers; ++j) {
-        inplace_center_and_trace_atom_major(&centers[j * parent_t::dim],
-                                            &trace_centers_p[j], 1, parent_t::dim / 3);
-    }
+    std::vector<float> traces(N_centers);
+    inplace_center_and_trace_atom_major(centers, traces.data(), static_cast<int>(N_centers), parent_t::dim / 3);
 }
 
 
@@ -10,6 +10,8 @@
 #include <stdexcept>
 #include <cmath>
 #include <vector>
+#include <limits>
+#include <algorithm>
 
 #include <pybind11/pybind11.h>
 #include <pybind11/numpy.h>
@@ -35,9 +37,26 @@ public:
 
     virtual dtype compute(const dtype *, const dtype *) = 0;
 
-    py::array_t<int> assign_chunk_to_centers(const np_array& chunk,
-                                             const np_array& centers,
-                                             unsigned int n_threads);
+    /**
+     * prepares n consecutive frames once for compute_prepared, e.g. minRMSD centers them and computes their
+     * traces. The default keeps the frames as they are.
+     * @param frames pointer to n * dim values
+     * @param n number of frames
+     * @param buffer storage of the prepared frames, if the metric needs a copy
+     * @param traces per frame values passed on to compute_prepared (resized to n)
+     * @return pointer to the prepared frames (either frames or buffer.data())
+     */
+    virtual const dtype* prepare(const dtype *frames, std::size_t n, std::vector<dtype> &buffer,
+                                 std::vector<float> &traces);
+
+    /**
+     * distance of two frames prepared by prepare(), along with their traces.
+     */
+    virtual dtype compute_prepared(const dtype *a, float trace_a, const dtype *b, float trace_b);
+
+    virtual py::array_t<int> assign_chunk_to_centers(const np_array& chunk,
+                                                     const np_array& centers,
+                                                     unsigned int n_threads);
     size_t dim;
 };
 
@@ -62,12 +81,11 @@ class min_rmsd_metric : public metric_base<dtype> {
 
 public:
     using parent_t = metric_base<dtype>;
-    min_rmsd_metric(std::size_t dim, float *precalc_trace_centers = nullptr)
+    explicit min_rmsd_metric(std::size_t dim)
             : metric_base<float>(dim) {
         if (dim % 3 != 0) {
             throw std::range_error("min_rmsd_metric is only implemented for input data with a dimension dividable by 3.");
         }
-        has_trace_a_been_precalculated = precalc_trace_centers != nullptr;
     }
     ~min_rmsd_metric() = default;
     min_rmsd_metric(const min_rmsd_metric&) = delete;
@@ -75,20 +93,30 @@ public:
     min_rmsd_metric(min_rmsd_metric&&) = default;
     min_rmsd_metric&operator=(min_rmsd_metric&&) = default;
     dtype compute(const dtype *a, const dtype *b);
+    /**
+     * copies and centers the frames in buffer and stores their traces, so compute_prepared evaluates the
+     * QCP kernel without centering the frames again.
+     */
+    const dtype* prepare(const dtype *frames, std::size_t n, std::vector<dtype> &buffer,
+                         std::vector<float> &traces) override;
+    dtype compute_prepared(const dtype *a, float trace_a, const dtype *b, float trace_b) override;
+    /**
+     * assign frames to their closest centers. Every frame and center is centered (and traced) only once per chunk,
+     * the distances are evaluated from thread local copies.
+     * @param chunk
+     * @param centers
+     * @param n_threads
+     * @return
+     */
+    py::array_t<int> assign_chunk_to_centers(const typename parent_t::np_array& chunk,
+                                             const typename parent_t::np_array& centers,
+                                             unsigned int n_threads) override;
     /**
      * pre-center in place
      * @param original_centers
      * @param N_centers
      */
     void precenter_centers(float *original_centers, std::size_t N_centers);
-
-private:
-    /**
-     * only used during cluster assignment. Avoids precentering the centers in every step.
-     */
-    std::vector<float> trace_centers;
-    bool has_trace_a_been_precalculated;
-    float trace_a_precentered;
 };
 
 #include "bits/metric_base_bits.h"
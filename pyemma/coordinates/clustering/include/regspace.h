@@ -52,17 +52,33 @@ public:
         std::size_t N_frames = chunk.shape(0);
         std::size_t dim = chunk.shape(1);
         std::size_t N_centers = py_centers.size();
+        auto metric = parent_t::metric.get();
+        // prepare (e.g. center) the chunk and the known centers once, new centers are appended prepared
+        std::vector<dtype> chunk_buffer, centers_buffer;
+        std::vector<float> chunk_traces, centers_traces;
+        const dtype* p_chunk = metric->prepare(chunk.data(), N_frames, chunk_buffer, chunk_traces);
+        std::vector<dtype> centers(N_centers * dim);
+        for (std::size_t j = 0; j < N_centers; ++j) {
+            auto point = py_centers[j].cast < py::array_t < dtype, py::array::c_style | py::array::forcecast >> ();
+            std::copy(point.data(), point.data() + dim, centers.begin() + j * dim);
+        }
+        const dtype* p_centers = metric->prepare(centers.data(), N_centers, centers_buffer, centers_traces);
+        if (p_centers == centers.data()) {
+            // the metric works on the frames themselves, keep the centers in one buffer nevertheless
+            centers_buffer.swap(centers);
+        }
         #if defined(USE_OPENMP)
         omp_set_num_threads(n_threads);
         #endif
         // do the clustering
         for (std::size_t i = 0; i < N_frames; ++i) {
             auto mindist = std::numeric_limits<dtype>::max();
+            const dtype* frame = p_chunk + i * dim;
+            const float frame_trace = chunk_traces[i];
+            const dtype* prepared_centers = centers_buffer.data();
             #pragma omp parallel for reduction(min:mindist)
             for (std::size_t j = 0; j < N_centers; ++j) {
-                // TODO avoid the cast in inner loop?
-                auto point = py_centers[j].cast < py::array_t < dtype >> ();
-                auto d = parent_t::metric.get()->compute(&data(i, 0), point.data());
+                auto d = metric->compute_prepared(frame, frame_trace, prepared_centers + j * dim, centers_traces[j]);
                 if (d < mindist) mindist = d;
             }
             if (mindist > dmin) {
@@ -77,6 +93,8 @@ public:
                 std::memcpy(new_center.mutable_data(), &data(i, 0), sizeof(dtype)*dim);
 
                 py_centers.append(new_center);
+                centers_buffer.insert(centers_buffer.end(), frame, frame + dim);
+                centers_traces.push_back(frame_trace);
                 N_centers++;
             }
         }
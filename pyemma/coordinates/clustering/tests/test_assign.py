@@ -273,6 +273,19 @@ class TestClusterAssign(unittest.TestCase):
                          "assigned states=%s out of %s possible ones."
                          % (num_assigned_states, N_centers))
 
+    def test_min_rmsd_against_mdtraj(self):
+        import mdtraj
+        import pyemma.datasets as data
+        d = data.get_bpti_test_data()
+        traj = mdtraj.load(d['trajs'][0], top=d['top'])
+        centers = traj[[3, 17, 40, 61]]
+        # non centered data and centers
+        X = (traj.xyz + np.arange(traj.n_frames)[:, None, None] * 0.1).reshape(traj.n_frames, -1)
+        dtraj = coor.assign_to_centers(X, centers=centers.xyz.reshape(centers.n_frames, -1), metric='minRMSD',
+                                       return_dtrajs=True, n_jobs=2)[0]
+        rmsds = np.array([mdtraj.rmsd(traj, centers, frame=k) for k in range(centers.n_frames)])
+        np.testing.assert_equal(dtraj, rmsds.argmin(axis=0))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -106,7 +106,7 @@ class Iterable(Loggable, metaclass=ABCMeta):
 
         self._in_memory = True
 
-    def iterator(self, stride=1, lag=0, chunk=None, return_trajindex=True, cols=None, skip=0):
+    def iterator(self, stride=1, lag=0, chunk=None, return_trajindex=True, cols=None, skip=0, return_lagged=True):
         """ creates an iterator to stream over the (transformed) data.
 
         If your data is too large to fit into memory and you want to incrementally compute
@@ -129,6 +129,9 @@ class Iterable(Loggable, metaclass=ABCMeta):
             return only the given columns.
         skip: int, default=0
             skip 'n' first frames of each trajectory.
+        return_lagged: boolean, default=True
+            only used if lag > 0. If False, the time-lagged data is neither read nor computed and None is returned
+            in its place. The instantaneous data still only contains frames having a time-lagged counterpart.
 
         Returns
         -------
@@ -154,14 +157,24 @@ class Iterable(Loggable, metaclass=ABCMeta):
         if self.in_memory:
             from pyemma.coordinates.data.data_in_memory import DataInMemory
             return DataInMemory(self._Y).iterator(
-                lag=lag, chunk=chunk, stride=stride, return_trajindex=return_trajindex, skip=skip
+                lag=lag, chunk=chunk, stride=stride, return_trajindex=return_trajindex, skip=skip,
+                return_lagged=return_lagged
             )
         chunk = chunk if chunk is not None else self.chunksize
+        if lag > 0 and not return_lagged:
+            it = self._create_iterator(skip=skip, chunk=chunk, stride=stride,
+                                       return_trajindex=True, cols=cols)
+            return _LaggedDataIterator(it, lag, return_trajindex)
         if 0 < lag <= chunk:
             it = self._create_iterator(skip=skip, chunk=chunk, stride=1,
                                        return_trajindex=return_trajindex, cols=cols)
             it.return_traj_index = True
             return _LaggedIterator(it, lag, return_trajindex, stride)
+        elif lag > 0 and is_int(stride) and lag % stride == 0:
+            # the time-lagged frames are part of the strided stream, so a single pass suffices.
+            it = self._create_iterator(skip=skip, chunk=chunk, stride=stride,
+                                       return_trajindex=True, cols=cols)
+            return _RingBufferLaggedIterator(it, lag, return_trajindex)
         elif lag > 0:
             it = self._create_iterator(skip=skip, chunk=chunk, stride=stride,
                                        return_trajindex=return_trajindex, cols=cols)
@@ -210,14 +223,21 @@ class Iterable(Loggable, metaclass=ABCMeta):
         if chunk is None:
             chunk = self.chunksize
 
+        # let the iterator select the columns, so sources can omit computing the others (eg. FeatureReader).
+        cols = np.arange(self.ndim)[dimensions]
+        if len(cols) == self.ndim and np.all(cols == np.arange(self.ndim)):
+            cols = None
+
         # create iterator
         if self.in_memory and not self._mapping_to_mem_active:
             from pyemma.coordinates.data.data_in_memory import DataInMemory
             assert self._Y is not None
             it = DataInMemory(self._Y)._create_iterator(skip=skip, chunk=chunk,
-                                                        stride=stride, return_trajindex=True)
+                                                        stride=stride, return_trajindex=True, cols=cols)
         else:
-            it = self._create_iterator(skip=skip, chunk=chunk, stride=stride, return_trajindex=True)
+            it = self._create_iterator(skip=skip, chunk=chunk, stride=stride, return_trajindex=True, cols=cols)
+            # every chunk is copied into the output arrays, so transformers may reuse their output buffers.
+            it._reuse_output = True
 
         with it:
             # allocate memory
@@ -248,7 +268,7 @@ class Iterable(Loggable, metaclass=ABCMeta):
                 for itraj, chunk in it:
                     L = len(chunk)
                     assert L
-                    trajs[itraj][it.pos:it.pos + L, :] = chunk[:, dimensions]
+                    trajs[itraj][it.pos:it.pos + L, :] = chunk if cols is not None else chunk[:, dimensions]
                     # update progress
                     pg.update(1)
 
@@ -463,6 +483,244 @@ class _LaggedIterator(object):
         self._it.__exit__(exc_type, exc_val, exc_tb)
 
 
+class _FrameRingBuffer(object):
+    """ FIFO of frames stored in a ring buffer.
+
+    Parameters
+    ----------
+    capacity : int
+        initial number of frames, the buffer grows if more frames are pushed.
+    ndim : int
+        dimension of a frame.
+    dtype : numpy.dtype
+        data type of the frames.
+    spill_to_disk : bool
+        if True, the buffer is memory mapped to a temporary file.
+    """
+    def __init__(self, capacity, ndim, dtype, spill_to_disk=False):
+        self._ndim = ndim
+        self._dtype = dtype
+        self._spill_to_disk = spill_to_disk
+        self._fh = None
+        self._buffer = self._allocate(max(1, capacity))
+        self._start = 0
+        self._size = 0
+
+    def _allocate(self, capacity):
+        if self._spill_to_disk:
+            import tempfile
+            self._fh = tempfile.TemporaryFile()
+            return np.memmap(self._fh, dtype=self._dtype, mode='w+', shape=(capacity, self._ndim))
+        return np.empty((capacity, self._ndim), dtype=self._dtype)
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+
+    def close(self):
+        self.clear()
+        self._buffer = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def push(self, frames):
+        n = len(frames)
+        if self._size + n > len(self._buffer):
+            content = self.peek(0, self._size)
+            old_fh = self._fh
+            self._buffer = self._allocate(max(2 * len(self._buffer), self._size + n))
+            if old_fh is not None:
+                old_fh.close()
+            self._buffer[:self._size] = content
+            self._start = 0
+        capacity = len(self._buffer)
+        end = (self._start + self._size) % capacity
+        first = min(n, capacity - end)
+        self._buffer[end:end + first] = frames[:first]
+        self._buffer[:n - first] = frames[first:]
+        self._size += n
+
+    def peek(self, offset, n):
+        """ returns a copy of n frames starting at offset (relative to the oldest frame). """
+        assert offset + n <= self._size
+        capacity = len(self._buffer)
+        begin = (self._start + offset) % capacity
+        first = min(n, capacity - begin)
+        out = np.empty((n, self._ndim), dtype=self._dtype)
+        out[:first] = self._buffer[begin:begin + first]
+        out[first:] = self._buffer[:n - first]
+        return out
+
+    def discard(self, n):
+        """ removes the n oldest frames. """
+        n = min(n, self._size)
+        self._start = (self._start + n) % len(self._buffer)
+        self._size -= n
+
+
+class _RingBufferLaggedIterator(object):
+    """ _RingBufferLaggedIterator builds time-lagged chunks for arbitrary lag times in a single pass.
+
+    The last lag frames of the current trajectory are kept in a ring buffer, so every frame is only read once.
+    If the buffer would exceed SPILL_TO_DISK_CUTOFF bytes, it is memory mapped to a temporary file. The instantaneous
+    chunks have the same boundaries as the chunks of an iterator without lag.
+
+    Parameters
+    ----------
+    it: DataSourceIterator (stride must divide lag)
+    lag : int
+        lag time
+    return_trajindex: bool
+        whether to return the current trajectory index during iteration (itraj).
+    """
+    SPILL_TO_DISK_CUTOFF = int(512 * 1024**2)  # 512 MB
+
+    def __init__(self, it, lag, return_trajindex):
+        assert is_int(lag)
+        self._it = it
+        self._lag = lag
+        self._return_trajindex = return_trajindex
+        self._stride = it.stride
+        # lag in units of strided frames.
+        self._lag_strided = lag // it.stride
+        self._buffer = None
+        self._itraj = None
+        self._pending = []
+        self._exhausted = False
+
+    @property
+    def n_chunks(self):
+        cs = self._it.chunksize
+        return self._it._data_source.n_chunks(cs, stride=self._stride, skip=self._it.skip + self._lag)
+
+    def __len__(self):
+        return self._it._data_source.trajectory_lengths(self._stride, self._it.skip + self._lag).min()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.next()
+
+    def _create_buffer(self, X):
+        chunksize = self._it.chunksize if self._it.chunksize > 0 else len(X)
+        capacity = self._lag_strided + 2 * chunksize
+        spill = capacity * X.shape[1] * X.dtype.itemsize > _RingBufferLaggedIterator.SPILL_TO_DISK_CUTOFF
+        return _FrameRingBuffer(capacity, X.shape[1], X.dtype, spill_to_disk=spill)
+
+    def _emit(self, n):
+        X = self._buffer.peek(0, n)
+        Y = self._buffer.peek(self._lag_strided, n)
+        self._buffer.discard(n)
+        self._pending.append((self._itraj, X, Y))
+
+    def _flush(self):
+        n_pairs = len(self._buffer) - self._lag_strided
+        if n_pairs > 0:
+            self._emit(n_pairs)
+        self._buffer.clear()
+
+    def _read(self):
+        try:
+            itraj, X = self._it.next()
+        except StopIteration:
+            self._exhausted = True
+            if self._buffer is not None:
+                self._flush()
+            return
+        if self._buffer is None:
+            self._buffer = self._create_buffer(X)
+        if itraj != self._itraj:
+            self._flush()
+            self._itraj = itraj
+        self._buffer.push(X)
+        chunksize = self._it.chunksize
+        if chunksize > 0:
+            while len(self._buffer) - self._lag_strided >= chunksize:
+                self._emit(chunksize)
+        if self._it.last_chunk_in_traj:
+            self._flush()
+
+    def next(self):
+        while not self._pending:
+            if self._exhausted:
+                raise StopIteration()
+            self._read()
+        itraj, X, Y = self._pending.pop(0)
+        if self._return_trajindex:
+            return itraj, X, Y
+        return X, Y
+
+    def close(self):
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+
+    def __enter__(self):
+        self._it.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        self._it.__exit__(exc_type, exc_val, exc_tb)
+
+
+class _LaggedDataIterator(object):
+    """ _LaggedDataIterator returns only the instantaneous part of time-lagged chunks (the lagged part is None).
+
+    Frames without time-lagged counterpart are cut off, the lagged data itself is never read.
+
+    Parameters
+    ----------
+    it: DataSourceIterator
+    lag : int
+        lag time
+    return_trajindex: bool
+        whether to return the current trajectory index during iteration (itraj).
+    """
+    def __init__(self, it, lag, return_trajindex):
+        self._it = it
+        self._lag = lag
+        self._return_trajindex = return_trajindex
+        # number of frames per trajectory, which have a time-lagged counterpart.
+        self._n_valid = it._data_source.trajectory_lengths(it.stride, it.skip + lag)
+
+    @property
+    def n_chunks(self):
+        cs = self._it.chunksize
+        return self._it._data_source.n_chunks(cs, stride=self._it.stride, skip=self._it.skip + self._lag)
+
+    def __len__(self):
+        return self._n_valid.min()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.next()
+
+    def next(self):
+        while True:
+            itraj, X = self._it.next()
+            X = X[:max(0, self._n_valid[itraj] - self._it.pos)]
+            if len(X) > 0:
+                break
+        if self._return_trajindex:
+            return itraj, X, None
+        return X, None
+
+    def __enter__(self):
+        self._it.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._it.__exit__(exc_type, exc_val, exc_tb)
+
+
 class _LegacyLaggedIterator(object):
     """ _LegacyLaggedIterator uses two iterators to build time-lagged chunks.
 
@@ -233,10 +233,19 @@ class StreamingTransformerIterator(DataSourceIterator):
     def __init__(self, data_source, skip=0, chunk=0, stride=1, return_trajindex=False, cols=None):
         super(StreamingTransformerIterator, self).__init__(
             data_source, return_trajindex=return_trajindex)
+        # cols refer to the output of the transformer, so the input is always read completely.
         self._it = self._data_source.data_producer.iterator(
-            skip=skip, chunk=chunk, stride=stride, return_trajindex=return_trajindex, cols=cols
+            skip=skip, chunk=chunk, stride=stride, return_trajindex=return_trajindex
         )
         self.state = self._it.state
+        self.state.cols = cols
+        # if set, the transformer output is written into a buffer, which is reused for every chunk. This is only
+        # safe, if the consumer does not keep references to the chunks, e.g. a subsequent transformer.
+        self._reuse_output = False
+        self._out = None
+        self._scratch = {}
+        if isinstance(self._it, StreamingTransformerIterator):
+            self._it._reuse_output = True
 
     def close(self):
         self._it.close()
@@ -249,7 +258,15 @@ class StreamingTransformerIterator(DataSourceIterator):
 
     def _next_chunk(self):
         X = self._it._next_chunk()
-        return self._data_source._transform_array(X)
+        if self._reuse_output and getattr(self._data_source, '_transform_array_supports_out', False):
+            if self._out is None or len(self._out) < len(X):
+                self._out = np.empty((len(X), self._data_source.dimension()), dtype=self._data_source.output_type())
+            return self._data_source._transform_array(X, out=self._out[:len(X)], scratch=self._scratch)
+        Y = self._data_source._transform_array(X)
+        if isinstance(self._it, StreamingTransformerIterator) and np.may_share_memory(X, Y):
+            # the input buffer gets overwritten by the next chunk.
+            Y = Y.copy()
+        return Y
 
 
 class StreamingTransformerRandomAccessStrategy(RandomAccessStrategy):
@@ -258,6 +258,14 @@ class DataInMemoryIterator(DataSourceIterator):
             self._selected_itraj = self._itraj
             self._t = 0
 
+    def _read_slice(self, data, slice_x):
+        """ reads the frames selected by the given slice from data. Readers may override this to optimize access. """
+        return data[slice_x]
+
+    def _read_indices(self, data, indices):
+        """ reads the frames given by the sorted array indices from data. Readers may override this. """
+        return data[indices]
+
     def _next_chunk_impl(self, data):
         if self._itraj >= self._data_source.ntraj:
             self.close()
@@ -271,24 +279,24 @@ class DataInMemoryIterator(DataSourceIterator):
         # complete trajectory mode
         if self.chunksize == 0:
             if not self.uniform_stride:
-                chunk = data[self.ra_indices_for_traj(self._itraj)]
+                chunk = self._read_indices(data, self.ra_indices_for_traj(self._itraj))
                 self._itraj += 1
                 # skip trajs which are not included in stride
                 while self._itraj not in self.traj_keys and self._itraj < self.number_of_trajectories():
                     self._itraj += 1
             else:
-                chunk = data[skip::self.stride]
+                chunk = self._read_slice(data, slice(skip, None, self.stride))
                 self._itraj += 1
             self._select_file(self._itraj)
             return chunk
         # chunked mode
         else:
             if not self.uniform_stride:
-                random_access_chunk = data[
+                random_access_chunk = self._read_indices(data,
                     self.ra_indices_for_traj(self._itraj)[self._t:min(
                             self._t + self.chunksize, self.ra_trajectory_length(self._itraj)
                     )]
-                ]
+                )
                 self._t += self.chunksize
                 if self._t >= self.ra_trajectory_length(self._itraj):
                     self._itraj += 1
@@ -305,7 +313,7 @@ class DataInMemoryIterator(DataSourceIterator):
             else:
                 upper_bound = min(skip + self._t + self.chunksize * self.stride, traj_len)
                 slice_x = slice(skip + self._t, upper_bound, self.stride)
-                chunk = data[slice_x]
+                chunk = self._read_slice(data, slice_x)
 
                 self._t = upper_bound
 
@@ -132,10 +132,17 @@ class FeatureReader(DataSource, SerializableMixIn):
             length = len(fh)
             frame = fh.read(1)[0]
             ndim = np.shape(frame)[1]
+            # Frame byte offsets of formats with variable frame sizes (xtc, trr). These allow to seek in O(1) later on.
+            # Formats like dcd have fixed frame sizes and can always seek directly.
             offsets = fh.offsets if hasattr(fh, 'offsets') else []
 
         return TrajInfo(ndim, length, offsets)
 
+    @staticmethod
+    def _traj_info_needs_offsets(filename):
+        """ whether the trajectory info of the given file should contain frame offsets. """
+        return filename.endswith(('.xtc', '.trr'))
+
     def _create_iterator(self, skip=0, chunk=0, stride=1, return_trajindex=True, cols=None):
         return FeatureReaderIterator(self, skip=skip, chunk=chunk, stride=stride,
                                      return_trajindex=return_trajindex, cols=cols)
@@ -304,12 +311,20 @@ class FeatureReaderLinearRandomAccessStrategy(RandomAccessStrategy):
 
 class FeatureReaderIterator(DataSourceIterator):
     def __init__(self, data_source, skip=0, chunk=0, stride=1, return_trajindex=False, cols=None):
-        # TODO: optimize cols access (eg. omit features, before calculating em
         super(FeatureReaderIterator, self).__init__(
                 data_source, skip=skip, chunk=chunk, stride=stride,
                 return_trajindex=return_trajindex,
                 cols=cols
         )
+        # push the column selection down into the featurization: only the features (and their atoms)
+        # contributing to the selected columns are loaded and evaluated.
+        self._cols_plan, self._atom_indices, self._atom_map = None, None, None
+        featurizer = data_source.featurizer
+        if cols is not None and not data_source._return_traj_obj and featurizer.active_features:
+            self._cols_plan, self._atom_indices = featurizer._plan_cols(cols)
+            if self._atom_indices is not None:
+                self._atom_map = np.full(featurizer.topology.n_atoms, -1, dtype=int)
+                self._atom_map[self._atom_indices] = np.arange(len(self._atom_indices))
         self._selected_itraj = -1
         self._select_file(0)
 
@@ -343,6 +358,8 @@ class FeatureReaderIterator(DataSourceIterator):
             self._t = 0
             self._itraj = itraj
             self._selected_itraj = itraj
+            # neighbor lists of the features are state of the trajectory (and of this iterator)
+            self._neighbor_lists = {}
             self._create_mditer()
 
     def _next_chunk(self):
@@ -366,6 +383,8 @@ class FeatureReaderIterator(DataSourceIterator):
                 raise
 
         shape = chunk.xyz.shape
+        # the chunk belongs to the current trajectory, even if the next one gets selected below
+        neighbor_lists = self._neighbor_lists
 
         self._t += shape[0]
 
@@ -387,9 +406,12 @@ class FeatureReaderIterator(DataSourceIterator):
         # 3. extracted features
         if self._data_source._return_traj_obj:
             res = chunk
+        elif self._cols_plan is not None:
+            res = self._data_source.featurizer._transform_cols(chunk, self._cols_plan, self._atom_map,
+                                                                   neighbor_lists=neighbor_lists)
         else:
             # map data
-            res = self._data_source.featurizer.transform(chunk)
+            res = self._data_source.featurizer.transform(chunk, neighbor_lists=neighbor_lists)
         return res
 
     def _create_mditer(self):
@@ -398,15 +420,30 @@ class FeatureReaderIterator(DataSourceIterator):
                 self._itraj += 1
             if self._itraj < self._data_source.ntraj:
                 self._mditer = self._create_patched_iter(
-                        self._data_source.filenames[self._itraj], stride=self.ra_indices_for_traj(self._itraj)
+                        self._data_source.filenames[self._itraj], stride=self.ra_indices_for_traj(self._itraj),
+                        atom_indices=self._atom_indices, offsets=self._offsets(self._itraj)
                 )
         else:
             self._mditer = self._create_patched_iter(
-                    self._data_source.filenames[self._itraj], skip=self.skip, stride=self.stride
+                    self._data_source.filenames[self._itraj], skip=self.skip, stride=self.stride,
+                    atom_indices=self._atom_indices, offsets=self._offsets(self._itraj)
             )
         self._closed = False
 
-    def _create_patched_iter(self, filename, skip=0, stride=1, atom_indices=None):
+    def _use_cols(self, X):
+        # columns have already been selected during featurization
+        if self._cols_plan is not None:
+            return X
+        return super(FeatureReaderIterator, self)._use_cols(X)
+
+    def _offsets(self, itraj):
+        """ cached frame offsets of given trajectory or None if unknown. """
+        offsets = self._data_source._offsets
+        if itraj < len(offsets) and len(offsets[itraj]) > 0:
+            return offsets[itraj]
+        return None
+
+    def _create_patched_iter(self, filename, skip=0, stride=1, atom_indices=None, offsets=None):
         return patches.iterload(filename, chunk=self.chunksize, top=self._data_source.featurizer.topology,
-                                skip=skip, stride=stride, atom_indices=atom_indices)
+                                skip=skip, stride=stride, atom_indices=atom_indices, offsets=offsets)
 
@@ -27,6 +27,10 @@ class Feature(SerializableMixIn):
     __serialize_version = 0
     __serialize_fields = ('dimension', 'top')
 
+    # whether transform might modify its input in place. Features not using the cache of the featurizer are assumed
+    # to do so, unless they declare otherwise, and the cached results are dropped after them (see _transform_cached).
+    _modifies_traj = True
+
     @property
     def dimension(self):
         return self._dim
@@ -46,6 +50,47 @@ class Feature(SerializableMixIn):
     def describe(self):
         raise NotImplementedError()
 
+    def _transform_cached(self, traj, cache):
+        """ computes the feature, sharing intermediate results with the other features of a featurizer.
+
+        Parameters
+        ----------
+        traj : mdtraj.Trajectory
+            input frames.
+        cache : GeometryCache
+            intermediate results for the frames of traj.
+
+        Returns
+        -------
+        out : ndarray((T, dimension))
+        """
+        res = self.transform(traj)
+        if self._modifies_traj:
+            cache.clear()
+        return res
+
+    def _atom_indices_for_cols(self, cols):
+        """ atom indices needed to compute the given output columns of this feature or None, if all atoms are needed. """
+        return None
+
+    def _transform_cols(self, traj, cols, atom_map=None):
+        """ computes only the given output columns of this feature.
+
+        Parameters
+        ----------
+        traj : mdtraj.Trajectory
+            input frames. If atom_map is given, traj only contains a subset of the atoms of the topology.
+        cols : ndarray(dtype=int)
+            output columns of this feature to compute (in the order they should be returned).
+        atom_map : ndarray(dtype=int) or None
+            maps atom indices of the topology to atom indices of traj.
+
+        Returns
+        -------
+        out : ndarray((T, len(cols)))
+        """
+        return self.transform(traj)[:, cols]
+
     def __eq__(self, other):
         if not isinstance(other, Feature):
             return False
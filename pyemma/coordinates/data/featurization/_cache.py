@@ -0,0 +1,140 @@
+# This file is part of PyEMMA.
+#
+# Copyright (c) 2015, 2014 Computational Molecular Biology Group, Freie Universitaet Berlin (GER)
+#
+# PyEMMA is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import mdtraj
+import numpy as np
+
+
+def _key(indices):
+    if indices is None:
+        return None
+    indices = np.asarray(indices)
+    return indices.dtype.str, indices.shape, indices.tobytes()
+
+
+class GeometryCache(object):
+    r""" Intermediate results of the features for one chunk of a trajectory.
+
+    MDFeaturizer.transform creates one cache per chunk and passes it to every feature (see
+    Feature._transform_cached), so features computing the same quantities share them instead of recomputing:
+    superposed and imaged copies of the chunk, centered coordinates with their traces (for minimal RMSDs),
+    centers of mass and individual distances, angles and dihedrals. All entries are keyed by the atom selection
+    they were computed for (references are compared by identity).
+
+    Unlike the other entries, the neighbor lists of the features (keyed by the id of the feature) are state of the
+    trajectory the chunk belongs to. An iterator passes the same mapping to the caches of all chunks of one
+    trajectory, so the lists are carried over from chunk to chunk, but never shared between iterators.
+
+    Parameters
+    ----------
+    traj : mdtraj.Trajectory
+        the chunk. The cache is invalid, once its coordinates are modified (see :py:meth:`clear`).
+    neighbor_lists : dict or None
+        neighbor lists of the trajectory. If None, the lists only live as long as this cache.
+    """
+
+    def __init__(self, traj, neighbor_lists=None):
+        self._traj = traj
+        self._store = {}
+        self.neighbor_lists = {} if neighbor_lists is None else neighbor_lists
+
+    def clear(self):
+        """ Drops all entries, e.g. after the coordinates of the chunk have been modified in place. """
+        self._store.clear()
+
+    def traj(self, ref=None, atom_indices=None, ref_atom_indices=None, image_molecules=False):
+        """ The chunk, optionally superposed onto the first frame of ref and/or with imaged molecules.
+
+        Returns the chunk itself if neither is requested, a (shared) modified copy otherwise.
+        """
+        if ref is None and not image_molecules:
+            return self._traj
+        key = ('traj', id(ref), _key(atom_indices), _key(ref_atom_indices), image_molecules)
+        if key not in self._store:
+            traj = self._traj
+            if ref is not None:
+                traj = traj.slice(slice(None), copy=True)
+                traj.superpose(ref, atom_indices=atom_indices, ref_atom_indices=ref_atom_indices)
+            if image_molecules:
+                traj = traj.image_molecules()
+            self._store[key] = traj
+        return self._store[key]
+
+    def centered(self, atom_indices=None):
+        """ Copy of the chunk restricted to atom_indices and centered at the origin, with the traces needed by
+        mdtraj.rmsd(..., precentered=True). """
+        key = ('centered', _key(atom_indices))
+        if key not in self._store:
+            if atom_indices is None:
+                traj = self._traj.slice(slice(None), copy=True)
+            else:
+                traj = self._traj.atom_slice(atom_indices)
+            traj.center_coordinates()
+            self._store[key] = traj
+        return self._store[key]
+
+    def com(self, atoms, weights, ref=None, image_molecules=False):
+        """ (Weighted) center of the atoms in every frame of the (superposed, imaged) chunk, shape (T, 3). """
+        key = ('com', _key(atoms), _key(weights), id(ref), image_molecules)
+        if key not in self._store:
+            traj = self.traj(ref=ref, image_molecules=image_molecules)
+            self._store[key] = np.average(traj.xyz[:, atoms], axis=1, weights=weights)
+        return self._store[key]
+
+    @staticmethod
+    def _tuple_keys(indexes):
+        return indexes.view(np.dtype((np.void, indexes.itemsize * indexes.shape[1]))).ravel()
+
+    def _per_tuple(self, kind, compute, indexes, periodic):
+        # every atom tuple is only computed once, duplicates across features are shared.
+        # The first request is stored as computed, so a single feature does not pay for the bookkeeping. Once
+        # another feature asks for the same kind, tuples are compared as raw bytes, with the keys kept sorted.
+        indexes = np.ascontiguousarray(indexes, dtype=np.int64)
+        entry = self._store.get((kind, periodic))
+        if entry is None:
+            values = compute(self._traj, indexes, periodic=periodic)
+            self._store[(kind, periodic)] = (indexes, values)
+            return values
+        keys, values = entry
+        if keys.dtype.kind != 'V':
+            keys, first = np.unique(self._tuple_keys(keys), return_index=True)
+            values = values[:, first]
+        query = self._tuple_keys(indexes)
+        pos = np.searchsorted(keys, query)
+        known = pos < len(keys)
+        known[known] = keys[pos[known]] == query[known]
+        if not np.all(known):
+            missing = np.unique(query[~known])
+            new = compute(self._traj, missing.view(np.int64).reshape(len(missing), -1), periodic=periodic)
+            keys = np.concatenate((keys, missing))
+            order = np.argsort(keys, kind='mergesort')
+            keys, values = keys[order], np.hstack((values, new))[:, order]
+            pos = np.searchsorted(keys, query)
+        self._store[(kind, periodic)] = (keys, values)
+        return values[:, pos]
+
+    def distances(self, pairs, periodic=True):
+        """ Distances of atom pairs, shape (T, len(pairs)). """
+        return self._per_tuple('distances', mdtraj.compute_distances, pairs, periodic)
+
+    def angles(self, triples, periodic=True):
+        """ Angles of atom triples, shape (T, len(triples)). """
+        return self._per_tuple('angles', mdtraj.compute_angles, triples, periodic)
+
+    def dihedrals(self, quadruples, periodic=True):
+        """ Dihedral angles of atom quadruples, shape (T, len(quadruples)). """
+        return self._per_tuple('dihedrals', mdtraj.compute_dihedrals, quadruples, periodic)
@@ -29,6 +29,7 @@ from mdtraj.geometry.dihedral import (indices_phi,
                                       indices_omega)
 
 from pyemma.coordinates.data.featurization._base import Feature
+from pyemma.coordinates.data.featurization._cache import GeometryCache
 from pyemma.coordinates.data.featurization.util import _describe_atom
 
 
@@ -66,7 +67,13 @@ class AngleFeature(Feature):
         return labels
 
     def transform(self, traj):
-        rad = mdtraj.compute_angles(traj, self.angle_indexes, self.periodic)
+        return self._transform_cached(traj, GeometryCache(traj))
+
+    def _cached_angles(self, cache):
+        return cache.angles(self.angle_indexes, self.periodic)
+
+    def _transform_cached(self, traj, cache):
+        rad = self._cached_angles(cache)
         if self.cossin:
             rad = np.dstack((np.cos(rad), np.sin(rad)))
             rad = rad.reshape(rad.shape[0], rad.shape[1] * rad.shape[2])
@@ -75,6 +82,29 @@ class AngleFeature(Feature):
         else:
             return rad
 
+    def _compute_angles(self, traj, indexes):
+        return mdtraj.compute_angles(traj, indexes, self.periodic)
+
+    def _angles_for_cols(self, cols):
+        cols = np.asarray(cols)
+        # with cossin every angle maps to two consecutive columns (cos, sin)
+        return cols // 2 if self.cossin else cols
+
+    def _atom_indices_for_cols(self, cols):
+        return np.unique(self.angle_indexes[self._angles_for_cols(cols)])
+
+    def _transform_cols(self, traj, cols, atom_map=None):
+        angles, inverse = np.unique(self._angles_for_cols(cols), return_inverse=True)
+        indexes = self.angle_indexes[angles]
+        if atom_map is not None:
+            indexes = atom_map[indexes]
+        rad = self._compute_angles(traj, indexes)[:, inverse]
+        if self.cossin:
+            return np.where(np.asarray(cols) % 2 == 1, np.sin(rad), np.cos(rad))
+        if self.deg:
+            return np.rad2deg(rad)
+        return rad
+
     def __eq__(self, other):
         eq = super(AngleFeature, self).__eq__(other)
         if not eq or not isinstance(other, AngleFeature):
@@ -112,16 +142,11 @@ class DihedralFeature(AngleFeature):
                       for quad in self.angle_indexes]
         return labels
 
-    def transform(self, traj):
-        rad = mdtraj.compute_dihedrals(traj, self.angle_indexes, self.periodic)
-        if self.cossin:
-            rad = np.dstack((np.cos(rad), np.sin(rad)))
-            rad = rad.reshape(rad.shape[0], rad.shape[1] * rad.shape[2])
-        # convert to degrees
-        if self.deg and not self.cossin:
-            rad = np.rad2deg(rad)
+    def _compute_angles(self, traj, indexes):
+        return mdtraj.compute_dihedrals(traj, indexes, self.periodic)
 
-        return rad
+    def _cached_angles(self, cache):
+        return cache.dihedrals(self.angle_indexes, self.periodic)
 
 
 class BackboneTorsionFeature(DihedralFeature):
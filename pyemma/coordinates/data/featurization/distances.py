@@ -19,10 +19,16 @@ Created on 15.02.2016
 
 @author: marscher
 '''
+from itertools import product
+
 import mdtraj
 import numpy as np
 
+from pyemma._base.serialization.serialization import Modifications
 from pyemma.coordinates.data.featurization._base import Feature
+from pyemma.coordinates.data.featurization._cache import GeometryCache
+from pyemma.coordinates.data.featurization.distances_c import kernels
+from pyemma.coordinates.data.featurization.neighbor_list import NeighborList
 from pyemma.coordinates.data.featurization.util import _describe_atom
 
 
@@ -48,7 +54,24 @@ class DistanceFeature(Feature):
         return labels
 
     def transform(self, traj):
-        return mdtraj.compute_distances(traj, self.distance_indexes, periodic=self.periodic)
+        return self._transform_cached(traj, GeometryCache(traj))
+
+    def _transform_cached(self, traj, cache):
+        return cache.distances(self.distance_indexes, periodic=self.periodic)
+
+    def _pairs_for_cols(self, cols):
+        return self.distance_indexes[cols]
+
+    def _atom_indices_for_cols(self, cols):
+        return np.unique(self._pairs_for_cols(cols))
+
+    def _distances(self, traj, pairs, atom_map=None):
+        if atom_map is not None:
+            pairs = atom_map[pairs]
+        return mdtraj.compute_distances(traj, pairs, periodic=self.periodic)
+
+    def _transform_cols(self, traj, cols, atom_map=None):
+        return self._distances(traj, self._pairs_for_cols(cols), atom_map)
 
     def __eq__(self, other):
         eq = super(DistanceFeature, self).__eq__(other)
@@ -66,17 +89,24 @@ class InverseDistanceFeature(DistanceFeature):
     def __init__(self, top, distance_indexes, periodic=True):
         DistanceFeature.__init__(self, top, distance_indexes, periodic=periodic)
 
-    def transform(self, traj):
-        return 1.0 / mdtraj.compute_distances(traj, self.distance_indexes, periodic=self.periodic)
+    def _transform_cached(self, traj, cache):
+        return 1.0 / cache.distances(self.distance_indexes, periodic=self.periodic)
+
+    def _transform_cols(self, traj, cols, atom_map=None):
+        return 1.0 / super(InverseDistanceFeature, self)._transform_cols(traj, cols, atom_map)
 
     # does not need own eq impl, since we take prefix label into account
 
 
 class ResidueMinDistanceFeature(DistanceFeature):
-    __serialize_version = 0
-    __serialize_fields = ('contacts', 'scheme', 'ignore_nonprotein', 'threshold', 'prefix_label')
-
-    def __init__(self, top, contacts, scheme, ignore_nonprotein, threshold, periodic):
+    __serialize_version = 1
+    __serialize_fields = ('contacts', 'scheme', 'ignore_nonprotein', 'threshold', 'prefix_label',
+                          'neighbor_list', 'cutoff', 'skin', 'update_stride')
+    __serialize_modifications_map = {0: Modifications().set('neighbor_list', False).set('cutoff', None)
+                                                       .set('skin', 0.1).set('update_stride', 10).list()}
+
+    def __init__(self, top, contacts, scheme, ignore_nonprotein, threshold, periodic,
+                 neighbor_list=False, cutoff=None, skin=0.1, update_stride=10):
         self.top = top
         self.contacts = contacts
         self.scheme = scheme
@@ -84,6 +114,12 @@ class ResidueMinDistanceFeature(DistanceFeature):
         self.prefix_label = "RES_DIST (%s)" % scheme
         self.periodic = periodic
         self.ignore_nonprotein = ignore_nonprotein
+        self.neighbor_list = neighbor_list
+        self.cutoff = cutoff
+        self.skin = skin
+        self.update_stride = update_stride
+        if neighbor_list and threshold is None and cutoff is None:
+            raise ValueError('The neighbor list needs a threshold or a cutoff.')
 
         # mdtraj.compute_contacts might ignore part of the user input (if it is contradictory) and
         # produce a warning. I think it is more robust to let it run once on a dummy trajectory to
@@ -102,7 +138,61 @@ class ResidueMinDistanceFeature(DistanceFeature):
                   for pair in self.distance_indexes]
         return labels
 
+    def _residue_membership(self, residue):
+        """ atoms of a residue entering the minimum distance, selected exactly like in mdtraj.compute_contacts """
+        from mdtraj.core import element
+        scheme = self.scheme.lower()
+        if scheme == 'ca':
+            return [a.index for a in residue.atoms if a.name.lower() == 'ca']
+        if scheme == 'closest':
+            return [a.index for a in residue.atoms]
+        if scheme == 'closest-heavy':
+            return [a.index for a in residue.atoms if not (a.element == element.hydrogen)]
+        if scheme == 'sidechain' or residue.name == 'GLY':
+            # glycine has no heavy sidechain atoms, mdtraj uses its sidechain hydrogens instead.
+            return [a.index for a in residue.atoms if a.is_sidechain]
+        return [a.index for a in residue.atoms if a.is_sidechain and not (a.element == element.hydrogen)]
+
+    def _residue_atom_pairs(self):
+        """ atom pairs of all residue pairs (stored consecutively) and the offsets of the residue pairs. """
+        if getattr(self, '_atom_pairs', None) is None:
+            members = {}
+            pairs, sizes = [], []
+            for r0, r1 in self.distance_indexes:
+                for r in (r0, r1):
+                    if r not in members:
+                        members[r] = self._residue_membership(self.top.residue(r))
+                pairs.extend(product(members[r0], members[r1]))
+                sizes.append(len(members[r0]) * len(members[r1]))
+            self._atom_pairs = (np.array(pairs, dtype=int).reshape(-1, 2), np.concatenate(([0], np.cumsum(sizes))))
+        return self._atom_pairs
+
+    def _transform_neighbor_list(self, traj, neighbor_lists):
+        pairs, offsets = self._residue_atom_pairs()
+        nlist = neighbor_lists.get(id(self))
+        if nlist is None:
+            cutoff = self.threshold if self.threshold is not None else self.cutoff
+            nlist = neighbor_lists[id(self)] = NeighborList(pairs, cutoff, self.skin, self.update_stride)
+        xyz = nlist.coordinates(traj)
+        box, triclinic = kernels.periodic_box(traj, self.periodic)
+        res = np.empty((traj.n_frames, self.dimension), dtype=np.float32)
+        for start, stop, candidates in nlist.blocks(xyz, box, triclinic):
+            # residue pairs without any atom pair in the list get an infinite distance (or no contact)
+            res[start:stop] = kernels.group_mindist(xyz[start:stop], nlist.local_pairs[candidates],
+                                                    np.searchsorted(candidates, offsets), threshold=self.threshold,
+                                                    box=None if box is None else box[start:stop],
+                                                    triclinic=triclinic)
+        if self.threshold is None:
+            np.minimum(res, nlist.cutoff, out=res)
+        return res
+
     def transform(self, traj):
+        return self._transform_cached(traj, GeometryCache(traj))
+
+    def _transform_cached(self, traj, cache):
+        # not computed from the shared distances of the cache
+        if self.neighbor_list:
+            return self._transform_neighbor_list(traj, cache.neighbor_lists)
         # We let mdtraj compute the contacts with the input scheme
         D = mdtraj.compute_contacts(traj, contacts=self.contacts, scheme=self.scheme, periodic=self.periodic)[0]
         res = np.zeros_like(D)
@@ -114,6 +204,13 @@ class ResidueMinDistanceFeature(DistanceFeature):
             res = D
         return res
 
+    # distance_indexes are residue pairs here and the atoms entering the minimum depend on the scheme,
+    # so selected columns are taken from the full feature.
+    _atom_indices_for_cols = Feature._atom_indices_for_cols
+
+    def _transform_cols(self, traj, cols, atom_map=None, neighbor_lists=None):
+        return self._transform_cached(traj, GeometryCache(traj, neighbor_lists))[:, cols]
+
     def __eq__(self, other):
         eq = super(ResidueMinDistanceFeature, self).__eq__(other)
         if not eq or not isinstance(other, ResidueMinDistanceFeature):
@@ -122,7 +219,11 @@ class ResidueMinDistanceFeature(DistanceFeature):
                 and self.scheme == other.scheme
                 and self.periodic == other.periodic
                 and self.threshold == other.threshold
-                and self.ignore_nonprotein == other.ignore_nonprotein)
+                and self.ignore_nonprotein == other.ignore_nonprotein
+                and self.neighbor_list == other.neighbor_list
+                and self.cutoff == other.cutoff
+                and self.skin == other.skin
+                and self.update_stride == other.update_stride)
 
 
 class GroupMinDistanceFeature(DistanceFeature):
@@ -150,23 +251,33 @@ class GroupMinDistanceFeature(DistanceFeature):
                                                        ) for pair in self.group_pairs]
         return labels
 
-    def transform(self, traj):
-        # All needed distances
-        Dall = mdtraj.compute_distances(traj, self.distance_indexes, periodic=self.periodic)
-        # Just the minimas
-        Dmin = np.zeros((traj.n_frames, self.dimension))
-        res = np.zeros_like(Dmin)
-        # Compute the min groupwise
-        for ii, (gi, gf) in enumerate(self.group_identifiers):
-            Dmin[:, ii] = Dall[:, gi:gf].min(1)
-        # Do we want binary?
-        if self.threshold is not None:
-            I = np.argwhere(Dmin <= self.threshold)
-            res[I[:, 0], I[:, 1]] = 1.0
-        else:
-            res = Dmin
+    # not computed from the shared distances of the cache
+    _transform_cached = Feature._transform_cached
+    _modifies_traj = False
 
-        return res
+    def transform(self, traj):
+        offsets = np.append(np.asarray(self.group_identifiers)[:, 0], len(self.distance_indexes))
+        return self._group_mindist(traj, self.distance_indexes, offsets)
+
+    def _group_mindist(self, traj, pairs, offsets):
+        # minimum (or contact) of each group pair, without computing the full distance matrix
+        box, triclinic = kernels.periodic_box(traj, self.periodic)
+        res = kernels.group_mindist(traj.xyz, pairs, offsets, threshold=self.threshold,
+                                    box=box, triclinic=triclinic)
+        # this feature has always been double precision
+        return res.astype(np.float64)
+
+    def _pairs_for_cols(self, cols):
+        group_identifiers = np.asarray(self.group_identifiers)
+        return np.concatenate([self.distance_indexes[gi:gf] for gi, gf in group_identifiers[cols]])
+
+    def _transform_cols(self, traj, cols, atom_map=None):
+        group_identifiers = np.asarray(self.group_identifiers)[cols]
+        sizes = group_identifiers[:, 1] - group_identifiers[:, 0]
+        pairs = self._pairs_for_cols(cols)
+        if atom_map is not None:
+            pairs = atom_map[pairs]
+        return self._group_mindist(traj, pairs, np.concatenate(([0], np.cumsum(sizes))))
 
     def __eq__(self, other):
         eq = super(GroupMinDistanceFeature, self).__eq__(other)
@@ -181,35 +292,89 @@ class GroupMinDistanceFeature(DistanceFeature):
 
 class ContactFeature(DistanceFeature):
     prefix_label = "CONTACT:"
-    __serialize_version = 0
-    __serialize_fields = ('distance_indexes', 'prefix_label', 'count_contacts', 'threshold')
-
-    def __init__(self, top, distance_indexes, threshold=5.0, periodic=True, count_contacts=False):
+    __serialize_version = 1
+    __serialize_fields = ('distance_indexes', 'prefix_label', 'count_contacts', 'threshold',
+                          'neighbor_list', 'skin', 'update_stride')
+    __serialize_modifications_map = {0: Modifications().set('neighbor_list', False).set('skin', 0.1)
+                                                       .set('update_stride', 10).list()}
+
+    def __init__(self, top, distance_indexes, threshold=5.0, periodic=True, count_contacts=False,
+                 neighbor_list=False, skin=0.1, update_stride=10):
         DistanceFeature.__init__(self, top, distance_indexes, periodic=periodic)
         if count_contacts:
             self.prefix_label = "counted " + self.prefix_label
         self.threshold = threshold
         self.count_contacts = count_contacts
+        self.neighbor_list = neighbor_list
+        self.skin = skin
+        self.update_stride = update_stride
         if count_contacts:
             self.dimension = 1
         else:
             self.dimension = len(self.distance_indexes)
 
     def transform(self, traj):
-        dists = mdtraj.compute_distances(
-            traj, self.distance_indexes, periodic=self.periodic)
-        res = np.zeros(
-            (len(traj), self.distance_indexes.shape[0]), dtype=np.float32)
-        I = np.argwhere(dists <= self.threshold)
-        res[I[:, 0], I[:, 1]] = 1.0
+        return self._transform_cached(traj, GeometryCache(traj))
+
+    def _transform_cached(self, traj, cache):
+        # not computed from the shared distances of the cache
+        if self.neighbor_list:
+            return self._contacts_neighbor_list(traj, cache.neighbor_lists)
+        return self._contacts(traj, self.distance_indexes)
+
+    def _contacts(self, traj, pairs):
+        # thresholded in squared distances, without computing the full distance matrix
+        box, triclinic = kernels.periodic_box(traj, self.periodic)
+        return kernels.contacts(traj.xyz, pairs, self.threshold, box=box, triclinic=triclinic,
+                                count=self.count_contacts)
+
+    def _contacts_neighbor_list(self, traj, neighbor_lists, atom_map=None):
+        nlist = neighbor_lists.get(id(self))
+        if nlist is None:
+            nlist = neighbor_lists[id(self)] = NeighborList(self.distance_indexes, self.threshold, self.skin,
+                                                            self.update_stride)
+        xyz = nlist.coordinates(traj, atom_map)
+        box, triclinic = kernels.periodic_box(traj, self.periodic)
+        res = np.zeros((traj.n_frames, self.dimension), dtype=np.float32)
+        for start, stop, candidates in nlist.blocks(xyz, box, triclinic):
+            c = kernels.contacts(xyz[start:stop], nlist.local_pairs[candidates], self.threshold,
+                                 box=None if box is None else box[start:stop], triclinic=triclinic,
+                                 count=self.count_contacts)
+            if self.count_contacts:
+                res[start:stop] = c
+            else:
+                res[start:stop, candidates] = c
+        return res
+
+    def _atom_indices_for_cols(self, cols):
+        # the neighbor list covers all pairs
+        if self.neighbor_list:
+            return np.unique(self.distance_indexes)
+        return super(ContactFeature, self)._atom_indices_for_cols(cols)
+
+    def _pairs_for_cols(self, cols):
+        # the count is taken over all pairs
         if self.count_contacts:
-            return res.sum(1, keepdims=True)
-        else:
-            return res
+            return self.distance_indexes
+        return self.distance_indexes[cols]
+
+    def _transform_cols(self, traj, cols, atom_map=None, neighbor_lists=None):
+        if self.neighbor_list:
+            res = self._contacts_neighbor_list(traj, {} if neighbor_lists is None else neighbor_lists, atom_map)
+            return np.repeat(res, len(cols), axis=1) if self.count_contacts else res[:, cols]
+        pairs = self._pairs_for_cols(cols)
+        if atom_map is not None:
+            pairs = atom_map[pairs]
+        res = self._contacts(traj, pairs)
+        if self.count_contacts:
+            return np.repeat(res, len(cols), axis=1)
+        return res
 
     def __eq__(self, other):
         eq = super(ContactFeature, self).__eq__(other)
         if not eq or not isinstance(other, ContactFeature):
             return False
         return (self.count_contacts == other.count_contacts
-                and self.threshold == other.threshold and self.periodic == other.periodic)
+                and self.threshold == other.threshold and self.periodic == other.periodic
+                and self.neighbor_list == other.neighbor_list
+                and self.skin == other.skin and self.update_stride == other.update_stride)
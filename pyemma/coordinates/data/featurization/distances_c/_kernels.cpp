@@ -0,0 +1,28 @@
+#include <pybind11/pybind11.h>
+
+#include "distances_cpp.h"
+
+namespace py = pybind11;
+
+
+PYBIND11_MODULE(_kernels, m) {
+    m.doc() = "fused distance kernels for the featurizer.";
+
+    // ================================================
+    // Thresholded contacts and contact counts
+    // ================================================
+    m.def("contacts_float", &_contacts<float>);
+    m.def("contacts_double", &_contacts<double>);
+
+    // ================================================
+    // Group minimum distances
+    // ================================================
+    m.def("group_mindist_float", &_group_mindist<float>);
+    m.def("group_mindist_double", &_group_mindist<double>);
+
+    // ================================================
+    // Cell list neighbor search
+    // ================================================
+    m.def("neighbor_pairs_float", &_neighbor_pairs<float>);
+    m.def("neighbor_pairs_double", &_neighbor_pairs<double>);
+}
@@ -0,0 +1,364 @@
+#pragma once
+
+#include <algorithm>
+#include <cmath>
+#include <cstdint>
+#include <limits>
+#include <stdexcept>
+#include <vector>
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+
+#if defined(USE_OPENMP)
+#include <omp.h>
+#endif
+
+namespace py = pybind11;
+
+
+/** Squared distance between two atoms of a frame under the minimum image convention.
+
+The box vectors are stored row-wise (a, b, c) and are expected to be in reduced, lower triangular form, i.e.
+a = (ax, 0, 0), b = (bx, by, 0) and c = (cx, cy, cz), which is what mdtraj computes from unit cell lengths and
+angles. For an orthorhombic box only the diagonal is used. For triclinic boxes, the distance vector is first wrapped
+along c, b and a, and afterwards the 27 neighboring images are searched, like mdtraj does.
+
+@param x : (3) coordinates of the first atom
+@param y : (3) coordinates of the second atom
+@param box : (3, 3) box vectors or nullptr for non-periodic distances
+@param triclinic : whether the box has non-zero off-diagonal elements
+*/
+template<typename dtype>
+inline dtype _distance2(const dtype *x, const dtype *y, const dtype *box, bool triclinic) {
+    dtype d[3] = {y[0] - x[0], y[1] - x[1], y[2] - x[2]};
+    if (box == nullptr) {
+        return d[0] * d[0] + d[1] * d[1] + d[2] * d[2];
+    }
+    if (!triclinic) {
+        for (int k = 0; k < 3; ++k) {
+            const dtype l = box[4 * k];
+            d[k] -= l * std::round(d[k] / l);
+        }
+        return d[0] * d[0] + d[1] * d[1] + d[2] * d[2];
+    }
+    for (int v = 2; v >= 0; --v) {
+        const dtype *bv = box + 3 * v;
+        const dtype n = std::round(d[v] / bv[v]);
+        d[0] -= n * bv[0];
+        d[1] -= n * bv[1];
+        d[2] -= n * bv[2];
+    }
+    dtype min_d2 = d[0] * d[0] + d[1] * d[1] + d[2] * d[2];
+    for (int i = -1; i <= 1; ++i) {
+        for (int j = -1; j <= 1; ++j) {
+            for (int k = -1; k <= 1; ++k) {
+                const dtype s0 = d[0] + i * box[0] + j * box[3] + k * box[6];
+                const dtype s1 = d[1] + j * box[4] + k * box[7];
+                const dtype s2 = d[2] + k * box[8];
+                min_d2 = std::min(min_d2, s0 * s0 + s1 * s1 + s2 * s2);
+            }
+        }
+    }
+    return min_d2;
+}
+
+/** Checks the shapes of the input arrays, which are shared by all kernels. */
+template<typename dtype>
+void _check_input(const py::array_t<dtype, py::array::c_style> &np_xyz,
+                  const py::array_t<std::int64_t, py::array::c_style> &np_pairs,
+                  const py::array_t<dtype, py::array::c_style> &np_box, bool periodic) {
+    if (np_xyz.ndim() != 3 || np_xyz.shape(2) != 3) {
+        throw std::invalid_argument("xyz has to be of shape (n_frames, n_atoms, 3).");
+    }
+    if (np_pairs.ndim() != 2 || np_pairs.shape(1) != 2) {
+        throw std::invalid_argument("pairs has to be of shape (n_pairs, 2).");
+    }
+    if (periodic && (np_box.ndim() != 3 || np_box.shape(0) != np_xyz.shape(0)
+                     || np_box.shape(1) != 3 || np_box.shape(2) != 3)) {
+        throw std::invalid_argument("box has to be of shape (n_frames, 3, 3).");
+    }
+    const std::int64_t n_atoms = np_xyz.shape(1);
+    const std::int64_t *pairs = np_pairs.data();
+    for (py::ssize_t i = 0; i < 2 * np_pairs.shape(0); ++i) {
+        if (pairs[i] < 0 || pairs[i] >= n_atoms) {
+            throw std::out_of_range("atom index in pairs out of range.");
+        }
+    }
+}
+
+/** Binary contacts (d <= threshold) of atom pairs or the number of contacts per frame.
+
+The distances are compared in squared form and never stored. The GIL is released and the frames are processed in
+parallel.
+
+@param np_xyz : (T, N, 3) coordinates
+@param np_pairs : (P, 2) atom indices
+@param threshold : contact distance
+@param np_box : (T, 3, 3) box vectors (ignored if periodic is false)
+@param periodic : use the minimum image convention
+@param triclinic : the boxes are not orthorhombic
+@param np_out : (T, P) output for the contacts or (T, 1) for the contact counts
+@param count : count the contacts per frame
+@param n_threads : number of OpenMP threads, 0 for the OpenMP default
+*/
+template<typename dtype>
+void _contacts(const py::array_t<dtype, py::array::c_style> &np_xyz,
+               const py::array_t<std::int64_t, py::array::c_style> &np_pairs,
+               double threshold,
+               const py::array_t<dtype, py::array::c_style> &np_box, bool periodic, bool triclinic,
+               py::array_t<float, py::array::c_style> &np_out, bool count, int n_threads) {
+    _check_input(np_xyz, np_pairs, np_box, periodic);
+    const std::int64_t T = np_xyz.shape(0), N = np_xyz.shape(1), P = np_pairs.shape(0);
+    if (np_out.ndim() != 2 || np_out.shape(0) != T || np_out.shape(1) != (count ? 1 : P)) {
+        throw std::invalid_argument("out has wrong shape.");
+    }
+    const dtype *xyz = np_xyz.data();
+    const std::int64_t *pairs = np_pairs.data();
+    const dtype *box = periodic ? np_box.data() : nullptr;
+    float *out = np_out.mutable_data();
+    const dtype threshold2 = static_cast<dtype>(threshold * threshold);
+    {
+        py::gil_scoped_release release;
+        #if defined(USE_OPENMP)
+        if (n_threads > 0) omp_set_num_threads(n_threads);
+        #endif
+        #pragma omp parallel for
+        for (std::int64_t t = 0; t < T; ++t) {
+            const dtype *frame = xyz + t * N * 3;
+            const dtype *frame_box = box ? box + t * 9 : nullptr;
+            float n_contacts = 0;
+            for (std::int64_t p = 0; p < P; ++p) {
+                const float c = _distance2(frame + 3 * pairs[2 * p], frame + 3 * pairs[2 * p + 1],
+                                           frame_box, triclinic) <= threshold2 ? 1.f : 0.f;
+                if (count) {
+                    n_contacts += c;
+                } else {
+                    out[t * P + p] = c;
+                }
+            }
+            if (count) {
+                out[t] = n_contacts;
+            }
+        }
+    }
+}
+
+/** Minimum distances between groups of atoms, optionally thresholded to binary contacts.
+
+The atom pairs of a group pair are stored consecutively, np_offsets[g] and np_offsets[g + 1] delimit the pairs of
+group pair g. The minimum is reduced on the fly, so the distances of the individual atom pairs are never stored.
+The GIL is released and the frames are processed in parallel.
+
+@param np_xyz : (T, N, 3) coordinates
+@param np_pairs : (P, 2) atom indices
+@param np_offsets : (G + 1) start indices of the group pairs in np_pairs
+@param threshold : contact distance, if negative the minimum distances are returned
+@param np_box : (T, 3, 3) box vectors (ignored if periodic is false)
+@param periodic : use the minimum image convention
+@param triclinic : the boxes are not orthorhombic
+@param np_out : (T, G) output
+@param n_threads : number of OpenMP threads, 0 for the OpenMP default
+*/
+template<typename dtype>
+void _group_mindist(const py::array_t<dtype, py::array::c_style> &np_xyz,
+                    const py::array_t<std::int64_t, py::array::c_style> &np_pairs,
+                    const py::array_t<std::int64_t, py::array::c_style> &np_offsets,
+                    double threshold,
+                    const py::array_t<dtype, py::array::c_style> &np_box, bool periodic, bool triclinic,
+                    py::array_t<float, py::array::c_style> &np_out, int n_threads) {
+    _check_input(np_xyz, np_pairs, np_box, periodic);
+    const std::int64_t T = np_xyz.shape(0), N = np_xyz.shape(1), P = np_pairs.shape(0);
+    const std::int64_t G = np_offsets.shape(0) - 1;
+    const std::int64_t *offsets = np_offsets.data();
+    if (G < 0 || offsets[0] != 0 || offsets[G] != P) {
+        throw std::invalid_argument("offsets have to start with 0 and end with the number of pairs.");
+    }
+    for (std::int64_t g = 0; g < G; ++g) {
+        if (offsets[g + 1] < offsets[g]) {
+            throw std::invalid_argument("offsets have to be non-decreasing.");
+        }
+    }
+    if (np_out.ndim() != 2 || np_out.shape(0) != T || np_out.shape(1) != G) {
+        throw std::invalid_argument("out has wrong shape.");
+    }
+    const dtype *xyz = np_xyz.data();
+    const std::int64_t *pairs = np_pairs.data();
+    const dtype *box = periodic ? np_box.data() : nullptr;
+    float *out = np_out.mutable_data();
+    const bool binary = threshold >= 0;
+    const dtype threshold2 = static_cast<dtype>(threshold * threshold);
+    {
+        py::gil_scoped_release release;
+        #if defined(USE_OPENMP)
+        if (n_threads > 0) omp_set_num_threads(n_threads);
+        #endif
+        #pragma omp parallel for
+        for (std::int64_t t = 0; t < T; ++t) {
+            const dtype *frame = xyz + t * N * 3;
+            const dtype *frame_box = box ? box + t * 9 : nullptr;
+            for (std::int64_t g = 0; g < G; ++g) {
+                dtype min_d2 = std::numeric_limits<dtype>::infinity();
+                for (std::int64_t p = offsets[g]; p < offsets[g + 1]; ++p) {
+                    min_d2 = std::min(min_d2, _distance2(frame + 3 * pairs[2 * p], frame + 3 * pairs[2 * p + 1],
+                                                         frame_box, triclinic));
+                    // for contacts, one pair within the threshold is sufficient
+                    if (binary && min_d2 <= threshold2) break;
+                }
+                if (binary) {
+                    out[t * G + g] = min_d2 <= threshold2 ? 1.f : 0.f;
+                } else {
+                    out[t * G + g] = static_cast<float>(std::sqrt(min_d2));
+                }
+            }
+        }
+    }
+}
+
+/** All pairs of the given atoms within a radius in one frame, found with a cell list.
+
+The atoms are sorted into cells with edges of at least the radius, so only atoms in the same or adjacent cells need
+to be compared. Periodic boxes have to be orthorhombic; along box edges shorter than three cells, all atoms are
+compared. The cost is linear in the number of atoms for homogeneous densities. The GIL is released.
+
+@param np_xyz : (N, 3) coordinates of the frame
+@param np_atoms : (A) atom indices to consider
+@param radius : neighbor distance
+@param np_box : (3, 3) box vectors (ignored if periodic is false)
+@param periodic : use the minimum image convention
+
+@return (K, 2) atom pairs (i < j) with a distance smaller or equal to radius
+*/
+template<typename dtype>
+py::array_t<std::int64_t> _neighbor_pairs(const py::array_t<dtype, py::array::c_style> &np_xyz,
+                                          const py::array_t<std::int64_t, py::array::c_style> &np_atoms,
+                                          double radius,
+                                          const py::array_t<dtype, py::array::c_style> &np_box, bool periodic) {
+    if (np_xyz.ndim() != 2 || np_xyz.shape(1) != 3) {
+        throw std::invalid_argument("xyz has to be of shape (n_atoms, 3).");
+    }
+    if (periodic && (np_box.ndim() != 2 || np_box.shape(0) != 3 || np_box.shape(1) != 3)) {
+        throw std::invalid_argument("box has to be of shape (3, 3).");
+    }
+    if (!(radius > 0)) {
+        throw std::invalid_argument("radius has to be positive.");
+    }
+    const std::int64_t N = np_xyz.shape(0), A = np_atoms.shape(0);
+    const dtype *xyz = np_xyz.data();
+    const std::int64_t *atoms = np_atoms.data();
+    for (std::int64_t a = 0; a < A; ++a) {
+        if (atoms[a] < 0 || atoms[a] >= N) {
+            throw std::out_of_range("atom index out of range.");
+        }
+    }
+    const dtype *box = periodic ? np_box.data() : nullptr;
+    std::vector<std::int64_t> result;
+    {
+        py::gil_scoped_release release;
+        // cell grid
+        double origin[3], extent[3], edge[3];
+        std::int64_t n_cells[3];
+        for (int k = 0; k < 3; ++k) {
+            double lo = 0;
+            if (box) {
+                extent[k] = box[4 * k];
+            } else {
+                double hi = lo = std::numeric_limits<double>::infinity();
+                hi = -hi;
+                for (std::int64_t a = 0; a < A; ++a) {
+                    lo = std::min(lo, static_cast<double>(xyz[3 * atoms[a] + k]));
+                    hi = std::max(hi, static_cast<double>(xyz[3 * atoms[a] + k]));
+                }
+                extent[k] = A > 0 ? hi - lo : 0;
+            }
+            origin[k] = lo;
+            n_cells[k] = std::max<std::int64_t>(1, static_cast<std::int64_t>(std::min(extent[k] / radius, 1024.)));
+            // with less than three periodic cells, the neighboring cells would overlap
+            if (box && n_cells[k] < 3) n_cells[k] = 1;
+        }
+        // limit the memory of the grid for sparse, extended systems
+        while (n_cells[0] * n_cells[1] * n_cells[2] > 8 * A + 27) {
+            const int k = static_cast<int>(std::max_element(n_cells, n_cells + 3) - n_cells);
+            n_cells[k] = (box && n_cells[k] < 6) ? 1 : n_cells[k] / 2;
+        }
+        for (int k = 0; k < 3; ++k) {
+            edge[k] = extent[k] > 0 ? extent[k] / n_cells[k] : 1;
+        }
+        // sort the atoms into the cells (counting sort)
+        const std::int64_t total_cells = n_cells[0] * n_cells[1] * n_cells[2];
+        std::vector<std::int64_t> cell_of(A), cell_start(total_cells + 1, 0), cell_atoms(A);
+        std::vector<std::int64_t> cell_coord(3 * A);
+        for (std::int64_t a = 0; a < A; ++a) {
+            std::int64_t c = 0;
+            for (int k = 0; k < 3; ++k) {
+                double x = xyz[3 * atoms[a] + k] - origin[k];
+                if (box) {
+                    x -= box[4 * k] * std::floor(x / box[4 * k]);
+                }
+                std::int64_t ck = static_cast<std::int64_t>(x / edge[k]);
+                ck = std::min(std::max<std::int64_t>(ck, 0), n_cells[k] - 1);
+                cell_coord[3 * a + k] = ck;
+                c = c * n_cells[k] + ck;
+            }
+            cell_of[a] = c;
+            ++cell_start[c + 1];
+        }
+        for (std::int64_t c = 0; c < total_cells; ++c) {
+            cell_start[c + 1] += cell_start[c];
+        }
+        {
+            std::vector<std::int64_t> fill(cell_start.begin(), cell_start.end() - 1);
+            for (std::int64_t a = 0; a < A; ++a) {
+                cell_atoms[fill[cell_of[a]]++] = a;
+            }
+        }
+        const dtype radius2 = static_cast<dtype>(radius * radius);
+        // neighboring cells, every cell pair is visited once per direction and every atom pair once (i < j).
+        int lo[3], hi[3];
+        for (int k = 0; k < 3; ++k) {
+            lo[k] = n_cells[k] == 1 ? 0 : -1;
+            hi[k] = n_cells[k] == 1 ? 0 : 1;
+        }
+        #pragma omp parallel
+        {
+            std::vector<std::int64_t> local;
+            #pragma omp for schedule(dynamic, 64)
+            for (std::int64_t a = 0; a < A; ++a) {
+                const std::int64_t i = atoms[a];
+                for (int dx = lo[0]; dx <= hi[0]; ++dx) {
+                    for (int dy = lo[1]; dy <= hi[1]; ++dy) {
+                        for (int dz = lo[2]; dz <= hi[2]; ++dz) {
+                            const int d[3] = {dx, dy, dz};
+                            std::int64_t c = 0;
+                            bool valid = true;
+                            for (int k = 0; k < 3; ++k) {
+                                std::int64_t ck = cell_coord[3 * a + k] + d[k];
+                                if (n_cells[k] == 1) {
+                                    ck = 0;
+                                } else if (box) {
+                                    ck = (ck + n_cells[k]) % n_cells[k];
+                                } else if (ck < 0 || ck >= n_cells[k]) {
+                                    valid = false;
+                                }
+                                c = c * n_cells[k] + ck;
+                            }
+                            if (!valid) continue;
+                            for (std::int64_t s = cell_start[c]; s < cell_start[c + 1]; ++s) {
+                                const std::int64_t j = atoms[cell_atoms[s]];
+                                if (j <= i) continue;
+                                if (_distance2(xyz + 3 * i, xyz + 3 * j, box, false) <= radius2) {
+                                    local.push_back(i);
+                                    local.push_back(j);
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+            #pragma omp critical
+            result.insert(result.end(), local.begin(), local.end());
+        }
+    }
+    py::array_t<std::int64_t> np_result(std::vector<std::size_t>{result.size() / 2, 2});
+    std::copy(result.begin(), result.end(), np_result.mutable_data());
+    return np_result;
+}
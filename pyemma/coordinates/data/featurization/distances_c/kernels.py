@@ -0,0 +1,149 @@
+import numpy
+
+
+def periodic_box(traj, periodic=True):
+    """ Box vectors of the trajectory for the minimum image convention
+
+    Parameters
+    ----------
+    traj : mdtraj.Trajectory
+        trajectory (chunk)
+    periodic : bool
+        if False, None is returned.
+
+    Returns
+    -------
+    box : ndarray (T, 3, 3) or None
+        reduced box vectors (row-wise) or None, if periodic is False or the trajectory has no unit cell.
+    triclinic : bool
+        whether the box is not orthorhombic.
+
+    """
+    if not periodic or traj.unitcell_vectors is None:
+        return None, False
+    box = numpy.array(traj.unitcell_vectors, dtype=traj.xyz.dtype)
+    triclinic = not numpy.allclose(traj.unitcell_angles, 90)
+    if triclinic:
+        # reduce the box vectors (like mdtraj does), so the image search only needs the neighboring cells.
+        a, b, c = box[:, 0], box[:, 1], box[:, 2]
+        c -= b * numpy.round(c[:, 1] / b[:, 1])[:, None]
+        c -= a * numpy.round(c[:, 0] / a[:, 0])[:, None]
+        b -= a * numpy.round(b[:, 0] / a[:, 0])[:, None]
+    return box, triclinic
+
+
+def _prepare(xyz, pairs, box):
+    from pyemma.coordinates.data.featurization.distances_c import _kernels
+    if xyz.dtype == numpy.float32:
+        suffix = 'float'
+    elif xyz.dtype == numpy.float64:
+        suffix = 'double'
+    else:
+        raise TypeError('unsupported type of xyz: %s' % xyz.dtype)
+    xyz = numpy.require(xyz, requirements='C')
+    pairs = numpy.require(pairs, dtype=numpy.int64, requirements='C').reshape(-1, 2)
+    box = numpy.require(box, dtype=xyz.dtype, requirements='C') if box is not None \
+        else numpy.empty((0, 3, 3), dtype=xyz.dtype)
+    return _kernels, suffix, xyz, pairs, box
+
+
+def contacts(xyz, pairs, threshold, box=None, triclinic=False, count=False, n_threads=0):
+    """ Binary contacts of atom pairs without computing the distance matrix
+
+    Parameters
+    ----------
+    xyz : ndarray (T, N, 3) of type float32 or float64
+        coordinates
+    pairs : ndarray (P, 2)
+        atom indices
+    threshold : float
+        pairs with a distance smaller or equal to threshold are in contact.
+    box : ndarray (T, 3, 3) or None
+        box vectors as returned by :func:`periodic_box`, None for non-periodic distances.
+    triclinic : bool
+        whether the box is not orthorhombic.
+    count : bool
+        return the number of contacts per frame instead of the contacts.
+    n_threads : int
+        number of threads, 0 uses the OpenMP default.
+
+    Returns
+    -------
+    contacts : ndarray (T, P) or (T, 1) of type float32
+        1 for pairs in contact and 0 otherwise, or the number of contacts.
+
+    """
+    _kernels, suffix, xyz, pairs, box_ = _prepare(xyz, pairs, box)
+    out = numpy.empty((xyz.shape[0], 1 if count else pairs.shape[0]), dtype=numpy.float32)
+    getattr(_kernels, 'contacts_' + suffix)(xyz, pairs, threshold, box_, box is not None, triclinic,
+                                           out, count, n_threads)
+    return out
+
+
+def group_mindist(xyz, pairs, offsets, threshold=None, box=None, triclinic=False, n_threads=0):
+    """ Minimum distances between groups of atoms without computing the distance matrix
+
+    Parameters
+    ----------
+    xyz : ndarray (T, N, 3) of type float32 or float64
+        coordinates
+    pairs : ndarray (P, 2)
+        atom indices, the pairs of every group pair are stored consecutively.
+    offsets : ndarray (G + 1)
+        pairs[offsets[g]:offsets[g + 1]] are the atom pairs of group pair g.
+    threshold : float or None
+        if given, 1 is returned for groups in contact (minimum distance smaller or equal to threshold) and 0 otherwise.
+    box : ndarray (T, 3, 3) or None
+        box vectors as returned by :func:`periodic_box`, None for non-periodic distances.
+    triclinic : bool
+        whether the box is not orthorhombic.
+    n_threads : int
+        number of threads, 0 uses the OpenMP default.
+
+    Returns
+    -------
+    mindist : ndarray (T, G) of type float32
+        minimum distances or contacts of the group pairs.
+
+    """
+    _kernels, suffix, xyz, pairs, box_ = _prepare(xyz, pairs, box)
+    offsets = numpy.require(offsets, dtype=numpy.int64, requirements='C')
+    out = numpy.empty((xyz.shape[0], len(offsets) - 1), dtype=numpy.float32)
+    getattr(_kernels, 'group_mindist_' + suffix)(xyz, pairs, offsets, -1.0 if threshold is None else threshold,
+                                                box_, box is not None, triclinic, out, n_threads)
+    return out
+
+
+def neighbor_pairs(xyz, radius, atoms=None, box=None):
+    """ All pairs of atoms within a radius in one frame, found with a cell list
+
+    Parameters
+    ----------
+    xyz : ndarray (N, 3) of type float32 or float64
+        coordinates of one frame
+    radius : float
+        neighbor distance
+    atoms : ndarray (A) or None
+        indices of the atoms to consider, None for all atoms.
+    box : ndarray (3, 3) or None
+        orthorhombic box vectors, None for non-periodic distances.
+
+    Returns
+    -------
+    pairs : ndarray (K, 2) of type int64
+        atom pairs (i < j) with a distance smaller or equal to radius.
+
+    """
+    from pyemma.coordinates.data.featurization.distances_c import _kernels
+    if xyz.dtype == numpy.float32:
+        fun = _kernels.neighbor_pairs_float
+    elif xyz.dtype == numpy.float64:
+        fun = _kernels.neighbor_pairs_double
+    else:
+        raise TypeError('unsupported type of xyz: %s' % xyz.dtype)
+    xyz = numpy.require(xyz, requirements='C')
+    atoms = numpy.arange(len(xyz), dtype=numpy.int64) if atoms is None \
+        else numpy.unique(numpy.asarray(atoms, dtype=numpy.int64))
+    box_ = numpy.require(box, dtype=xyz.dtype, requirements='C') if box is not None \
+        else numpy.empty((0, 3), dtype=xyz.dtype)
+    return fun(xyz, atoms, radius, box_, box is not None)
@@ -27,6 +27,7 @@ import mdtraj
 from pyemma.coordinates.data.featurization.util import (_parse_pairwise_input,
                                                         _parse_groupwise_input)
 
+from ._cache import GeometryCache
 from .misc import CustomFeature
 import numpy as np
 from pyemma.coordinates.util.patches import load_topology_cached
@@ -408,7 +409,8 @@ class MDFeaturizer(SerializableMixIn, Loggable):
         f = InverseDistanceFeature(self.topology, atom_pairs, periodic=periodic)
         self.__add_feature(f)
 
-    def add_contacts(self, indices, indices2=None, threshold=0.3, periodic=True, count_contacts=False):
+    def add_contacts(self, indices, indices2=None, threshold=0.3, periodic=True, count_contacts=False,
+                     neighbor_list=False, skin=0.1, update_stride=10):
         r"""
         Adds the contacts to the feature list.
 
@@ -437,6 +439,19 @@ class MDFeaturizer(SerializableMixIn, Loggable):
             If set to true, this feature will return the number of formed contacts (and not feature values with either 1.0 or 0)
             The ouput of this feature will be of shape (Nt,1), and not (Nt, nr_of_contacts)
 
+        neighbor_list : boolean, default False
+            Only evaluate the pairs in a Verlet neighbor list, i.e. the pairs closer than threshold + skin, which is
+            updated at least every update_stride frames with a cell list. The result is identical, but contact maps
+            of many atom pairs (e.g. all pairs of a large protein or membrane), most of them far apart, are much
+            cheaper to compute.
+
+        skin : float, default 0.1
+            additional distance (in nm) for pairs in the neighbor list. The list is rebuilt earlier, if atoms moved
+            more than half of the skin.
+
+        update_stride : int, default 10
+            maximum number of frames between two updates of the neighbor list.
+
 
         .. note::
             When using the *iterable of integers* input, :py:obj:`indices` and :py:obj:`indices2`
@@ -448,7 +463,8 @@ class MDFeaturizer(SerializableMixIn, Loggable):
             indices, indices2, self._logger, fname='add_contacts()')
 
         atom_pairs = self._check_indices(atom_pairs)
-        f = ContactFeature(self.topology, atom_pairs, threshold, periodic, count_contacts)
+        f = ContactFeature(self.topology, atom_pairs, threshold, periodic, count_contacts,
+                           neighbor_list=neighbor_list, skin=skin, update_stride=update_stride)
         self.__add_feature(f)
 
     def add_residue_mindist(self,
@@ -456,7 +472,11 @@ class MDFeaturizer(SerializableMixIn, Loggable):
                             scheme='closest-heavy',
                             ignore_nonprotein=True,
                             threshold=None,
-                            periodic=True):
+                            periodic=True,
+                            neighbor_list=False,
+                            cutoff=None,
+                            skin=0.1,
+                            update_stride=10):
         r"""
         Adds the minimum distance between residues to the feature list. See below how
         the minimum distance can be defined. If the topology generated out of :py:obj:`topfile`
@@ -488,22 +508,40 @@ class MDFeaturizer(SerializableMixIn, Loggable):
             information, we will treat dihedrals that cross periodic images
             using the minimum image convention.
 
+        neighbor_list : bool, optional, default = False
+            Only evaluate the atom pairs in a Verlet neighbor list, i.e. the pairs closer than the cutoff + skin, which
+            is updated at least every update_stride frames with a cell list. Residues farther apart than the cutoff
+            get the distance cutoff (or 0.0 with a threshold). Distances within the cutoff are exact.
+
+        cutoff : float, optional, default = None
+            cutoff distance (in nm) of the neighbor list. Only used without a threshold, otherwise the threshold is
+            the cutoff.
+
+        skin : float, optional, default = 0.1
+            additional distance (in nm) for pairs in the neighbor list. The list is rebuilt earlier, if atoms moved
+            more than half of the skin.
+
+        update_stride : int, optional, default = 10
+            maximum number of frames between two updates of the neighbor list.
+
 
         .. note::
             Using :py:obj:`scheme` = 'closest' or 'closest-heavy' with :py:obj:`residue pairs` = 'all'
             will compute nearly all interatomic distances, for every frame, before extracting the closest pairs.
             This can be very time consuming. Those schemes are intended to be used with a subset of residues chosen
-            via :py:obj:`residue_pairs`.
+            via :py:obj:`residue_pairs` or with a neighbor list (:py:obj:`neighbor_list` = True).
 
 
         """
         from .distances import ResidueMinDistanceFeature
-        if scheme != 'ca' and is_string(residue_pairs):
+        if scheme != 'ca' and is_string(residue_pairs) and not neighbor_list:
             if residue_pairs == 'all':
                 self._logger.warning("Using all residue pairs with schemes like closest or closest-heavy is "
                                      "very time consuming. Consider reducing the residue pairs")
 
-        f = ResidueMinDistanceFeature(self.topology, residue_pairs, scheme, ignore_nonprotein, threshold, periodic)
+        f = ResidueMinDistanceFeature(self.topology, residue_pairs, scheme, ignore_nonprotein, threshold, periodic,
+                                      neighbor_list=neighbor_list, cutoff=cutoff, skin=skin,
+                                      update_stride=update_stride)
         self.__add_feature(f)
 
     def add_group_COM(self, group_definitions, ref_geom=None, image_molecules=False, mass_weighted=True,):
@@ -784,6 +822,9 @@ class MDFeaturizer(SerializableMixIn, Loggable):
         r"""
         Adds the minimum root-mean-square-deviation (minrmsd) with respect to a reference structure to the feature list.
 
+        Several reference structures can be added at once by passing a list of frames, which is faster than adding
+        them one by one: every frame is centered only once and then compared to all references.
+
         Parameters
         ----------
         ref:
@@ -792,9 +833,11 @@ class MDFeaturizer(SerializableMixIn, Loggable):
                 1. :py:obj:`mdtraj.Trajectory` object
                 2. filename for mdtraj to load. In this case, only the :py:obj:`ref_frame` of that file will be used.
 
-        ref_frame: integer, default=0
+        ref_frame: integer or list of integers, default=0
             Reference frame of the filename specified in :py:obj:`ref`.
-            This parameter has no effect if :py:obj:`ref` is not a filename.
+            A single integer has no effect if :py:obj:`ref` is not a filename, then the first frame is used.
+            A list of frames adds the minrmsd to each of these frames of :py:obj:`ref` (filename or trajectory),
+            one dimension per frame.
 
         atom_indices: array_like, default=None
             Atoms that will be used for:
@@ -861,7 +904,7 @@ class MDFeaturizer(SerializableMixIn, Loggable):
         dim = sum(f.dimension for f in self.active_features)
         return dim
 
-    def transform(self, traj):
+    def transform(self, traj, neighbor_lists=None):
         """
         Maps an mdtraj Trajectory object to the selected output features
 
@@ -869,6 +912,9 @@ class MDFeaturizer(SerializableMixIn, Loggable):
         ----------
         traj : mdtraj Trajectory
             Trajectory object used as an input
+        neighbor_lists : dict or None
+            neighbor lists of the features of the trajectory traj belongs to, carried over between its chunks.
+            If None, the lists are rebuilt for traj.
 
         Returns
         -------
@@ -884,6 +930,8 @@ class MDFeaturizer(SerializableMixIn, Loggable):
 
         # otherwise build feature vector.
         feature_vec = []
+        # intermediate results shared by the features of this chunk
+        cache = GeometryCache(traj, neighbor_lists)
 
         # TODO: consider parallel evaluation computation here, this effort is
         # only worth it, if computation time dominates memory transfers
@@ -892,6 +940,8 @@ class MDFeaturizer(SerializableMixIn, Loggable):
             if isinstance(f, CustomFeature):
                 # NOTE: casting=safe raises in numpy>=1.9
                 vec = f.transform(traj).astype(np.float32, casting='safe')
+                # the custom function might have modified traj in place
+                cache.clear()
                 if vec.shape[0] == 0:
                     vec = np.empty((0, f.dimension))
 
@@ -911,7 +961,7 @@ class MDFeaturizer(SerializableMixIn, Loggable):
                                         traj.xyz.shape[0],
                                         vec.shape[0]))
             else:
-                vec = f.transform(traj).astype(np.float32)
+                vec = f._transform_cached(traj, cache).astype(np.float32)
             feature_vec.append(vec)
 
         if len(feature_vec) > 1:
@@ -920,3 +970,64 @@ class MDFeaturizer(SerializableMixIn, Loggable):
             res = feature_vec[0]
 
         return res
+
+    def _plan_cols(self, cols):
+        """ Maps output columns to the active features computing them.
+
+        Parameters
+        ----------
+        cols : array_like(dtype=int) or slice
+            output columns (in the order they should be returned)
+
+        Returns
+        -------
+        plan : list of tuples (feature, local columns, positions in output)
+            only features contributing at least one column are listed.
+        atom_indices : ndarray(dtype=int) or None
+            sorted atom indices needed to compute the columns or None, if all atoms are needed.
+        """
+        cols = np.arange(self.dimension())[cols]
+        offsets = np.cumsum([0] + [f.dimension for f in self.active_features])
+        feature_of_col = np.searchsorted(offsets, cols, side='right') - 1
+        plan, atoms = [], []
+        for i, f in enumerate(self.active_features):
+            positions = np.flatnonzero(feature_of_col == i)
+            if len(positions) == 0:
+                continue
+            local_cols = cols[positions] - offsets[i]
+            plan.append((f, local_cols, positions))
+            if atoms is not None:
+                needed = f._atom_indices_for_cols(local_cols)
+                atoms = None if needed is None else atoms + [needed]
+        atom_indices = np.unique(np.concatenate(atoms)) if atoms else None
+        if atom_indices is not None and len(atom_indices) == self.topology.n_atoms:
+            atom_indices = None
+        return plan, atom_indices
+
+    def _transform_cols(self, traj, plan, atom_map=None, neighbor_lists=None):
+        """ Evaluates only the output columns given by a plan obtained from :py:meth:`_plan_cols`.
+
+        Parameters
+        ----------
+        traj : mdtraj Trajectory
+            input frames, containing only the atoms of the plan, if atom_map is given.
+        plan : list of tuples
+            output of :py:meth:`_plan_cols`
+        atom_map : ndarray(dtype=int) or None
+            maps atom indices of the topology to atom indices of traj.
+        neighbor_lists : dict or None
+            neighbor lists of the features of the trajectory traj belongs to, see :py:meth:`transform`.
+
+        Returns
+        -------
+        out : ndarray((T, n), dtype=float32)
+            the requested n columns of the output features.
+        """
+        n_cols = sum(len(positions) for _, _, positions in plan)
+        res = np.empty((traj.n_frames, n_cols), dtype=np.float32)
+        for f, local_cols, positions in plan:
+            if getattr(f, 'neighbor_list', False):
+                res[:, positions] = f._transform_cols(traj, local_cols, atom_map, neighbor_lists=neighbor_lists)
+            else:
+                res[:, positions] = f._transform_cols(traj, local_cols, atom_map)
+        return res
@@ -20,12 +20,15 @@ Created on 15.02.2016
 
 @author: marscher
 '''
+import numbers
 from itertools import count
 
 import mdtraj
 import numpy as np
 
+from pyemma._base.serialization.serialization import Modifications
 from pyemma.coordinates.data.featurization._base import Feature
+from pyemma.coordinates.data.featurization._cache import GeometryCache
 from pyemma.coordinates.data.featurization.util import (_describe_atom,
                                                         cmp_traj)
 
@@ -152,6 +155,7 @@ class SelectionFeature(Feature):
     __serialize_version = 0
     __serialize_fields = ('indexes',)
     prefix_label = "ATOM:"
+    _modifies_traj = False
 
     def __init__(self, top, indexes):
         self.top = top
@@ -175,6 +179,16 @@ class SelectionFeature(Feature):
         newshape = (traj.xyz.shape[0], 3 * self.indexes.shape[0])
         return np.reshape(traj.xyz[:, self.indexes, :], newshape)
 
+    def _atom_indices_for_cols(self, cols):
+        return np.unique(self.indexes[np.asarray(cols) // 3])
+
+    def _transform_cols(self, traj, cols, atom_map=None):
+        cols = np.asarray(cols)
+        atoms = self.indexes[cols // 3]
+        if atom_map is not None:
+            atoms = atom_map[atoms]
+        return traj.xyz[:, atoms, cols % 3]
+
     def __eq__(self, other):
         eq = super(SelectionFeature, self).__eq__(other)
         if not eq or not isinstance(other, SelectionFeature):
@@ -182,49 +196,80 @@ class SelectionFeature(Feature):
         return np.all(self.indexes == other.indexes)
 
 
+def _first_frame(ref):
+    # up to version 0, only the first frame of the reference was used.
+    return ref[0]
+
+
 class MinRmsdFeature(Feature):
 
-    __serialize_version = 0
+    __serialize_version = 1
     __serialize_fields = ('ref', 'ref_frame', 'name', 'precentered', 'atom_indices',)
+    __serialize_modifications_map = {0: Modifications().map('ref', _first_frame).list()}
 
     def __init__(self, ref, ref_frame=0, atom_indices=None, topology=None, precentered=False):
         self.top = topology
 
-        assert isinstance(
-            ref_frame, int), "ref_frame has to be of type integer, and not %s" % type(ref_frame)
+        if isinstance(ref_frame, numbers.Integral):
+            ref_frame = int(ref_frame)
+            frames = [ref_frame]
+        else:
+            ref_frame = [int(f) for f in ref_frame]
+            frames = ref_frame
+            if len(frames) == 0:
+                raise ValueError("no reference frames given")
 
         # Types of inputs
         # 1. Filename+top
         if isinstance(ref, str):
             # Store the filename
             self.name = ref[:]
-            ref = mdtraj.load_frame(ref, ref_frame, top=topology)
+            ref = mdtraj.join([mdtraj.load_frame(ref, f, top=topology) for f in frames])
             # mdtraj is pretty good handling exceptions, we're not checking for
             # types or anything here
 
         # 2. md.Trajectory object
         elif isinstance(ref, mdtraj.Trajectory):
             self.name = ref.__repr__()[:]
+            # a single frame number has no effect (the first frame is the reference), several select the references.
+            ref = ref[0] if isinstance(ref_frame, int) else ref[frames]
         else:
             raise TypeError("input reference has to be either a filename or "
                             "a mdtraj.Trajectory object, and not of %s" % type(ref))
 
+        # all frames of ref are reference structures
         self.ref = ref
         self.ref_frame = ref_frame
         self.atom_indices = atom_indices
         self.precentered = precentered
-        self.dimension = 1
+        self.dimension = len(frames)
 
     def describe(self):
-        label = "minrmsd to frame %u of %s" % (self.ref_frame, self.name)
-        if self.precentered:
-            label += ', precentered=True'
-        if self.atom_indices is not None:
-            label += ', subset of atoms  '
-        return [label]
+        frames = [self.ref_frame] if isinstance(self.ref_frame, int) else self.ref_frame
+        labels = []
+        for frame in frames:
+            label = "minrmsd to frame %u of %s" % (frame, self.name)
+            if self.precentered:
+                label += ', precentered=True'
+            if self.atom_indices is not None:
+                label += ', subset of atoms  '
+            labels.append(label)
+        return labels
 
     def transform(self, traj):
-        return np.array(mdtraj.rmsd(traj, self.ref, atom_indices=self.atom_indices), ndmin=2).T
+        return self._transform_cached(traj, GeometryCache(traj))
+
+    def _transform_cached(self, traj, cache):
+        # every frame is centered only once per chunk (shared by all minimal RMSDs of the same atoms), the RMSDs to
+        # all references are evaluated from the precentered frames.
+        atom_indices = None if self.atom_indices is None else np.asarray(self.atom_indices, dtype=int)
+        ref = getattr(self, '_ref_centered', None)
+        if ref is None:
+            ref = self.ref[:] if atom_indices is None else self.ref.atom_slice(atom_indices)
+            ref.center_coordinates()
+            self._ref_centered = ref
+        target = cache.centered(atom_indices)
+        return np.vstack([mdtraj.rmsd(target, ref, frame=k, precentered=True) for k in range(ref.n_frames)]).T
 
     def __eq__(self, other):
         if not isinstance(other, MinRmsdFeature):
@@ -258,13 +303,24 @@ class AlignFeature(SelectionFeature):
                 and self.in_place == other.in_place)
 
     def transform(self, traj):
-        if not self.in_place:
-            traj = traj.slice(slice(None), copy=True)
-        aligned = traj.superpose(reference=self.ref, atom_indices=self.atom_indices,
+        return self._transform_cached(traj, GeometryCache(traj))
+
+    def _transform_cached(self, traj, cache):
+        if self.in_place:
+            aligned = traj.superpose(reference=self.ref, atom_indices=self.atom_indices,
+                                     ref_atom_indices=self.ref_atom_indices)
+            # the coordinates of all following features have changed
+            cache.clear()
+        else:
+            aligned = cache.traj(ref=self.ref, atom_indices=self.atom_indices,
                                  ref_atom_indices=self.ref_atom_indices)
         # apply selection
         return super(AlignFeature, self).transform(aligned)
 
+    # superposition depends on atoms outside of the selection.
+    _atom_indices_for_cols = Feature._atom_indices_for_cols
+    _transform_cols = Feature._transform_cols
+
 
 class GroupCOMFeature(Feature):
     __serialize_version = 0
@@ -299,16 +355,12 @@ class GroupCOMFeature(Feature):
         return self._describe
 
     def transform(self, traj):
-        # TODO: is it possible to avoid copy? Otherwise the trajectory is altered...
-        traj_copy = traj[:]
-        COM_xyz = []
-        if self.ref_geom is not None:
-            traj_copy = traj_copy.superpose(self.ref_geom)
-        if self.image_molecules:
-            traj_copy = traj_copy.image_molecules()
-        for aas, mms in zip(self.group_definitions, self.masses_in_groups):
-            COM_xyz.append(np.average(traj_copy.xyz[:, aas, ], axis=1, weights=mms))
-        return np.hstack(COM_xyz)
+        return self._transform_cached(traj, GeometryCache(traj))
+
+    def _transform_cached(self, traj, cache):
+        # superposed and imaged frames as well as the COMs of equal groups are shared with other COM features
+        return np.hstack([cache.com(aas, mms, ref=self.ref_geom, image_molecules=self.image_molecules)
+                          for aas, mms in zip(self.group_definitions, self.masses_in_groups)])
 
     def __eq__(self, other):
         eq = super(GroupCOMFeature, self).__eq__(other)
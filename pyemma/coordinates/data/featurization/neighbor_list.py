@@ -0,0 +1,131 @@
+# This file is part of PyEMMA.
+#
+# Copyright (c) 2015, 2014 Computational Molecular Biology Group, Freie Universitaet Berlin (GER)
+#
+# PyEMMA is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from pyemma.coordinates.data.featurization.distances_c import kernels
+
+
+class NeighborList(object):
+    r""" Verlet list of the atom pairs of a feature, which are within a cutoff distance.
+
+    The list contains all pairs closer than cutoff + skin and is valid as long as no pair can have entered the
+    cutoff, i.e. as long as twice the largest displacement of an atom plus the change of the box vectors since the
+    last update is smaller than the skin. It is rebuilt every update_stride frames or as soon as it might have become
+    invalid, so distances inside the cutoff are always exact. The rebuild uses a cell list for orthorhombic and
+    non-periodic systems, which is linear in the number of atoms.
+
+    The atoms of the feature are handled in a compact numbering (see :py:meth:`coordinates`), so the list is
+    independent of the atoms contained in the input frames.
+
+    Parameters
+    ----------
+    pairs : ndarray (P, 2)
+        atom pairs of the feature (topology indices)
+    cutoff : float
+        pairs farther apart than cutoff are not evaluated.
+    skin : float, default=0.1
+        additional distance for pairs in the list.
+    update_stride : int, default=10
+        maximum number of frames between two updates of the list.
+    """
+
+    def __init__(self, pairs, cutoff, skin=0.1, update_stride=10):
+        if cutoff is None or cutoff <= 0:
+            raise ValueError('the cutoff of the neighbor list has to be positive, but was %s' % cutoff)
+        if skin < 0:
+            raise ValueError('the skin of the neighbor list has to be non-negative, but was %s' % skin)
+        if update_stride < 1:
+            raise ValueError('update_stride has to be positive, but was %s' % update_stride)
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        self.cutoff = cutoff
+        self.skin = skin
+        self.update_stride = int(update_stride)
+        self.atoms = np.unique(pairs)
+        self.local_pairs = np.searchsorted(self.atoms, pairs)
+        self._keys = self._pair_keys(self.local_pairs)
+        self.reset()
+
+    def _pair_keys(self, pairs):
+        return np.min(pairs, axis=1) * len(self.atoms) + np.max(pairs, axis=1)
+
+    def reset(self):
+        """ Forces a rebuild of the list for the next frame. """
+        self._reference = None
+        self._reference_box = None
+        self._age = 0
+        self.candidates = None
+
+    def coordinates(self, traj, atom_map=None):
+        """ Coordinates of the atoms of the list (in compact numbering) of all frames of traj. """
+        atoms = self.atoms if atom_map is None else atom_map[self.atoms]
+        return traj.xyz[:, atoms]
+
+    def _rebuild(self, xyz, box, triclinic):
+        radius = self.cutoff + self.skin
+        if box is not None and triclinic:
+            within = kernels.contacts(xyz[np.newaxis], self.local_pairs, radius,
+                                      box=box[np.newaxis], triclinic=True)[0]
+            self.candidates = np.flatnonzero(within)
+        else:
+            found = kernels.neighbor_pairs(xyz, radius, box=box)
+            self.candidates = np.flatnonzero(np.isin(self._keys, self._pair_keys(found)))
+        self._reference = xyz.copy()
+        self._reference_box = None if box is None else box.copy()
+        self._age = 0
+
+    def _moved(self, xyz, box):
+        """ upper bound of the change of the pair distances of every frame since the last update. """
+        moved = 2 * np.sqrt(((xyz - self._reference) ** 2).sum(axis=-1)).max(axis=1)
+        if box is not None:
+            moved += np.sqrt(((box - self._reference_box) ** 2).sum(axis=-1)).sum(axis=1)
+        return moved
+
+    def blocks(self, xyz, box=None, triclinic=False):
+        """ Splits frames into consecutive blocks sharing the same list.
+
+        Parameters
+        ----------
+        xyz : ndarray (T, A, 3)
+            coordinates of the atoms of the list as returned by :py:meth:`coordinates`.
+        box : ndarray (T, 3, 3) or None
+            box vectors as returned by :py:func:`kernels.periodic_box`, None for non-periodic distances.
+        triclinic : bool
+            whether the box is not orthorhombic.
+
+        Yields
+        ------
+        start, stop, candidates : int, int, ndarray(dtype=int)
+            frames [start, stop) and the indices of the pairs, which have to be evaluated for these frames.
+        """
+        T = len(xyz)
+        start = 0
+        while start < T:
+            if (self._reference is None or self._age >= self.update_stride
+                    or (box is None) != (self._reference_box is None)):
+                self._rebuild(xyz[start], None if box is None else box[start], triclinic)
+            stop = min(T, start + self.update_stride - self._age)
+            moved = self._moved(xyz[start:stop], None if box is None else box[start:stop])
+            invalid = np.flatnonzero(moved > self.skin)
+            if len(invalid) > 0 and invalid[0] == 0:
+                self.reset()
+                continue
+            if len(invalid) > 0:
+                stop = start + invalid[0]
+            yield start, stop, self.candidates
+            self._age += stop - start
+            start = stop
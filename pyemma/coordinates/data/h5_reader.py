@@ -1,3 +1,5 @@
+import numpy as np
+
 from pyemma._base.serialization.serialization import SerializableMixIn
 
 from pyemma.coordinates.data._base.datasource import DataSource
@@ -29,12 +31,25 @@ class H5Reader(DataSource, SerializableMixIn):
         All selections have to begin with the root node '/'.
 
     chunk_size: int
+
+    max_open_files: int, default=8
+        maximum number of file handles an iterator keeps open while switching between data sets. Files are closed
+        in least recently used order once this limit is reached and all of them, when the iterator is closed.
+
+    chunk_cache_size: int or None, default=None
+        size of the raw data chunk cache per opened file in bytes (maps to h5py's rdcc_nbytes). If None, the
+        HDF5 default (1 MB) is used. Increase this, if the on-disk chunks of your data sets are larger.
     """
     __serialize_version = 0
 
-    def __init__(self, filenames, selection='/*', chunk_size=5000, **kw):
+    def __init__(self, filenames, selection='/*', chunk_size=5000, max_open_files=8, chunk_cache_size=None, **kw):
         super(H5Reader, self).__init__(chunksize=chunk_size)
 
+        if max_open_files < 1:
+            raise ValueError('max_open_files has to be positive.')
+        self.max_open_files = max_open_files
+        self.chunk_cache_size = chunk_cache_size
+
         self._is_reader = True
         self._is_random_accessible = True
 
@@ -68,7 +83,7 @@ class H5Reader(DataSource, SerializableMixIn):
                              'Check the log output')
 
     def __reduce__(self):
-        return H5Reader, (self.filenames, self.selection, self.chunksize)
+        return H5Reader, (self.filenames, self.selection, self.chunksize, self.max_open_files, self.chunk_cache_size)
 
     @property
     def selection(self):
@@ -166,42 +181,124 @@ class H5Reader(DataSource, SerializableMixIn):
             t = TrajInfo(-1, 0)
         return t
 
-    def _load_file(self, itraj):
+    def _open_file(self, filename):
+        """ opens filename for reading with the configured raw data chunk cache. """
         # noinspection PyUnresolvedReferences
         import tables
         import h5py
-        filename, path = self._itraj_dataset_mapping[itraj]
-        self.logger.debug('load file %s with path %s', filename, path)
-        file = h5py.File(filename, 'r')
-        ds = file[path]
-        return ds
+        kw = {}
+        if self.chunk_cache_size is not None:
+            kw['rdcc_nbytes'] = int(self.chunk_cache_size)
+        return h5py.File(filename, 'r', **kw)
 
     def _create_iterator(self, skip=0, chunk=0, stride=1, return_trajindex=True, cols=None):
         return H5Iterator(self, skip=skip, chunk=chunk, stride=stride, return_trajindex=return_trajindex, cols=cols)
 
 
 class H5Iterator(DataInMemoryIterator):
+    """ Iterator over HDF5 data sets, which aligns its reads with the on-disk chunk layout of the data set.
+
+    HDF5 decompresses a whole chunk, even if only a single row of it is requested. So instead of letting subsequent
+    reads decompress the same chunk again, we always read up to the end of the last touched chunk and keep the
+    remainder for the next read. Random access reads are grouped by chunk, so every chunk is decompressed only once.
+
+    The iterator owns the handles of recently accessed files (at most max_open_files of the reader) and closes them,
+    when it is closed.
+    """
     def __init__(self, data_source, skip=0, chunk=0, stride=1, return_trajindex=False, cols=False):
+        from collections import OrderedDict
+        self._file_handles = OrderedDict()
+        self._block = (0, None)
         super(H5Iterator, self).__init__(data_source=data_source, skip=skip,
                                          chunk=chunk, stride=stride,
                                          return_trajindex=return_trajindex,
                                          cols=cols)
 
     def close(self):
-        if hasattr(self, '_fh'):
-            self._fh.close()
-            del self._fh
+        self._block = (0, None)
+        self.data = None
+        # force re-opening the current file, if the iterator is reset.
+        self._selected_itraj = -1
+        while self._file_handles:
+            _, fh = self._file_handles.popitem()
+            fh.close()
+
+    def _open_file(self, filename):
+        """ returns an open h5py.File for filename, re-using the handles of recently accessed files. """
+        fh = self._file_handles.pop(filename, None)
+        if fh is None or not fh.id.valid:
+            fh = self._data_source._open_file(filename)
+        # move to end, so the least recently used handle is always first.
+        self._file_handles[filename] = fh
+        while len(self._file_handles) > self._data_source.max_open_files:
+            _, lru = self._file_handles.popitem(last=False)
+            lru.close()
+        return fh
 
     def _select_file(self, itraj):
         if self._selected_itraj != itraj:
             self._first_file_opened = True
-            self.close()
+            # buffered frames belong to the previous data set.
+            self._block = (0, None)
             self._t = 0
             self._itraj = itraj
             self._selected_itraj = self._itraj
             if itraj < self.number_of_trajectories():
-                self.data = self._data_source._load_file(itraj)
-                self._fh = self.data.file
+                filename, path = self._data_source._itraj_dataset_mapping[itraj]
+                self._data_source.logger.debug('load file %s with path %s', filename, path)
+                self.data = self._open_file(filename)[path]
+
+    @staticmethod
+    def _chunk_rows(data):
+        """ number of frames stored in one on-disk chunk of data set (0, if the data set is not chunked). """
+        return data.chunks[0] if data.chunks is not None else 0
+
+    def _read_slice(self, data, slice_x):
+        start, stop, step = slice_x.indices(data.shape[0])
+        rows = self._chunk_rows(data)
+        if rows <= 1 or step >= rows or start >= stop:
+            # the hyperslab selection touches every chunk at most once, so there is nothing to gain.
+            self._block = (0, None)
+            return data[start:stop:step]
+
+        block_start, block = self._block
+        if block is not None and block_start <= start < block_start + len(block):
+            head = block[start - block_start:]
+            read_start = block_start + len(block)
+        else:
+            head = None
+            read_start = start
+        # extend the read to the end of the last touched chunk.
+        aligned_stop = min(-(-stop // rows) * rows, data.shape[0])
+        if read_start < aligned_stop:
+            block = data[read_start:aligned_stop]
+            if head is not None:
+                block = np.concatenate((head, block))
+        else:
+            block = head
+
+        n = stop - start
+        self._block = (stop, block[n:]) if len(block) > n else (0, None)
+        return block[:n:step]
+
+    def _read_indices(self, data, indices):
+        indices = np.asarray(indices)
+        if len(indices) == 0:
+            return np.empty((0, ) + data.shape[1:], dtype=data.dtype)
+        # h5py only supports increasing, unique indices for point selections.
+        unique, inverse = np.unique(indices, return_inverse=True)
+        rows = self._chunk_rows(data)
+        if rows == 0:
+            return data[unique][inverse]
+
+        values = np.empty((len(unique), ) + data.shape[1:], dtype=data.dtype)
+        chunk_ids = unique // rows
+        boundaries = np.flatnonzero(np.diff(chunk_ids)) + 1
+        for group in np.split(np.arange(len(unique)), boundaries):
+            # read the contiguous range of frames within this chunk and select the requested ones in memory.
+            first, last = unique[group[0]], unique[group[-1]]
+            values[group] = data[first:last + 1][unique[group] - first]
+        return values[inverse]
 
     def _next_chunk(self):
         X = self._next_chunk_impl(self.data)
@@ -54,9 +54,21 @@ class _JoiningIterator(DataSourceIterator):
     def __init__(self, src, sources, skip=0, chunk=0, stride=1, return_trajindex=False, cols=None):
         super(_JoiningIterator, self).__init__(src, skip, chunk,
                                                stride, return_trajindex, cols)
+        # distribute the selected columns over the sources, so every source only computes its own share
+        # and sources without selected columns are not read at all.
+        self._positions = None
+        source_cols = [None] * len(sources)
+        if cols is not None:
+            cols = np.arange(src.ndim)[cols]
+            offsets = np.cumsum([0] + [s.ndim for s in sources])
+            source_of_col = np.searchsorted(offsets, cols, side='right') - 1
+            positions = [np.flatnonzero(source_of_col == i) for i in range(len(sources))]
+            self._positions = [p for p in positions if len(p)]
+            source_cols = [cols[p] - offsets[i] for i, p in enumerate(positions) if len(p)]
+            sources = [s for s, p in zip(sources, positions) if len(p)]
         self._iterators = [s.iterator(skip=skip, chunk=chunk, stride=stride,
-                                      return_trajindex=return_trajindex, cols=cols)
-                           for s in sources]
+                                      return_trajindex=return_trajindex, cols=c)
+                           for s, c in zip(sources, source_cols)]
         self._selected_itraj = -1
         self.sources = sources
 
@@ -75,7 +87,12 @@ class _JoiningIterator(DataSourceIterator):
                 X = next(it)
             chunks.append(X)
 
-        res = np.hstack(chunks)
+        if self._positions is None:
+            res = np.hstack(chunks)
+        else:
+            res = np.empty((len(chunks[0]), sum(len(p) for p in self._positions)), dtype=np.result_type(*chunks))
+            for X, positions in zip(chunks, self._positions):
+                res[:, positions] = X
         self._t += len(res)
 
         if self._t >= self.trajectory_length() and self._itraj < self._data_source.ntraj -1:
@@ -84,6 +101,12 @@ class _JoiningIterator(DataSourceIterator):
 
         return res
 
+    def _use_cols(self, X):
+        # columns have already been selected by the underlying iterators
+        if self._positions is not None:
+            return X
+        return super(_JoiningIterator, self)._use_cols(X)
+
     def _select_file(self, itraj):
         if itraj != self._selected_itraj:
             self._t = 0
@@ -28,12 +28,13 @@ from pyemma.coordinates.data.util.reader_utils import (copy_traj_attributes as _
                                                        preallocate_empty_trajectory as _preallocate_empty_trajectory,
                                                        enforce_top as _enforce_top)
 
-__all__ = ['frames_from_files']
+__all__ = ['frames_from_files', 'save_frames_to_files']
 
 log = getLogger(__name__)
 
 
-def frames_from_files(files, top, frames, chunksize=1000, stride=1, verbose=False, copy_not_join=None, reader=None):
+def frames_from_files(files, top, frames, chunksize=1000, stride=1, verbose=False, copy_not_join=None, reader=None,
+                      n_jobs=1):
     """
     Constructs a Trajectory object out of given frames collected from files (or given reader).
 
@@ -45,6 +46,7 @@ def frames_from_files(files, top, frames, chunksize=1000, stride=1, verbose=Fals
     :param verbose:
     :param copy_not_join: not used
     :param reader: if a reader is given, ignore files and top param!
+    :param n_jobs: number of files to read concurrently. Fragmented trajectories are always read serially.
     :return: mdtra.Trajectory consisting out of frames indices.
     """
     # Enforce topology to be a md.Topology object
@@ -124,6 +126,15 @@ def frames_from_files(files, top, frames, chunksize=1000, stride=1, verbose=Fals
                 for _r in r:
                     _r._return_traj_obj = flag
 
+    if (n_jobs is None or n_jobs > 1) and isinstance(reader, FeatureReader):
+        if n_jobs is None:
+            from pyemma._base.parallel import get_n_jobs
+            n_jobs = get_n_jobs(logger=log)
+        # group the requests by file and read them concurrently, seeking via the cached frame offsets.
+        frames_by_file = _read_frames_by_file(reader.filenames, top, np.unique(sorted_inds, axis=0), chunksize,
+                                              offsets=reader._offsets, n_jobs=n_jobs)
+        return _assemble_frames(top, sorted_inds[sort_inds.argsort()], frames_by_file)
+
     try:
         # If the reader got passed in, it could have the data already mapped to memory.
         # In this case, we cannot force it to return trajectory objects, so we have to re-create it.
@@ -150,3 +161,117 @@ def frames_from_files(files, top, frames, chunksize=1000, stride=1, verbose=Fals
         if reader_given:
             set_reader_return_traj_objects(reader, False)
     return dest
+
+
+def _read_frames(filename, top, frames, chunksize, offsets=None):
+    """ Reads the given sorted and unique frame indices of a single trajectory file.
+
+    :param filename: trajectory file
+    :param top: md.Topology
+    :param frames: sorted, unique frame indices
+    :param chunksize: number of frames to read at once
+    :param offsets: byte offsets of the frames in the file (eg. TrajInfo.offsets), enables direct seeking.
+    :return: mdtraj.Trajectory consisting out of the requested frames in the given order.
+    """
+    from pyemma.coordinates.util.patches import iterload
+    with iterload(filename, chunk=chunksize or 0, top=top, stride=np.asarray(frames), offsets=offsets) as it:
+        chunks = [c for c in it]
+    return chunks[0].join(chunks[1:]) if len(chunks) > 1 else chunks[0]
+
+
+def _read_frames_by_file(files, top, frames, chunksize, offsets=None, n_jobs=1):
+    """ Reads the requested (itraj, frame) pairs grouped by file with a pool of n_jobs threads.
+
+    :param frames: lexicographically sorted and unique (N, 2) array of (itraj, frame) pairs.
+    :return: dict mapping itraj to a tuple (frame indices, mdtraj.Trajectory holding exactly these frames)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    itrajs, starts = np.unique(frames[:, 0], return_index=True)
+    frames_per_traj = np.split(frames[:, 1], starts[1:])
+
+    with ThreadPoolExecutor(max_workers=max(1, n_jobs)) as pool:
+        futures = [pool.submit(_read_frames, files[itraj], top, traj_frames, chunksize,
+                               offsets[itraj] if offsets else None)
+                   for itraj, traj_frames in zip(itrajs, frames_per_traj)]
+        return {itraj: (traj_frames, f.result()) for itraj, traj_frames, f in zip(itrajs, frames_per_traj, futures)}
+
+
+def _assemble_frames(top, indexes, frames_by_file):
+    """ Assembles the trajectory given by the (itraj, frame) pairs in indexes from the per file frames. """
+    dest = _preallocate_empty_trajectory(top, len(indexes))
+    for itraj in np.unique(indexes[:, 0]):
+        target = np.flatnonzero(indexes[:, 0] == itraj)
+        traj_frames, traj = frames_by_file[itraj]
+        source = np.searchsorted(traj_frames, indexes[target, 1])
+        dest.xyz[target] = traj.xyz[source]
+        dest.time[target] = traj.time[source]
+        if traj.unitcell_lengths is not None:
+            dest.unitcell_lengths[target] = traj.unitcell_lengths[source]
+            dest.unitcell_angles[target] = traj.unitcell_angles[source]
+    return dest
+
+
+def save_frames_to_files(files, top, indexes, outfiles, stride=1, chunksize=1000, offsets=None, n_jobs=1,
+                         image_molecules=False, max_bytes=None, lengths=None):
+    """
+    Extracts multiple sets of frames from trajectory files and writes every set into its own output file.
+
+    Requests of several sets are grouped per input file, so every input file is opened only once per batch of sets.
+    The files of a batch are read concurrently by a pool of n_jobs threads, which seek directly to the requested
+    frames, if byte offsets are given. The size of a batch is limited by max_bytes, so only the coordinates of one
+    batch are held in memory at once.
+
+    :param files: source files
+    :param top: topology
+    :param indexes: list of (T_i, 2) arrays of (itraj, frame) pairs
+    :param outfiles: list of output file names (one per element of indexes)
+    :param stride: stride the frame indices in indexes refer to
+    :param chunksize: number of frames to read at once
+    :param offsets: list of byte offset arrays per file (eg. reader._offsets) or None
+    :param n_jobs: number of files to read concurrently
+    :param image_molecules: call mdtraj.Trajectory.image_molecules before saving
+    :param max_bytes: maximum size of the coordinates read per batch, defaults to iterload.MEMORY_CUTOFF
+    :param lengths: trajectory lengths of files, if given the indices are checked against them.
+    :return: list of written file names
+    """
+    from pyemma.coordinates.util.patches import iterload
+    top = _enforce_top(top)
+    if max_bytes is None:
+        max_bytes = iterload.MEMORY_CUTOFF
+    bytes_per_frame = 3 * 4 * top.n_atoms
+
+    indexes = [np.array(i, dtype=np.int64, copy=True) for i in indexes]
+    for i in indexes:
+        i[:, 1] *= int(stride)
+        for itraj in np.unique(i[:, 0]):
+            if itraj >= len(files):
+                raise ValueError("indexes ask for file nr. %u, but only %u files given" % (itraj, len(files)))
+            largest = i[i[:, 0] == itraj, 1].max()
+            if lengths is not None and largest >= lengths[itraj]:
+                raise ValueError("largest specified index ({largest}) is larger than trajectory length "
+                                 "'{filename}' = {length}".format(largest=largest, filename=files[itraj],
+                                                                  length=lengths[itraj]))
+
+    def batches():
+        batch, size = [], 0
+        for j, i in enumerate(indexes):
+            if batch and (size + len(i)) * bytes_per_frame > max_bytes:
+                yield batch
+                batch, size = [], 0
+            batch.append(j)
+            size += len(i)
+        if batch:
+            yield batch
+
+    for batch in batches():
+        requested = np.unique(np.vstack([indexes[j] for j in batch]), axis=0)
+        frames_by_file = _read_frames_by_file(files, top, requested, chunksize, offsets=offsets, n_jobs=n_jobs)
+        for j in batch:
+            traj = _assemble_frames(top, indexes[j], frames_by_file)
+            if image_molecules:
+                traj.image_molecules(inplace=True)
+            traj.save(outfiles[j])
+            log.debug("Created file %s", outfiles[j])
+        del frames_by_file
+
+    return outfiles
@@ -222,6 +222,13 @@ class SqliteDB(AbstractDB):
                                config.traj_info_max_entries, config.traj_info_max_size))
                 self._clean(n=self.clean_n_entries)
 
+    def update(self, traj_info):
+        values = (traj_info.length, traj_info.ndim, np.array(traj_info.offsets), traj_info.abs_path,
+                  traj_info.hash_value)
+        statement = ("UPDATE traj_info SET length=?, ndim=?, offsets=?, abs_path=? WHERE hash=?", values)
+        with self._database as c:
+            c.execute(*statement)
+
     def get(self, key):
         cursor = self._database.execute("SELECT * FROM traj_info WHERE hash=?", (key,))
         row = cursor.fetchone()
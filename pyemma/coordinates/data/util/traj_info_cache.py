@@ -178,6 +178,11 @@ class TrajectoryInfoCache(object):
         with open(filename, PyCSVReader.DEFAULT_OPEN_MODE) as fh:
             reader._determine_dialect(fh, length)
 
+    @staticmethod
+    def _offsets_missing(reader, filename, info):
+        needs_offsets = getattr(reader, '_traj_info_needs_offsets', None)
+        return needs_offsets is not None and needs_offsets(filename) and len(info.offsets) == 0
+
     def __getitem__(self, filename_reader_tuple):
         filename, reader = filename_reader_tuple
         abs_path = os.path.abspath(filename)
@@ -187,6 +192,10 @@ class TrajectoryInfoCache(object):
             if not isinstance(info, TrajInfo):
                 raise KeyError()
             self._handle_csv(reader, filename, info.length)
+            # entries created by older versions may lack the frame offsets, which are needed for fast seeking.
+            if self._offsets_missing(reader, filename, info):
+                info.offsets = reader._get_traj_info(filename).offsets
+                self._database.update(info)
             # if path has changed, update it
             if not info.abs_path == abs_path:
                 info.abs_path = abs_path
@@ -27,7 +27,7 @@ from pyemma._base.progress import ProgressReporter
 from pyemma._ext.variational.estimators.running_moments import running_covar
 
 
-__all__ = ['LaggedCovariance']
+__all__ = ['LaggedCovariance', 'MultiLagCovariance']
 
 __author__ = 'paul, nueske'
 
@@ -100,6 +100,7 @@ class LaggedCovariance(StreamingEstimator):
 
         self._rc = None
         self._used_data = 0
+        self._tails = {}
 
     @property
     def weights(self):
@@ -146,33 +147,38 @@ class LaggedCovariance(StreamingEstimator):
                                      remove_mean=self.remove_data_mean, symmetrize=self.reversible,
                                      sparse_mode=self.sparse_mode, modify_data=self.modify_data, nsave=nsave)
 
-    def _estimate(self, iterable, partial_fit=False):
+    def _estimate(self, iterable, partial_fit=False, skip=None):
+        if skip is None:
+            skip = self.skip
+        if not partial_fit:
+            self._tails = {}
         indim = iterable.dimension()
         if not indim:
             raise ValueError("zero dimension from data source!")
 
-        if not any(iterable.trajectory_lengths(stride=self.stride, skip=self.lag+self.skip) > 0):
+        if not any(iterable.trajectory_lengths(stride=self.stride, skip=self.lag+skip) > 0):
             if partial_fit:
                 self.logger.warn("Could not use data passed to partial_fit(), "
                                  "because no single data set [longest=%i] is longer than lag+skip [%i]",
-                                 max(iterable.trajectory_lengths(self.stride, skip=self.skip)), self.lag+self.skip)
+                                 max(iterable.trajectory_lengths(self.stride, skip=skip)), self.lag+skip)
                 return self
             else:
                 raise ValueError("None single dataset [longest=%i] is longer than"
-                                 " lag+skip [%i]." % (max(iterable.trajectory_lengths(self.stride, skip=self.skip)),
-                                                      self.lag+self.skip))
+                                 " lag+skip [%i]." % (max(iterable.trajectory_lengths(self.stride, skip=skip)),
+                                                      self.lag+skip))
 
         self.logger.debug("will use %s total frames for %s",
-                          iterable.trajectory_lengths(self.stride, skip=self.skip), self.name)
+                          iterable.trajectory_lengths(self.stride, skip=skip), self.name)
 
         chunksize = 0 if partial_fit else iterable.chunksize
-        it = iterable.iterator(lag=self.lag, return_trajindex=False, stride=self.stride, skip=self.skip,
-                               chunk=chunksize)
+        # if only C00 is requested, the time-lagged data does not need to be read or computed.
+        it = iterable.iterator(lag=self.lag, return_trajindex=False, stride=self.stride, skip=skip,
+                               chunk=chunksize, return_lagged=self.c0t or self.ctt)
         # iterator over input weights
         if hasattr(self.weights, 'iterator'):
             if hasattr(self.weights, '_transform_array'):
                 self.weights.data_producer = iterable
-            it_weights = self.weights.iterator(lag=0, return_trajindex=False, stride=self.stride, skip=self.skip,
+            it_weights = self.weights.iterator(lag=0, return_trajindex=False, stride=self.stride, skip=skip,
                                                chunk=chunksize)
             if it_weights.number_of_trajectories() != iterable.number_of_trajectories():
                 raise ValueError("number of weight arrays did not match number of input data sets. {} vs. {}"
@@ -184,7 +190,7 @@ class LaggedCovariance(StreamingEstimator):
 
         # TODO: we could possibly optimize the case lag>0 and c0t=False using skip.
         # Access how much iterator hassle this would be.
-        #self.skipped=0
+        #skipped=0
         pg = ProgressReporter()
         pg.register(it.n_chunks, 'calculate covariances', stage=0)
         with it, pg.context(stage=0):
@@ -202,7 +208,7 @@ class LaggedCovariance(StreamingEstimator):
                         # however doing so, leads to wrong results...
                         # if np.all(np.abs(weight) < np.finfo(np.float).eps):
                         #     #print("skip")
-                        #     self.skipped += len(X)
+                        #     skipped += len(X)
                         #     continue
                 if self.remove_constant_mean is not None:
                     X = X - self.remove_constant_mean[np.newaxis, :]
@@ -219,19 +225,82 @@ class LaggedCovariance(StreamingEstimator):
         if partial_fit:
             self._used_data += len(it)
 
-    def partial_fit(self, X):
+    def partial_fit(self, X, itraj=None):
         """ incrementally update the estimates
 
         Parameters
         ----------
         X: array, list of arrays, PyEMMA reader
             input data.
+        itraj: hashable or list of hashables, optional, default=None
+            identifiers of the trajectories continued by the arrays in X. If given, the last lag frames of every
+            trajectory are kept until the next call, so consecutive segments of a trajectory (e.g. of a running
+            simulation) can be passed without overlap and no time-lagged pair is lost at the segment boundaries.
+            The first skip frames are only removed from the beginning of every trajectory. Requires array input
+            and stride=1.
         """
         from pyemma.coordinates import source
 
-        self._estimate(source(X), partial_fit=True)
-        self._estimated = True
+        if itraj is not None:
+            X = self._continue_trajectories(X, itraj)
+            if X:
+                self._estimate(source(X), partial_fit=True, skip=0)
+            self._estimated = self._rc is not None
+        else:
+            self._estimate(source(X), partial_fit=True)
+            self._estimated = True
+
+        return self
+
+    def _continue_trajectories(self, X, itraj):
+        """ prepends the buffered last lag frames of the trajectories itraj to the segments X.
+
+        Returns the list of segments, which contain time-lagged pairs, and buffers their last lag frames.
+        """
+        from pyemma.util.types import ensure_traj_list
+        if self.stride != 1:
+            raise ValueError('Continuing trajectories in partial_fit requires stride=1.')
+        if hasattr(self.weights, 'iterator') and not hasattr(self.weights, '_transform_array'):
+            raise ValueError('Continuing trajectories in partial_fit does not support weight arrays.')
+        X = ensure_traj_list(X)
+        if not isinstance(itraj, (list, tuple, np.ndarray)):
+            itraj = [itraj]
+        if len(itraj) != len(X):
+            raise ValueError('Number of trajectory identifiers ({}) does not match number of arrays ({}).'
+                             .format(len(itraj), len(X)))
+        segments = []
+        for key, x in zip(itraj, X):
+            # the tail buffer holds either the frames still to skip or the last lag frames of the trajectory.
+            to_skip, tail = self._tails.get(key, (self.skip, None))
+            if to_skip:
+                x, to_skip = x[to_skip:], max(0, to_skip - len(x))
+            if tail is not None:
+                x = np.concatenate((tail, x))
+            self._tails[key] = (to_skip, x[max(0, len(x) - self.lag):].copy() if self.lag else None)
+            if len(x) > self.lag:
+                segments.append(x)
+        return segments
+
+    def combine(self, other):
+        """ combine the estimates with those of another, independently estimated LaggedCovariance
+
+        Both estimators need to have the same settings. Together with the serialization of the running moments
+        (see :meth:`RunningCovar.to_bytes <pyemma._ext.variational.estimators.running_moments.RunningCovar.to_bytes>`),
+        this allows to estimate covariances on separate parts of the data, e.g. on different nodes.
 
+        Parameters
+        ----------
+        other: LaggedCovariance
+            estimator with estimates on other data.
+        """
+        other._check_estimated()
+        if self._rc is None:
+            self._rc = running_covar(xx=self.c00, xy=self.c0t, yy=self.ctt,
+                                     remove_mean=self.remove_data_mean, symmetrize=self.reversible,
+                                     sparse_mode=self.sparse_mode, modify_data=self.modify_data)
+        self._rc.combine(other._rc)
+        self._used_data += other._used_data
+        self._estimated = True
         return self
 
     @property
@@ -293,3 +362,237 @@ class LaggedCovariance(StreamingEstimator):
         if self.ctt:
             if self._rc.storage_YY.nsave <= ns:
                 self._rc.storage_YY.nsave = ns
+
+
+class MultiLagCovariance(StreamingEstimator):
+    r"""Compute lagged covariances for several lag times in one pass over the data.
+
+    The instantaneous second moments are accumulated only once over all frames. The moments of every lag time
+    are obtained by subtracting the moments of the first and last lag frames of each trajectory, which are kept
+    in a head buffer and a ring buffer covering the largest lag time. Only the time-lagged products are
+    accumulated once per lag time. The results are identical to those of :class:`LaggedCovariance` with
+    c00=True, c0t=True, ctt=True for every single lag time.
+
+    Parameters
+    ----------
+    lags : iterable of int
+        lag times.
+    remove_data_mean : bool, optional, default=True
+        substract the sample mean from the time series (mean-free correlations).
+    reversible : bool, optional, default=False
+        symmetrize correlations.
+    bessel : bool, optional, default=True
+        use Bessel's correction for correlations in order to use an unbiased estimator
+    stride: int, optional, default = 1
+        Use only every stride-th time step. All lag times have to be multiples of stride.
+    skip : int, optional, default=0
+        skip the first initial n frames per trajectory.
+
+    Notes
+    -----
+    Weighted estimation is not supported, since the weights of the time-lagged data depend on the lag time.
+    """
+    def __init__(self, lags, remove_data_mean=True, reversible=False, bessel=True, stride=1, skip=0):
+        super(MultiLagCovariance, self).__init__()
+        lags = np.unique(np.asarray(lags, dtype=int))
+        if lags.size == 0 or lags[0] < 1:
+            raise ValueError("lags must be positive, but were {}".format(lags))
+        if np.any(lags % stride):
+            raise ValueError("all lags have to be multiples of stride={}, but were {}".format(stride, lags))
+        self.set_params(lags=lags, remove_data_mean=remove_data_mean, reversible=reversible, bessel=bessel,
+                        stride=stride, skip=skip)
+
+    def _estimate(self, iterable):
+        d = iterable.dimension()
+        if not d:
+            raise ValueError("zero dimension from data source!")
+        if not any(iterable.trajectory_lengths(stride=self.stride, skip=self.lags[0] + self.skip) > 0):
+            raise ValueError("None single dataset [longest=%i] is longer than lag+skip [%i]."
+                             % (max(iterable.trajectory_lengths(self.stride, skip=self.skip)),
+                                self.lags[0] + self.skip))
+
+        # lag times in units of the strided time series
+        lags = self.lags // self.stride
+        n_lags, L = len(lags), lags[-1]
+        self._shift = None
+        self._n = np.zeros(n_lags, dtype=np.int64)
+        self._sx, self._sy = np.zeros((n_lags, d)), np.zeros((n_lags, d))
+        self._XX, self._YY, self._XY = np.zeros((n_lags, d, d)), np.zeros((n_lags, d, d)), np.zeros((n_lags, d, d))
+        G, S = np.zeros((d, d)), np.zeros(d)
+        head, ring = np.empty((L, d)), np.empty((L, d))
+
+        def finalize_trajectory(T):
+            # remove the moments of the first (last) lag frames from the instantaneous (time-lagged) ones.
+            n = np.minimum(lags, T)
+            tail = ring[np.arange(T - n[-1], T) % L][::-1]
+            self._n += T - n
+            for moments, sums, buffer in ((self._XX, self._sx, tail), (self._YY, self._sy, head[:n[-1]])):
+                M, s, start = np.zeros((d, d)), np.zeros(d), 0
+                for k, stop in enumerate(n):
+                    if stop == T:
+                        break
+                    M += np.dot(buffer[start:stop].T, buffer[start:stop])
+                    s += buffer[start:stop].sum(axis=0)
+                    start = stop
+                    moments[k] += G - M
+                    sums[k] += S - s
+            G.fill(0)
+            S.fill(0)
+
+        it = iterable.iterator(return_trajindex=True, stride=self.stride, skip=self.skip, chunk=iterable.chunksize)
+        pg = ProgressReporter()
+        pg.register(it.n_chunks, 'calculate covariances', stage=0)
+        current_itraj, t = None, 0
+        with it, pg.context(stage=0):
+            for itraj, X in it:
+                if itraj != current_itraj:
+                    if current_itraj is not None:
+                        finalize_trajectory(t)
+                    current_itraj, t = itraj, 0
+                if self._shift is None:
+                    # shift the data by its first frame to avoid cancellation errors when removing the mean.
+                    self._shift = np.array(X[0], dtype=np.float64)
+                X = np.asarray(X, dtype=np.float64) - self._shift
+                m = len(X)
+                G += np.dot(X.T, X)
+                S += X.sum(axis=0)
+                if t < L:
+                    head[t:min(L, t + m)] = X[:L - t]
+                # time-lagged products, the instantaneous frames before t are taken from the ring buffer.
+                for k, lag in enumerate(lags):
+                    i0 = max(0, lag - t)
+                    if i0 < min(m, lag):
+                        Xb = ring[np.arange(t + i0 - lag, t + min(m, lag) - lag) % L]
+                        self._XY[k] += np.dot(Xb.T, X[i0:min(m, lag)])
+                    if m > lag:
+                        self._XY[k] += np.dot(X[:m - lag].T, X[lag:])
+                ring[np.arange(max(t, t + m - L), t + m) % L] = X[max(0, m - L):]
+                t += m
+                pg.update(1, stage=0)
+            if current_itraj is not None:
+                finalize_trajectory(t)
+        self._covariances = None
+        return self
+
+    def _compute_covariances(self):
+        self._check_estimated()
+        if self._covariances is not None:
+            return self._covariances
+        if np.any(self._n == 0):
+            raise ValueError("No data for lag times {}.".format(self.lags[self._n == 0]))
+        means, means_tau, C00, C0t, Ctt = [], [], [], [], []
+        c = self._shift
+        for n, sx, sy, XX, XY, YY in zip(self._n, self._sx, self._sy, self._XX, self._XY, self._YY):
+            if not self.remove_data_mean:
+                # undo the shift of the data
+                XX = XX + np.outer(sx, c) + np.outer(c, sx) + n * np.outer(c, c)
+                XY = XY + np.outer(sx, c) + np.outer(c, sy) + n * np.outer(c, c)
+                YY = YY + np.outer(sy, c) + np.outer(c, sy) + n * np.outer(c, c)
+                sx, sy = sx + n * c, sy + n * c
+            if self.reversible:
+                w = 2 * n
+                sx = sy = sx + sy
+                XX = YY = XX + YY
+                XY = XY + XY.T
+            else:
+                w = n
+            mx, my = sx / w, sy / w
+            if self.remove_data_mean:
+                XX = XX - w * np.outer(mx, mx)
+                XY = XY - w * np.outer(mx, my)
+                YY = YY - w * np.outer(my, my)
+                mx, my = mx + c, my + c
+            norm = float(w - 1 if self.bessel else w)
+            means.append(mx)
+            means_tau.append(my)
+            C00.append(XX / norm)
+            C0t.append(XY / norm)
+            Ctt.append(YY / norm)
+        self._covariances = tuple(np.array(x) for x in (means, means_tau, C00, C0t, Ctt))
+        return self._covariances
+
+    @property
+    def mean(self):
+        """ Means of the instantaneous data, one row per lag time """
+        return self._compute_covariances()[0]
+
+    @property
+    def mean_tau(self):
+        """ Means of the time-lagged data, one row per lag time """
+        return self._compute_covariances()[1]
+
+    @property
+    def C00_(self):
+        """ Instantaneous covariance matrices, shape (n_lags, d, d) """
+        return self._compute_covariances()[2]
+
+    @property
+    def C0t_(self):
+        """ Time-lagged covariance matrices, shape (n_lags, d, d) """
+        return self._compute_covariances()[3]
+
+    @property
+    def Ctt_(self):
+        """ Covariance matrices of the time shifted data, shape (n_lags, d, d) """
+        return self._compute_covariances()[4]
+
+    def tica_models(self, dim=-1, var_cutoff=0.95, kinetic_map=True, commute_map=False, epsilon=1e-6):
+        r""" TICA transformations for all lag times, which share the estimated covariances.
+
+        The TICA objects are estimated already and use the data of this estimator as data producer.
+        For parameters see :class:`TICA <pyemma.coordinates.transform.TICA>`.
+
+        Returns
+        -------
+        ticas : list of TICA objects, one per lag time
+        """
+        from pyemma.coordinates.transform.tica import TICA
+        if not self.remove_data_mean or self.bessel:
+            raise ValueError('TICA requires mean-free covariances without Bessel correction '
+                             '(remove_data_mean=True, bessel=False).')
+        models = []
+        for lag, mean, C00, C0t in zip(self.lags, self.mean, self.C00_, self.C0t_):
+            tica = TICA(lag, dim=dim, var_cutoff=var_cutoff, kinetic_map=kinetic_map, commute_map=commute_map,
+                        epsilon=epsilon, stride=self.stride, skip=self.skip, reversible=self.reversible)
+            tica.data_producer = self.data_producer
+            tica._model.update_model_params(mean=mean, cov=C00, cov_tau=C0t)
+            tica._model.basis = None
+            tica._diagonalize()
+            models.append(tica)
+        return models
+
+    def vamp_scores(self, score_method='VAMP2', k=None, epsilon=1e-6):
+        r""" VAMP scores of the estimated covariances for all lag times.
+
+        The VAMP-r score is given by :math:`1 + \sum_{i=1}^k \sigma_i^r`, where :math:`\sigma_i` are the
+        singular values of :math:`C_{00}^{-1/2} C_{0t} C_{tt}^{-1/2}` of the mean-free data and the constant
+        accounts for the constant singular function.
+
+        Parameters
+        ----------
+        score_method : str, default='VAMP2'
+            one of 'VAMP1' or 'VAMP2'.
+        k : int, optional, default=None
+            number of singular values to use, None uses all.
+        epsilon : float, default=1e-6
+            eigenvalue norm cutoff of the covariance matrices.
+
+        Returns
+        -------
+        scores : ndarray(n_lags)
+        """
+        from pyemma._ext.variational.solvers.direct import spd_inv_sqrt
+        if not self.remove_data_mean:
+            raise ValueError('VAMP scores require mean-free covariances (remove_data_mean=True).')
+        if score_method.lower() == 'vamp1':
+            r = 1
+        elif score_method.lower() == 'vamp2':
+            r = 2
+        else:
+            raise ValueError('Unknown score: ' + str(score_method))
+        scores = []
+        for C00, C0t, Ctt in zip(self.C00_, self.C0t_, self.Ctt_):
+            K = np.dot(np.dot(spd_inv_sqrt(C00, epsilon=epsilon), C0t), spd_inv_sqrt(Ctt, epsilon=epsilon))
+            singular_values = np.linalg.svd(K, compute_uv=False)[:k]
+            scores.append(1 + np.sum(singular_values ** r))
+        return np.array(scores)
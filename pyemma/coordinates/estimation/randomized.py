@@ -0,0 +1,137 @@
+# This file is part of PyEMMA.
+#
+# Copyright (c) 2015, 2014 Computational Molecular Biology Group, Freie Universitaet Berlin (GER)
+#
+# PyEMMA is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Randomized range finder for the covariance matrix of streamed data.
+
+Used by the low rank modes of TICA and PCA, which never form the full (d, d) covariance matrices:
+an orthonormal basis Q of the dominant subspace of the instantaneous covariance matrix C is found
+by randomized subspace iteration [1]_, where every product C Q is accumulated over the chunks of
+the data. The (small) covariance matrices of the data projected onto Q are estimated afterwards.
+
+References
+----------
+.. [1] Halko, N., Martinsson, P. G., Tropp, J. A. 2011. Finding structure with randomness: Probabilistic
+   algorithms for constructing approximate matrix decompositions. SIAM Rev. 53, 217-288.
+"""
+
+import numpy as np
+
+from pyemma._base.progress import ProgressReporter
+from pyemma.coordinates.data._base.transformer import StreamingTransformer
+
+__all__ = ['randomized_range']
+
+
+def _covariance_times(iterable, Q, mean=None, stride=1, skip=0, chunksize=None):
+    """ Computes the product of the (unnormalized) mean-free covariance matrix of the data with Q in one pass.
+
+    If mean is None, the data mean is computed in the same pass. The data is shifted by its first frame then,
+    to avoid cancellation errors when removing the mean afterwards.
+
+    Returns
+    -------
+    CQ : ndarray(d, l)
+    mean : ndarray(d)
+    """
+    d, l = Q.shape
+    CQ = np.zeros((d, l))
+    shift = mean
+    s = np.zeros(d)
+    n = 0
+    it = iterable.iterator(return_trajindex=False, chunk=chunksize, stride=stride, skip=skip)
+    pg = ProgressReporter()
+    pg.register(it.n_chunks, 'randomized range finder')
+    with it, pg.context():
+        for X in it:
+            if shift is None:
+                shift = np.array(X[0], dtype=np.float64)
+            X = X - shift
+            if mean is None:
+                s += X.sum(axis=0)
+                n += len(X)
+            CQ += np.dot(X.T, np.dot(X, Q))
+            pg.update(1)
+    if mean is None:
+        if n == 0:
+            raise ValueError('no data available for the randomized range finder (stride or skip too large?)')
+        # (X - s/n)^T (X - s/n) Q = X^T X Q - s (s^T Q) / n
+        CQ -= np.outer(s, np.dot(s, Q)) / n
+        mean = shift + s / n
+    return CQ, mean
+
+
+def randomized_range(iterable, rank, n_oversamples=10, n_power_iter=2, stride=1, skip=0, chunksize=None,
+                     random_state=None):
+    r""" Orthonormal basis of the dominant subspace of the covariance matrix of streamed data.
+
+    Parameters
+    ----------
+    iterable : Iterable
+        input data
+    rank : int
+        number of dominant dimensions to capture
+    n_oversamples : int, default=10
+        additional random directions, which improve the accuracy of the captured subspace.
+    n_power_iter : int, default=2
+        number of subspace iterations. Every iteration is an additional pass over the data and
+        improves the accuracy for slowly decaying covariance spectra.
+    stride : int, default=1
+        use only every stride-th time step.
+    skip : int, default=0
+        skip the first initial n frames per trajectory.
+    chunksize : int, default=None
+        number of frames to process at once, None uses the default of iterable.
+    random_state : None, int or numpy.random.RandomState
+        random number generator (seed) for the initial random directions.
+
+    Returns
+    -------
+    mean : ndarray(d)
+        data mean
+    basis : ndarray(d, min(d, rank + n_oversamples))
+        orthonormal basis (column-wise).
+    """
+    d = iterable.dimension()
+    if rank < 1:
+        raise ValueError('rank has to be positive, but was %s' % rank)
+    l = min(d, rank + n_oversamples)
+    if not isinstance(random_state, np.random.RandomState):
+        random_state = np.random.RandomState(random_state)
+    Q = random_state.standard_normal((d, l))
+    mean = None
+    for _ in range(n_power_iter + 1):
+        CQ, mean = _covariance_times(iterable, Q, mean=mean, stride=stride, skip=skip, chunksize=chunksize)
+        Q, _ = np.linalg.qr(CQ)
+    return mean, Q
+
+
+class _Projection(StreamingTransformer):
+    """ Projects the data of the data producer onto the columns of basis. """
+
+    def __init__(self, basis, data_producer=None):
+        super(_Projection, self).__init__()
+        self.basis = basis
+        self.data_producer = data_producer
+
+    def dimension(self):
+        return self.basis.shape[1]
+
+    def describe(self):
+        return "[Projection onto %i dimensional subspace]" % self.dimension()
+
+    def _transform_array(self, X):
+        return np.dot(X, self.basis)
@@ -483,5 +483,81 @@ class TestCovarEstimatorWeightsList(unittest.TestCase):
         c.estimate(x, weights=None)
         c.estimate(x, weights=x[:,0])
 
+class TestCovarEstimatorContinuedTrajectories(unittest.TestCase):
+
+    def test_partial_fit_segments(self):
+        state = np.random.RandomState(3)
+        data = [state.randn(300, 2).cumsum(axis=0), state.randn(200, 2).cumsum(axis=0)]
+        for lag, skip in ((1, 0), (7, 0), (7, 12)):
+            ref = covariance_lagged(data, lag=lag, skip=skip, c0t=True, ctt=True, remove_data_mean=True)
+            cov = covariance_lagged(lag=lag, skip=skip, c0t=True, ctt=True, remove_data_mean=True)
+            # interleaved segments of different length, some shorter than lag and skip
+            bounds = [0, 3, 5, 40, 41, 150, 200]
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                cov.partial_fit([data[1][start:stop], data[0][start:stop]], itraj=['b', 'a'])
+            cov.partial_fit(data[0][200:], itraj='a')
+            np.testing.assert_allclose(cov.mean, ref.mean)
+            np.testing.assert_allclose(cov.C00_, ref.C00_)
+            np.testing.assert_allclose(cov.C0t_, ref.C0t_)
+            np.testing.assert_allclose(cov.Ctt_, ref.Ctt_)
+
+        with self.assertRaises(ValueError):
+            covariance_lagged(lag=1, stride=2).partial_fit(data[0], itraj=0)
+
+
+class TestMultiLagCovariance(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        state = np.random.RandomState(17)
+        cls.data = [state.randn(T, 3).cumsum(axis=0) + 100 for T in (500, 7, 130)]
+
+    def test_matches_single_lag(self):
+        lags = [2, 6, 10, 60]
+        for stride in (1, 2):
+            for reversible in (False, True):
+                for remove_data_mean in (False, True):
+                    multi = covariance_lagged(self.data, lag=[l * stride for l in lags], stride=stride, skip=3,
+                                              reversible=reversible, remove_data_mean=remove_data_mean,
+                                              chunksize=13)
+                    for i, lag in enumerate(lags):
+                        single = covariance_lagged(self.data, lag=lag * stride, stride=stride, skip=3,
+                                                   reversible=reversible, remove_data_mean=remove_data_mean,
+                                                   c00=True, c0t=True, ctt=not reversible, chunksize=13)
+                        np.testing.assert_allclose(multi.mean[i], single.mean)
+                        np.testing.assert_allclose(multi.C00_[i], single.C00_, rtol=1e-8, atol=1e-8)
+                        np.testing.assert_allclose(multi.C0t_[i], single.C0t_, rtol=1e-8, atol=1e-8)
+                        if not reversible:
+                            np.testing.assert_allclose(multi.Ctt_[i], single.Ctt_, rtol=1e-8, atol=1e-8)
+
+    def test_tica_lag_scan(self):
+        from pyemma.coordinates import tica
+        lags = [1, 5, 20]
+        ticas = tica(self.data, lag=lags, dim=2, chunk_size=50)
+        for lag, t in zip(lags, ticas):
+            ref = tica(self.data, lag=lag, dim=2)
+            self.assertEqual(t.lag, lag)
+            np.testing.assert_allclose(t.eigenvalues, ref.eigenvalues, rtol=1e-8)
+            np.testing.assert_allclose(t.timescales, ref.timescales, rtol=1e-8)
+            np.testing.assert_allclose(np.abs(t.get_output()[0]), np.abs(ref.get_output()[0]), rtol=1e-6, atol=1e-8)
+
+        covars = covariance_lagged(self.data, lag=lags, remove_data_mean=True, reversible=True, bessel=False)
+        scores = covars.vamp_scores(score_method='VAMP2', k=2)
+        for score, t in zip(scores, ticas):
+            self.assertAlmostEqual(score, 1 + np.sum(t.eigenvalues[:2] ** 2))
+
+    def test_invalid_lags(self):
+        with self.assertRaises(ValueError):
+            covariance_lagged(self.data, lag=[1, 3], stride=2)
+        with self.assertRaises(ValueError):
+            covariance_lagged(self.data, lag=[1, 3], weights=[np.ones(len(x)) for x in self.data])
+        from pyemma.coordinates import tica
+        from pyemma.util.exceptions import PyEMMA_DeprecationWarning
+        with self.assertRaises(ValueError):
+            tica(self.data, lag=[1, 3], ncov_max=10)
+        with self.assertWarns(PyEMMA_DeprecationWarning):
+            tica(self.data, lag=[1, 3], remove_mean=False)
+
+
 if __name__ == "__main__":
     unittest.main()
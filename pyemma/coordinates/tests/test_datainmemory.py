@@ -211,6 +211,56 @@ class TestDataInMemory(unittest.TestCase):
             np.testing.assert_equal(traj.T.squeeze(), input_traj[lag::stride].squeeze(),
                                     err_msg="failed for traj=%s" % idx)
 
+    def _check_lagged_iterator(self, reader, data, lag, stride, chunk, expected_type, return_lagged=True):
+        it = reader.iterator(chunk=chunk, stride=stride, lag=lag, return_lagged=return_lagged)
+        self.assertIsInstance(it, expected_type)
+        chunked_trajs = [[] for _ in range(len(data))]
+        chunked_lagged_trajs = [[] for _ in range(len(data))]
+        with it:
+            for itraj, X, Y in it:
+                if chunk > 0:
+                    self.assertLessEqual(len(X), chunk)
+                chunked_trajs[itraj].append(X)
+                if return_lagged:
+                    self.assertEqual(len(X), len(Y))
+                    chunked_lagged_trajs[itraj].append(Y)
+                else:
+                    self.assertIsNone(Y)
+        for itraj, input_traj in enumerate(data):
+            lagged = input_traj[lag::stride]
+            if len(lagged) == 0:
+                self.assertEqual(chunked_trajs[itraj], [])
+                continue
+            np.testing.assert_equal(np.vstack(chunked_trajs[itraj]).squeeze(), input_traj[::stride][:len(lagged)])
+            if return_lagged:
+                np.testing.assert_equal(np.vstack(chunked_lagged_trajs[itraj]).squeeze(), lagged)
+
+    def test_lagged_iterator_ring_buffer(self):
+        from pyemma.coordinates.data._base.iterable import _RingBufferLaggedIterator
+        data = [np.arange(30), np.arange(50), np.arange(5), np.arange(33)]
+        reader = DataInMemory(data)
+        for lag, stride, chunk in ((9, 1, 5), (10, 2, 3), (12, 3, 1), (12, 4, 0), (20, 1, 7)):
+            self._check_lagged_iterator(reader, data, lag, stride, chunk, _RingBufferLaggedIterator)
+
+    def test_lagged_iterator_ring_buffer_spill_to_disk(self):
+        from pyemma.coordinates.data._base.iterable import _RingBufferLaggedIterator
+        from pyemma.util.contexts import attribute
+        data = [np.random.random((40, 3)), np.random.random((23, 3))]
+        reader = DataInMemory(data)
+        with attribute(_RingBufferLaggedIterator, 'SPILL_TO_DISK_CUTOFF', 0):
+            it = reader.iterator(chunk=2, lag=6, return_trajindex=False)
+            with it:
+                X, Y = it.next()
+                self.assertIsInstance(it._buffer._buffer, np.memmap)
+            self._check_lagged_iterator(reader, data, 6, 1, 2, _RingBufferLaggedIterator)
+
+    def test_lagged_iterator_data_only(self):
+        from pyemma.coordinates.data._base.iterable import _LaggedDataIterator
+        data = [np.arange(30), np.arange(50), np.arange(5), np.arange(33)]
+        reader = DataInMemory(data)
+        for lag, stride, chunk in ((9, 2, 5), (3, 1, 10), (12, 5, 0)):
+            self._check_lagged_iterator(reader, data, lag, stride, chunk, _LaggedDataIterator, return_lagged=False)
+
     def test_lagged_iterator_1d(self):
         n = 30
         chunksize = 10
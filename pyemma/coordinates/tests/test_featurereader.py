@@ -176,6 +176,35 @@ class TestFeatureReader(unittest.TestCase):
             for x in it:
                 np.testing.assert_equal(x, ref)
 
+    def test_cols_pushdown(self):
+        trajs = pkg_resources.resource_filename('pyemma.coordinates.tests', 'data/bpti_mini.xtc')
+        top = pkg_resources.resource_filename('pyemma.coordinates.tests', 'data/bpti_ca.pdb')
+        reader = api.source(trajs, top=top, chunksize=17)
+        feat = reader.featurizer
+        ca = feat.select('name CA')
+        feat.add_distances(feat.pairs(ca[:10]))
+        feat.add_selection(ca[5:8])
+        feat.add_angles(np.array([ca[:3], ca[3:6], ca[6:9]]), cossin=True)
+        feat.add_dihedrals(np.array([ca[:4], ca[10:14]]))
+        feat.add_contacts(feat.pairs(ca[20:25]), threshold=0.5)
+        feat.add_group_mindist([ca[:3], ca[30:33], ca[40:45]])
+        full = reader.get_output()[0]
+
+        for cols in (np.array([0, 2]), np.array([50, 1, 47, 48, 55, 44]),
+                     np.arange(feat.dimension())[::-1], slice(45, 60)):
+            for stride in (1, 3):
+                out = reader.get_output(dimensions=cols, stride=stride)[0]
+                np.testing.assert_allclose(out, full[::stride, cols], rtol=1e-5, atol=1e-6)
+            # random access
+            ra_stride = np.array([[0, 1], [0, 5], [0, 6], [0, 40]])
+            with reader.iterator(stride=ra_stride, cols=cols, return_trajindex=False) as it:
+                out = np.vstack([x for x in it])
+            np.testing.assert_allclose(out, full[ra_stride[:, 1]][:, cols], rtol=1e-5, atol=1e-6)
+
+        # only the atoms of the selected features are loaded
+        with reader.iterator(cols=[0], return_trajindex=False) as it:
+            np.testing.assert_equal(it._atom_indices, ca[:2])
+
     def test_with_pipeline_time_lagged(self):
         reader = api.source(self.trajfile, top=self.topfile)
         assert isinstance(reader, FeatureReader)
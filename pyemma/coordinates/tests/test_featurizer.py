@@ -23,10 +23,11 @@ import pyemma
 import os
 import mdtraj
 
-from itertools import combinations, product
+from itertools import combinations, product, zip_longest
 
 from pyemma.coordinates.data.featurization.featurizer import MDFeaturizer, CustomFeature
 from pyemma.coordinates.data.featurization.util import _parse_pairwise_input, _describe_atom, hash_top
+from pyemma.coordinates.data.featurization._cache import GeometryCache
 
 from pyemma.coordinates.data.featurization.util import _atoms_in_residues
 import pkg_resources
@@ -603,6 +604,63 @@ class TestFeaturizer(unittest.TestCase):
         assert self.feat.dimension() == 1
         assert len(self.feat.describe()) == 1
 
+    def test_MinRmsd_multiple_refs(self):
+        frames = [self.ref_frame, 0, 3]
+        self.feat.add_minrmsd_to_ref(self.traj, ref_frame=frames, atom_indices=self.atom_indices)
+        test_Y = self.feat.transform(self.traj)
+        ref_Y = np.array([mdtraj.rmsd(self.traj, self.traj, frame=f, atom_indices=self.atom_indices)
+                          for f in frames]).T
+        np.testing.assert_allclose(test_Y, ref_Y, rtol=1e-4, atol=1e-6)
+        assert self.feat.dimension() == len(frames)
+        assert len(self.feat.describe()) == len(frames)
+
+        # the same from a file
+        feat = MDFeaturizer(self.pdbfile)
+        feat.add_minrmsd_to_ref(xtcfile, ref_frame=frames, atom_indices=self.atom_indices)
+        np.testing.assert_allclose(feat.transform(self.traj), test_Y, rtol=1e-4, atol=1e-6)
+
+    def test_shared_geometry_cache(self):
+        # overlapping features share intermediate results of the chunk, this must not change them
+        pairs = self.feat.pairs(np.arange(10))
+        self.feat.add_distances(pairs)
+        self.feat.add_inverse_distances(pairs[::2])
+        self.feat.add_backbone_torsions()
+        self.feat.add_backbone_torsions(cossin=True)
+        self.feat.add_minrmsd_to_ref(self.traj[self.ref_frame], atom_indices=self.atom_indices)
+        self.feat.add_minrmsd_to_ref(self.traj[0], atom_indices=self.atom_indices)
+        self.feat.add_group_COM([[0, 1, 2], [3, 4]])
+        self.feat.add_group_COM([[3, 4]], ref_geom=self.traj[0])
+        Y = self.feat.transform(self.traj)
+        Yref = np.hstack([f.transform(self.traj) for f in self.feat.active_features])
+        np.testing.assert_allclose(Y, Yref, rtol=1e-6)
+
+        cache = GeometryCache(self.traj)
+        quadruples = np.array([[0, 1, 2, 3], [4, 5, 6, 7], [0, 1, 2, 3]])
+        np.testing.assert_equal(cache.dihedrals(quadruples[1:]), mdtraj.compute_dihedrals(self.traj, quadruples[1:]))
+        np.testing.assert_equal(cache.dihedrals(quadruples), mdtraj.compute_dihedrals(self.traj, quadruples))
+        np.testing.assert_equal(cache.distances(pairs[:3], periodic=False),
+                                mdtraj.compute_distances(self.traj, pairs[:3], periodic=False))
+        # the first request is stored as computed, duplicates included
+        cache = GeometryCache(self.traj)
+        np.testing.assert_equal(cache.dihedrals(quadruples), mdtraj.compute_dihedrals(self.traj, quadruples))
+        np.testing.assert_equal(cache.dihedrals(quadruples[::-1]), mdtraj.compute_dihedrals(self.traj, quadruples[::-1]))
+
+    def test_geometry_cache_invalidation(self):
+        # features after one modifying the chunk in place must not see the results cached before
+        def scale(traj):
+            traj.xyz *= 2
+            return np.zeros((traj.n_frames, 1), dtype=np.float32)
+        pairs = self.feat.pairs(np.arange(10))
+        feat = MDFeaturizer(self.pdbfile)
+        feat.add_distances(pairs, periodic=False)
+        feat.add_custom_func(scale, 1)
+        feat.add_inverse_distances(pairs, periodic=False)
+        traj = self.traj[:]
+        D = mdtraj.compute_distances(traj, pairs, periodic=False)
+        Y = feat.transform(traj)
+        np.testing.assert_allclose(Y[:, :len(pairs)], D, rtol=1e-6)
+        np.testing.assert_allclose(Y[:, len(pairs) + 1:], 1. / (2 * D), rtol=1e-6)
+
     def test_Residue_Mindist_Ca_all(self):
         n_ca = self.feat.topology.n_atoms
         self.feat.add_residue_mindist(scheme='ca')
@@ -652,6 +710,87 @@ class TestFeaturizer(unittest.TestCase):
         assert np.allclose(D, Dperiodic_false)
         assert len(self.feat.describe()) == self.feat.dimension()
 
+    def test_neighbor_list(self):
+        traj = self.traj[:]
+        traj.unitcell_lengths = np.tile([2.5, 2.5, 2.5], (traj.n_frames, 1))
+        traj.unitcell_angles = np.tile([90, 90, 90], (traj.n_frames, 1))
+        pairs = self.feat.pairs(np.arange(self.feat.topology.n_atoms), excluded_neighbors=2)
+        for periodic in (True, False):
+            feat = MDFeaturizer(self.feat.topology)
+            feat.add_contacts(pairs, threshold=0.6, periodic=periodic)
+            feat.add_contacts(pairs, threshold=0.6, periodic=periodic, count_contacts=True)
+            feat_nl = MDFeaturizer(self.feat.topology)
+            feat_nl.add_contacts(pairs, threshold=0.6, periodic=periodic, neighbor_list=True, update_stride=3)
+            feat_nl.add_contacts(pairs, threshold=0.6, periodic=periodic, count_contacts=True,
+                                 neighbor_list=True, skin=0.05)
+            # in chunks, the lists of the trajectory are carried over
+            neighbor_lists = {}
+            Y_nl = np.vstack([feat_nl.transform(traj[i:i + 7], neighbor_lists=neighbor_lists)
+                              for i in range(0, traj.n_frames, 7)])
+            self.assertEqual(len(neighbor_lists), 2)
+            np.testing.assert_equal(Y_nl, feat.transform(traj))
+
+            for threshold, cutoff in ((None, 0.8), (0.7, None)):
+                feat_nl = MDFeaturizer(self.feat.topology)
+                feat_nl.add_residue_mindist(scheme='closest-heavy', threshold=threshold, periodic=periodic,
+                                            neighbor_list=True, cutoff=cutoff)
+                D = feat_nl.transform(traj)
+                Dref = mdtraj.compute_contacts(traj, scheme='closest-heavy', periodic=periodic)[0]
+                if threshold is None:
+                    np.testing.assert_allclose(D, np.minimum(Dref, cutoff), rtol=1e-5, atol=1e-6)
+                else:
+                    np.testing.assert_equal(D, Dref <= threshold)
+
+        with self.assertRaises(ValueError):
+            self.feat.add_residue_mindist(neighbor_list=True)
+
+    def test_neighbor_list_glycine(self):
+        traj = mdtraj.load(pdbfile_ops_aa)
+        gly = [r.index for r in traj.top.residues if r.name == 'GLY']
+        assert gly
+        others = np.arange(0, traj.n_residues, 10)
+        contacts = np.array([[g, r] for g in gly for r in others if abs(g - r) > 2])
+        for scheme in ('sidechain', 'sidechain-heavy'):
+            feat = MDFeaturizer(traj.topology)
+            feat.add_residue_mindist(contacts, scheme=scheme, periodic=False, neighbor_list=True, cutoff=1.5)
+            Dref = mdtraj.compute_contacts(traj, contacts, scheme=scheme, periodic=False)[0]
+            np.testing.assert_allclose(feat.transform(traj), np.minimum(Dref, 1.5), rtol=1e-5, atol=1e-6)
+
+    def test_neighbor_list_iterators(self):
+        import tempfile
+        pairs = self.feat.pairs(np.arange(self.feat.topology.n_atoms), excluded_neighbors=2)
+        feat = MDFeaturizer(self.pdbfile)
+        feat.add_contacts(pairs, threshold=0.6, periodic=False)
+        feat_nl = MDFeaturizer(self.pdbfile)
+        feat_nl.add_contacts(pairs, threshold=0.6, periodic=False, neighbor_list=True, update_stride=5)
+        with tempfile.TemporaryDirectory() as td:
+            files = [xtcfile, os.path.join(td, 'reversed.xtc')]
+            self.traj[::-1].save(files[1])
+            ref = pyemma.coordinates.source(files, features=feat).get_output()
+            reader = pyemma.coordinates.source(files, features=feat_nl)
+            # the first iterator switches to the second trajectory, while the second one still is in the first.
+            iterators = reader.iterator(chunk=7), reader.iterator(chunk=3)
+            out = ([[], []], [[], []])
+            for chunks in zip_longest(*iterators):
+                self.assertIsNot(iterators[0]._neighbor_lists, iterators[1]._neighbor_lists)
+                for i, chunk in enumerate(chunks):
+                    if chunk is not None:
+                        out[i][chunk[0]].append(chunk[1])
+            for i in (0, 1):
+                for itraj in (0, 1):
+                    np.testing.assert_equal(np.vstack(out[i][itraj]), ref[itraj])
+            np.testing.assert_equal(reader.get_output(dimensions=[1, 5, 7])[1], ref[1][:, [1, 5, 7]])
+
+    def test_neighbor_list_eq(self):
+        pairs = np.array([[0, 10], [5, 20]])
+        feat = MDFeaturizer(self.pdbfile)
+        feat.add_contacts(pairs, threshold=0.6, neighbor_list=True)
+        feat.add_contacts(pairs, threshold=0.6, neighbor_list=True, skin=0.2)
+        feat.add_contacts(pairs, threshold=0.6, neighbor_list=True, update_stride=20)
+        feat.add_residue_mindist([[0, 10]], neighbor_list=True, cutoff=1.0)
+        feat.add_residue_mindist([[0, 10]], neighbor_list=True, cutoff=1.0, skin=0.2)
+        self.assertEqual(len(feat.active_features), 5)
+
     def test_Group_Mindist_One_Group(self):
         group0 = [0, 20, 30, 0]
         self.feat.add_group_mindist(group_definitions=[group0])  # Even with duplicates
@@ -728,6 +867,36 @@ class TestFeaturizer(unittest.TestCase):
         assert np.allclose(D.squeeze(), Dref)
         assert len(self.feat.describe()) == self.feat.dimension()
 
+    def test_contacts_and_group_mindist_periodic(self):
+        traj = self.traj[:]
+        pairs = self.feat.pairs(np.arange(0, 58, 3), excluded_neighbors=2)
+        groups = [np.arange(0, 10), np.arange(20, 30), np.arange(40, 50)]
+        for angles in ([90, 90, 90], [60, 60, 90], [70.5, 109.5, 70.5]):
+            traj.unitcell_lengths = np.tile([2.0, 2.1, 2.2], (traj.n_frames, 1))
+            traj.unitcell_angles = np.tile(angles, (traj.n_frames, 1))
+            for periodic in (True, False):
+                feat = MDFeaturizer(self.feat.topology)
+                feat.add_contacts(pairs, threshold=0.8, periodic=periodic)
+                feat.add_contacts(pairs, threshold=0.8, periodic=periodic, count_contacts=True)
+                feat.add_group_mindist(groups, periodic=periodic)
+                feat.add_group_mindist(groups, threshold=0.4, periodic=periodic)
+                Y = feat.transform(traj)
+
+                D = mdtraj.compute_distances(traj, pairs, periodic=periodic)
+                C = (D <= 0.8).astype(np.float32)
+                Dmin = np.vstack([mdtraj.compute_distances(traj, np.array(list(product(groups[i], groups[j]))),
+                                                           periodic=periodic).min(1)
+                                  for i, j in ((0, 1), (0, 2), (1, 2))]).T
+                n = len(pairs)
+                # contacts are decided on squared distances, so only pairs at the threshold may differ by rounding
+                away = np.abs(D - 0.8) > 1e-6
+                np.testing.assert_equal(Y[:, :n][away], C[away])
+                np.testing.assert_allclose(Y[:, n], Y[:, :n].sum(1))
+                np.testing.assert_allclose(Y[:, n + 1:n + 4], Dmin, rtol=1e-5, atol=1e-6)
+                np.testing.assert_equal(Y[:, n + 4:], Dmin <= 0.4)
+                for f in feat.active_features[2:]:
+                    self.assertEqual(f.transform(traj).dtype, np.float64)
+
     # TODO consider creating a COM's own class and not a method of TestFeaturizer
     def test_Group_COM_with_all_atom_geoms(self):
 
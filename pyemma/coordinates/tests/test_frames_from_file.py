@@ -66,6 +66,13 @@ class TestFramesFromFile(unittest.TestCase):
         (found_diff, errmsg) = compare_coords_md_trajectory_objects(traj_test, traj_ref, atom=0, mess=False)
         self.assertFalse(found_diff, errmsg)
 
+    def test_gets_the_right_frames_parallel(self):
+        traj_test = _frames_from_file(self.trajfiles, self.pdbfile, self.frames, chunksize=self.chunksize, n_jobs=2)
+        traj_ref = md.load(self.trajfiles, top=self.pdbfile)[self.frames]
+
+        (found_diff, errmsg) = compare_coords_md_trajectory_objects(traj_test, traj_ref, atom=0, mess=False)
+        self.assertFalse(found_diff, errmsg)
+
     def test_gets_the_right_frames_no_stride_with_chunk(self):
 
         traj_test = _frames_from_file(self.trajfiles, self.pdbfile, self.frames, chunksize=self.chunksize, verbose = False)
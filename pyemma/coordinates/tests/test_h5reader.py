@@ -79,5 +79,75 @@ class TestH5Reader(unittest.TestCase):
         assert out.shape[0] == 5
         assert out.shape[1] == 5
 
+    def test_chunked_dataset_strided(self):
+        import tempfile
+        f = tempfile.mktemp(suffix='.h5', dir=self.directory)
+        data = np.random.random((1000, 4))
+        with h5py.File(f, mode='w') as fh:
+            fh.create_dataset('chunked', data=data, chunks=(64, 4), compression='gzip')
+        reader = H5Reader(f, selection='/chunked')
+        for stride in (1, 3, 64, 100):
+            for chunk in (0, 7, 50):
+                out = reader.get_output(stride=stride, chunk_size=chunk)[0]
+                np.testing.assert_equal(out, data[::stride], err_msg='stride=%s, chunk=%s' % (stride, chunk))
+        out = reader.get_output(skip=13, stride=5, chunk_size=17)[0]
+        np.testing.assert_equal(out, data[13::5])
+
+    def test_chunked_dataset_random_access(self):
+        import tempfile
+        f = tempfile.mktemp(suffix='.h5', dir=self.directory)
+        data = np.random.random((500, 2))
+        with h5py.File(f, mode='w') as fh:
+            fh.create_dataset('chunked', data=data, chunks=(32, 2))
+        reader = H5Reader(f, selection='/chunked')
+        frames = np.array([0, 1, 1, 31, 32, 100, 101, 499])
+        ra = np.vstack((np.zeros_like(frames), frames)).T
+        for chunk in (0, 3):
+            out = np.concatenate([x for x in reader.iterator(stride=ra, chunk=chunk, return_trajindex=False)])
+            np.testing.assert_equal(out, data[frames])
+
+    def test_file_handle_pool(self):
+        import tempfile
+        files = [tempfile.mktemp(suffix='.h5', dir=self.directory) for _ in range(3)]
+        for i, f in enumerate(files):
+            with h5py.File(f, mode='w') as fh:
+                fh.create_dataset('x', data=np.full((10, 2), i))
+        reader = H5Reader(files, selection='/x', max_open_files=2, chunk_cache_size=2**20)
+        out = reader.get_output()
+        for i, f in enumerate(reader.filenames):
+            np.testing.assert_equal(out[i], files.index(f))
+        with reader.iterator(chunk=0, return_trajindex=True) as it:
+            handles = []
+            for itraj, X in it:
+                self.assertLessEqual(len(it._file_handles), 2)
+                handles.extend(it._file_handles.values())
+            self.assertEqual(len(it._file_handles), 0)
+        for fh in handles:
+            self.assertFalse(fh.id.valid)
+
+    def test_interleaved_iterators(self):
+        import tempfile
+        files = [tempfile.mktemp(suffix='.h5', dir=self.directory) for _ in range(3)]
+        data = [np.random.random((100, 2)) for _ in files]
+        for f, x in zip(files, data):
+            with h5py.File(f, mode='w') as fh:
+                fh.create_dataset('x', data=x, chunks=(16, 2))
+        reader = H5Reader(files, selection='/x', max_open_files=1)
+        expected = [data[files.index(f)] for f in reader.filenames]
+        it1 = reader.iterator(chunk=7, return_trajindex=True)
+        it2 = reader.iterator(chunk=11, return_trajindex=True)
+        out1, out2 = [[] for _ in files], [[] for _ in files]
+        # it2 runs out of chunks first, so zip does not drop a chunk of it1.
+        for (i2, X2), (i1, X1) in zip(it2, it1):
+            out1[i1].append(X1)
+            out2[i2].append(X2)
+        for itraj, X in it1:
+            out1[itraj].append(X)
+        for itraj, X in it2:
+            out2[itraj].append(X)
+        for i, x in enumerate(expected):
+            np.testing.assert_equal(np.concatenate(out1[i]), x)
+            np.testing.assert_equal(np.concatenate(out2[i]), x)
+
 if __name__ == '__main__':
     unittest.main()
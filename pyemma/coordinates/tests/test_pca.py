@@ -30,6 +30,7 @@ import pkg_resources
 import numpy as np
 
 from pyemma.coordinates import pca, source
+from pyemma.util.contexts import numpy_random_seed
 from logging import getLogger
 import pyemma.util.types as types
 
@@ -221,6 +222,36 @@ class TestPCAExtensive(unittest.TestCase):
         true_corr = np.corrcoef(feature_traj.T, pca_traj.T)[:nfeat,-npcs:]
         np.testing.assert_allclose(test_corr, true_corr, atol=1.E-8)
 
+    def test_low_rank(self):
+        with numpy_random_seed(42):
+            d = 30
+            R, _ = np.linalg.qr(np.random.randn(d, d))
+            scales = np.concatenate(([10., 5., 2.], 0.01 * np.ones(d - 3)))
+            X = (np.random.randn(5000, d) * scales).dot(R) + 3
+        dense = pca(X, dim=3)
+        low = pca(X, dim=3, rank=3)
+        self.assertEqual(low.basis.shape, (d, 13))
+        np.testing.assert_allclose(low.mean, X.mean(axis=0))
+        np.testing.assert_allclose(low.eigenvalues, dense.eigenvalues[:3], rtol=1e-6)
+        np.testing.assert_allclose(np.abs(low.get_output()[0]), np.abs(dense.get_output()[0]), atol=1e-3)
+        np.testing.assert_allclose(np.abs(low.feature_PC_correlation), np.abs(dense.feature_PC_correlation),
+                                   atol=1e-3)
+        # the random directions of the range finder are seeded, repeated estimations agree
+        np.testing.assert_array_equal(pca(X, dim=3, rank=3).basis, low.basis)
+
+    def test_transform_dtype(self):
+        with numpy_random_seed(5):
+            X = np.random.randn(300, 4) + 1e3
+        p = pca(X, dim=2)
+        ref = np.dot(X - p.mean, p.eigenvectors[:, :2])
+        # the direct transform returns double precision, the streamed output is of the output type
+        Y = p.transform(X)
+        self.assertEqual(Y.dtype, np.float64)
+        np.testing.assert_allclose(Y, ref, rtol=1e-10, atol=1e-10)
+        Y = p.get_output(chunk=64)[0]
+        self.assertEqual(Y.dtype, p.output_type())
+        np.testing.assert_allclose(Y, ref, rtol=1e-5, atol=1e-5)
+
     def test_pipelining_sklearn_compat(self):
         from pyemma.coordinates.transform import PCA
         t = PCA(dim=2)
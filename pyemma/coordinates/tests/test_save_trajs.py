@@ -97,6 +97,23 @@ class TestSaveTrajs(unittest.TestCase):
 
         self.assertFalse(found_diff, errmsg)
 
+    def test_save_SaveTrajs_parallel(self):
+        __ = save_trajs(self.reader, self.sets, outfiles=self.n_pass_files, n_jobs=2)
+        traj_n_pass = single_traj_from_n_files(self.n_pass_files, top=self.pdbfile)
+
+        (found_diff, errmsg) = compare_coords_md_trajectory_objects(traj_n_pass, self.traj_ref, atom=0)
+        self.assertFalse(found_diff, errmsg)
+
+    def test_save_SaveTrajs_parallel_small_batches(self):
+        from pyemma.coordinates.data.util.frames_from_file import save_frames_to_files
+        # limit the memory, so every set is processed in a batch on its own.
+        save_frames_to_files(self.reader.filenames, self.reader.featurizer.topology, self.sets, self.n_pass_files,
+                             offsets=self.reader._offsets, n_jobs=2, max_bytes=1)
+        traj_n_pass = single_traj_from_n_files(self.n_pass_files, top=self.pdbfile)
+
+        (found_diff, errmsg) = compare_coords_md_trajectory_objects(traj_n_pass, self.traj_ref, atom=0)
+        self.assertFalse(found_diff, errmsg)
+
     def test_save_SaveTrajs_onepass(self):
 
         # With the inmemory option = True
@@ -162,6 +179,8 @@ class TestSaveTrajs(unittest.TestCase):
         self.sets[0][:,1] *= 100000
         with self.assertRaises(ValueError) as raised:
             save_trajs(self.reader, self.sets, outfiles=self.one_pass_files)
+        with self.assertRaises(ValueError) as raised:
+            save_trajs(self.reader, self.sets, outfiles=self.one_pass_files, n_jobs=2)
 
 if __name__ == "__main__":
     unittest.main()
@@ -142,6 +142,24 @@ class TestSerializationCoordinates(unittest.TestCase):
 
         self.compare(t, params)
 
+    def test_tica_pca_version_0(self):
+        """ models saved before the low rank option was added have neither rank nor random_state """
+        from unittest import mock
+        from pyemma.coordinates.transform import TICA, PCA
+        for estimator in (TICA(lag=1, dim=2), PCA(dim=2)):
+            cls = estimator.__class__
+            estimator.estimate(self.data)
+            old_params = [p for p in cls._get_param_names() if p not in ('rank', 'random_state')]
+            with mock.patch.object(cls, '_%s__serialize_version' % cls.__name__, 0), \
+                    mock.patch.object(cls, '_get_param_names', classmethod(lambda c: old_params)):
+                estimator.save(self.fn, overwrite=True)
+            restored = pyemma.load(self.fn)
+            self.assertIsNone(restored.rank)
+            self.assertEqual(restored.random_state, 42)
+            self.assertEqual(restored.dimension(), 2)
+            np.testing.assert_allclose(restored.transform(self.data), estimator.transform(self.data))
+            restored.partial_fit(self.data)
+
     def test_save_chain(self):
         """ ensure a chain is correctly saved/restored"""
         from pyemma.datasets import get_bpti_test_data
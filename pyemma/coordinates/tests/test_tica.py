@@ -189,6 +189,97 @@ class TestTICA_Basic(unittest.TestCase):
     def test_commute_map(self):
         tica(list(range(100)), commute_map=True, kinetic_map=False)
 
+    def test_transform_buffers(self):
+        with numpy_random_seed(11):
+            X = (np.random.randn(1000, 5) + 10).astype(np.float32)
+        t = tica(X, lag=2, dim=3)
+        ref = np.dot(X - t.mean, t.eigenvectors[:, :3])
+        np.testing.assert_allclose(t.get_output(chunk=64)[0], ref, rtol=1e-5, atol=1e-5)
+        out = np.empty((len(X), 3), dtype=np.float32)
+        self.assertIs(t._transform_array(X, out=out), out)
+        np.testing.assert_allclose(out, ref, rtol=1e-5, atol=1e-5)
+
+        # the inner transformer of a chain writes into a reused buffer
+        p = api.pca(t, dim=2)
+        np.testing.assert_allclose(p.get_output(chunk=64)[0], p.transform(t.get_output()[0]), rtol=1e-5, atol=1e-5)
+
+        # chunks of varying length are projected into the output buffer with reused scratch buffers
+        scratch = {}
+        for start, stop in ((0, 500), (500, 600), (600, 1000)):
+            chunk_out = out[:stop - start]
+            self.assertIs(t._transform_array(X[start:stop], out=chunk_out, scratch=scratch), chunk_out)
+            np.testing.assert_allclose(chunk_out, ref[start:stop], rtol=1e-5, atol=1e-5)
+        self.assertEqual(t.transform(X).dtype, np.float32)
+
+        t.transform_dtype = np.float32
+        np.testing.assert_allclose(t.get_output(chunk=64)[0], ref, rtol=1e-5, atol=1e-5)
+        out[...] = 0
+        self.assertIs(t._transform_array(X, out=out), out)
+        np.testing.assert_allclose(out, ref, rtol=1e-5, atol=1e-5)
+        self.assertEqual(t.transform(X).dtype, np.float32)
+        t.transform_dtype = None
+        with self.assertRaises(ValueError):
+            t.transform_dtype = np.int32
+
+    def test_transform_large_mean(self):
+        # the mean has to be removed in double precision before projecting, if it is large compared to the spread
+        with numpy_random_seed(13):
+            X = np.random.randn(2000, 5).cumsum(axis=0) * 1e-2 + 1e4
+        t = tica(X, lag=2, dim=3)
+        ref = np.dot(X - t.mean, t.eigenvectors[:, :3])
+        scale = np.abs(ref).max()
+        np.testing.assert_allclose(t.transform(X), ref, rtol=1e-5, atol=1e-6 * scale)
+        np.testing.assert_allclose(t.get_output(chunk=128)[0], ref, rtol=1e-5, atol=1e-6 * scale)
+        out = np.empty((len(X), 3), dtype=np.float32)
+        t._transform_array(X, out=out)
+        np.testing.assert_allclose(out, ref, rtol=1e-5, atol=1e-6 * scale)
+        # explicit single precision still subtracts the mean before rounding
+        t.transform_dtype = np.float32
+        np.testing.assert_allclose(t.transform(X), ref, rtol=1e-3, atol=1e-4 * scale)
+
+    def test_partial_fit_continued_trajectory(self):
+        with numpy_random_seed(7):
+            X = np.random.randn(500, 3).cumsum(axis=0)
+        ref = tica(X, lag=10, dim=2)
+        t = _internal_tica(lag=10, dim=2)
+        for start in range(0, 500, 64):
+            t.partial_fit(X[start:start + 64], itraj=0)
+        np.testing.assert_allclose(t.eigenvalues, ref.eigenvalues)
+        np.testing.assert_allclose(t.mean, ref.mean)
+
+    def test_low_rank(self):
+        # three slow processes with large variance hidden in isotropic noise
+        with numpy_random_seed(42):
+            T, d = 20000, 40
+            a = np.array([0.99, 0.95, 0.9])
+            slow = np.zeros((T, 3))
+            noise = np.random.randn(T, 3) * np.sqrt(1 - a**2)
+            for t in range(1, T):
+                slow[t] = a * slow[t - 1] + noise[t]
+            R, _ = np.linalg.qr(np.random.randn(d, d))
+            X = np.hstack((10 * slow, 0.1 * np.random.randn(T, d - 3))).dot(R) + 5
+
+        dense = tica(X, lag=1, dim=3)
+        low = tica(X, lag=1, dim=3, rank=5)
+        self.assertEqual(low.basis.shape, (d, 15))
+        self.assertEqual(low.cov.shape, (15, 15))
+        np.testing.assert_allclose(low.mean, X.mean(axis=0))
+        np.testing.assert_allclose(low.eigenvalues[:3], dense.eigenvalues[:3], rtol=1e-3)
+        Y_low, Y_dense = low.get_output()[0], dense.get_output()[0]
+        for i in range(3):
+            self.assertGreater(np.abs(np.corrcoef(Y_low[:, i], Y_dense[:, i])[0, 1]), 0.99)
+        # the random directions of the range finder are seeded, repeated estimations agree
+        np.testing.assert_array_equal(tica(X, lag=1, dim=3, rank=5).basis, low.basis)
+
+        # the basis spans the whole space if rank exceeds the input dimension
+        full_rank = tica(X[:, :10], lag=1, dim=3, rank=10)
+        dense = tica(X[:, :10], lag=1, dim=3)
+        np.testing.assert_allclose(full_rank.eigenvalues, dense.eigenvalues, rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(full_rank.feature_TIC_correlation, dense.feature_TIC_correlation, atol=1e-8)
+
+        with self.assertRaises(NotImplementedError):
+            _internal_tica(lag=1, rank=2).partial_fit(X)
+
 
 class TestTICAExtensive(unittest.TestCase):
     @classmethod
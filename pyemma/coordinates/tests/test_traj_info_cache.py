@@ -142,6 +142,33 @@ class TestTrajectoryInfoCache(unittest.TestCase):
 
         np.testing.assert_equal(results, expected)
 
+    def test_featurereader_xtc_missing_offsets(self):
+        # entries without offsets (eg. from older versions) are completed on access and stored persistently.
+        with settings(use_trajectory_lengths_cache=False):
+            reader = FeatureReader(xtcfiles, pdbfile)
+        f = xtcfiles[0]
+        info = self.db[f, reader]
+        expected = np.array(info.offsets)
+        assert len(expected) == info.length
+        info.offsets = []
+        self.db._database.update(info)
+        self.assertEqual(len(self.db._database.get(info.hash_value).offsets), 0)
+
+        np.testing.assert_equal(self.db[f, reader].offsets, expected)
+        np.testing.assert_equal(self.db._database.get(info.hash_value).offsets, expected)
+
+    def test_featurereader_strided_with_offsets(self):
+        reader = FeatureReader(xtcfiles, pdbfile)
+        self.assertTrue(all(len(o) > 0 for o in reader._offsets))
+        ref = [mdtraj.load(f, top=pdbfile).xyz.reshape(-1, reader.ndim) for f in xtcfiles]
+        for stride in (1, 3, 100):
+            out = reader.get_output(stride=stride)
+            for x, y in zip(out, ref):
+                np.testing.assert_allclose(x, y[::stride], atol=1e-6)
+        out = reader.get_output(skip=5, stride=7)
+        for x, y in zip(out, ref):
+            np.testing.assert_allclose(x, y[5::7], atol=1e-6)
+
     def test_npy_reader(self):
         lengths_and_dims = [(7, 3), (23, 3), (27, 3)]
         data = [
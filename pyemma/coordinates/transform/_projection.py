@@ -0,0 +1,118 @@
+# This file is part of PyEMMA.
+#
+# Copyright (c) 2015, 2014 Computational Molecular Biology Group, Freie Universitaet Berlin (GER)
+#
+# PyEMMA is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+
+
+class ProjectionMixIn(object):
+    r""" Linear projection :math:`(X - \mu) W` of mean and projection matrix W for TICA and PCA.
+
+    The mean is subtracted from each chunk before the GEMM, so data with a large mean compared to its fluctuations
+    does not suffer from cancellation. The projection matrix is cached for the current model and every floating
+    point type it is needed in. If the caller passes an output buffer and a dictionary of scratch buffers (see
+    StreamingTransformerIterator), the mean free chunk and the product are computed in scratch buffers, which are
+    reused for every chunk, and the result is written into the output buffer, so no memory is allocated per chunk.
+    """
+    _transform_array_supports_out = True
+
+    @property
+    def transform_dtype(self):
+        r""" Floating point type used to compute the projection: None (default), numpy.float32 or numpy.float64.
+
+        By default (None), the projection is computed in double precision and then converted to the output type.
+        With numpy.float32, the mean free chunk and the projection are computed in single precision, directly into
+        the output buffers of get_output and of transformer chains. This is faster and needs less memory, but
+        double precision input is rounded to single precision after subtracting the mean.
+        """
+        return getattr(self, '_transform_dtype', None)
+
+    @transform_dtype.setter
+    def transform_dtype(self, value):
+        if value is not None:
+            value = np.dtype(value).type
+            if value not in (np.float32, np.float64):
+                raise ValueError('transform_dtype has to be None, numpy.float32 or numpy.float64, but was %s' % value)
+        self._transform_dtype = value
+
+    def _projection(self, mean, eigenvectors, dim, dtype):
+        cache = getattr(self, '_projection_cache', None)
+        if cache is None or cache[0] is not mean or cache[1] is not eigenvectors or cache[2] != dim:
+            cache = (mean, eigenvectors, dim, {})
+            self._projection_cache = cache
+        casts = cache[3]
+        if dtype not in casts:
+            V = eigenvectors[:, :dim]
+            if dtype.kind != 'c':
+                V = V.real
+            casts[dtype] = np.ascontiguousarray(V, dtype=dtype)
+        return casts[dtype]
+
+    @staticmethod
+    def _scratch_buffer(scratch, name, shape, dtype):
+        r""" Buffer of the given shape and type, taken from the dictionary scratch and grown as needed. """
+        if scratch is None:
+            return np.empty(shape, dtype=dtype)
+        buffer = scratch.get(name)
+        if buffer is None or buffer.dtype != dtype or buffer.shape[1:] != shape[1:] or len(buffer) < shape[0]:
+            buffer = np.empty(shape, dtype=dtype)
+            scratch[name] = buffer
+        return buffer[:shape[0]]
+
+    def _project(self, X, mean, eigenvectors, dim, out=None, output_type=None, scratch=None):
+        r""" Projects X onto the first dim eigenvectors.
+
+        Parameters
+        ----------
+        X : ndarray(n, m)
+            the input data
+        mean : ndarray(m)
+            the mean, which is subtracted before projecting
+        eigenvectors : ndarray(m, k)
+            the projection vectors (column-wise)
+        dim : int
+            the number of projection vectors to use
+        out : ndarray(n, dim), optional
+            buffer to write the projected data into
+        output_type : dtype, optional
+            type of the returned array, if out is not given. By default, the result is returned in the compute type.
+        scratch : dict, optional
+            scratch buffers, which are reused by subsequent calls with the same dictionary
+
+        Returns
+        -------
+        Y : ndarray(n, dim)
+            the projected data, out if given
+        """
+        result_type = out.dtype if out is not None else np.dtype(output_type or np.float64)
+        dtype = np.dtype(self.transform_dtype or np.float64)
+        if result_type.kind == 'c':
+            dtype = np.result_type(dtype, np.complex64)
+        W = self._projection(mean, eigenvectors, dim, dtype)
+        n = np.shape(X)[0]
+        # the difference is evaluated in the precision of input and mean (at least double precision for a double
+        # precision mean) and only then stored in the compute type
+        X_meanfree = self._scratch_buffer(scratch, 'meanfree', np.shape(X), np.finfo(dtype).dtype)
+        np.subtract(X, mean, out=X_meanfree, casting='same_kind')
+        if out is not None and out.dtype == dtype and out.flags.c_contiguous:
+            return np.dot(X_meanfree, W, out=out)
+        Y = np.dot(X_meanfree, W, out=self._scratch_buffer(scratch, 'product', (n, W.shape[1]), dtype))
+        if out is not None:
+            np.copyto(out, Y, casting='same_kind')
+            return out
+        if output_type is None or Y.dtype == result_type:
+            return Y if scratch is None else Y.copy()
+        return Y.astype(result_type)
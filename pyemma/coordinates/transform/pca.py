@@ -22,11 +22,12 @@ import math
 
 import numpy as np
 from decorator import decorator
-from pyemma._base.serialization.serialization import SerializableMixIn
+from pyemma._base.serialization.serialization import SerializableMixIn, Modifications
 
 from pyemma._base.model import Model
 from pyemma._ext.variational.estimators.running_moments import running_covar
 from pyemma.coordinates.data._base.transformer import StreamingEstimationTransformer
+from pyemma.coordinates.transform._projection import ProjectionMixIn
 from pyemma.util.annotators import fix_docs
 from pyemma.util.reflection import get_default_args
 
@@ -47,17 +48,19 @@ def _lazy_estimation(func, *args, **kw):
 class PCAModel(Model, SerializableMixIn):
     __serialize_version = 0
 
-    def set_model_params(self, mean, eigenvectors):
+    def set_model_params(self, mean, eigenvectors, basis=None):
         self.mean = mean
         self.eigenvectors = eigenvectors
+        self.basis = basis
 
 
 @fix_docs
-class PCA(StreamingEstimationTransformer, SerializableMixIn):
+class PCA(ProjectionMixIn, StreamingEstimationTransformer, SerializableMixIn):
     r""" Principal component analysis."""
-    __serialize_version = 0
+    __serialize_version = 1
+    __serialize_modifications_map = {0: Modifications().set('rank', None).set('random_state', 42).list()}
 
-    def __init__(self, dim=-1, var_cutoff=0.95, mean=None, stride=1, skip=0):
+    def __init__(self, dim=-1, var_cutoff=0.95, mean=None, stride=1, skip=0, rank=None, random_state=42):
         r""" Principal component analysis.
 
         Given a sequence of multivariate data :math:`X_t`,
@@ -97,14 +100,33 @@ class PCA(StreamingEstimationTransformer, SerializableMixIn):
         skip: int, default 0
             skip the first n frames of each trajectory.
 
+        rank : int, optional, default None
+            If given, only the rank dominant principal components are computed by a randomized range finder [1]_
+            on the streamed data, so the full covariance matrix is never formed. :py:obj:`cov` is then expressed in
+            the :py:obj:`basis` of the found subspace and :py:obj:`cumvar` refers to the variance captured by it.
+            This requires three additional passes over the data and is meant for very high dimensional inputs.
+
+        random_state : None, int or numpy.random.RandomState, optional, default 42
+            Seed of the random directions of the range finder of a low rank PCA. The default is fixed, so
+            repeated estimations give identical results; None draws a new seed every time.
+
+        References
+        ----------
+        .. [1] Halko, N., Martinsson, P. G., Tropp, J. A. 2011. Finding structure with randomness: Probabilistic
+           algorithms for constructing approximate matrix decompositions. SIAM Rev. 53, 217-288.
+
         """
         super(PCA, self).__init__()
         default_var_cutoff = get_default_args(self.__init__)['var_cutoff']
         if dim != -1 and var_cutoff != default_var_cutoff:
             raise ValueError('Trying to set both the number of dimension and the subspace variance. Use either or.')
+        if rank is not None and dim > rank:
+            raise ValueError('Requested more output dimensions (%i) than the rank (%i) of the low rank PCA.'
+                             % (dim, rank))
 
         self._model = PCAModel()
-        self.set_params(dim=dim, var_cutoff=var_cutoff, mean=mean, stride=stride, skip=skip)
+        self.set_params(dim=dim, var_cutoff=var_cutoff, mean=mean, stride=stride, skip=skip, rank=rank,
+                        random_state=random_state)
 
     def describe(self):
         return "[PCA, output dimension = %i]" % self.dim
@@ -120,6 +142,8 @@ class PCA(StreamingEstimationTransformer, SerializableMixIn):
             d = dim
         elif self.var_cutoff == 1.0:  # We only know that all dimensions are wanted, so return input dim
             d = self.data_producer.dimension()
+            if self.rank is not None:
+                d = min(d, self.rank)
         else:  # We know nothing. Give up
             raise RuntimeError('Requested dimension, but the dimension depends on the cumulative variance and the '
                                'transformer has not yet been parametrized. Call parametrize() before.')
@@ -160,7 +184,14 @@ class PCA(StreamingEstimationTransformer, SerializableMixIn):
     def mean(self, value):
         self._model.mean = value
 
+    @property
+    def basis(self):
+        """ orthonormal basis (column-wise) of the subspace of a low rank PCA or None (see rank). """
+        return getattr(self._model, 'basis', None)
+
     def partial_fit(self, X):
+        if self.rank is not None:
+            raise NotImplementedError('partial_fit is not supported for low rank PCA (rank=%s).' % self.rank)
         from pyemma.coordinates import source
         iterable = source(X)
 
@@ -190,8 +221,14 @@ class PCA(StreamingEstimationTransformer, SerializableMixIn):
             correlation matrix between input features and PCs. There is a row for each feature and a column
             for each PC.
         """
-        feature_sigma = np.array(np.sqrt(np.diag(self.cov)), ndmin=2)
         PC_sigma = np.array(np.sqrt(self.eigenvalues[:self.dimension()]), ndmin=2)
+        if self.basis is not None:
+            # low rank PCA: the covariance is approximated by basis cov basis^T
+            cov_basis = np.dot(self.basis, self.cov)
+            feature_sigma = np.array(np.sqrt(np.einsum('ij,ij->i', cov_basis, self.basis)), ndmin=2)
+            return (np.dot(cov_basis, np.dot(self.basis.T, self.eigenvectors[:, : self.dimension()]))
+                    / feature_sigma.T.dot(PC_sigma))
+        feature_sigma = np.array(np.sqrt(np.diag(self.cov)), ndmin=2)
         return np.dot(self.cov, self.eigenvectors[:, : self.dimension()]) / feature_sigma.T.dot(PC_sigma)
 
     def _init_covar(self, partial_fit, n_chunks):
@@ -216,6 +253,10 @@ class PCA(StreamingEstimationTransformer, SerializableMixIn):
         I = np.argsort(v)[::-1]
         eigenvalues = v[I]
         eigenvectors = R[:, I]
+        if self.basis is not None:
+            # low rank PCA: map back from the subspace, only the first rank components are reliable.
+            eigenvalues = eigenvalues[:self.rank]
+            eigenvectors = self.basis.dot(eigenvectors[:, :self.rank])
 
         # compute cumulative variance
         cumvar = np.cumsum(eigenvalues)
@@ -227,6 +268,13 @@ class PCA(StreamingEstimationTransformer, SerializableMixIn):
 
     def _estimate(self, iterable, **kw):
         partial_fit = 'partial' in kw
+        basis = None
+        if self.rank is not None:
+            # estimate the covariance of the data projected onto the dominant subspace only.
+            from pyemma.coordinates.estimation.randomized import randomized_range, _Projection
+            mean, basis = randomized_range(iterable, self.rank, stride=self.stride, skip=self.skip,
+                                           chunksize=self.chunksize, random_state=self.random_state)
+            iterable = _Projection(basis, iterable)
         it = iterable.iterator(return_trajindex=False, chunk=self.chunksize,
                                stride=self.stride, skip=self.skip)
         from pyemma._base.progress import ProgressReporter
@@ -242,19 +290,25 @@ class PCA(StreamingEstimationTransformer, SerializableMixIn):
 
         self.cov = self._covar.cov_XX(bessel=True)
         self.mu = self._covar.mean_X()
+        if basis is not None:
+            # the mean within the subspace is the one of the projected data.
+            self.mu = mean + basis.dot(self.mu - basis.T.dot(mean))
+            iterable.data_producer = None
 
-        self._model.update_model_params(mean=self._covar.mean_X())
+        self._model.update_model_params(mean=self.mu)
+        self._model.basis = basis
         if not partial_fit:
             self._diagonalize()
 
         return self._model
 
-    def _transform_array(self, X):
+    def _transform_array(self, X, out=None, scratch=None):
         r"""
         Projects the data onto the dominant principal components.
         :param X: the input data
-        :return: the projected data
+        :param out: optional buffer to write the projected data into
+        :param scratch: optional dictionary of scratch buffers, which are reused across chunks
+        :return: the projected data (in double precision, if out is not given)
         """
-        X_meanfree = X - self._model.mean
-        Y = np.dot(X_meanfree, self._model.eigenvectors[:, 0:self.dimension()])
-        return Y
+        return self._project(X, self._model.mean, self._model.eigenvectors, self.dimension(), out=out,
+                             scratch=scratch)
@@ -23,12 +23,13 @@ Created on 19.01.2015
 
 import numpy as np
 from decorator import decorator
-from pyemma._base.serialization.serialization import SerializableMixIn
+from pyemma._base.serialization.serialization import SerializableMixIn, Modifications
 
 from pyemma._base.model import Model
 from pyemma._ext.variational.solvers.direct import eig_corr
 from pyemma._ext.variational.util import ZeroRankError
 from pyemma.coordinates.data._base.transformer import StreamingEstimationTransformer
+from pyemma.coordinates.transform._projection import ProjectionMixIn
 from pyemma.coordinates.estimation.covariance import LaggedCovariance
 from pyemma.util.annotators import deprecated, fix_docs
 from pyemma.util.reflection import get_default_args
@@ -41,11 +42,12 @@ class TICAModel(Model, SerializableMixIn):
     __serialize_version = 0
 
     def set_model_params(self, mean=None, cov_tau=None, cov=None,
-                         cumvar=None, eigenvalues=None, eigenvectors=None):
+                         cumvar=None, eigenvalues=None, eigenvectors=None, basis=None):
         self.update_model_params(cov=cov, cov_tau=cov_tau,
                                  mean=mean, cumvar=cumvar,
                                  eigenvalues=eigenvalues,
-                                 eigenvectors=eigenvectors)
+                                 eigenvectors=eigenvectors,
+                                 basis=basis)
 
 @decorator
 def _lazy_estimation(func, *args, **kw):
@@ -57,12 +59,13 @@ def _lazy_estimation(func, *args, **kw):
 
 
 @fix_docs
-class TICA(StreamingEstimationTransformer, SerializableMixIn):
+class TICA(ProjectionMixIn, StreamingEstimationTransformer, SerializableMixIn):
     r""" Time-lagged independent component analysis (TICA)"""
-    __serialize_version = 0
+    __serialize_version = 1
+    __serialize_modifications_map = {0: Modifications().set('rank', None).set('random_state', 42).list()}
 
     def __init__(self, lag, dim=-1, var_cutoff=0.95, kinetic_map=True, commute_map=False, epsilon=1e-6,
-                 stride=1, skip=0, reversible=True, weights=None, ncov_max=float('inf')):
+                 stride=1, skip=0, reversible=True, weights=None, ncov_max=float('inf'), rank=None, random_state=42):
         r""" Time-lagged independent component analysis (TICA) [1]_, [2]_, [3]_.
 
         Parameters
@@ -98,6 +101,16 @@ class TICA(StreamingEstimationTransformer, SerializableMixIn):
               off-equilibrium data. The only requirement is that weights possesses a method weights(X), that accepts a
               trajectory X (np.ndarray(T, n)) and returns a vector of re-weighting factors (np.ndarray(T,)).
             * A list of ndarrays (ndim=1) specifies the weights for each frame of each trajectory.
+        rank : int, optional, default None
+            If given, a low rank TICA is estimated, which never forms the full covariance matrices: a randomized
+            range finder determines an orthonormal basis of the dominant (rank + 10 dimensional) subspace of the
+            instantaneous covariance matrix from the streamed data [6]_, and the TICA problem is solved within this
+            subspace. At most rank independent components are returned and :py:obj:`cov` and :py:obj:`cov_tau`
+            are expressed in the :py:obj:`basis` of this subspace. This requires three additional passes over
+            the data and is meant for very high dimensional inputs.
+        random_state : None, int or numpy.random.RandomState, optional, default 42
+            Seed of the random directions of the range finder of a low rank TICA. The default is fixed, so
+            repeated estimations give identical results; None draws a new seed every time.
 
         Notes
         -----
@@ -137,6 +150,8 @@ class TICA(StreamingEstimationTransformer, SerializableMixIn):
             J. Chem. Theory. Comput. doi:10.1021/acs.jctc.5b00553
         .. [5] Noe, F., Banisch, R., Clementi, C. 2016. Commute maps: separating slowly-mixing molecular configurations
            for kinetic modeling. J. Chem. Theory. Comput. doi:10.1021/acs.jctc.6b00762
+        .. [6] Halko, N., Martinsson, P. G., Tropp, J. A. 2011. Finding structure with randomness: Probabilistic
+           algorithms for constructing approximate matrix decompositions. SIAM Rev. 53, 217-288.
 
         """
         default_var_cutoff = get_default_args(self.__init__)['var_cutoff']
@@ -153,13 +168,17 @@ class TICA(StreamingEstimationTransformer, SerializableMixIn):
 
         if dim > -1:
             var_cutoff = 1.0
+        if rank is not None and dim > rank:
+            raise ValueError('Requested more output dimensions (%i) than the rank (%i) of the low rank TICA.'
+                             % (dim, rank))
 
         # empty dummy model instance
         self._model = TICAModel()
         # this instance will be set by partial fit.
         self._covar = None
         self.set_params(lag=lag, dim=dim, var_cutoff=var_cutoff, kinetic_map=kinetic_map, commute_map=commute_map,
-                        epsilon=epsilon, reversible=reversible, stride=stride, skip=skip, weights=weights, ncov_max=ncov_max)
+                        epsilon=epsilon, reversible=reversible, stride=stride, skip=skip, weights=weights, ncov_max=ncov_max,
+                        rank=rank, random_state=random_state)
 
     @property
     def lag(self):
@@ -191,6 +210,8 @@ class TICA(StreamingEstimationTransformer, SerializableMixIn):
             d = dim
         elif self.var_cutoff == 1.0:  # We only know that all dimensions are wanted, so return input dim
             d = self.data_producer.dimension()
+            if self.rank is not None:
+                d = min(d, self.rank)
         else:  # We know nothing. Give up
             raise RuntimeError('Requested dimension, but the dimension depends on the cumulative variance and the '
                                'transformer has not yet been estimated. Call estimate() before.')
@@ -220,18 +241,25 @@ class TICA(StreamingEstimationTransformer, SerializableMixIn):
         """
         return super(TICA, self).estimate(X, **kwargs)
 
-    def partial_fit(self, X):
+    def partial_fit(self, X, itraj=None):
         """ incrementally update the covariances and mean.
 
         Parameters
         ----------
         X: array, list of arrays, PyEMMA reader
             input data.
+        itraj: hashable or list of hashables, optional, default=None
+            identifiers of the trajectories continued by the arrays in X. If given, consecutive segments of a
+            trajectory (e.g. of a running simulation) can be passed without overlap and without losing the
+            time-lagged pairs at the segment boundaries, see
+            :meth:`LaggedCovariance.partial_fit <pyemma.coordinates.estimation.covariance.LaggedCovariance.partial_fit>`.
 
         Notes
         -----
         The projection matrix is first being calculated upon its first access.
         """
+        if self.rank is not None:
+            raise NotImplementedError('partial_fit is not supported for low rank TICA (rank=%s).' % self.rank)
         from pyemma.coordinates import source
         iterable = source(X)
 
@@ -243,10 +271,13 @@ class TICA(StreamingEstimationTransformer, SerializableMixIn):
             self._covar = LaggedCovariance(c00=True, c0t=True, ctt=False, remove_data_mean=True, reversible=self.reversible,
                                            lag=self.lag, bessel=False, stride=self.stride, skip=self.skip,
                                            weights=self.weights, ncov_max=self.ncov_max)
-        self._covar.partial_fit(iterable)
+        self._covar.partial_fit(iterable if itraj is None else X, itraj=itraj)
+        if not self._covar._estimated:
+            return self
         self._model.update_model_params(mean=self._covar.mean,  # TODO: inefficient, fixme
                                         cov=self._covar.C00_,
                                         cov_tau=self._covar.C0t_)
+        self._model.basis = None
 
         self._used_data = self._covar._used_data
         self._estimated = False
@@ -263,36 +294,55 @@ class TICA(StreamingEstimationTransformer, SerializableMixIn):
             raise RuntimeError("requested more output dimensions (%i) than dimension"
                                " of input data (%i)" % (self.dim, indim))
 
+        basis = None
+        if self.rank is not None:
+            # estimate the covariances of the data projected onto the dominant subspace only.
+            from pyemma.coordinates.estimation.randomized import randomized_range, _Projection
+            mean, basis = randomized_range(iterable, self.rank, stride=self.stride, skip=self.skip,
+                                           chunksize=self.chunksize, random_state=self.random_state)
+            iterable = _Projection(basis, iterable)
+
         if self._logger_is_active(self._loglevel_DEBUG):
             self.logger.debug("Running TICA with tau=%i; Estimating two covariance matrices"
-                               " with dimension (%i, %i)", self._lag, indim, indim)
+                               " with dimension (%i, %i)", self._lag, iterable.dimension(), iterable.dimension())
 
-        covar.estimate(iterable, **kw)
-        self._model.update_model_params(mean=covar.mean,
+        try:
+            covar.estimate(iterable, **kw)
+        finally:
+            if basis is not None:
+                iterable.data_producer = None
+        covar_mean = covar.mean
+        if basis is not None:
+            # the mean within the subspace is the one of the projected data.
+            covar_mean = mean + basis.dot(covar_mean - basis.T.dot(mean))
+        self._model.update_model_params(mean=covar_mean,
                                         cov=covar.C00_,
                                         cov_tau=covar.C0t_)
+        self._model.basis = basis
         self._used_data = covar._used_data
         self._diagonalize()
 
         return self._model
 
-    def _transform_array(self, X):
+    def _transform_array(self, X, out=None, scratch=None):
         r"""Projects the data onto the dominant independent components.
 
         Parameters
         ----------
         X : ndarray(n, m)
             the input data
+        out : ndarray(n, dim), optional
+            buffer to write the projected data into
+        scratch : dict, optional
+            scratch buffers of the projection, which are reused across chunks
 
         Returns
         -------
         Y : ndarray(n,)
             the projected data
         """
-        X_meanfree = X - self.mean
-        Y = np.dot(X_meanfree, self.eigenvectors[:, 0:self.dimension()])
-
-        return Y.astype(self.output_type())
+        return self._project(X, self.mean, self.eigenvectors, self.dimension(), out=out,
+                             output_type=self.output_type(), scratch=scratch)
 
     def _diagonalize(self):
         # diagonalize with low rank approximation
@@ -303,6 +353,10 @@ class TICA(StreamingEstimationTransformer, SerializableMixIn):
             raise ZeroRankError('All input features are constant in all time steps. No dimension would be left after dimension reduction.')
         if self.kinetic_map and self.commute_map:
             raise ValueError('Trying to use both kinetic_map and commute_map. Use either or.')
+        if self.basis is not None:
+            # low rank TICA: map back from the subspace, only the first rank components are reliable.
+            eigenvalues = eigenvalues[:self.rank]
+            eigenvectors = self.basis.dot(eigenvectors[:, :self.rank])
         if self.kinetic_map:  # scale by eigenvalues
             eigenvectors *= eigenvalues[None, :]
         if self.commute_map:  # scale by (regularized) timescales
@@ -367,12 +421,18 @@ class TICA(StreamingEstimationTransformer, SerializableMixIn):
             correlation matrix between input features and TICs. There is a row for each feature and a column
             for each TIC.
         """
+        if self.basis is not None:
+            # low rank TICA: the covariance is approximated by basis cov basis^T
+            cov_basis = np.dot(self.basis, self.cov)
+            feature_sigma = np.sqrt(np.einsum('ij,ij->i', cov_basis, self.basis))
+            return (np.dot(cov_basis, np.dot(self.basis.T, self.eigenvectors[:, : self.dimension()]))
+                    / feature_sigma[:, np.newaxis])
         feature_sigma = np.sqrt(np.diag(self.cov))
         return np.dot(self.cov, self.eigenvectors[:, : self.dimension()]) / feature_sigma[:, np.newaxis]
 
     @property
     def cov(self):
-        """ covariance matrix of input data. """
+        """ covariance matrix of input data. For low rank TICA, it is expressed in :py:obj:`basis`. """
         return self._model.cov
 
     @cov.setter
@@ -381,13 +441,18 @@ class TICA(StreamingEstimationTransformer, SerializableMixIn):
 
     @property
     def cov_tau(self):
-        """ covariance matrix of time-lagged input data. """
+        """ covariance matrix of time-lagged input data. For low rank TICA, it is expressed in :py:obj:`basis`. """
         return self._model.cov_tau
 
     @cov_tau.setter
     def cov_tau(self, value):
         self._model.cov_tau = value
 
+    @property
+    def basis(self):
+        """ orthonormal basis (column-wise) of the subspace of a low rank TICA or None (see rank). """
+        return getattr(self._model, 'basis', None)
+
     @property
     @_lazy_estimation
     def eigenvalues(self):
@@ -96,6 +96,9 @@ class iterload(object):
             and .pdb formats, which already contain topology information.
         stride : int, default=None
             Only read every stride-th frame.
+        offsets : array_like, optional
+            Byte offsets of all frames in the file (eg. from the trajectory info cache). If given and supported by
+            the format (xtc, trr), the file does not have to be scanned to seek to a frame.
         atom_indices : array_like, optional
             If not none, then read only a subset of the atoms coordinates from the
             file. This may be slightly slower than the standard read because it
@@ -124,6 +127,8 @@ class iterload(object):
         self._atom_indices = cast_indices(kwargs.pop('atom_indices', None))
         self._top = kwargs.pop('top', None)
         self._skip = kwargs.pop('skip', 0)
+        # byte offsets of the frames (eg. obtained from the trajectory info cache), which allow O(1) seeking.
+        offsets = kwargs.pop('offsets', None)
         self._kwargs = kwargs
         self._chunksize = chunk
         self._extension = _get_extension(self._filename)
@@ -144,14 +149,22 @@ class iterload(object):
         else:
             n_atoms = self._topology.n_atoms
 
+        # with known frame offsets seeking is O(1), so striding via random access never reads skipped frames.
+        has_offsets = offsets is not None and len(offsets) > 0
         if (self.is_ra_iter or
                     self._stride > iterload.MAX_STRIDE_SWITCH_TO_RA or
+                    (has_offsets and self._stride > 1) or
                 (8 * self._chunksize * self._stride * n_atoms > iterload.MEMORY_CUTOFF)):
             self._mode = 'random_access'
             self._f = (lambda x:
                        md_open(x, n_atoms=self._topology.n_atoms)
                        if self._extension in ('.crd', '.mdcrd')
                        else md_open(self._filename))(self._filename)
+            self._set_offsets(offsets)
+            # frames read in random access mode only contain the selected atoms, so they need a matching topology.
+            self._ra_topology = self._topology
+            if self._atom_indices is not None and self._topology is not None:
+                self._ra_topology = load_topology_cached(self._topology).subset(self._atom_indices)
             if not isinstance(self._stride, np.ndarray):
                 self._stride  = np.arange(self._skip, len(self._f), self._stride)
             self._ra_it = self._random_access_generator(self._f)
@@ -163,10 +176,12 @@ class iterload(object):
                 else md_open(self._filename)
             )(self._filename)
 
-            # offset array handling
-            offsets = kwargs.pop('offsets', None)
-            if hasattr(self._f, 'offsets') and offsets is not None:
-                self._f.offsets = offsets
+            self._set_offsets(offsets)
+
+    def _set_offsets(self, offsets):
+        # offset array handling
+        if hasattr(self._f, 'offsets') and offsets is not None and len(offsets) > 0:
+            self._f.offsets = offsets
 
     @property
     def skip(self):
@@ -251,7 +266,7 @@ class iterload(object):
                     coords.append(local_traj_data)
                     curr_size += len(grouped_stride)
                 if curr_size == chunksize:
-                    yield _join_traj_data(coords, self._topology)
+                    yield _join_traj_data(coords, self._ra_topology)
                     chunksize = self._chunksize
                     curr_size = 0
                     coords = []
@@ -262,13 +277,12 @@ class iterload(object):
                     leftovers = leftovers[min(chunksize, len(leftovers)):]
                     curr_size += len(local_chunk)
                     if curr_size == chunksize:
-                        yield _join_traj_data(coords, self._topology)
+                        yield _join_traj_data(coords, self._ra_topology)
                         curr_size = 0
                         coords = []
             if coords:
-                yield _join_traj_data(coords, self._topology)
-
-            raise StopIteration("delivered all RA indices")
+                yield _join_traj_data(coords, self._ra_topology)
+            # delivered all RA indices
 
 
 def _read_traj_data(atom_indices, f, n_frames, **kwargs):
@@ -1318,7 +1318,7 @@ def bayesian_hidden_markov_model(dtrajs, nstates, lag, nsamples=100, reversible=
 
 def estimate_augmented_markov_model(dtrajs, ftrajs, lag, m, sigmas,
                           count_mode='sliding',  connectivity='largest',
-                          dt_traj='1 step', maxiter=1000000, eps=0.05, maxcache=3000):
+                          dt_traj='1 step', maxiter=1000000, eps=0.05, maxcache=3000, sparse=False):
     r""" Estimates an Augmented Markov model from discrete trajectories and experimental data
 
     Returns a :class:`AugmentedMarkovModel` that
@@ -1406,8 +1406,14 @@ def estimate_augmented_markov_model(dtrajs, ftrajs, lag, m, sigmas,
         $$ \mathrm{eps} > \frac{\mid o_{\mathrm{pred}}^{(i+1)}-o_{\mathrm{pred}}^{(i)}\mid }{\sigma}. $$
 
     maxcache : int, optional
-        Parameter which specifies the maximum size of cache used
-        when performing estimation of AMM, in megabytes.
+        not used anymore, the R tensor is stored in compact form, which
+        has the size of the observable matrix.
+
+    sparse : bool, optional
+        If true, the count matrix and the fixed-point iteration of the AMM
+        are kept in sparse form, which reduces memory and time per iteration
+        for large numbers of Markov states. The transition matrix is
+        returned as sparse matrix.
 
     Returns
     -------
@@ -1465,7 +1471,7 @@ def estimate_augmented_markov_model(dtrajs, ftrajs, lag, m, sigmas,
         mlamm = _ML_AMM(lag=lag, count_mode=count_mode,
                         connectivity=connectivity,
                         dt_traj=dt_traj, maxiter=maxiter, max_cache=maxcache,
-                        E=_E, w=_w, m=m)
+                        E=_E, w=_w, m=m, sparse=sparse)
         # estimate and return
         return mlamm.estimate(dtrajs)
 
@@ -1597,12 +1603,12 @@ def tpt(msmobj, A, B):
         raise ValueError('set A or B defines more states, than given transition matrix.')
 
     # forward committor
-    qplus = msmana.committor(T, A, B, forward=True)
-    # backward committor
+    qplus = msmobj.committor_forward(A, B)
+    # backward committor, reuses the factorization of the forward committor
     if msmana.is_reversible(T, mu=mu):
         qminus = 1.0 - qplus
     else:
-        qminus = msmana.committor(T, A, B, forward=False, mu=mu)
+        qminus = msmobj.committor_backward(A, B)
     # gross flux
     grossflux = flux_matrix(T, mu, qminus, qplus, netflux=False)
     # net flux
@@ -8,7 +8,84 @@ __all__ = ['bootstrapping_count_matrix', 'bootstrapping_dtrajs', 'twostep_count_
            'oom_components', 'equilibrium_transition_matrix']
 
 
-def bootstrapping_dtrajs(dtrajs, lag, N_full, nbs=10000, active_set=None):
+def _bootstrap_singular_values(draw, count_matrices, nbs, N, batch_size=None, n_jobs=None, tol=None):
+    """
+    Mean and standard deviation of the singular values of re-sampled count matrices.
+
+    The re-samplings are processed in batches: draw(n) returns the random weights of n re-samplings
+    (called sequentially, so that results only depend on the state of numpy.random) and
+    count_matrices(weights) turns them into an (n, N, N) array of count matrices, whose singular
+    values are computed by a single batched SVD. Batches are evaluated concurrently by n_jobs threads.
+
+    Parameters
+    ----------
+    draw : callable
+        draw(n) returns the random weights of n re-samplings.
+    count_matrices : callable
+        count_matrices(weights) returns the re-sampled count matrices as ndarray(n, N, N).
+    nbs : int
+        maximum number of re-samplings.
+    N : int
+        number of states of the count matrices.
+    batch_size : int, optional
+        number of re-samplings per batch, by default chosen such that a batch of
+        count matrices occupies about 32 MB.
+    n_jobs : int, optional
+        number of threads, by default determined by :func:`pyemma._base.parallel.get_n_jobs`.
+    tol : float, optional
+        stop early, once the signal-to-noise ratios of all singular values change by less than
+        tol (relative) between two consecutive rounds of n_jobs batches; None runs all nbs
+        re-samplings.
+
+    Returns
+    -------
+    smean : ndarray(N,)
+        mean values of singular values
+    sdev : ndarray(N,)
+        standard deviations of singular values
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    if n_jobs is None:
+        from pyemma._base.parallel import get_n_jobs
+        n_jobs = get_n_jobs()
+    n_jobs = max(int(n_jobs), 1)
+    if batch_size is None:
+        batch_size = 2**22 // max(N * N, 1)
+    batch_size = int(min(max(batch_size, 1), max(nbs, 1)))
+
+    def svals(weights):
+        C = count_matrices(weights)
+        return np.linalg.svd(C, compute_uv=False)
+
+    # running mean and sum of squared deviations, merged batch-wise (Chan et al.)
+    n = 0
+    mean = np.zeros(N)
+    m2 = np.zeros(N)
+    ratio = None
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        while n < nbs:
+            sizes = []
+            while len(sizes) < n_jobs and n + sum(sizes) < nbs:
+                sizes.append(min(batch_size, nbs - n - sum(sizes)))
+            for s in pool.map(svals, [draw(size) for size in sizes]):
+                nb = s.shape[0]
+                mb = s.mean(axis=0)
+                delta = mb - mean
+                m2 += ((s - mb)**2).sum(axis=0) + delta**2 * n * nb / (n + nb)
+                mean += delta * nb / (n + nb)
+                n += nb
+            if tol is not None:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    new_ratio = mean / np.sqrt(m2 / n)
+                finite = np.isfinite(new_ratio)
+                if ratio is not None and np.array_equal(finite, np.isfinite(ratio)) and \
+                        np.all(np.abs(new_ratio[finite] - ratio[finite]) <= tol * np.abs(new_ratio[finite])):
+                    break
+                ratio = new_ratio
+    return mean, np.sqrt(m2 / max(n, 1))
+
+
+def bootstrapping_dtrajs(dtrajs, lag, N_full, nbs=10000, active_set=None, batch_size=None, n_jobs=None, tol=None):
     """
     Perform trajectory based re-sampling.
 
@@ -26,6 +103,13 @@ def bootstrapping_dtrajs(dtrajs, lag, N_full, nbs=10000, active_set=None):
     active_set : ndarray
         Indices of active set, all count matrices will be restricted
         to active set.
+    batch_size : int, optional
+        Number of re-samplings evaluated at once, see :func:`_bootstrap_singular_values`.
+    n_jobs : int, optional
+        Number of threads used for the singular value decompositions.
+    tol : float, optional
+        Relative tolerance for stopping the re-sampling early, once the signal-to-noise
+        ratios of the singular values have converged. None performs all nbs re-samplings.
 
     Returns
     -------
@@ -37,46 +121,41 @@ def bootstrapping_dtrajs(dtrajs, lag, N_full, nbs=10000, active_set=None):
 
     # Get the number of simulations:
     Q = len(dtrajs)
-    # Get the number of states in the active set:
-    if active_set is not None:
-        N = active_set.size
-    else:
-        N = N_full
-    # Build up a matrix of count matrices for each simulation. Size is Q*N^2:
+    # Get the states of the active set:
+    if active_set is None:
+        active_set = np.arange(N_full)
+    N = active_set.size
+    # Build up a matrix of count matrices for each simulation, restricted to the active set. Size is Q*N^2:
+    full2active = -np.ones(N_full, dtype=int)
+    full2active[active_set] = np.arange(N)
     traj_ind = []
     state1 = []
     state2 = []
-    q = 0
-    for traj in dtrajs:
-        traj_ind.append(q*np.ones(traj[:-lag].size))
-        state1.append(traj[:-lag])
-        state2.append(traj[lag:])
-        q += 1
+    for q, traj in enumerate(dtrajs):
+        traj_ind.append(q*np.ones(traj[:-lag].size, dtype=int))
+        state1.append(full2active[traj[:-lag]])
+        state2.append(full2active[traj[lag:]])
     traj_inds = np.concatenate(traj_ind)
-    pairs = N_full * np.concatenate(state1) + np.concatenate(state2)
+    state1 = np.concatenate(state1)
+    state2 = np.concatenate(state2)
+    inside = (state1 >= 0) & (state2 >= 0)
+    pairs = N * state1[inside] + state2[inside]
     data = np.ones(pairs.size)
-    Ct_traj = scipy.sparse.coo_matrix((data, (traj_inds, pairs)), shape=(Q, N_full*N_full))
-    Ct_traj = Ct_traj.tocsr()
-
-    # Perform re-sampling:
-    svals = np.zeros((nbs, N))
-    for s in range(nbs):
-        # Choose selection:
-        sel = np.random.choice(Q, Q, replace=True)
-        # Compute count matrix for selection:
-        Ct_sel = Ct_traj[sel, :].sum(axis=0)
-        Ct_sel = np.asarray(Ct_sel).reshape((N_full, N_full))
-        if active_set is not None:
-            from pyemma.util.linalg import submatrix
-            Ct_sel = submatrix(Ct_sel, active_set)
-        svals[s, :] = scl.svdvals(Ct_sel)
-    # Compute mean and uncertainties:
-    smean = np.mean(svals, axis=0)
-    sdev = np.std(svals, axis=0)
-
-    return smean, sdev
-
-def bootstrapping_count_matrix(Ct, nbs=10000):
+    Ct_traj = scipy.sparse.coo_matrix((data, (traj_inds[inside], pairs)), shape=(Q, N*N))
+    # transposed, such that the re-sampled count matrices are a single sparse-dense product:
+    Ct_traj_T = Ct_traj.T.tocsr()
+
+    # Perform re-sampling, drawing Q trajectories with replacement is a multinomial draw of their weights:
+    def draw(n):
+        return np.random.multinomial(Q, np.ones(Q) / Q, size=n).astype(np.float64)
+
+    def count_matrices(weights):
+        return np.asarray(Ct_traj_T.dot(weights.T)).T.reshape((weights.shape[0], N, N))
+
+    return _bootstrap_singular_values(draw, count_matrices, nbs, N, batch_size=batch_size, n_jobs=n_jobs, tol=tol)
+
+
+def bootstrapping_count_matrix(Ct, nbs=10000, batch_size=None, n_jobs=None, tol=None):
     """
     Perform bootstrapping on trajectories to estimate uncertainties for singular values of count matrices.
 
@@ -87,6 +166,13 @@ def bootstrapping_count_matrix(Ct, nbs=10000):
 
     nbs : int, optional
         the number of re-samplings to be drawn from dtrajs
+    batch_size : int, optional
+        Number of re-samplings evaluated at once, see :func:`_bootstrap_singular_values`.
+    n_jobs : int, optional
+        Number of threads used for the singular value decompositions.
+    tol : float, optional
+        Relative tolerance for stopping the re-sampling early, once the signal-to-noise
+        ratios of the singular values have converged. None performs all nbs re-samplings.
 
     Returns
     -------
@@ -101,22 +187,17 @@ def bootstrapping_count_matrix(Ct, nbs=10000):
     T = Ct.sum()
     # Reshape and normalize the count matrix:
     p = Ct.toarray()
-    p = np.reshape(p, (N*N,)).astype(np.float)
+    p = np.reshape(p, (N*N,)).astype(np.float64)
     p = p / T
+
     # Perform the bootstrapping:
-    svals = np.zeros((nbs, N))
-    for s in range(nbs):
-        # Draw sample:
-        sel = np.random.multinomial(T, p)
-        # Compute the count-matrix:
-        sC = np.reshape(sel, (N, N))
-        # Compute singular values:
-        svals[s, :] = scl.svdvals(sC)
-    # Compute mean and uncertainties:
-    smean = np.mean(svals, axis=0)
-    sdev = np.std(svals, axis=0)
-
-    return smean, sdev
+    def draw(n):
+        return np.random.multinomial(int(T), p, size=n)
+
+    def count_matrices(sel):
+        return np.reshape(sel, (sel.shape[0], N, N)).astype(np.float64)
+
+    return _bootstrap_singular_values(draw, count_matrices, nbs, N, batch_size=batch_size, n_jobs=n_jobs, tol=tol)
 
 def twostep_count_matrix(dtrajs, lag, N):
     """
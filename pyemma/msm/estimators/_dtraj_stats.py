@@ -114,6 +114,8 @@ class DiscreteTrajectoryStats(object):
 
         # not yet estimated
         self._counted_at_lag = False
+        # count matrices precomputed by count_lagged_multi, by (lag, count_mode)
+        self._count_cache = {}
 
     def to_coreset(self, core_set, in_place=True):
         """
@@ -220,7 +222,10 @@ class DiscreteTrajectoryStats(object):
 
         # Compute count matrix
         count_mode = count_mode.lower()
-        if count_mode == 'sliding':
+        if (lag, count_mode) in self._count_cache:
+            # copy, count_matrix(effective=True) rescales in place
+            self._C = self._count_cache[(lag, count_mode)].copy()
+        elif count_mode == 'sliding':
             self._C = msmest.count_matrix(self._dtrajs, lag, sliding=True)
         elif count_mode == 'sample':
             self._C = msmest.count_matrix(self._dtrajs, lag, sliding=False)
@@ -264,6 +269,52 @@ class DiscreteTrajectoryStats(object):
         # remember that this function was called
         self._counted_at_lag = True
 
+    def count_lagged_multi(self, lags, count_mode='sliding'):
+        r""" Precomputes the count matrices at several lag times
+
+        The transition pairs of all trajectories are extracted at once for every lag time
+        instead of trajectory by trajectory. Subsequent calls of :func:`count_lagged` with
+        one of these lag times and the same count_mode reuse the count matrices.
+
+        Parameters
+        ----------
+        lags : iterable of int
+            lag times in trajectory steps
+
+        count_mode : str, optional, default='sliding'
+            'sliding' or 'sample', see :func:`count_lagged`. Effective count matrices are
+            not precomputed, but evaluated by :func:`count_lagged`.
+
+        """
+        count_mode = count_mode.lower()
+        if count_mode not in ('sliding', 'sample'):
+            return
+        import scipy.sparse
+        lengths = np.array([len(d) for d in self._dtrajs], dtype=int)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        states = np.concatenate(self._dtrajs)
+        for lag in lags:
+            lag = int(lag)
+            if (lag, count_mode) in self._count_cache:
+                continue
+            valid = lengths > lag
+            # number of transition pairs per trajectory (dtraj[0:-lag] or dtraj[0:-lag:lag])
+            npairs = lengths[valid] - lag if count_mode == 'sliding' else (lengths[valid] - 1) // lag
+            if npairs.sum() == 0:
+                raise ValueError('No counts found - lag ' + str(lag) + ' may exceed trajectory length.')
+            # index of the first frame of every pair within the concatenated trajectories
+            pair_offsets = np.concatenate(([0], np.cumsum(npairs)[:-1]))
+            step = 1 if count_mode == 'sliding' else lag
+            i = np.repeat(starts[valid], npairs) + step * (np.arange(npairs.sum()) - np.repeat(pair_offsets, npairs))
+            row = states[i]
+            col = states[i + lag]
+            # negative states are not counted
+            inside = (row >= 0) & (col >= 0)
+            row = row[inside]
+            col = col[inside]
+            C = scipy.sparse.coo_matrix((np.ones(row.size), (row, col)), shape=(self._nstates, self._nstates))
+            self._count_cache[(lag, count_mode)] = C.tocsr()
+
     # ==================================
     # Permanent properties
     # ==================================
@@ -20,6 +20,7 @@
 
 
 from pyemma._base.progress import ProgressReporterMixin
+from pyemma.msm.estimators._dtraj_stats import DiscreteTrajectoryStats as _DiscreteTrajectoryStats
 from pyemma.msm.estimators.maximum_likelihood_msm import MaximumLikelihoodMSM as _MLMSM
 from pyemma.msm.models.msm import MSM as _MSM
 from pyemma.msm.models.msm_sampled import SampledMSM as _SampledMSM
@@ -171,7 +172,8 @@ class BayesianMSM(_MLMSM, _SampledMSM, ProgressReporterMixin):
 
     def _estimate(self, dtrajs):
         # ensure right format
-        dtrajs = ensure_dtraj_list(dtrajs)
+        if not isinstance(dtrajs, _DiscreteTrajectoryStats):
+            dtrajs = ensure_dtraj_list(dtrajs)
         # conduct MLE estimation (superclass) first
         _MLMSM._estimate(self, dtrajs)
 
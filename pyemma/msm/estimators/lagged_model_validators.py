@@ -20,6 +20,7 @@
 
 import math
 import numpy as np
+from scipy.sparse import issparse
 
 from pyemma._base.serialization.serialization import SerializableMixIn
 from pyemma._base.estimator import Estimator, estimate_param_scan, param_grid
@@ -31,6 +32,39 @@ from pyemma.util import types
 __author__ = 'noe'
 
 
+def _propagate(p0, P, ks):
+    r""" Propagates the distributions p0 by the transition matrix P for all numbers of steps in ks
+
+    The powers are evaluated in increasing order with a single recurrence, such that
+    :math:`p_0 P^k` for all k costs as many products as the largest k.
+
+    Parameters
+    ----------
+    p0 : ndarray(m, n)
+        initial distributions, one per row
+    P : ndarray(n, n) or ndarray(S, n, n) or sparse matrix
+        transition matrix, or a stack of S transition matrices that are propagated
+        simultaneously
+    ks : int-array
+        positive numbers of steps
+
+    Returns
+    -------
+    pks : list of ndarray(m, n) or ndarray(S, m, n)
+        normalized distributions after ks[i] steps
+
+    """
+    pks = [None] * len(ks)
+    pk = p0
+    k = 0
+    for i in np.argsort(ks, kind='mergesort'):
+        for _ in range(ks[i] - k):
+            pk = P.T.dot(pk.T).T if issparse(P) else np.matmul(pk, P)
+        k = ks[i]
+        pks[i] = pk / pk.sum(axis=-1, keepdims=True)
+    return pks
+
+
 class LaggedModelValidator(Estimator, ProgressReporterMixin, SerializableMixIn):
     r""" Validates a model estimated at lag time tau by testing its predictions
     for longer lag times
@@ -133,6 +167,7 @@ class LaggedModelValidator(Estimator, ProgressReporterMixin, SerializableMixIn):
         else:
             progress_reporter = None
 
+        data = self._share_counts(data, [p['lag'] for p in pargrid])
         estimated_models, estimators = \
             estimate_param_scan(self.test_estimator, data, pargrid, return_estimators=True, failfast=False,
                                 progress_reporter=progress_reporter, n_jobs=self.n_jobs)
@@ -140,17 +175,14 @@ class LaggedModelValidator(Estimator, ProgressReporterMixin, SerializableMixIn):
             estimated_models = [None] + estimated_models
             estimators = [None] + estimators
 
-        for i in range(len(self.mlags)):
-            mlag = self.mlags[i]
-
-            # make a prediction using the current model
-            self._pred.append(self._compute_observables(self.test_model, self.test_estimator, mlag))
-            # compute prediction errors if we can
-            if self.has_errors:
-                l, r = self._compute_observables_conf(self.test_model, self.test_estimator, mlag)
-                self._pred_L.append(l)
-                self._pred_R.append(r)
+        # make predictions using the current model for all lag time multiples
+        self._pred = self._compute_predictions(self.test_model, self.test_estimator, self.mlags)
+        # compute prediction errors if we can
+        if self.has_errors:
+            self._pred_L, self._pred_R = self._compute_predictions_conf(self.test_model, self.test_estimator,
+                                                                        self.mlags)
 
+        for i in range(len(self.mlags)):
             # do an estimate at this lagtime
             model = estimated_models[i]
             estimator = estimators[i]
@@ -176,6 +208,28 @@ class LaggedModelValidator(Estimator, ProgressReporterMixin, SerializableMixIn):
             self._est_L = None
             self._est_R = None
 
+    def _share_counts(self, data, lags):
+        """ Prepares the discrete trajectory statistics of all tested lag times at once
+
+        MSM estimators accept a :class:`DiscreteTrajectoryStats <pyemma.msm.estimators._dtraj_stats.DiscreteTrajectoryStats>`
+        instead of discrete trajectories. Passing a single one to all estimates avoids
+        recomputing the trajectory statistics and lets the count matrices of all lag times
+        be computed in one pass. For all other estimators, data is returned unchanged.
+
+        """
+        from pyemma.msm.estimators.maximum_likelihood_msm import MaximumLikelihoodMSM, AugmentedMarkovModel
+        from pyemma.msm.estimators._dtraj_stats import DiscreteTrajectoryStats
+        if (not isinstance(self.test_estimator, MaximumLikelihoodMSM)
+                or isinstance(self.test_estimator, AugmentedMarkovModel)):
+            return data
+        dtrajstats = DiscreteTrajectoryStats(types.ensure_dtraj_list(data))
+        for lag in lags:
+            try:
+                dtrajstats.count_lagged_multi([lag], count_mode=self.test_estimator.count_mode)
+            except ValueError:
+                pass  # no counts at this lag time, the estimate at this lag time will fail on its own
+        return dtrajstats
+
     @property
     def lagtimes(self):
         return self._lags
@@ -247,6 +301,66 @@ class LaggedModelValidator(Estimator, ProgressReporterMixin, SerializableMixIn):
         return self._pred_L, self._pred_R
 
     # USER functions
+    def _compute_predictions(self, model, estimator, mlags):
+        """Compute the predictions of the tested model for all lag time multiples
+
+        Evaluates :func:`_compute_observables` for every lag time multiple.
+        Subclasses may override this when the observables of all lag time
+        multiples can be computed at once.
+
+        Parameters
+        ----------
+        model : Model
+            tested model.
+
+        estimator : Estimator
+            estimator that has produced the model.
+
+        mlags : int-array
+            multiples of the model lag time.
+
+        Returns
+        -------
+        Y : list of ndarray
+            predicted observables for every lag time multiple
+
+        """
+        return [self._compute_observables(model, estimator, mlag) for mlag in mlags]
+
+    def _compute_predictions_conf(self, model, estimator, mlags):
+        """Compute confidence intervals of the predictions of the tested model for all lag time multiples
+
+        Evaluates :func:`_compute_observables_conf` for every lag time multiple.
+        Subclasses may override this when the confidence intervals of all lag time
+        multiples can be computed at once.
+
+        Parameters
+        ----------
+        model : Model
+            tested model.
+
+        estimator : Estimator
+            estimator that has produced the model.
+
+        mlags : int-array
+            multiples of the model lag time.
+
+        Returns
+        -------
+        L : list of ndarray
+            lower confidence bounds for every lag time multiple
+        R : list of ndarray
+            upper confidence bounds for every lag time multiple
+
+        """
+        L = []
+        R = []
+        for mlag in mlags:
+            l, r = self._compute_observables_conf(model, estimator, mlag)
+            L.append(l)
+            R.append(r)
+        return L, R
+
     def _compute_observables(self, model, estimator, mlag=1):
         """Compute observables for given model
 
@@ -344,6 +458,9 @@ class ChapmanKolmogorovValidator(LaggedModelValidator):
     __serialize_version = 0
     __serialize_fields = ('nstates', 'nsets', 'active_set', '_full2active', 'P0')
 
+    # maximum number of transition matrix elements of the sample models propagated at once
+    _sample_chunk_size = 2 ** 24
+
     def __init__(self, model, estimator, memberships, mlags=None, conf=0.95,
                  err_est=False, n_jobs=1, show_progress=True):
         """
@@ -374,18 +491,70 @@ class ChapmanKolmogorovValidator(LaggedModelValidator):
         self.P0 /= self.P0.sum(axis=0)  # column-normalize
         self.err_est = err_est  # TODO: this is currently unused
 
+    def _initial_distributions(self, active_set):
+        """ Starting distributions of all sets restricted to active_set, one per row """
+        subset = self._full2active[active_set]  # find subset we are now working on
+        p0 = self.P0[subset].T  # map distributions to new active set
+        return p0 / p0.sum(axis=1, keepdims=True), subset  # renormalize
+
+    def _can_propagate(self, model, subset):
+        # propagate directly with the transition matrix unless the model would rather interpret
+        # the distributions on its observable states (HMSM with as many observable as hidden states)
+        return len(subset) == model.nstates and getattr(model, 'nstates_obs', None) != model.nstates
+
+    def _compute_predictions(self, model, estimator, mlags):
+        p0, subset = self._initial_distributions(model.active_set)
+        if not self._can_propagate(model, subset):
+            return super(ChapmanKolmogorovValidator, self)._compute_predictions(model, estimator, mlags)
+        mlags = np.asarray(mlags)
+        nonzero = mlags != 0
+        pks = _propagate(p0, model.transition_matrix, mlags[nonzero])
+        M = self.memberships[subset]
+        pk_on_set = [np.eye(self.nsets)] * len(mlags)
+        for i, pk in zip(np.where(nonzero)[0], pks):
+            pk_on_set[i] = pk.dot(M)  # map onto sets
+        return pk_on_set
+
+    def _compute_predictions_conf(self, model, estimator, mlags):
+        p0, subset = self._initial_distributions(estimator.active_set)
+        if not self._can_propagate(model, subset):
+            return super(ChapmanKolmogorovValidator, self)._compute_predictions_conf(model, estimator, mlags)
+        mlags = np.asarray(mlags)
+        nonzero = mlags != 0
+        M = self.memberships[subset]
+        # set probabilities of all samples, propagated with stacks of sample transition matrices
+        values = [[] for _ in range(np.count_nonzero(nonzero))]
+        samples = model.samples
+        n = len(subset)
+        chunksize = max(1, self._sample_chunk_size // (n * n))
+        for start in range(0, len(samples), chunksize):
+            chunk = samples[start:start + chunksize]
+            if any(issparse(sample.transition_matrix) for sample in chunk):
+                # sparse matrices cannot be stacked, propagate sample by sample
+                pks = [_propagate(p0, sample.transition_matrix, mlags[nonzero]) for sample in chunk]
+                pks = [np.array(pks_k) for pks_k in zip(*pks)]
+            else:
+                Ps = np.array([sample.transition_matrix for sample in chunk])
+                pks = _propagate(p0, Ps, mlags[nonzero])
+            for v, pk in zip(values, pks):
+                v.append(np.matmul(pk, M))
+        L = [np.eye(self.nsets)] * len(mlags)
+        R = [np.eye(self.nsets)] * len(mlags)
+        for i, v in zip(np.where(nonzero)[0], values):
+            L[i], R[i] = confidence_interval(np.concatenate(v), conf=self.conf)
+        return L, R
+
     def _compute_observables(self, model, estimator, mlag=1):
         # for lag time 0 we return an identity matrix
         if mlag == 0 or model is None:
             return np.eye(self.nsets)
+        p0, subset = self._initial_distributions(model.active_set)
+        if self._can_propagate(model, subset):
+            return self._compute_predictions(model, estimator, [mlag])[0]
         # otherwise compute or predict them by model.propagate
         pk_on_set = np.zeros((self.nsets, self.nsets))
-        subset = self._full2active[model.active_set]  # find subset we are now working on
         for i in range(self.nsets):
-            p0 = self.P0[:, i]  # starting distribution on reference active set
-            p0sub = p0[subset]  # map distribution to new active set
-            p0sub /= p0sub.sum()  # renormalize
-            pksub = model.propagate(p0sub, mlag)
+            pksub = model.propagate(p0[i], mlag)
             for j in range(self.nsets):
                 pk_on_set[i, j] = np.dot(pksub, self.memberships[subset, j])  # map onto set
         return pk_on_set
@@ -394,18 +563,18 @@ class ChapmanKolmogorovValidator(LaggedModelValidator):
         # for lag time 0 we return an identity matrix
         if mlag == 0 or model is None:
             return np.eye(self.nsets), np.eye(self.nsets)
+        p0, subset = self._initial_distributions(estimator.active_set)
+        if self._can_propagate(model, subset):
+            L, R = self._compute_predictions_conf(model, estimator, [mlag])
+            return L[0], R[0]
         # otherwise compute or predict them by model.propagate
-        subset = self._full2active[estimator.active_set]  # find subset we are now working on
         l = np.zeros((self.nsets, self.nsets))
         r = np.zeros((self.nsets, self.nsets))
         for i in range(self.nsets):
-            p0 = self.P0[:, i]  # starting distribution
-            p0sub = p0[subset]  # map distribution to new active set
-            p0sub /= p0sub.sum()  # renormalize
-            pksub_samples = model.sample_f('propagate', p0sub, mlag)
+            pksub_samples = model.sample_f('propagate', p0[i], mlag)
             for j in range(self.nsets):
                 pk_on_set_samples = np.fromiter((np.dot(pksub, self.memberships[subset, j])
-                                                 for pksub in pksub_samples), dtype=np.float, count=len(pksub_samples))
+                                                 for pksub in pksub_samples), dtype=np.float64, count=len(pksub_samples))
                 l[i, j], r[i, j] = confidence_interval(pk_on_set_samples, conf=self.conf)
         return l, r
 
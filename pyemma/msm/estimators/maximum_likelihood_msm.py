@@ -22,6 +22,7 @@ from msmtools import estimation as msmest
 from pyemma.util.annotators import alias, aliased, fix_docs
 from pyemma.util.types import ensure_dtraj_list
 from pyemma._base.estimator import Estimator as _Estimator
+from pyemma._base.serialization.serialization import Modifications as _Modifications
 from pyemma.msm.estimators._dtraj_stats import DiscreteTrajectoryStats as _DiscreteTrajectoryStats
 from pyemma.msm.models.msm import MSM as _MSM
 from pyemma.util.units import TimeUnit as _TimeUnit
@@ -210,7 +211,8 @@ class _MSMEstimator(_Estimator, _MSM):
             MSM class.
 
         """
-        dtrajs = ensure_dtraj_list(dtrajs)  # ensure format
+        if not isinstance(dtrajs, _DiscreteTrajectoryStats):
+            dtrajs = ensure_dtraj_list(dtrajs)  # ensure format
         return super(_MSMEstimator, self).estimate(dtrajs, **kwargs)
 
     def _check_is_estimated(self):
@@ -1104,7 +1106,7 @@ class MaximumLikelihoodMSM(_MSMEstimator):
                                          maxiter=self.maxiter, maxerr=self.maxerr)
         # Done. We set our own model parameters, so this estimator is
         # equal to the estimated model.
-        self._dtrajs_full = dtrajs
+        self._dtrajs_full = dtrajstats.discrete_trajectories
         self._connected_sets = msmest.connected_sets(self._C_full)
         self.set_model_params(P=P, pi=statdist_active, reversible=self.reversible,
                               dt_model=self.timestep_traj.get_scaled(self.lag))
@@ -1136,7 +1138,8 @@ class MaximumLikelihoodMSM(_MSMEstimator):
 @aliased
 class OOMReweightedMSM(_MSMEstimator):
     r"""OOM based estimator for MSMs given discrete trajectory statistics"""
-    __serialize_version = 0
+    __serialize_version = 1
+    __serialize_modifications_map = {0: _Modifications().set('tol_bootstrap', None).set('n_jobs', None).list()}
     __serialize_fields = ('_C2t', '_C_active', '_C_full', '_Xi',
                           '_active_set', '_connected_sets',
                           '_eigenvalues_OOM', '_full2_active',
@@ -1146,7 +1149,7 @@ class OOMReweightedMSM(_MSMEstimator):
     def __init__(self, lag=1, reversible=True, count_mode='sliding', sparse=False, connectivity='largest',
                  dt_traj='1 step', nbs=10000, rank_Ct='bootstrap_counts', tol_rank=10.0,
                  score_method='VAMP2', score_k=10,
-                 mincount_connectivity='1/n'):
+                 mincount_connectivity='1/n', tol_bootstrap=None, n_jobs=None):
         r"""Maximum likelihood estimator for MSMs given discrete trajectory statistics
 
         Parameters
@@ -1243,6 +1246,15 @@ class OOMReweightedMSM(_MSMEstimator):
             may thus separate the resulting transition matrix. The default
             evaluates to 1/nstates.
 
+        tol_bootstrap : float or None, optional, default=None
+            stop the re-sampling for the rank decision before nbs re-samplings, once the
+            signal-to-noise ratios of all singular values change by less than tol_bootstrap
+            (relative) between two rounds of batched re-samplings. None performs all nbs re-samplings.
+
+        n_jobs : int or None, optional, default=None
+            number of threads for the re-sampling. None determines the number of jobs
+            from the environment (see :func:`pyemma._base.parallel.get_n_jobs`).
+
         References
         ----------
         .. [1] H. Wu and F. Noe: Variational approach for learning Markov processes from time series data
@@ -1263,6 +1275,8 @@ class OOMReweightedMSM(_MSMEstimator):
         self.nbs = nbs
         self.tol_rank = tol_rank
         self.rank_Ct = rank_Ct
+        self.tol_bootstrap = tol_bootstrap
+        self.n_jobs = n_jobs
 
     def _estimate(self, dtrajs):
         """ Estimate MSM """
@@ -1304,10 +1318,12 @@ class OOMReweightedMSM(_MSMEstimator):
                 Ceff_full = msmest.effective_count_matrix(dtrajs_lag, self.lag)
                 from pyemma.util.linalg import submatrix
                 Ceff = submatrix(Ceff_full, self.active_set)
-                smean, sdev = bootstrapping_count_matrix(Ceff, nbs=self.nbs)
+                smean, sdev = bootstrapping_count_matrix(Ceff, nbs=self.nbs, n_jobs=self.n_jobs,
+                                                         tol=self.tol_bootstrap)
             else:
                 smean, sdev = bootstrapping_dtrajs(dtrajs_lag, self.lag, self._nstates_full, nbs=self.nbs,
-                                                   active_set=self._active_set)
+                                                   active_set=self._active_set, n_jobs=self.n_jobs,
+                                                   tol=self.tol_bootstrap)
             # Estimate two step count matrices:
             C2t = twostep_count_matrix(dtrajs, self.lag, self._nstates_full)
             # Rank decision:
@@ -1425,14 +1441,15 @@ class OOMReweightedMSM(_MSMEstimator):
 class AugmentedMarkovModel(MaximumLikelihoodMSM):
     r"""AMM estimator given discrete trajectory statistics and stationary expectation values from experiments"""
 
-    __serialize_version = 0
+    __serialize_version = 1
+    __serialize_modifications_map = {0: _Modifications().set('sparse', False).list()}
     __serialize_fields = ('E_active', 'E_min', 'E_max', 'mhat', 'm', 'lagrange',
                           'sigmas', 'count_inside', 'count_outside')
 
     def __init__(self, lag=1, count_mode='sliding', connectivity='largest',
                  dt_traj='1 step',
                  E=None, m=None, w=None, eps=0.05, support_ci=1.00, maxiter=500, max_cache=3000,
-                 mincount_connectivity='1/n'):
+                 mincount_connectivity='1/n', sparse=False):
         r"""Maximum likelihood estimator for AMMs given discrete trajectory statistics and expectation values from experiments
 
         Parameters
@@ -1510,7 +1527,8 @@ class AugmentedMarkovModel(MaximumLikelihoodMSM):
           Maximum number of iterations
 
         max_cache : int, default=3000
-          Maximum size (in megabytes) of cache when computing R tensor (Supporting information in [1]).
+          not used anymore. The R tensor (Supporting information in [1]) is stored in compact form, which
+          has the size of E.
 
         mincount_connectivity : float or '1/n'
             minimum number of counts to consider a connection between two states.
@@ -1518,6 +1536,13 @@ class AugmentedMarkovModel(MaximumLikelihoodMSM):
             may thus separate the resulting transition matrix. The default
             evaluates to 1/nstates.
 
+        sparse : bool, optional, default = False
+            If true keep the count matrix and the iteration matrix X in sparse (CSR) form and only
+            evaluate the fixed-point updates on the nonzero counts. Memory and time per iteration then
+            scale with the number of nonzero counts instead of the squared number of states, which is
+            suggested for large numbers of states (e.g. > 4000). The transition matrix is returned as
+            sparse matrix, too.
+
 
         References
         ----------
@@ -1529,7 +1554,7 @@ class AugmentedMarkovModel(MaximumLikelihoodMSM):
         if self.count_mode not in ('sliding', 'sample'):
             raise ValueError('count mode ' + count_mode + ' is unknown. Only \'sliding\' and \'sample\' are allowed.')
 
-        super(AugmentedMarkovModel, self).__init__(lag=lag, reversible=True, count_mode=count_mode, sparse=False,
+        super(AugmentedMarkovModel, self).__init__(lag=lag, reversible=True, count_mode=count_mode, sparse=sparse,
                                                    connectivity=connectivity, dt_traj=dt_traj, score_method=None,
                                                    score_k=None, mincount_connectivity=mincount_connectivity,
                                                    maxiter=maxiter)
@@ -1587,39 +1612,23 @@ class AugmentedMarkovModel(MaximumLikelihoodMSM):
     def _update_Q(self):
         """ Compute Q, a weighted sum of the R-tensor.
 
+            Q = -2 sum_k w_k S_k R_k is the sum Q_ij = q_i + q_j of a column and a row vector,
+            only q is stored (see _update_Rslices).
             See SI of [1].
         """
-        self._Q = _np.zeros((self.n_mstates_active, self.n_mstates_active))
-        for k in range(self.n_exp_active):
-            self._Q = self._Q + self.w[k] * self._S[k] * self._get_Rk(k)
-        self._Q *= -2.
-
-    def _update_Rslices(self, i):
-        """ Computation of multiple slices of R tensor.
+        self._q = -2. * self._R.dot(self.w * self._S)
 
-            When _estimate(.) is called the R-tensor is split into segments whose maximum size is
-            specified by max_cache argument (see constructor).
-            _Rsi specifies which of the segments are currently in cache.
-             For equations check SI of [1].
+    def _update_Rslices(self):
+        """ Computation of the R tensor.
 
-        """
-        pek = self._pihat[:, None] * self.E_active[:, i * self._slicesz:(i + 1) * self._slicesz]
-        pp = self._pihat[:, None] + self._pihat[None, :]
-        ppmhat = pp * self.mhat[i * self._slicesz:(i + 1) * self._slicesz, None, None]
-        self._Rs = (pek[:, None, :] + pek[None, :, :]).T - ppmhat
-        self._Rsi = i
+            The slices of the R tensor are R_k[i, j] = pihat_i (E_ik - mhat_k) + pihat_j (E_jk - mhat_k)
+            and are stored in compact form, as the (n, k) array pihat_i (E_ik - mhat_k), which is
+            updated in place.
+            For equations check SI of [1].
 
-    def _get_Rk(self, k):
         """
-          Convienence function to get cached value of an Rk slice of the R tensor.
-          If we are outside cache, update the cache and return appropriate slice.
-
-        """
-        if k > (self._Rsi + 1) * self._slicesz or k < self._Rsi * self._slicesz:
-            self._update_Rslices(_np.floor(k / self._slicesz).astype(int))
-            return self._Rs[k % self._slicesz]
-        else:
-            return self._Rs[k % self._slicesz]
+        _np.subtract(self.E_active, self.mhat[None, :], out=self._R)
+        self._R *= self._pihat[:, None]
 
     def _update_pihat(self):
         """ Update stationary distribution estimate of Augmented Markov model (\hat pi) """
@@ -1640,15 +1649,28 @@ class AugmentedMarkovModel(MaximumLikelihoodMSM):
         self._S = self.mhat - self.m
 
     def _update_X_and_pi(self):
-        # evaluate count-over-pi
-        c_over_pi = self._csum / self.pi
-        D = c_over_pi[:, None] + c_over_pi + self._Q
-        # update estimate
-        self.X = self._C2 / D
-
-        # renormalize
-        self.X /= _np.sum(self.X)
-        self.pi = _np.sum(self.X, axis=1)
+        # evaluate count-over-pi, D_ij = c_i / pi_i + c_j / pi_j + Q_ij
+        u = self._csum / self.pi + self._q
+        # update estimate in place, X is nonzero only where C2 is
+        if self.sparse:
+            _np.add(u[self._C2_rows], u[self._C2.indices], out=self._D)
+            _np.divide(self._C2.data, self._D, out=self.X.data)
+            # renormalize
+            self.X.data /= _np.sum(self.X.data)
+            self.pi = _np.bincount(self._C2_rows, weights=self.X.data, minlength=self.n_mstates_active)
+        else:
+            _np.add(u[:, None], u[None, :], out=self._D)
+            _np.divide(self._C2, self._D, out=self.X)
+            # renormalize
+            self.X /= _np.sum(self.X)
+            self.pi = _np.sum(self.X, axis=1)
+
+    def _X_over_pi(self):
+        """ Transition matrix P_ij = X_ij / pi_i of the current iterate """
+        if self.sparse:
+            import scipy.sparse
+            return scipy.sparse.diags(1. / self.pi).dot(self.X).tocsr()
+        return self.X / self.pi[:, None]
 
     def _newton_lagrange(self):
         """
@@ -1682,7 +1704,7 @@ class AugmentedMarkovModel(MaximumLikelihoodMSM):
             self._update_Q()
             self._update_X_and_pi()
 
-            P = self.X / self.pi[:, None]
+            P = self._X_over_pi()
             _ll_new = self._log_likelihood_biased(self._C_active, P, self.m, self.mhat, self.w)
             # decrease slope in Lagrange space (only used if loop is repeated, e.g. if sanity checks fail)
             frac *= 0.1
@@ -1734,8 +1756,8 @@ class AugmentedMarkovModel(MaximumLikelihoodMSM):
         self._full2active[self.active_set] = _np.arange(len(self.active_set))
 
         # slice out active states from E matrix
-        _dset = list(set(_np.concatenate(dtrajs)))
-        _rras = [_dset.index(s) for s in self.active_set]
+        _dset = {s: i for i, s in enumerate(set(_np.concatenate(dtrajs)))}
+        _rras = [_dset[s] for s in self.active_set]
         self.E_active = self.E[_rras]
 
         if not self.sparse:
@@ -1744,8 +1766,22 @@ class AugmentedMarkovModel(MaximumLikelihoodMSM):
 
         # reversibly counted
         self._C2 = 0.5 * (self._C_active + self._C_active.T)
-        self._nz = _np.nonzero(self._C2)
-        self._csum = _np.sum(self._C_active, axis=1)  # row sums C
+        self._csum = _np.asarray(self._C_active.sum(axis=1)).reshape(-1)  # row sums C
+        # preallocate the iteration matrix X and the denominator D of its update
+        if self.sparse:
+            import scipy.sparse
+            self._C2 = scipy.sparse.csr_matrix(self._C2)
+            self._C2.eliminate_zeros()
+            self._C2.sort_indices()
+            self._C2_rows = _np.repeat(_np.arange(self._C2.shape[0]), _np.diff(self._C2.indptr))
+            self.X = scipy.sparse.csr_matrix(
+                (_np.zeros_like(self._C2.data), self._C2.indices.copy(), self._C2.indptr.copy()),
+                shape=self._C2.shape)
+            self._D = _np.empty_like(self._C2.data)
+        else:
+            self._nz = _np.nonzero(self._C2)
+            self.X = _np.zeros_like(self._C2)
+            self._D = _np.empty_like(self._C2)
 
         # get ranges of Markov model expectation values
         if self.support_ci == 1:
@@ -1785,10 +1821,9 @@ class AugmentedMarkovModel(MaximumLikelihoodMSM):
         self._update_mhat()
         self._dmhat = 1e-1 * _np.ones(_np.shape(self.mhat))
 
-        # Determine number of slices of R-tensors computable at once with the given cache size
-        self._slicesz = _np.floor(self.max_cache / (self.P.nbytes / 1.e6)).astype(int)
-        # compute first bundle of slices
-        self._update_Rslices(0)
+        # compute the R tensor
+        self._R = _np.empty(_np.shape(self.E_active))
+        self._update_Rslices()
 
         self._ll_old = self._log_likelihood_biased(self._C_active, self.P, self.m, self.mhat, self.w)
 
@@ -1830,7 +1865,7 @@ class AugmentedMarkovModel(MaximumLikelihoodMSM):
             if i > 1:
                 X_old = self.X.copy()
                 self._update_X_and_pi()
-                if _np.any(self.X[self._nz] < 0) and i > 0:
+                if _np.any((self.X.data if self.sparse else self.X[self._nz]) < 0) and i > 0:
                     die = True
                     self.logger.warn(
                         "Warning: new X is not proportional to C... reverting to previous step and terminating")
@@ -1839,7 +1874,7 @@ class AugmentedMarkovModel(MaximumLikelihoodMSM):
             if not converged:
                 self._newton_lagrange()
             else:  # once Lagrange multipliers are converged compute likelihood here
-                P = self.X / self.pi[:, None]
+                P = self._X_over_pi()
                 _ll_new = self._log_likelihood_biased(self._C_active, P, self.m, self.mhat, self.w)
                 self._lls.append(_ll_new)
 
@@ -1861,7 +1896,7 @@ class AugmentedMarkovModel(MaximumLikelihoodMSM):
                 break
             if i == self.maxiter:
                 self.logger.info("Failed to converge within %i iterations. "
-                                 "Consider increasing max_iter(now=%i)" % (i, self.max_iter))
+                                 "Consider increasing max_iter(now=%i)" % (i, self.maxiter))
             i += 1
 
         _P = msmest.tmatrix(self._C_active, reversible=True, mu=self._pihat)
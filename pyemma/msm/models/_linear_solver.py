@@ -0,0 +1,155 @@
+# This file is part of PyEMMA.
+#
+# Copyright (c) 2018 Computational Molecular Biology Group, Freie Universitaet Berlin (GER)
+#
+# PyEMMA is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+r"""Linear solvers for the hitting problems of Markov models
+
+Mean first passage times and committors are solutions of linear systems with the
+generator :math:`I - P` restricted to the states outside of a set of excluded
+(target) states. The restricted generator only depends on the excluded set, such
+that its factorization can be reused for all right-hand sides and for the
+transposed systems of backward committors.
+
+"""
+
+import logging
+
+import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.linalg
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['RestrictedGeneratorSolver']
+
+
+def _iterative_solve(solver, A, b, M, tol, maxiter):
+    # scipy renamed the relative tolerance from tol to rtol
+    try:
+        return solver(A, b, M=M, rtol=tol, atol=0., maxiter=maxiter)
+    except TypeError:
+        return solver(A, b, M=M, tol=tol, atol=0., maxiter=maxiter)
+
+
+class RestrictedGeneratorSolver(object):
+    r"""Solves linear systems with the generator :math:`I - P` restricted to the complement of an excluded set
+
+    Dense transition matrices are LU factorized once. Sparse transition matrices are
+    factorized by a sparse LU factorization, or, if its factors do not fit into memory,
+    the systems can be solved by GMRES or BiCGSTAB, preconditioned by an incomplete LU
+    factorization. Note that the restricted generators of metastable models are badly
+    conditioned, such that the iterative solvers may need many iterations.
+
+    Parameters
+    ----------
+    P : ndarray(n, n) or scipy.sparse matrix
+        transition matrix
+    excluded : int-array
+        excluded states, e.g. the target states of a hitting problem
+    method : str, optional, default='direct'
+        solver for sparse transition matrices, one of 'direct', 'gmres' or 'bicgstab'.
+        If the incomplete factorization or the iteration fails, the direct solver is used.
+    tol : float, optional, default=1e-12
+        relative residual tolerance of the iterative solvers
+    maxiter : int, optional, default=200
+        maximum number of iterations of the iterative solvers (restart cycles for GMRES)
+
+    Attributes
+    ----------
+    inside : int-array
+        the states the restricted generator is defined on, in increasing order
+
+    """
+
+    def __init__(self, P, excluded, method='direct', tol=1e-12, maxiter=200):
+        if method not in ('direct', 'gmres', 'bicgstab'):
+            raise ValueError('Unknown linear solver ' + str(method) + ', use direct, gmres or bicgstab')
+        n = P.shape[0]
+        self.inside = np.setdiff1d(np.arange(n), excluded)
+        self.method = method
+        self.tol = tol
+        self.maxiter = maxiter
+        self.sparse = scipy.sparse.issparse(P)
+        if len(self.inside) == 0:
+            self.sparse = False
+            self._lu = None
+        elif self.sparse:
+            P = P.tocsr()
+            self._A = (scipy.sparse.identity(len(self.inside), format='csr')
+                       - P[self.inside][:, self.inside]).tocsc()
+            self._AT = None
+            self._lu = None
+            self._ilu = None
+            if method != 'direct':
+                try:
+                    self._ilu = scipy.sparse.linalg.spilu(self._A, drop_tol=1e-6, fill_factor=10)
+                except RuntimeError:
+                    logger.debug('incomplete LU factorization failed, using the direct solver')
+                    self.method = 'direct'
+            if self.method == 'direct':
+                self._factorize()
+        else:
+            self._lu = scipy.linalg.lu_factor(np.eye(len(self.inside)) - P[np.ix_(self.inside, self.inside)])
+
+    def _factorize(self):
+        if self._lu is None:
+            self._lu = scipy.sparse.linalg.splu(self._A)
+        return self._lu
+
+    def solve(self, b, trans=False):
+        r"""Solves :math:`(I - P)_{XX} x = b` for the states X inside
+
+        Parameters
+        ----------
+        b : ndarray(m) or ndarray(m, k)
+            right-hand side(s) on the inside states. Several right-hand sides are
+            solved at once with the same factorization.
+        trans : bool, optional, default=False
+            solve the transposed system instead.
+
+        Returns
+        -------
+        x : ndarray(m) or ndarray(m, k)
+            solution(s)
+
+        """
+        b = np.asarray(b, dtype=np.float64)
+        if len(self.inside) == 0:
+            return b
+        if not self.sparse:
+            return scipy.linalg.lu_solve(self._lu, b, trans=1 if trans else 0)
+        if self.method == 'direct':
+            return self._factorize().solve(b, trans='T' if trans else 'N')
+        if b.ndim == 1:
+            return self._solve_iterative(b, trans)
+        return np.column_stack([self._solve_iterative(b[:, i], trans) for i in range(b.shape[1])])
+
+    def _solve_iterative(self, b, trans):
+        if not np.any(b):
+            return np.zeros_like(b)
+        if trans and self._AT is None:
+            self._AT = self._A.T.tocsr()
+        A = self._AT if trans else self._A
+        mode = 'T' if trans else 'N'
+        M = scipy.sparse.linalg.LinearOperator(A.shape, matvec=lambda x: self._ilu.solve(x, trans=mode),
+                                               dtype=np.float64)
+        solver = scipy.sparse.linalg.gmres if self.method == 'gmres' else scipy.sparse.linalg.bicgstab
+        x, info = _iterative_solve(solver, A, b, M, self.tol, self.maxiter)
+        if info != 0:
+            logger.warning('%s did not converge (info=%i), using the direct solver', self.method, info)
+            x = self._factorize().solve(b, trans=mode)
+        return x
@@ -177,6 +177,8 @@ class MSM(_Model, SerializableMixIn):
     @P.setter
     def P(self, value):
         self._P = value
+        # factorizations for hitting problems are only valid for this transition matrix
+        self._linear_solvers = None
         import msmtools.analysis as msmana
         # check input
         if self._P is not None:
@@ -493,6 +495,52 @@ class MSM(_Model, SerializableMixIn):
     # Hitting problems
     ################################################################################
 
+    # number of restricted generator factorizations kept for hitting problems with different target sets
+    _linear_solvers_max = 8
+    _linear_solver = 'direct'
+    _linear_solvers = None
+
+    @property
+    def linear_solver(self):
+        r""" Linear solver for mean first passage times and committors of sparse models
+
+        One of 'direct' (default) for a sparse LU factorization, or 'gmres' or
+        'bicgstab', both preconditioned by an incomplete LU factorization, for models
+        whose LU factors do not fit into memory. Dense models always use a LU
+        factorization. The factorizations of the last few sets of target states are
+        kept, such that repeated queries with the same target states only need to solve.
+
+        """
+        return self._linear_solver
+
+    @linear_solver.setter
+    def linear_solver(self, value):
+        if value not in ('direct', 'gmres', 'bicgstab'):
+            raise ValueError('Unknown linear solver ' + str(value) + ', use direct, gmres or bicgstab')
+        self._linear_solver = value
+        self._linear_solvers = None
+
+    def _restricted_solver(self, P, excluded):
+        """ Solver for the generator I - P restricted to the states not in excluded.
+
+        Solvers for the transition matrix of this model are cached by the excluded set.
+        """
+        from pyemma.msm.models._linear_solver import RestrictedGeneratorSolver
+        excluded = _np.unique(excluded)
+        if P is not self._P:
+            return RestrictedGeneratorSolver(P, excluded, method=self.linear_solver)
+        if self._linear_solvers is None:
+            from collections import OrderedDict
+            self._linear_solvers = OrderedDict()
+        key = tuple(excluded)
+        solver = self._linear_solvers.pop(key, None)
+        if solver is None:
+            solver = RestrictedGeneratorSolver(P, excluded, method=self.linear_solver)
+            while len(self._linear_solvers) >= self._linear_solvers_max:
+                self._linear_solvers.popitem(last=False)  # least recently used
+        self._linear_solvers[key] = solver
+        return solver
+
     def _assert_in_active(self, A):
         """
         Checks if set A is within the active set
@@ -507,9 +555,17 @@ class MSM(_Model, SerializableMixIn):
     def _mfpt(self, P, A, B, mu=None):
         self._assert_in_active(A)
         self._assert_in_active(B)
-        from msmtools.analysis import mfpt as __mfpt
-        # scale mfpt by lag time
-        return self._timeunit_model.dt * __mfpt(P, B, origin=A, mu=mu)
+        A = _types.ensure_int_vector(A)
+        if mu is None:
+            from msmtools.analysis import stationary_distribution
+            mu = stationary_distribution(P)
+        # mean first passage times of all states to B
+        solver = self._restricted_solver(P, B)
+        tB = _np.zeros(_np.shape(P)[0])
+        tB[solver.inside] = solver.solve(_np.ones(len(solver.inside)))
+        # average over A, scale mfpt by lag time
+        nuA = mu[A] / _np.sum(mu[A])
+        return self._timeunit_model.dt * _np.dot(nuA, tB[A])
 
     def mfpt(self, A, B):
         """Mean first passage times from set A to set B, in units of the input trajectory time step
@@ -523,11 +579,23 @@ class MSM(_Model, SerializableMixIn):
         """
         return self._mfpt(self.transition_matrix, A, B, mu=self.stationary_distribution)
 
-    def _committor_forward(self, P, A, B):
+    def _committor_sets(self, A, B):
         self._assert_in_active(A)
         self._assert_in_active(B)
-        from msmtools.analysis import committor as __committor
-        return __committor(P, A, B, forward=True)
+        A = _types.ensure_int_vector(A)
+        B = _types.ensure_int_vector(B)
+        if _np.intersect1d(A, B).size > 0:
+            raise ValueError("Sets A and B have to be disjoint")
+        return A, B
+
+    def _committor_forward(self, P, A, B):
+        A, B = self._committor_sets(A, B)
+        solver = self._restricted_solver(P, _np.concatenate((A, B)))
+        q = _np.zeros(_np.shape(P)[0])
+        q[B] = 1.0
+        # (I - P) q = 0 on the remaining states: the flux into B is the right-hand side
+        q[solver.inside] = solver.solve(P.dot(q)[solver.inside])
+        return q
 
     def committor_forward(self, A, B):
         """Forward committor (also known as p_fold or splitting probability) from set A to set B
@@ -542,10 +610,19 @@ class MSM(_Model, SerializableMixIn):
         return self._committor_forward(self.transition_matrix, A, B)
 
     def _committor_backward(self, P, A, B, mu=None):
-        self._assert_in_active(A)
-        self._assert_in_active(B)
-        from msmtools.analysis import committor as __committor
-        return __committor(P, A, B, forward=False, mu=mu)
+        A, B = self._committor_sets(A, B)
+        if mu is None:
+            from msmtools.analysis import stationary_distribution
+            mu = stationary_distribution(P)
+        # same restricted generator as the forward committor, transposed for the time-reversed process:
+        # (I - P)^T (mu q) = 0 on the remaining states
+        solver = self._restricted_solver(P, _np.concatenate((A, B)))
+        muA = _np.zeros(_np.shape(P)[0])
+        muA[A] = mu[A]
+        q = _np.zeros(_np.shape(P)[0])
+        q[A] = 1.0
+        q[solver.inside] = solver.solve(P.T.dot(muA)[solver.inside], trans=True) / mu[solver.inside]
+        return q
 
     def committor_backward(self, A, B):
         """Backward committor from set A to set B
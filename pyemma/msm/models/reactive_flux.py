@@ -21,7 +21,11 @@ analysis of Markov models.
 __moduleauthor__ = "Benjamin Trendelkamp-Schroer, Frank Noe"
 
 """
+import heapq
+import warnings
+
 import numpy as np
+import scipy.sparse
 
 from msmtools import flux as tptapi
 
@@ -34,6 +38,181 @@ from pyemma.util.annotators import alias, aliased
 
 __all__ = ['ReactiveFlux']
 
+
+def _widest_path(graph, rank, sources, targets, threshold):
+    r"""Finds a path from sources to targets that maximizes the smallest edge rank on the path
+
+    Dijkstra search in which the width of a path is the smallest rank of its edges. Only edges
+    with a rank larger than threshold are used. Nodes are settled in the order of decreasing
+    width, such that the search stops when the first target is settled.
+
+    Parameters
+    ----------
+    graph : tuple of lists
+        (indptr, indices, rows) of the CSR flux matrix, rows being the row index of each edge
+    rank : list of int
+        rank of every edge, -1 for removed edges
+    sources, targets : frozenset of int
+        start and end nodes
+    threshold : int
+        only edges with a larger rank are used
+
+    Returns
+    -------
+    edges : list of int
+        indexes of the path edges, in path order. None if no target can be reached.
+
+    """
+    indptr, indices, rows = graph
+    # the search usually stays in a small part of the graph, so only visited nodes are stored
+    width = {}
+    pred = {}
+    heap = []
+    for a in sources:
+        width[a] = len(rank)
+        heap.append((-len(rank), a))
+    heapq.heapify(heap)
+    while heap:
+        w, u = heapq.heappop(heap)
+        w = -w
+        if w < width[u]:
+            continue  # outdated entry, u was already settled with a larger width
+        if u in targets:
+            edges = []
+            while u not in sources:
+                edges.append(pred[u])
+                u = rows[pred[u]]
+            return edges[::-1]
+        width[u] = w + 1  # settled, larger than any width it could be offered again
+        for e in range(indptr[u], indptr[u + 1]):
+            r = rank[e]
+            if r <= threshold:
+                continue
+            v = indices[e]
+            wv = r if r < w else w
+            if wv > width.get(v, -1):
+                width[v] = wv
+                pred[v] = e
+                heapq.heappush(heap, (-wv, v))
+    return None
+
+
+def _dominant_path(graph, rank, sources, targets):
+    r"""Dominant reaction pathway from sources to targets
+
+    The path is found recursively [1]_: the bottleneck, i.e. the smallest edge of the widest path,
+    is fixed and the dominant paths from the sources to the bottleneck and from the bottleneck
+    to the targets are found among the edges larger than the bottleneck.
+
+    Returns
+    -------
+    path : list of int
+        nodes of the path. None if no target can be reached.
+
+    References
+    ----------
+    .. [1] P. Metzner, C. Schuette and E. Vanden-Eijnden.
+        Transition Path Theory for Markov Jump Processes.
+        Multiscale Model Simul 7: 1192-1219 (2009)
+
+    """
+    indptr, indices, rows = graph
+    # nodes (int) and unresolved path segments (tuple), resolved from left to right
+    stack = [(sources, targets, -1)]
+    path = []
+    while stack:
+        item = stack.pop()
+        if not isinstance(item, tuple):
+            path.append(item)
+            continue
+        seg_sources, seg_targets, threshold = item
+        edges = _widest_path(graph, rank, seg_sources, seg_targets, threshold)
+        if edges is None:
+            return None
+        bottleneck = min(edges, key=rank.__getitem__)
+        b1 = rows[bottleneck]
+        b2 = indices[bottleneck]
+        r = rank[bottleneck]
+        # push the right part first, such that the left part is resolved first
+        stack.append(b2 if b2 in seg_targets else (frozenset([b2]), seg_targets, r))
+        stack.append(b1 if b1 in seg_sources else (seg_sources, frozenset([b1]), r))
+    return path
+
+
+def _pathways(F, A, B, fraction=1.0, maxiter=1000, tol=1e-14):
+    r"""Decomposes the flux network F into dominant reaction pathways from A to B
+
+    Pathways are found one after the other by :func:`_dominant_path` on the CSR flux matrix.
+    The capacity of every pathway is subtracted from the flux of its edges in place, until
+    the requested fraction of the total flux is explained.
+
+    Edges are ranked by their flux, ties being broken by their position in the CSR matrix,
+    such that bottlenecks are unique.
+
+    """
+    F = scipy.sparse.csr_matrix(F, dtype=np.float64, copy=True)
+    F.sum_duplicates()
+    indptr, indices, flux = F.indptr, F.indices, F.data
+    rows = np.repeat(np.arange(F.shape[0]), np.diff(indptr))
+    graph = (indptr.tolist(), indices.tolist(), rows.tolist())
+    sources = frozenset(int(a) for a in A)
+    targets = frozenset(int(b) for b in B)
+    in_A = np.zeros(F.shape[0], dtype=bool)
+    in_A[list(sources)] = True
+    total = flux[in_A[rows]].sum()
+    explained = 0.0
+    paths = []
+    capacities = []
+    rank = np.empty(len(flux), dtype=int)
+    while True:
+        rank[np.argsort(flux, kind='mergesort')] = np.arange(len(flux))
+        rank[flux <= 0] = -1  # removed edges
+        path = _dominant_path(graph, rank.tolist(), sources, targets)
+        if path is None:
+            break
+        # edges of the path: position of column path[t+1] within row path[t]
+        edges = np.array([indptr[i] + np.searchsorted(indices[indptr[i]:indptr[i + 1]], j)
+                          for i, j in zip(path[:-1], path[1:])], dtype=int)
+        c = flux[edges].min()
+        paths.append(np.array(path))
+        capacities.append(c)
+        explained += c
+        flux[edges] -= c
+        if abs(explained / total - fraction) <= tol or explained / total >= fraction:
+            break
+        if len(paths) > maxiter:
+            warnings.warn("Maximum number of iterations reached", RuntimeWarning)
+            break
+    return paths, capacities
+
+
+def _set_members(sets):
+    r"""Returns the states of all sets and the index of the set of each of these states"""
+    sizes = [len(s) for s in sets]
+    members = np.fromiter((i for s in sets for i in s), dtype=int, count=sum(sizes))
+    return members, np.repeat(np.arange(len(sets)), sizes)
+
+
+def _coarsegrain(F, sets):
+    r"""Sums up the flux F between the given sets, fluxes within a set are discarded
+
+    The coarse-grained flux is :math:`M^T F M` without its diagonal, where M is the
+    (n, nsets) indicator matrix of the sets. Sparse fluxes give a sparse result.
+
+    """
+    members, set_index = _set_members(sets)
+    M = scipy.sparse.csr_matrix((np.ones(len(members)), (members, set_index)), shape=(F.shape[0], len(sets)))
+    if scipy.sparse.issparse(F):
+        Fc = M.T.dot(F.tocsr()).dot(M).tolil()
+        Fc.setdiag(0)
+        Fc = Fc.tocsr()
+        Fc.eliminate_zeros()
+    else:
+        Fc = M.T.dot(M.T.dot(F).T).T
+        np.fill_diagonal(Fc, 0)
+    return Fc
+
+
 @aliased
 class ReactiveFlux(Model, SerializableMixIn):
     r"""A->B reactive flux from transition path theory (TPT)
@@ -227,8 +406,7 @@ class ReactiveFlux(Model, SerializableMixIn):
             Multiscale Model Simul 7: 1192-1219 (2009)
 
         """
-        return tptapi.pathways(self.net_flux, self.A, self.B,
-                               fraction=fraction, maxiter=maxiter)
+        return _pathways(self.net_flux, self.A, self.B, fraction=fraction, maxiter=maxiter)
 
     def _pathways_to_flux(self, paths, pathfluxes, n=None):
         r"""Sums up the flux from the pathways given
@@ -246,23 +424,23 @@ class ReactiveFlux(Model, SerializableMixIn):
 
         Returns
         -------
-        flux : (n,n) ndarray of float
-            the flux containing the summed path fluxes
+        flux : (n,n) ndarray of float or scipy sparse matrix
+            the flux containing the summed path fluxes. Sparse if the flux
+            of this object is sparse.
 
         """
         if n is None:
-            n = 0
-            for p in paths:
-                n = max(n, np.max(p))
-            n += 1
-
-        # initialize flux
-        F = np.zeros((n, n))
-        for i in range(len(paths)):
-            p = paths[i]
-            for t in range(len(p) - 1):
-                F[p[t], p[t + 1]] += pathfluxes[i]
-        return F
+            n = max(np.max(p) for p in paths) + 1
+
+        # all path edges at once, weighted by the flux of their path
+        paths = [np.asarray(p, dtype=int) for p in paths]
+        rows = np.concatenate([p[:-1] for p in paths] + [np.empty(0, dtype=int)])
+        cols = np.concatenate([p[1:] for p in paths] + [np.empty(0, dtype=int)])
+        weights = np.repeat(pathfluxes, [len(p) - 1 for p in paths])
+        F = scipy.sparse.coo_matrix((weights, (rows, cols)), shape=(n, n))  # duplicate edges are summed up
+        if scipy.sparse.issparse(self._flux):
+            return F.tocsr()
+        return F.toarray()
 
     def major_flux(self, fraction=0.9):
         r"""Returns the main pathway part of the net flux comprising
@@ -370,21 +548,18 @@ class ReactiveFlux(Model, SerializableMixIn):
         (tpt_sets, Aindexes, Bindexes) = self._compute_coarse_sets(user_sets)
         nnew = len(tpt_sets)
 
-        # coarse-grain fluxHere we should branch between sparse and dense implementations, but currently there is only a
-        F_coarse = tptapi.coarsegrain(self._gross_flux, tpt_sets)
+        # coarse-grain flux. Sparse fluxes stay sparse
+        F_coarse = _coarsegrain(self._gross_flux, tpt_sets)
         Fnet_coarse = tptapi.to_netflux(F_coarse)
 
-        # coarse-grain stationary probability and committors - this can be done all dense
-        pstat_coarse = np.zeros(nnew)
-        forward_committor_coarse = np.zeros(nnew)
-        backward_committor_coarse = np.zeros(nnew)
-        for i in range(0, nnew):
-            I = list(tpt_sets[i])
-            muI = self._mu[I]
-            pstat_coarse[i] = np.sum(muI)
-            partialI = muI / pstat_coarse[i]  # normalized stationary probability over I
-            forward_committor_coarse[i] = np.dot(partialI, self._qplus[I])
-            backward_committor_coarse[i] = np.dot(partialI, self._qminus[I])
+        # coarse-grain stationary probability and committors as stationary averages over the sets
+        members, set_index = _set_members(tpt_sets)
+        muI = self._mu[members]
+        pstat_coarse = np.bincount(set_index, weights=muI, minlength=nnew)
+        forward_committor_coarse = np.bincount(set_index, weights=muI * self._qplus[members],
+                                               minlength=nnew) / pstat_coarse
+        backward_committor_coarse = np.bincount(set_index, weights=muI * self._qminus[members],
+                                                minlength=nnew) / pstat_coarse
 
         res = ReactiveFlux(Aindexes, Bindexes, Fnet_coarse, mu=pstat_coarse,
                            qminus=backward_committor_coarse, qplus=forward_committor_coarse, gross_flux=F_coarse,
@@ -0,0 +1,99 @@
+# This file is part of PyEMMA.
+#
+# Copyright (c) 2018 Computational Molecular Biology Group, Freie Universitaet Berlin (GER)
+#
+# PyEMMA is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+r"""Benchmark of the AMM estimation against the former dense R-tensor implementation"""
+
+import time
+import numpy as np
+from msmtools.generation import generate_traj
+from pyemma.msm import AugmentedMarkovModel
+
+
+class DenseRTensorAMM(AugmentedMarkovModel):
+    """ Reference: the former dense estimation, which forms Q from cached (n, n) slices of the R-tensor """
+
+    def _update_Rslices(self, i=0):
+        if not hasattr(self, '_slicesz'):
+            # Determine number of slices of R-tensors computable at once with the given cache size
+            self._slicesz = np.floor(self.max_cache / (self.P.nbytes / 1.e6)).astype(int)
+        pek = self._pihat[:, None] * self.E_active[:, i * self._slicesz:(i + 1) * self._slicesz]
+        pp = self._pihat[:, None] + self._pihat[None, :]
+        ppmhat = pp * self.mhat[i * self._slicesz:(i + 1) * self._slicesz, None, None]
+        self._Rs = (pek[:, None, :] + pek[None, :, :]).T - ppmhat
+        self._Rsi = i
+
+    def _get_Rk(self, k):
+        if k > (self._Rsi + 1) * self._slicesz or k < self._Rsi * self._slicesz:
+            self._update_Rslices(np.floor(k / self._slicesz).astype(int))
+            return self._Rs[k % self._slicesz]
+        else:
+            return self._Rs[k % self._slicesz]
+
+    def _update_Q(self):
+        self._Q = np.zeros((self.n_mstates_active, self.n_mstates_active))
+        for k in range(self.n_exp_active):
+            self._Q = self._Q + self.w[k] * self._S[k] * self._get_Rk(k)
+        self._Q *= -2.
+
+    def _update_X_and_pi(self):
+        c_over_pi = self._csum / self.pi
+        D = c_over_pi[:, None] + c_over_pi + self._Q
+        self.X = self._C2 / D
+        self.X /= np.sum(self.X)
+        self.pi = np.sum(self.X, axis=1)
+
+
+def gen_data(n, k, length):
+    """ Random walk on a ring of n states with k observables """
+    P = np.zeros((n, n))
+    idx = np.arange(n)
+    P[idx, idx] = 0.5
+    P[idx, (idx + 1) % n] = 0.25
+    P[idx, (idx - 1) % n] = 0.25
+    dtraj = generate_traj(P, length, start=0)
+    E = np.random.rand(n, k)
+    m = E.mean(axis=0) + 0.1 * E.std(axis=0)
+    w = np.ones(k)
+    return dtraj, E, m, w
+
+
+def time_estimation(cls, dtraj, E, m, w, nrep=1, **kwargs):
+    t1 = time.time()
+    for r in range(nrep):
+        amm = cls(E=E, m=m, w=w, maxiter=50, **kwargs).estimate([dtraj])
+    t2 = time.time()
+    # return mean time and the estimate
+    return (t2 - t1) / float(nrep), amm
+
+
+def benchmark_amm(n=1000, k=10, length=200000, nrep=1):
+    dtraj, E, m, w = gen_data(n, k, length)
+    reftime, ref = time_estimation(DenseRTensorAMM, dtraj, E, m, w, nrep=nrep)
+    densetime, dense = time_estimation(AugmentedMarkovModel, dtraj, E, m, w, nrep=nrep)
+    sparsetime, sparse = time_estimation(AugmentedMarkovModel, dtraj, E, m, w, nrep=nrep, sparse=True)
+    err = max(np.max(np.abs(dense.pi - ref.pi)), np.max(np.abs(sparse.pi - ref.pi)))
+    print('n = %i\tk = %i\tR-tensor %.3f s\tdense %.3f s (%.1fx)\tsparse %.3f s (%.1fx)\tmax |dpi| = %.2e'
+          % (n, k, reftime, densetime, reftime / densetime, sparsetime, reftime / sparsetime, err))
+
+
+def main():
+    for n, k in [(100, 5), (500, 10), (1000, 10), (1000, 50), (2000, 20)]:
+        benchmark_amm(n=n, k=k)
+
+
+if __name__ == "__main__":
+    main()
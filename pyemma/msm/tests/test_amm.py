@@ -88,6 +88,27 @@ class TestAMMSimple(unittest.TestCase):
         self.assertTrue(np.allclose(self.AMM.pi, amm.pi))
         self.assertTrue(np.allclose(self.AMM.lagrange, amm.lagrange))
 
+    def test_AMM_sparse(self):
+        """ sparse estimation agrees with the dense one """
+        amm = AugmentedMarkovModel(E=self.E, m=self.m, w=self.w, sparse=True)
+        amm.estimate([self.dtraj])
+        self.assertTrue(amm.is_sparse)
+        self.assertTrue(np.allclose(self.AMM.P, amm.P.toarray()))
+        self.assertTrue(np.allclose(self.AMM.pi, amm.pi))
+        self.assertTrue(np.allclose(self.AMM.lagrange, amm.lagrange))
+        self.assertTrue(np.allclose(self.AMM.mhat, amm.mhat))
+
+    def test_Q(self):
+        """ Q = q_i + q_j agrees with the weighted sum of the R-tensor slices """
+        pihat, E, mhat = self.AMM._pihat, self.AMM.E_active, self.AMM.mhat
+        pek = pihat[:, None] * E
+        pp = pihat[:, None] + pihat[None, :]
+        R = (pek[:, None, :] + pek[None, :, :]).T - pp * mhat[:, None, None]
+        Q = -2. * np.sum(self.AMM.w[:, None, None] * self.AMM._S[:, None, None] * R, axis=0)
+        self.AMM._update_Rslices()
+        self.AMM._update_Q()
+        assert_allclose(Q, self.AMM._q[:, None] + self.AMM._q[None, :])
+
 
 class TestAMMDoubleWell(_tmsm):
 
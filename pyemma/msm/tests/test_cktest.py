@@ -211,6 +211,30 @@ class TestCK_AllEstimators(unittest.TestCase):
         assert ck.predictions_conf[0] is None
         assert ck.predictions_conf[1] is None
 
+    def test_ck_msm_propagate(self):
+        MLMSM = msm.estimate_markov_model([self.double_well_data.dtraj_T100K_dt10_n6good], 40)
+        mlags = [0, 1, 3, 10]
+        ck = MLMSM.cktest(2, mlags=mlags)
+        # reference: propagate every set distribution separately
+        for k, pred in zip(mlags, ck.predictions):
+            for i in range(2):
+                pk = MLMSM.propagate(ck.P0[:, i], k)
+                np.testing.assert_allclose(pred[i], pk.dot(ck.memberships), atol=1e-10)
+
+    def test_ck_bmsm_propagate(self):
+        BMSM = msm.bayesian_markov_model([self.double_well_data.dtraj_T100K_dt10_n6good], 40, nsamples=20)
+        mlags = [0, 1, 10]
+        ck = BMSM.cktest(2, mlags=mlags)
+        L, R = ck.predictions_conf
+        # reference: propagate every set distribution with every sample separately
+        from pyemma.util.statistics import confidence_interval
+        for k, l, r in zip(mlags[1:], L[1:], R[1:]):
+            for i in range(2):
+                samples = [pk.dot(ck.memberships) for pk in BMSM.sample_f('propagate', ck.P0[:, i], k)]
+                l_ref, r_ref = confidence_interval(samples, conf=ck.conf)
+                np.testing.assert_allclose(l[i], l_ref, atol=1e-10)
+                np.testing.assert_allclose(r[i], r_ref, atol=1e-10)
+
     def test_its_bmsm(self):
         BMSM = msm.bayesian_markov_model([self.double_well_data.dtraj_T100K_dt10_n6good], 40, reversible=True)
         # also ensure that reversible bit does not flip during cktest
@@ -53,6 +53,18 @@ class TestDtrajStats(unittest.TestCase):
         # check that the original count matrix remains unmodified
         np.testing.assert_equal(dts.count_matrix().todense(), C_mincount0)
 
+    def test_count_lagged_multi(self):
+        dtrajs = [np.random.randint(-1, 5, size=100), np.random.randint(0, 5, size=7), np.array([0, 1])]
+        for count_mode in ('sliding', 'sample'):
+            dts = DiscreteTrajectoryStats(dtrajs)
+            dts.count_lagged_multi([1, 3, 10], count_mode=count_mode)
+            for lag in [1, 3, 10]:
+                dts.count_lagged(lag, count_mode=count_mode)
+                C_ref = msmtools.estimation.count_matrix(dtrajs, lag, sliding=count_mode == 'sliding')
+                np.testing.assert_equal(dts.count_matrix().toarray(), C_ref.toarray())
+        with self.assertRaises(ValueError):
+            dts.count_lagged_multi([1000])
+
     def test_core_sets(self):
         dtrajs   = [np.array([0, 0, 2, 0, 0, 3, 0, 5, 5, 5, 0, 0, 6, 8, 4, 1, 2, 0, 3])]
         expected = [np.array([-1, -1, 2, 2, 2, 3, 3, 5, 5, 5, 5, 5, 6, 6, 4, 4, 2, 2, 3])]
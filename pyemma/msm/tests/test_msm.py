@@ -658,6 +658,35 @@ class TestMSMDoubleWell(unittest.TestCase):
         self._mfpt(self.msmrev_sparse)
         self._mfpt(self.msm_sparse)
 
+    def _linear_solver(self, msm):
+        from msmtools.analysis import committor, mfpt
+        a = [15, 16]
+        b = [47, 48]
+        ref_mfpt = mfpt(msm.P, b, origin=a, tau=msm.lag)
+        ref_forward = committor(msm.P, a, b, forward=True)
+        ref_backward = committor(msm.P, a, b, forward=False)
+        try:
+            for method in ('gmres', 'bicgstab', 'direct'):
+                msm.linear_solver = method
+                np.testing.assert_allclose(msm.mfpt(a, b), ref_mfpt, rtol=1e-6)
+                np.testing.assert_allclose(msm.committor_forward(a, b), ref_forward, atol=1e-8)
+                np.testing.assert_allclose(msm.committor_backward(a, b), ref_backward, atol=1e-8)
+                # forward and backward committor share the factorization for a and b,
+                # mfpt uses the one for b only
+                assert len(msm._linear_solvers) == 2
+        finally:
+            msm.linear_solver = 'direct'
+        with self.assertRaises(ValueError):
+            msm.linear_solver = 'cg'
+        with self.assertRaises(ValueError):
+            msm.committor_forward(a, a)
+
+    def test_linear_solver(self):
+        self._linear_solver(self.msmrev)
+        self._linear_solver(self.msm)
+        self._linear_solver(self.msmrev_sparse)
+        self._linear_solver(self.msm_sparse)
+
     # ---------------------------------
     # PCCA
     # ---------------------------------
@@ -32,6 +32,7 @@ import pkg_resources
 from pyemma.msm import estimate_markov_model
 from pyemma.msm import markov_model
 from pyemma.msm.estimators.maximum_likelihood_msm import OOMReweightedMSM
+from pyemma.msm.estimators._OOM_MSM import bootstrapping_dtrajs, bootstrapping_count_matrix
 from pyemma.util.linalg import _sort_by_norm
 from pyemma.util.discrete_trajectories import count_states
 import msmtools.estimation as msmest
@@ -894,6 +895,59 @@ class TestMSMFiveState(unittest.TestCase):
 
 
 
+class TestBootstrapping(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        data = np.load(pkg_resources.resource_filename('pyemma.msm.tests', "data/TestData_OOM_MSM.npz"))
+        cls.dtrajs = [data['arr_%d'%k] for k in range(100)]
+        cls.tau = 5
+        cls.active_set = np.array([0, 1, 2, 4])
+
+    def _reference_dtrajs(self, nbs):
+        # one re-sampling at a time
+        Q = len(self.dtrajs)
+        Ct_traj = np.zeros((Q, 5, 5))
+        for q, traj in enumerate(self.dtrajs):
+            np.add.at(Ct_traj[q], (traj[:-self.tau], traj[self.tau:]), 1)
+        Ct_traj = Ct_traj[:, self.active_set, :][:, :, self.active_set]
+        svals = np.array([scl.svdvals(Ct_traj[np.random.choice(Q, Q, replace=True)].sum(axis=0))
+                          for _ in range(nbs)])
+        return np.mean(svals, axis=0), np.std(svals, axis=0)
+
+    def test_bootstrapping_dtrajs(self):
+        np.random.seed(42)
+        smean_ref, sdev_ref = self._reference_dtrajs(2000)
+        results = []
+        for n_jobs in (1, 3):
+            np.random.seed(42)
+            results.append(bootstrapping_dtrajs(self.dtrajs, self.tau, 5, nbs=2000, active_set=self.active_set,
+                                                batch_size=300, n_jobs=n_jobs))
+            np.testing.assert_allclose(results[-1][0], smean_ref, rtol=0.05)
+            np.testing.assert_allclose(results[-1][1], sdev_ref, rtol=0.15)
+        # the random draws do not depend on the number of threads
+        np.testing.assert_array_almost_equal(results[0][0], results[1][0])
+        np.testing.assert_array_almost_equal(results[0][1], results[1][1])
+
+    def test_bootstrapping_count_matrix(self):
+        Ct = scipy.sparse.csr_matrix(msmest.count_matrix(self.dtrajs, self.tau).toarray()[:4, :4])
+        np.random.seed(42)
+        smean, sdev = bootstrapping_count_matrix(Ct, nbs=2000, n_jobs=2)
+        # the small singular values are biased by the noise, compare the dominant ones
+        np.testing.assert_allclose(smean[:2], scl.svdvals(Ct.toarray())[:2], rtol=0.01)
+        self.assertTrue(np.all(sdev > 0))
+
+    def test_early_stopping(self):
+        np.random.seed(42)
+        smean, sdev = bootstrapping_dtrajs(self.dtrajs, self.tau, 5, nbs=2000, active_set=self.active_set,
+                                           batch_size=300, n_jobs=2)
+        np.random.seed(42)
+        smean_tol, sdev_tol = bootstrapping_dtrajs(self.dtrajs, self.tau, 5, nbs=10**7,
+                                                   active_set=self.active_set, batch_size=300, n_jobs=2, tol=1e-2)
+        np.testing.assert_allclose(smean_tol, smean, rtol=0.05)
+        np.testing.assert_allclose(sdev_tol, sdev, rtol=0.2)
+
+
 class TestMSM_Incomplete(unittest.TestCase):
 
     @classmethod
@@ -182,6 +182,45 @@ class TestReactiveFluxFunctions(unittest.TestCase):
         # 0.99 flux
         assert_allclose(self.tpt1.major_flux(fraction=0.95), self.ref_majorflux_95percent, rtol=1e-02, atol=1e-07)
 
+    def test_pathways_sparse(self):
+        from scipy.sparse import csr_matrix
+        tpt_sparse = msmapi.ReactiveFlux(self.A, self.B, csr_matrix(self.tpt1.net_flux), mu=self.tpt1.mu,
+                                         qminus=self.tpt1.qminus, qplus=self.tpt1.qplus,
+                                         gross_flux=csr_matrix(self.tpt1.gross_flux))
+        (paths, pathfluxes) = tpt_sparse.pathways()
+        self.assertEqual(len(paths), len(self.ref_paths))
+        for i in range(len(paths)):
+            np.testing.assert_equal(paths[i], self.ref_paths[i])
+        assert_allclose(pathfluxes, self.ref_pathfluxes, rtol=1e-02, atol=1e-07)
+        # sparse fluxes give a sparse major flux
+        assert_allclose(tpt_sparse.major_flux(fraction=0.95).toarray(), self.ref_majorflux_95percent,
+                        rtol=1e-02, atol=1e-07)
+
+    def test_pathways_ties(self):
+        # two pathways of equal capacity are both found, in the order of the flux matrix
+        F = np.array([[0., 1., 1., 0.],
+                      [0., 0., 0., 1.],
+                      [0., 0., 0., 1.],
+                      [0., 0., 0., 0.]])
+        tpt_ties = msmapi.ReactiveFlux([0], [3], F, mu=np.ones(4) / 4., qminus=np.array([1., .5, .5, 0.]),
+                                       qplus=np.array([0., .5, .5, 1.]))
+        (paths, pathfluxes) = tpt_ties.pathways()
+        np.testing.assert_equal(paths, [[0, 2, 3], [0, 1, 3]])
+        assert_allclose(pathfluxes, [1., 1.])
+
+    def test_coarse_grain_sparse(self):
+        from scipy.sparse import csr_matrix
+        tpt2_sparse = msmapi.ReactiveFlux(self.A2, self.B2, csr_matrix(self.tpt2.net_flux), mu=self.tpt2.mu,
+                                          qminus=self.tpt2.qminus, qplus=self.tpt2.qplus,
+                                          gross_flux=csr_matrix(self.tpt2.gross_flux))
+        (tpt_sets, cgRF) = tpt2_sparse.coarse_grain(self.coarsesets2)
+        self.assertEqual(tpt_sets, self.ref2_tpt_sets)
+        assert_allclose(cgRF.stationary_distribution, self.ref2_cgpstat)
+        assert_allclose(cgRF.committor, self.ref2_cgcommittor)
+        assert_allclose(cgRF.backward_committor, self.ref2_cgbackwardcommittor)
+        assert_allclose(cgRF.net_flux.toarray(), self.ref2_cgnetflux, rtol=1.e-5, atol=1.e-8)
+        assert_allclose(cgRF.gross_flux.toarray(), self.ref2_cggrossflux, rtol=1.e-5, atol=1.e-8)
+
     def test_coarse_grain(self):
         (tpt_sets, cgRF) = self.tpt2.coarse_grain(self.coarsesets2)
         self.assertEqual(tpt_sets, self.ref2_tpt_sets)
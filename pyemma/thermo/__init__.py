@@ -48,11 +48,12 @@ use the API functions above.
     MBAR
     DTRAM
     TRAM
+    FixedPointAccelerator
 
 """
 
 from pyemma.thermo.models import StationaryModel, MultiThermModel, MEMM
-from pyemma.thermo.estimators import WHAM, MBAR, DTRAM, TRAM, EmptyState
+from pyemma.thermo.estimators import WHAM, MBAR, DTRAM, TRAM, EmptyState, FixedPointAccelerator
 
 # high-level api
 from .api import *
@@ -19,6 +19,7 @@ import numpy as _np
 from pyemma.util import types as _types
 from .util import get_averaged_bias_matrix as _get_averaged_bias_matrix
 from .util import assign_unbiased_state_label as _assign_unbiased_state_label
+from .util.util import _as_bias_array
 
 __docformat__ = "restructuredtext en"
 __author__ = "Frank Noe, Christoph Wehmeyer"
@@ -43,7 +44,7 @@ def estimate_umbrella_sampling(
     us_trajs, us_dtrajs, us_centers, us_force_constants, md_trajs=None, md_dtrajs=None, kT=None,
     maxiter=10000, maxerr=1.0E-15, save_convergence_info=0,
     estimator='wham', lag=1, dt_traj='1 step', init=None, init_maxiter=10000, init_maxerr=1.0E-8,
-    width=None, **kwargs):
+    width=None, lazy_bias=False, bias_dtype=_np.float64, **kwargs):
     r"""
     This function acts as a wrapper for ``tram()``, ``dtram()``, ``mbar()``, and ``wham()`` and
     handles the calculation of bias energies (``bias``) and thermodynamic state trajectories
@@ -116,6 +117,13 @@ def estimate_umbrella_sampling(
         Specify periodicity for individual us_traj dimensions. Each positive entry will make the
         corresponding feature periodic and use the given value as width. None/zero values will be
         treated as non-periodic.
+    lazy_bias : bool, optional, default=False
+        Evaluate the bias energies chunk by chunk when needed instead of keeping them in memory.
+        WHAM and dTRAM accumulate the averaged bias matrix chunk by chunk, TRAM and MBAR work on a
+        temporary memory-mapped file.
+    bias_dtype : numpy.dtype, optional, default=numpy.float64
+        Type of the bias energies, e.g. numpy.float32 to halve their memory footprint. TRAM and
+        MBAR always use double precision internally.
     **kwargs : dict, optional
         You can use this to pass estimator-specific named parameters to the chosen estimator, which
         are not already coverd by ``estimate_umbrella_sampling()``.
@@ -233,24 +241,27 @@ def estimate_umbrella_sampling(
             i += 1
     # data preparation
     ttrajs, btrajs, umbrella_centers, force_constants, unbiased_state = _get_umbrella_sampling_data(
-        us_trajs, us_centers, us_force_constants, md_trajs=md_trajs, kT=kT, width=width)
+        us_trajs, us_centers, us_force_constants, md_trajs=md_trajs, kT=kT, width=width,
+        lazy_bias=lazy_bias, bias_dtype=bias_dtype)
     estimator_obj = None
     # estimation
     if estimator == 'wham':
+        allowed_keys = ['solver']
+        parsed_kwargs = dict([(i, kwargs[i]) for i in allowed_keys if i in kwargs])
         estimator_obj = wham(
             ttrajs, us_dtrajs + md_dtrajs,
             _get_averaged_bias_matrix(btrajs, us_dtrajs + md_dtrajs),
             maxiter=maxiter, maxerr=maxerr,
-            save_convergence_info=save_convergence_info, dt_traj=dt_traj)
+            save_convergence_info=save_convergence_info, dt_traj=dt_traj, **parsed_kwargs)
     elif estimator == 'mbar':
-        allowed_keys = ['direct_space']
+        allowed_keys = ['direct_space', 'solver']
         parsed_kwargs = dict([(i, kwargs[i]) for i in allowed_keys if i in kwargs])
         estimator_obj = mbar(
             ttrajs, us_dtrajs + md_dtrajs, btrajs,
             maxiter=maxiter, maxerr=maxerr, save_convergence_info=save_convergence_info,
             dt_traj=dt_traj, **parsed_kwargs)
     elif estimator == 'dtram':
-        allowed_keys = ['count_mode', 'connectivity']
+        allowed_keys = ['count_mode', 'connectivity', 'solver']
         parsed_kwargs = dict([(i, kwargs[i]) for i in allowed_keys if i in kwargs])
         estimator_obj = dtram(
             ttrajs, us_dtrajs + md_dtrajs,
@@ -262,7 +273,8 @@ def estimate_umbrella_sampling(
     elif estimator == 'tram':
         allowed_keys = [
             'count_mode', 'connectivity', 'connectivity_factor','nn',
-            'direct_space', 'N_dtram_accelerations', 'equilibrium', 'overcounting_factor', 'callback']
+            'direct_space', 'N_dtram_accelerations', 'equilibrium', 'overcounting_factor', 'callback',
+            'solver']
         parsed_kwargs = dict([(i, kwargs[i]) for i in allowed_keys if i in kwargs])
         estimator_obj = tram(
             ttrajs, us_dtrajs + md_dtrajs, btrajs, lag, unbiased_state=unbiased_state,
@@ -285,7 +297,7 @@ def estimate_multi_temperature(
     energy_unit='kcal/mol', temp_unit='K', reference_temperature=None,
     maxiter=10000, maxerr=1.0E-15, save_convergence_info=0,
     estimator='wham', lag=1, dt_traj='1 step', init=None, init_maxiter=10000, init_maxerr=1e-8,
-    **kwargs):
+    lazy_bias=False, bias_dtype=_np.float64, **kwargs):
     r"""
     This function acts as a wrapper for ``tram()``, ``dtram()``, ``mbar``, and ``wham()`` and
     handles the calculation of bias energies (``bias``) and thermodynamic state trajectories
@@ -351,6 +363,13 @@ def estimate_multi_temperature(
         The maximum number of self-consistent iterations during the initialization.
     init_maxerr : float, optional, default=1.0E-8
         Convergence criterion for the initialization.
+    lazy_bias : bool, optional, default=False
+        Evaluate the bias energies chunk by chunk when needed instead of keeping them in memory.
+        WHAM and dTRAM accumulate the averaged bias matrix chunk by chunk, TRAM and MBAR work on a
+        temporary memory-mapped file.
+    bias_dtype : numpy.dtype, optional, default=numpy.float64
+        Type of the bias energies, e.g. numpy.float32 to halve their memory footprint. TRAM and
+        MBAR always use double precision internally.
     **kwargs : dict, optional
         You can use this to pass estimator-specific named parameters to the chosen estimator, which
         are not already coverd by ``estimate_multi_temperature()``.
@@ -415,23 +434,25 @@ def estimate_multi_temperature(
     from .util import get_multi_temperature_data as _get_multi_temperature_data
     ttrajs, btrajs, temperatures, unbiased_state = _get_multi_temperature_data(
         energy_trajs, temp_trajs, energy_unit, temp_unit,
-        reference_temperature=reference_temperature)
+        reference_temperature=reference_temperature, lazy_bias=lazy_bias, bias_dtype=bias_dtype)
     estimator_obj = None
     if estimator == 'wham':
+        allowed_keys = ['solver']
+        parsed_kwargs = dict([(i, kwargs[i]) for i in allowed_keys if i in kwargs])
         estimator_obj = wham(
             ttrajs, dtrajs,
             _get_averaged_bias_matrix(btrajs, dtrajs),
             maxiter=maxiter, maxerr=maxerr,
-            save_convergence_info=save_convergence_info, dt_traj=dt_traj)
+            save_convergence_info=save_convergence_info, dt_traj=dt_traj, **parsed_kwargs)
     elif estimator == 'mbar':
-        allowed_keys = ['direct_space']
+        allowed_keys = ['direct_space', 'solver']
         parsed_kwargs = dict([(i, kwargs[i]) for i in allowed_keys if i in kwargs])
         estimator_obj = mbar(
             ttrajs, dtrajs, btrajs,
             maxiter=maxiter, maxerr=maxerr, save_convergence_info=save_convergence_info,
             dt_traj=dt_traj, **parsed_kwargs)
     elif estimator == 'dtram':
-        allowed_keys = ['count_mode', 'connectivity']
+        allowed_keys = ['count_mode', 'connectivity', 'solver']
         parsed_kwargs = dict([(i, kwargs[i]) for i in allowed_keys if i in kwargs])
         estimator_obj = dtram(
             ttrajs, dtrajs,
@@ -443,7 +464,8 @@ def estimate_multi_temperature(
     elif estimator == 'tram':
         allowed_keys = [
             'count_mode', 'connectivity', 'connectivity_factor','nn',
-            'direct_space', 'N_dtram_accelerations', 'equilibrium', 'overcounting_factor', 'callback']
+            'direct_space', 'N_dtram_accelerations', 'equilibrium', 'overcounting_factor', 'callback',
+            'solver']
         parsed_kwargs = dict([(i, kwargs[i]) for i in allowed_keys if i in kwargs])
         estimator_obj = tram(
             ttrajs, dtrajs, btrajs, lag, unbiased_state=unbiased_state,
@@ -466,7 +488,8 @@ def tram(
     count_mode='sliding', connectivity='post_hoc_RE',
     maxiter=10000, maxerr=1.0E-15, save_convergence_info=0, dt_traj='1 step',
     connectivity_factor=1.0, nn=None, direct_space=False, N_dtram_accelerations=0, callback=None,
-    init='mbar', init_maxiter=10000, init_maxerr=1e-8, equilibrium=None, overcounting_factor=1.0):
+    init='mbar', init_maxiter=10000, init_maxerr=1e-8, equilibrium=None, overcounting_factor=1.0,
+    checkpoint_file=None, checkpoint_interval=1000, solver='default'):
     r"""
     Transition-based reweighting analysis method
 
@@ -484,7 +507,9 @@ def tram(
         A single reduced bias energy trajectory or a list of reduced bias energy trajectories.
         For every simulation frame seen in trajectory i and time step t, btrajs[i][t, k] is the
         reduced bias energy of that frame evaluated in the k'th thermodynamic state (i.e. at
-        the k'th umbrella/Hamiltonian/temperature)
+        the k'th umbrella/Hamiltonian/temperature). Instead of arrays, file names of .npy files
+        (which are memory-mapped) or :class:`LazyBiasTrajectory <pyemma.thermo.util.LazyBiasTrajectory>`
+        objects (which are evaluated chunk by chunk into a temporary memory-mapped file) can be given.
     lag : int or list of int, optional, default=1
         Integer lag time at which transitions are counted. Providing a list of lag times will
         trigger one estimation per lag time.
@@ -579,6 +604,16 @@ def tram(
         The maximum number of self-consistent iterations during the initialization.
     init_maxerr : float, optional, default=1.0E-8
         Convergence criterion for the initialization.
+    checkpoint_file : str, optional, default=None
+        HDF5 file to which the state of the self-consistent iteration is written every
+        checkpoint_interval iterations. If the file already exists, the estimation is resumed
+        from its checkpoint. When estimating for several lag times, each estimation starts
+        from the checkpoint of the previous one.
+    checkpoint_interval : int, optional, default=1000
+        Number of iterations between two checkpoints.
+    solver : str or FixedPointAccelerator, optional, default='default'
+        Solver of the self-consistent iteration: 'default' runs the iteration of thermotools,
+        'anderson' and 'diis' accelerate it (see :class:`FixedPointAccelerator <pyemma.thermo.FixedPointAccelerator>`).
 
     Returns
     -------
@@ -669,6 +704,8 @@ def tram(
     if len(ttrajs) != len(bias):
         raise ValueError("Unmatching number of ttraj/bias elements: %d!=%d" % (
             len(ttrajs), len(bias)))
+    # memory-map bias files and evaluate lazy bias trajectories (once for all estimations)
+    bias = [_as_bias_array(btraj) for btraj in bias]
     for ttraj, dtraj, btraj in zip(ttrajs, dtrajs, bias):
         if len(ttraj) != len(dtraj):
             raise ValueError("Unmatching number of data points in ttraj/dtraj: %d!=%d" % (
@@ -692,7 +729,9 @@ def tram(
                 dt_traj=dt_traj, connectivity_factor=connectivity_factor, nn=nn,
                 direct_space=direct_space, N_dtram_accelerations=N_dtram_accelerations,
                 callback=callback, init=init, init_maxiter=init_maxiter, init_maxerr=init_maxerr,
-                equilibrium=equilibrium, overcounting_factor=overcounting_factor).estimate((ttrajs, dtrajs, bias))
+                equilibrium=equilibrium, overcounting_factor=overcounting_factor,
+                checkpoint_file=checkpoint_file, checkpoint_interval=checkpoint_interval,
+                solver=solver).estimate((ttrajs, dtrajs, bias))
             tram_estimators.append(t)
             pg.update(1)
     _assign_unbiased_state_label(tram_estimators, unbiased_state)
@@ -705,7 +744,8 @@ def dtram(
     ttrajs, dtrajs, bias, lag, unbiased_state=None,
     count_mode='sliding', connectivity='reversible_pathways',
     maxiter=10000, maxerr=1.0E-15, save_convergence_info=0, dt_traj='1 step',
-    init=None, init_maxiter=10000, init_maxerr=1.0E-8):
+    init=None, init_maxiter=10000, init_maxerr=1.0E-8, checkpoint_file=None, checkpoint_interval=1000,
+    solver='default'):
     r"""
     Discrete transition-based reweighting analysis method
 
@@ -791,6 +831,16 @@ def dtram(
         The maximum number of self-consistent iterations during the initialization.
     init_maxerr : float, optional, default=1.0E-8
         Convergence criterion for the initialization.
+    checkpoint_file : str, optional, default=None
+        HDF5 file to which the state of the self-consistent iteration is written every
+        checkpoint_interval iterations. If the file already exists, the estimation is resumed
+        from its checkpoint. When estimating for several lag times, each estimation starts
+        from the checkpoint of the previous one.
+    checkpoint_interval : int, optional, default=1000
+        Number of iterations between two checkpoints.
+    solver : str or FixedPointAccelerator, optional, default='default'
+        Solver of the self-consistent iteration: 'default' runs the iteration of thermotools,
+        'anderson' and 'diis' accelerate it (see :class:`FixedPointAccelerator <pyemma.thermo.FixedPointAccelerator>`).
 
     Returns
     -------
@@ -897,7 +947,8 @@ def dtram(
                 count_mode=count_mode, connectivity=connectivity,
                 maxiter=maxiter, maxerr=maxerr, save_convergence_info=save_convergence_info,
                 dt_traj=dt_traj, init=init, init_maxiter=init_maxiter,
-                init_maxerr=init_maxerr).estimate((ttrajs, dtrajs))
+                init_maxerr=init_maxerr, checkpoint_file=checkpoint_file,
+                checkpoint_interval=checkpoint_interval, solver=solver).estimate((ttrajs, dtrajs))
             dtram_estimators.append(d)
             pg.update(1)
     _assign_unbiased_state_label(dtram_estimators, unbiased_state)
@@ -908,7 +959,7 @@ def dtram(
 
 def wham(
     ttrajs, dtrajs, bias,
-    maxiter=100000, maxerr=1.0E-15, save_convergence_info=0, dt_traj='1 step'):
+    maxiter=100000, maxerr=1.0E-15, save_convergence_info=0, dt_traj='1 step', solver='default'):
     r"""
     Weighted histogram analysis method
 
@@ -945,6 +996,9 @@ def wham(
         |  'us',   'microsecond*'
         |  'ms',   'millisecond*'
         |  's',    'second*'
+    solver : str or FixedPointAccelerator, optional, default='default'
+        Solver of the self-consistent iteration: 'default' runs the iteration of thermotools,
+        'anderson' and 'diis' accelerate it (see :class:`FixedPointAccelerator <pyemma.thermo.FixedPointAccelerator>`).
 
     Returns
     -------
@@ -1045,14 +1099,14 @@ def wham(
     wham_estimator = WHAM(
         bias,
         maxiter=maxiter, maxerr=maxerr,
-        save_convergence_info=save_convergence_info, dt_traj=dt_traj)
+        save_convergence_info=save_convergence_info, dt_traj=dt_traj, solver=solver)
     # run estimation
     return wham_estimator.estimate((ttrajs, dtrajs))
 
 def mbar(
     ttrajs, dtrajs, bias,
     maxiter=100000, maxerr=1.0E-15, save_convergence_info=0,
-    dt_traj='1 step', direct_space=False):
+    dt_traj='1 step', direct_space=False, checkpoint_file=None, checkpoint_interval=1000, solver='default'):
     r"""
     Multi-state Bennet acceptance ratio
 
@@ -1070,7 +1124,9 @@ def mbar(
         A single reduced bias energy trajectory or a list of reduced bias energy trajectories.
         For every simulation frame seen in trajectory i and time step t, btrajs[i][t, k] is the
         reduced bias energy of that frame evaluated in the k'th thermodynamic state (i.e. at
-        the k'th umbrella/Hamiltonian/temperature)
+        the k'th umbrella/Hamiltonian/temperature). Instead of arrays, file names of .npy files
+        (which are memory-mapped) or :class:`LazyBiasTrajectory <pyemma.thermo.util.LazyBiasTrajectory>`
+        objects (which are evaluated chunk by chunk into a temporary memory-mapped file) can be given.
     maxiter : int, optional, default=10000
         The maximum number of dTRAM iterations before the estimator exits unsuccessfully.
     maxerr : float, optional, default=1e-15
@@ -1096,6 +1152,15 @@ def mbar(
         Whether to perform the self-consitent iteration with Boltzmann factors
         (direct space) or free energies (log-space). When analyzing data from
         multi-temperature simulations, direct-space is not recommended.
+    checkpoint_file : str, optional, default=None
+        HDF5 file to which the state of the self-consistent iteration is written every
+        checkpoint_interval iterations. If the file already exists, the estimation is resumed
+        from its checkpoint.
+    checkpoint_interval : int, optional, default=1000
+        Number of iterations between two checkpoints.
+    solver : str or FixedPointAccelerator, optional, default='default'
+        Solver of the self-consistent iteration: 'default' runs the iteration of thermotools,
+        'anderson' and 'diis' accelerate it (see :class:`FixedPointAccelerator <pyemma.thermo.FixedPointAccelerator>`).
 
     Returns
     -------
@@ -1177,6 +1242,8 @@ def mbar(
     if len(ttrajs) != len(bias):
         raise ValueError("Unmatching number of ttraj/bias elements: %d!=%d" % (
             len(ttrajs), len(bias)))
+    # memory-map bias files and evaluate lazy bias trajectories (once for all estimations)
+    bias = [_as_bias_array(btraj) for btraj in bias]
     for ttraj, dtraj, btraj in zip(ttrajs, dtrajs, bias):
         if len(ttraj) != len(dtraj):
             raise ValueError("Unmatching number of data points in ttraj/dtraj: %d!=%d" % (
@@ -1188,6 +1255,7 @@ def mbar(
     from pyemma.thermo import MBAR
     mbar_estimator = MBAR(
         maxiter=maxiter, maxerr=maxerr, save_convergence_info=save_convergence_info,
-        dt_traj=dt_traj, direct_space=direct_space)
+        dt_traj=dt_traj, direct_space=direct_space,
+        checkpoint_file=checkpoint_file, checkpoint_interval=checkpoint_interval, solver=solver)
     # run estimation
     return mbar_estimator.estimate((ttrajs, dtrajs, bias))
@@ -19,11 +19,13 @@ import numpy as _np
 
 from pyemma._base.estimator import Estimator as _Estimator
 from pyemma._base.progress import ProgressReporter as _ProgressReporter
+from pyemma._base.serialization.serialization import Modifications as _Modifications
 from pyemma.thermo import MEMM as _MEMM
 from pyemma.thermo.estimators._base import ThermoBase
 from pyemma.thermo.models.memm import ThermoMSM as _ThermoMSM
 from pyemma.util import types as _types
 from pyemma.thermo.estimators._callback import _ConvergenceProgressIndicatorCallBack
+from pyemma.thermo.estimators._solver import _accelerator, _last_loglikelihood
 
 from msmtools.estimation import largest_connected_set as _largest_connected_set
 
@@ -37,7 +39,10 @@ __author__ = 'noe, wehmeyer'
 
 class DTRAM(_Estimator, _MEMM, ThermoBase):
     r""" Discrete Transition(-based) Reweighting Analysis Method."""
-    __serialize_version = 0
+    __serialize_version = 2
+    __serialize_modifications_map = {
+        0: _Modifications().set('checkpoint_file', None).set('checkpoint_interval', 1000).list(),
+        1: _Modifications().set('solver', 'default').list()}
     __serialize_fields = ('bias_energies',
                           'conf_energies',
                           'count_matrices',
@@ -54,7 +59,8 @@ class DTRAM(_Estimator, _MEMM, ThermoBase):
     def __init__(
         self, bias_energies_full, lag, count_mode='sliding', connectivity='reversible_pathways',
         maxiter=10000, maxerr=1.0E-15, save_convergence_info=0, dt_traj='1 step',
-        init=None, init_maxiter=10000, init_maxerr=1.0E-8):
+        init=None, init_maxiter=10000, init_maxerr=1.0E-8, checkpoint_file=None, checkpoint_interval=1000,
+        solver='default'):
         r""" Discrete Transition(-based) Reweighting Analysis Method
 
         Parameters
@@ -124,6 +130,21 @@ class DTRAM(_Estimator, _MEMM, ThermoBase):
             The maximum number of self-consistent iterations during the initialization.
         init_maxerr : float, optional, default=1.0E-8
             Convergence criterion for the initialization.
+        checkpoint_file : str, optional, default=None
+            HDF5 file to which the state of the self-consistent iteration is written every
+            checkpoint_interval iterations and after the iteration has finished (see
+            :class:`SolverCheckpoint <pyemma.thermo.estimators._checkpoint.SolverCheckpoint>`).
+            If the file already exists, the iteration is resumed from its checkpoint; with the
+            same input data, lag time and active set it continues for up to maxiter further
+            iterations; otherwise, the checkpoint is only used as a warm start. See also
+            :meth:`warm_start`.
+        checkpoint_interval : int, optional, default=1000
+            Number of iterations between two checkpoints; 0 only writes the final checkpoint.
+        solver : str or FixedPointAccelerator, optional, default='default'
+            Solver of the self-consistent iteration. 'default' runs the iteration of thermotools,
+            'anderson' and 'diis' accelerate it by Anderson mixing or DIIS on the free energies and
+            Lagrangian multipliers, safeguarded against a decrease of the log-likelihood (see
+            :class:`FixedPointAccelerator <pyemma.thermo.FixedPointAccelerator>`).
 
         Example
         -------
@@ -171,6 +192,9 @@ class DTRAM(_Estimator, _MEMM, ThermoBase):
         self.init = init
         self.init_maxiter = init_maxiter
         self.init_maxerr = init_maxerr
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self.solver = solver
         # set derived quantities
         self.nthermo, self.nstates_full = bias_energies_full.shape
         # set iteration variables
@@ -233,10 +257,16 @@ class DTRAM(_Estimator, _MEMM, ThermoBase):
         self.state_counts = self.state_counts_full[:, cset]
         self.state_counts = _np.require(self.state_counts, dtype=_np.intc ,requirements=['C', 'A'])
 
-        # run initialisation
+        # restore the iteration variables from the checkpoint file or a warm start
+        maxiter, checkpoint = self._init_solver({
+            'conf_energies': (len(cset), ),
+            'log_lagrangian_mult': (self.nthermo, len(cset))},
+            data=(self.count_matrices, self.bias_energies, self.state_counts))
+
+        # run initialisation (not needed when resuming or warm starting)
         pg = _ProgressReporter()
 
-        if self.init is not None and self.init == 'wham':
+        if self.init == 'wham' and self.conf_energies is None:
             stage = 'WHAM init.'
             with pg.context(stage=stage):
                 self.therm_energies, self.conf_energies, _increments, _loglikelihoods = \
@@ -248,17 +278,31 @@ class DTRAM(_Estimator, _MEMM, ThermoBase):
                             pg, stage, self.init_maxiter, self.init_maxerr))
 
         # run estimator
+        accelerator = _accelerator(self.solver)
         stage = 'DTRAM'
         with pg.context(stage=stage):
-            self.therm_energies, self.conf_energies, self.log_lagrangian_mult, \
-                self.increments, self.loglikelihoods = _dtram.estimate(
-                    self.count_matrices, self.bias_energies,
-                    maxiter=self.maxiter, maxerr=self.maxerr,
-                    log_lagrangian_mult=self.log_lagrangian_mult,
-                    conf_energies=self.conf_energies,
-                    save_convergence_info=self.save_convergence_info,
-                    callback=_ConvergenceProgressIndicatorCallBack(
-                        pg, stage, self.maxiter, self.maxerr))
+            callback = _ConvergenceProgressIndicatorCallBack(pg, stage, maxiter, self.maxerr, subcallback=checkpoint)
+            if accelerator is None:
+                self.therm_energies, self.conf_energies, self.log_lagrangian_mult, \
+                    self.increments, self.loglikelihoods = _dtram.estimate(
+                        self.count_matrices, self.bias_energies,
+                        maxiter=maxiter, maxerr=self.maxerr,
+                        log_lagrangian_mult=self.log_lagrangian_mult,
+                        conf_energies=self.conf_energies,
+                        save_convergence_info=self.save_convergence_info,
+                        callback=callback)
+            else:
+                def step(variables):
+                    result = _dtram.estimate(
+                        self.count_matrices, self.bias_energies, maxiter=1, maxerr=0.0,
+                        save_convergence_info=accelerator.save_convergence_info, **variables)
+                    return result, dict(conf_energies=result[1], log_lagrangian_mult=result[2]), \
+                        _last_loglikelihood(result[4])
+                (self.therm_energies, self.conf_energies, self.log_lagrangian_mult, _, _), \
+                    self.increments, self.loglikelihoods = accelerator.run(
+                        step, dict(conf_energies=self.conf_energies, log_lagrangian_mult=self.log_lagrangian_mult),
+                        maxiter, self.maxerr, save_convergence_info=self.save_convergence_info, callback=callback)
+        checkpoint.save({'conf_energies': self.conf_energies, 'log_lagrangian_mult': self.log_lagrangian_mult})
 
         # compute models
         fmsms = [_dtram.estimate_transition_matrix(
@@ -284,6 +328,9 @@ class DTRAM(_Estimator, _MEMM, ThermoBase):
         # done
         return self
 
+    _solver_variables = ('conf_energies', 'log_lagrangian_mult')
+    _solver_multipliers = ('log_lagrangian_mult', )
+
     def log_likelihood(self):
         return _dtram.get_loglikelihood(
             self.count_matrices,
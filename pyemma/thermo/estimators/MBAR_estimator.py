@@ -20,10 +20,13 @@ import numpy as _np
 from pyemma._base.estimator import Estimator as _Estimator
 from pyemma._base.progress import ProgressReporter as _ProgressReporter
 from pyemma._base.serialization.serialization import SerializableMixIn as _SerializableMixIn
+from pyemma._base.serialization.serialization import Modifications as _Modifications
 from pyemma.thermo import MultiThermModel as _MultiThermModel
 from pyemma.thermo import StationaryModel as _StationaryModel
 from pyemma.thermo.estimators._base import ThermoBase
+from pyemma.thermo.util.util import _as_bias_array
 from pyemma.thermo.estimators._callback import _ConvergenceProgressIndicatorCallBack
+from pyemma.thermo.estimators._solver import _accelerator
 from pyemma.util import types as _types
 
 from thermotools import mbar as _mbar
@@ -35,7 +38,10 @@ __author__ = 'wehmeyer'
 
 class MBAR(_Estimator, _MultiThermModel, ThermoBase, _SerializableMixIn):
     r"""Multi-state Bennet Acceptance Ratio Method."""
-    __serialize_version = 0
+    __serialize_version = 2
+    __serialize_modifications_map = {
+        0: _Modifications().set('checkpoint_file', None).set('checkpoint_interval', 1000).list(),
+        1: _Modifications().set('solver', 'default').list()}
     __serialize_fields = ('biased_conf_energies_full',
                           'btrajs',
                           'conf_energies',
@@ -52,7 +58,8 @@ class MBAR(_Estimator, _MultiThermModel, ThermoBase, _SerializableMixIn):
     def __init__(
         self,
         maxiter=10000, maxerr=1.0E-15, save_convergence_info=0,
-        dt_traj='1 step', direct_space=False):
+        dt_traj='1 step', direct_space=False, checkpoint_file=None, checkpoint_interval=1000,
+        solver='default'):
         r"""Multi-state Bennet Acceptance Ratio Method
 
         Parameters
@@ -79,6 +86,21 @@ class MBAR(_Estimator, _MultiThermModel, ThermoBase, _SerializableMixIn):
             |  's',    'second*'
         stride : int, optional, default=1
             not used
+        checkpoint_file : str, optional, default=None
+            HDF5 file to which the thermodynamic free energies are written every
+            checkpoint_interval iterations and after the iteration has finished (see
+            :class:`SolverCheckpoint <pyemma.thermo.estimators._checkpoint.SolverCheckpoint>`).
+            If the file already exists, the iteration is resumed from its checkpoint; with the
+            same input data and number of thermodynamic states it continues for up to maxiter
+            further iterations; otherwise, the checkpoint is only used as a warm start. See also
+            :meth:`warm_start`.
+        checkpoint_interval : int, optional, default=1000
+            Number of iterations between two checkpoints; 0 only writes the final checkpoint.
+        solver : str or FixedPointAccelerator, optional, default='default'
+            Solver of the self-consistent iteration. 'default' runs the iteration of thermotools,
+            'anderson' and 'diis' accelerate it by Anderson mixing or DIIS on the thermodynamic
+            free energies, safeguarded against an increasing increment (see
+            :class:`FixedPointAccelerator <pyemma.thermo.FixedPointAccelerator>`).
 
         Example
         -------
@@ -92,6 +114,9 @@ class MBAR(_Estimator, _MultiThermModel, ThermoBase, _SerializableMixIn):
         self.save_convergence_info = save_convergence_info
         self.dt_traj = dt_traj
         self.direct_space = direct_space
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self.solver = solver
         self.active_set = None
         # set iteration variables
         self.therm_energies = None
@@ -114,12 +139,16 @@ class MBAR(_Estimator, _MultiThermModel, ThermoBase, _SerializableMixIn):
             btrajs : list of numpy.ndarray((X_i, T), dtype=numpy.float64)
                 For every simulation frame seen in trajectory i and time step t, btrajs[i][t,k] is the
                 bias energy of that frame evaluated in the k'th thermodynamic state (i.e. at the k'th
-                Umbrella/Hamiltonian/temperature).
+                Umbrella/Hamiltonian/temperature). Elements may also be file names of .npy files,
+                which are memory-mapped, or :class:`LazyBiasTrajectory <pyemma.thermo.util.LazyBiasTrajectory>`
+                objects, which are evaluated into temporary memory-mapped files.
         """
         return super(MBAR, self).estimate(X)
 
     def _estimate(self, X):
         ttrajs, dtrajs_full, btrajs = X
+        # memory-map bias files and evaluate lazy bias trajectories into temporary memory maps
+        btrajs = [_as_bias_array(b) for b in btrajs]
         # shape and type checks
         assert len(ttrajs) == len(dtrajs_full) == len(btrajs)
         for t in ttrajs:
@@ -139,7 +168,6 @@ class MBAR(_Estimator, _MultiThermModel, ThermoBase, _SerializableMixIn):
         # cast types and change axis order if needed
         ttrajs = [_np.require(t, dtype=_np.intc, requirements='C') for t in ttrajs]
         dtrajs_full = [_np.require(d, dtype=_np.intc, requirements='C') for d in dtrajs_full]
-        btrajs = [_np.require(b, dtype=_np.float64, requirements='C') for b in btrajs]
 
         # find state visits
         self.state_counts_full = _util.state_counts(ttrajs, dtrajs_full)
@@ -153,16 +181,35 @@ class MBAR(_Estimator, _MultiThermModel, ThermoBase, _SerializableMixIn):
             mbar = _mbar_direct
         else:
             mbar = _mbar
+        # restore the thermodynamic free energies from the checkpoint file or a warm start,
+        # the result of a previous estimate is not reused otherwise
+        self.therm_energies = None
+        maxiter, checkpoint = self._init_solver(
+            {'therm_energies': (self.nthermo, )}, data=(self.state_counts_full, btrajs, dtrajs_full))
+        accelerator = _accelerator(self.solver)
         pg = _ProgressReporter()
         with pg.context():
-            self.therm_energies, self.unbiased_conf_energies_full, self.biased_conf_energies_full, \
-                self.increments = mbar.estimate(
-                    self.state_counts_full.sum(axis=1), btrajs, dtrajs_full,
-                    maxiter=self.maxiter, maxerr=self.maxerr,
-                    save_convergence_info=self.save_convergence_info,
-                    callback=_ConvergenceProgressIndicatorCallBack(
-                        pg, 'MBAR', self.maxiter, self.maxerr),
-                    n_conf_states=self.nstates_full)
+            callback = _ConvergenceProgressIndicatorCallBack(pg, 'MBAR', maxiter, self.maxerr, subcallback=checkpoint)
+            if accelerator is None:
+                self.therm_energies, self.unbiased_conf_energies_full, self.biased_conf_energies_full, \
+                    self.increments = mbar.estimate(
+                        self.state_counts_full.sum(axis=1), btrajs, dtrajs_full,
+                        maxiter=maxiter, maxerr=self.maxerr,
+                        therm_energies=self.therm_energies,
+                        save_convergence_info=self.save_convergence_info,
+                        callback=callback,
+                        n_conf_states=self.nstates_full)
+            else:
+                def step(variables):
+                    result = mbar.estimate(
+                        self.state_counts_full.sum(axis=1), btrajs, dtrajs_full, maxiter=1, maxerr=0.0,
+                        save_convergence_info=0, n_conf_states=self.nstates_full, **variables)
+                    return result, dict(therm_energies=result[0]), None
+                (self.therm_energies, self.unbiased_conf_energies_full, self.biased_conf_energies_full, _), \
+                    self.increments, _ = accelerator.run(
+                        step, dict(therm_energies=self.therm_energies), maxiter, self.maxerr,
+                        save_convergence_info=self.save_convergence_info, callback=callback)
+        checkpoint.save({'therm_energies': self.therm_energies})
         try:
             self.loglikelihoods = _np.nan * self.increments
         except TypeError:
@@ -183,6 +230,12 @@ class MBAR(_Estimator, _MultiThermModel, ThermoBase, _SerializableMixIn):
         # done
         return self
 
+    _solver_variables = ('therm_energies', )
+
+    def _solver_active_set(self):
+        # the thermodynamic free energies are not defined on configurational states
+        return None
+
     def pointwise_free_energies(self, therm_state=None):
         if therm_state is not None:
             assert 0 <= therm_state < self.nthermo
@@ -22,11 +22,15 @@ from pyemma._base.estimator import Estimator as _Estimator
 from pyemma._base.progress import ProgressReporter as _ProgressReporter
 from pyemma.thermo import MEMM as _MEMM
 from pyemma.thermo.estimators._base import ThermoBase
+from pyemma.thermo.util.util import _as_bias_array
 from pyemma.thermo.models.memm import ThermoMSM as _ThermoMSM
+from pyemma.thermo.models.multi_therm import LazyModels as _LazyModels
+from pyemma._base.serialization.serialization import Modifications as _Modifications
 from pyemma.util import types as _types
 from pyemma.util.units import TimeUnit as _TimeUnit
 from pyemma.thermo.estimators._callback import _ConvergenceProgressIndicatorCallBack
 from pyemma.thermo.estimators._callback import _IterationProgressIndicatorCallBack
+from pyemma.thermo.estimators._solver import _accelerator, _last_loglikelihood
 
 from thermotools import tram as _tram
 from thermotools import tram_direct as _tram_direct
@@ -44,9 +48,39 @@ class EmptyState(RuntimeWarning):
     pass
 
 
+def _estimate_thermo_msm(
+    K, log_lagrangian_mult, biased_conf_energies, count_matrices, therm_energies,
+    active_set, nstates_full, dt_model):
+    r"""ThermoMSM of thermodynamic state K restricted to its largest connected subset of active_set."""
+    fmsm = _tram.estimate_transition_matrix(
+        log_lagrangian_mult, biased_conf_energies, count_matrices, None, K)
+    fmsm = _np.ascontiguousarray((fmsm[active_set, :])[:, active_set])
+    lcc = _largest_connected_set(fmsm, directed=False)
+    return _ThermoMSM(
+        _np.ascontiguousarray((fmsm[lcc, :])[:, lcc]), active_set[lcc], nstates_full,
+        pi=_np.exp(therm_energies[K] - biased_conf_energies[K, :]), dt_model=dt_model)
+
+
+def _map_trajectory_blocks(function, ntraj, n_jobs):
+    r"""Calls function(indices) for contiguous blocks of trajectory indices in a thread pool."""
+    from concurrent.futures import ThreadPoolExecutor
+    from pyemma._base.parallel import get_n_jobs
+    if n_jobs is None:
+        n_jobs = get_n_jobs()
+    blocks = [b for b in _np.array_split(_np.arange(ntraj), max(1, min(n_jobs, ntraj))) if len(b) > 0]
+    if len(blocks) < 2:
+        return [function(b) for b in blocks]
+    with ThreadPoolExecutor(max_workers=len(blocks)) as pool:
+        return list(pool.map(function, blocks))
+
+
 class TRAM(_Estimator, _MEMM, ThermoBase):
     r"""Transition(-based) Reweighting Analysis Method."""
-    __serialize_version = 0
+    __serialize_version = 3
+    __serialize_modifications_map = {
+        0: _Modifications().set('n_jobs', None).list(),
+        1: _Modifications().set('checkpoint_file', None).set('checkpoint_interval', 1000).list(),
+        2: _Modifications().set('solver', 'default').list()}
     __serialize_fields = ('biased_conf_energies',
                           'btrajs',
                           'count_matrices',
@@ -76,7 +110,7 @@ class TRAM(_Estimator, _MEMM, ThermoBase):
         nn=None, connectivity_factor=1.0, direct_space=False, N_dtram_accelerations=0,
         callback=None,
         init='mbar', init_maxiter=5000, init_maxerr=1.0E-8,
-        overcounting_factor=1.0):
+        overcounting_factor=1.0, n_jobs=None, checkpoint_file=None, checkpoint_interval=1000, solver='default'):
         r"""Transition(-based) Reweighting Analysis Method
 
         Parameters
@@ -196,6 +230,26 @@ class TRAM(_Estimator, _MEMM, ThermoBase):
             non-equilibrium frame is counted n times. Values larger than 1 increase
             the relative weight of the non-equilibrium data. Values less than 1
             increase the relative weight of the equilibrium data.
+        n_jobs : int, optional, default=None
+            Number of threads used after the self-consistent iteration, i.e. for the
+            transition matrices and connected sets of the thermodynamic states and for
+            the pointwise free energies. None uses the number of available cores (see
+            :func:`pyemma._base.parallel.get_n_jobs`).
+        checkpoint_file : str, optional, default=None
+            HDF5 file to which the state of the self-consistent iteration is written every
+            checkpoint_interval iterations and after the iteration has finished (see
+            :class:`SolverCheckpoint <pyemma.thermo.estimators._checkpoint.SolverCheckpoint>`).
+            If the file already exists, the iteration is resumed from its checkpoint; with the
+            same input data, lag time and active set it continues for up to maxiter further
+            iterations; otherwise, the checkpoint is only used as a warm start. See also
+            :meth:`warm_start`.
+        checkpoint_interval : int, optional, default=1000
+            Number of iterations between two checkpoints; 0 only writes the final checkpoint.
+        solver : str or FixedPointAccelerator, optional, default='default'
+            Solver of the self-consistent iteration. 'default' runs the iteration of thermotools,
+            'anderson' and 'diis' accelerate it by Anderson mixing or DIIS on the free energies and
+            Lagrangian multipliers, safeguarded against a decrease of the log-likelihood (see
+            :class:`FixedPointAccelerator <pyemma.thermo.FixedPointAccelerator>`).
 
 
         References
@@ -229,6 +283,10 @@ class TRAM(_Estimator, _MEMM, ThermoBase):
         self.init_maxiter = init_maxiter
         self.init_maxerr = init_maxerr
         self.overcounting_factor = overcounting_factor
+        self.n_jobs = n_jobs
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self.solver = solver
         self.active_set = None
         self.biased_conf_energies = None
         self.mbar_therm_energies = None
@@ -252,12 +310,16 @@ class TRAM(_Estimator, _MEMM, ThermoBase):
             btrajs : list of numpy.ndarray((X_i, T), dtype=numpy.float64)
                 For every simulation frame seen in trajectory i and time step t, btrajs[i][t,k] is the
                 bias energy of that frame evaluated in the k'th thermodynamic state (i.e. at the k'th
-                Umbrella/Hamiltonian/temperature).
+                Umbrella/Hamiltonian/temperature). Elements may also be file names of .npy files,
+                which are memory-mapped, or :class:`LazyBiasTrajectory <pyemma.thermo.util.LazyBiasTrajectory>`
+                objects, which are evaluated into temporary memory-mapped files.
         """
         return super(TRAM, self).estimate(X, **params)
 
     def _estimate(self, X):
         ttrajs, dtrajs_full, btrajs = X
+        # memory-map bias files and evaluate lazy bias trajectories into temporary memory maps
+        btrajs = [_as_bias_array(b) for b in btrajs]
         # shape and type checks
         assert len(ttrajs) == len(dtrajs_full) == len(btrajs)
         for t in ttrajs:
@@ -282,7 +344,6 @@ class TRAM(_Estimator, _MEMM, ThermoBase):
         # cast types and change axis order if needed
         ttrajs = [_np.require(t, dtype=_np.intc, requirements='C') for t in ttrajs]
         dtrajs_full = [_np.require(d, dtype=_np.intc, requirements='C') for d in dtrajs_full]
-        btrajs = [_np.require(b, dtype=_np.float64, requirements='C') for b in btrajs]
 
         # if equilibrium information is given, separate the trajectories
         if self.equilibrium is not None:
@@ -368,6 +429,14 @@ class TRAM(_Estimator, _MEMM, ThermoBase):
                     'Thermodynamic state %d' % k \
                     + ' contains no transitions and no equilibrium data after reducing to the connected set.', EmptyState)
 
+        # restore the iteration variables from the checkpoint file or a warm start
+        maxiter, checkpoint = self._init_solver({
+            'biased_conf_energies': (self.nthermo, self.nstates_full),
+            'log_lagrangian_mult': (self.nthermo, self.nstates_full)},
+            data=(self.count_matrices, self.state_counts, self.btrajs, self.dtrajs,
+                  self.equilibrium_state_counts, self.equilibrium_btrajs, self.equilibrium_dtrajs),
+            callback=self.callback)
+
         if self.init == 'mbar' and self.biased_conf_energies is None:
             if self.direct_space:
                 mbar = _mbar_direct
@@ -395,50 +464,55 @@ class TRAM(_Estimator, _MEMM, ThermoBase):
         #import warnings
         #with warnings.catch_warnings() as cm:
         # warnings.filterwarnings('ignore', RuntimeWarning)
+        if self.equilibrium is None:
+            estimate = tram.estimate
+            kwargs = dict(N_dtram_accelerations=self.N_dtram_accelerations)
+        else: # use trammbar
+            estimate = trammbar.estimate
+            kwargs = dict(
+                equilibrium_therm_state_counts=self.equilibrium_state_counts.sum(axis=1).astype(_np.intc),
+                equilibrium_bias_energy_sequences=self.equilibrium_btrajs, equilibrium_state_sequences=self.equilibrium_dtrajs,
+                N_dtram_accelerations=self.N_dtram_accelerations,
+                overcounting_factor=self.overcounting_factor)
+        accelerator = _accelerator(self.solver)
         stage = 'TRAM'
         with pg.context(stage=stage):
-            if self.equilibrium is None:
+            callback = _ConvergenceProgressIndicatorCallBack(pg, stage, maxiter, self.maxerr, subcallback=checkpoint)
+            if accelerator is None:
                 self.biased_conf_energies, conf_energies, self.therm_energies, self.log_lagrangian_mult, \
-                    self.increments, self.loglikelihoods = tram.estimate(
+                    self.increments, self.loglikelihoods = estimate(
                         self.count_matrices, self.state_counts, self.btrajs, self.dtrajs,
-                        maxiter=self.maxiter, maxerr=self.maxerr,
-                        biased_conf_energies=self.biased_conf_energies,
-                        log_lagrangian_mult=self.log_lagrangian_mult,
-                        save_convergence_info=self.save_convergence_info,
-                        callback=_ConvergenceProgressIndicatorCallBack(
-                            pg, stage, self.maxiter, self.maxerr, subcallback=self.callback),
-                        N_dtram_accelerations=self.N_dtram_accelerations)
-            else: # use trammbar
-                self.biased_conf_energies, conf_energies, self.therm_energies, self.log_lagrangian_mult, \
-                    self.increments, self.loglikelihoods = trammbar.estimate(
-                        self.count_matrices, self.state_counts, self.btrajs, self.dtrajs,
-                        equilibrium_therm_state_counts=self.equilibrium_state_counts.sum(axis=1).astype(_np.intc),
-                        equilibrium_bias_energy_sequences=self.equilibrium_btrajs, equilibrium_state_sequences=self.equilibrium_dtrajs,
-                        maxiter=self.maxiter, maxerr=self.maxerr,
+                        maxiter=maxiter, maxerr=self.maxerr,
                         save_convergence_info=self.save_convergence_info,
                         biased_conf_energies=self.biased_conf_energies,
                         log_lagrangian_mult=self.log_lagrangian_mult,
-                        callback=_ConvergenceProgressIndicatorCallBack(
-                            pg, stage, self.maxiter, self.maxerr, subcallback=self.callback),
-                        N_dtram_accelerations=self.N_dtram_accelerations,
-                        overcounting_factor=self.overcounting_factor)
-
-        # compute models
-        fmsms = [_np.ascontiguousarray((
-            _tram.estimate_transition_matrix(
-                self.log_lagrangian_mult, self.biased_conf_energies, self.count_matrices, None,
-                K)[self.active_set, :])[:, self.active_set]) for K in range(self.nthermo)]
-
-        active_sets = [_largest_connected_set(msm, directed=False) for msm in fmsms]
-        fmsms = [_np.ascontiguousarray(
-            (msm[lcc, :])[:, lcc]) for msm, lcc in zip(fmsms, active_sets)]
-
-        models = []
-        for i, (msm, acs) in enumerate(zip(fmsms, active_sets)):
-            models.append(_ThermoMSM(
-                msm, self.active_set[acs], self.nstates_full,
-                pi=_np.exp(self.therm_energies[i] - self.biased_conf_energies[i, :]),
-                dt_model=self.timestep_traj.get_scaled(self.lag)))
+                        callback=callback, **kwargs)
+            else:
+                def step(variables):
+                    result = estimate(
+                        self.count_matrices, self.state_counts, self.btrajs, self.dtrajs,
+                        maxiter=1, maxerr=0.0, save_convergence_info=accelerator.save_convergence_info,
+                        callback=None, **dict(variables, **kwargs))
+                    return result, dict(biased_conf_energies=result[0], log_lagrangian_mult=result[3]), \
+                        _last_loglikelihood(result[5])
+                (self.biased_conf_energies, conf_energies, self.therm_energies, self.log_lagrangian_mult, _, _), \
+                    self.increments, self.loglikelihoods = accelerator.run(
+                        step, dict(biased_conf_energies=self.biased_conf_energies,
+                                   log_lagrangian_mult=self.log_lagrangian_mult),
+                        maxiter, self.maxerr, save_convergence_info=self.save_convergence_info, callback=callback)
+
+        checkpoint.save({
+            'biased_conf_energies': self.biased_conf_energies, 'log_lagrangian_mult': self.log_lagrangian_mult})
+
+        # compute models: the ThermoMSM of a thermodynamic state is built on first access,
+        # iterating over the models builds all remaining ones concurrently
+        from functools import partial
+        models = _LazyModels(self.nthermo, partial(
+            _estimate_thermo_msm,
+            log_lagrangian_mult=self.log_lagrangian_mult, biased_conf_energies=self.biased_conf_energies,
+            count_matrices=self.count_matrices, therm_energies=self.therm_energies,
+            active_set=self.active_set, nstates_full=self.nstates_full,
+            dt_model=self.timestep_traj.get_scaled(self.lag)), n_jobs=self.n_jobs)
 
         # set model parameters to self
         self.set_model_params(
@@ -446,6 +520,13 @@ class TRAM(_Estimator, _MEMM, ThermoBase):
 
         return self
 
+    _solver_variables = ('biased_conf_energies', 'log_lagrangian_mult')
+    _solver_multipliers = ('log_lagrangian_mult', )
+
+    def _solver_active_set(self):
+        # the iteration variables are defined on all configurational states
+        return _np.arange(self.nstates_full)
+
     def log_likelihood(self):
         r"""
         Returns the value of the log-likelihood of the converged TRAM estimate.
@@ -485,22 +566,30 @@ class TRAM(_Estimator, _MEMM, ThermoBase):
         if therm_state is not None:
             assert therm_state<=self.nthermo
         mu = [_np.zeros(d.shape[0], dtype=_np.float64) for d in self.dtrajs+self.equilibrium_dtrajs]
+        btrajs = self.btrajs + self.equilibrium_btrajs
+        dtrajs = self.dtrajs + self.equilibrium_dtrajs
+        # the pointwise free energies of every frame are independent, blocks of trajectories are evaluated concurrently
         if self.equilibrium is None:
-            _tram.get_pointwise_unbiased_free_energies(
-                therm_state,
-                self.log_lagrangian_mult, self.biased_conf_energies,
-                self.therm_energies, self.count_matrices,
-                self.btrajs, self.dtrajs,
-                self.state_counts, None, None, mu)
+            def evaluate(block):
+                _tram.get_pointwise_unbiased_free_energies(
+                    therm_state,
+                    self.log_lagrangian_mult, self.biased_conf_energies,
+                    self.therm_energies, self.count_matrices,
+                    [btrajs[i] for i in block], [dtrajs[i] for i in block],
+                    self.state_counts, None, None, [mu[i] for i in block])
         else:
-            _trammbar.get_pointwise_unbiased_free_energies(
-                therm_state,
-                self.log_lagrangian_mult, self.biased_conf_energies,
-                self.therm_energies, self.count_matrices,
-                self.btrajs+self.equilibrium_btrajs, self.dtrajs+self.equilibrium_dtrajs,
-                self.state_counts, None, None, mu,
-                equilibrium_therm_state_counts=self.equilibrium_state_counts.sum(axis=1).astype(_np.intc),
-                overcounting_factor=1.0/self.lag)
+            equilibrium_therm_state_counts = self.equilibrium_state_counts.sum(axis=1).astype(_np.intc)
+
+            def evaluate(block):
+                _trammbar.get_pointwise_unbiased_free_energies(
+                    therm_state,
+                    self.log_lagrangian_mult, self.biased_conf_energies,
+                    self.therm_energies, self.count_matrices,
+                    [btrajs[i] for i in block], [dtrajs[i] for i in block],
+                    self.state_counts, None, None, [mu[i] for i in block],
+                    equilibrium_therm_state_counts=equilibrium_therm_state_counts,
+                    overcounting_factor=1.0/self.lag)
+        _map_trajectory_blocks(evaluate, len(mu), self.n_jobs)
         return mu
 
     def mbar_pointwise_free_energies(self, therm_state=None):
@@ -509,9 +598,14 @@ class TRAM(_Estimator, _MEMM, ThermoBase):
         if therm_state is not None:
             assert therm_state<=self.nthermo
         mu = [_np.zeros(d.shape[0], dtype=_np.float64) for d in self.dtrajs+self.equilibrium_dtrajs]
-        _mbar.get_pointwise_unbiased_free_energies(therm_state,
-            _np.log(self.therm_state_counts_full + self.equilibrium_state_counts_full.sum(axis=1)).astype(_np.float64),
-            self.btrajs+self.equilibrium_btrajs, self.mbar_therm_energies, None, mu)
+        btrajs = self.btrajs + self.equilibrium_btrajs
+        log_therm_state_counts = _np.log(
+            self.therm_state_counts_full + self.equilibrium_state_counts_full.sum(axis=1)).astype(_np.float64)
+
+        def evaluate(block):
+            _mbar.get_pointwise_unbiased_free_energies(therm_state, log_therm_state_counts,
+                [btrajs[i] for i in block], self.mbar_therm_energies, None, [mu[i] for i in block])
+        _map_trajectory_blocks(evaluate, len(mu), self.n_jobs)
         return mu
 
     def __getstate__(self):
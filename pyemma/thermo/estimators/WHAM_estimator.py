@@ -20,10 +20,12 @@ import numpy as _np
 from pyemma._base.estimator import Estimator as _Estimator
 from pyemma._base.progress import ProgressReporter as _ProgressReporter
 from pyemma._base.serialization.serialization import SerializableMixIn as _SerializableMixIn
+from pyemma._base.serialization.serialization import Modifications as _Modifications
 from pyemma.thermo import MultiThermModel as _MultiThermModel
 from pyemma.thermo import StationaryModel as _StationaryModel
 from pyemma.thermo.estimators._base import ThermoBase
 from pyemma.thermo.estimators._callback import _ConvergenceProgressIndicatorCallBack
+from pyemma.thermo.estimators._solver import _accelerator, _last_loglikelihood
 from pyemma.util import types as _types
 from pyemma.util.units import TimeUnit as _TimeUnit
 from thermotools import wham as _wham
@@ -35,7 +37,8 @@ __author__ = 'wehmeyer, mey'
 class WHAM(_Estimator, _MultiThermModel, ThermoBase, _SerializableMixIn):
     r"""Weighted Histogram Analysis Method."""
 
-    __serialize_version = 0
+    __serialize_version = 1
+    __serialize_modifications_map = {0: _Modifications().set('solver', 'default').list()}
     __serialize_fields = ('bias_energies',
                           'conf_energies',
                           'increments',
@@ -48,7 +51,8 @@ class WHAM(_Estimator, _MultiThermModel, ThermoBase, _SerializableMixIn):
 
     def __init__(
             self, bias_energies_full,
-            maxiter=10000, maxerr=1.0E-15, save_convergence_info=0, dt_traj='1 step', stride=1):
+            maxiter=10000, maxerr=1.0E-15, save_convergence_info=0, dt_traj='1 step', stride=1,
+            solver='default'):
         r"""Weighted Histogram Analysis Method
 
         Parameters
@@ -78,6 +82,11 @@ class WHAM(_Estimator, _MultiThermModel, ThermoBase, _SerializableMixIn):
             |  's',    'second*'
         stride : int, optional, default=1
             not used
+        solver : str or FixedPointAccelerator, optional, default='default'
+            Solver of the self-consistent iteration. 'default' runs the iteration of thermotools,
+            'anderson' and 'diis' accelerate it by Anderson mixing or DIIS on the free energies,
+            safeguarded against a decrease of the log-likelihood (see
+            :class:`FixedPointAccelerator <pyemma.thermo.FixedPointAccelerator>`).
 
         Example
         -------
@@ -116,6 +125,7 @@ class WHAM(_Estimator, _MultiThermModel, ThermoBase, _SerializableMixIn):
         self.maxiter = maxiter
         self.maxerr = maxerr
         self.save_convergence_info = save_convergence_info
+        self.solver = solver
         # set derived quantities
         self.nthermo, self.nstates_full = bias_energies_full.shape
         # set iteration variables
@@ -165,15 +175,29 @@ class WHAM(_Estimator, _MultiThermModel, ThermoBase, _SerializableMixIn):
         # run estimator
         pg = _ProgressReporter()
         stage = 'WHAM'
+        accelerator = _accelerator(self.solver)
         with pg.context(stage=stage):
-            self.therm_energies, self.conf_energies, self.increments, self.loglikelihoods = \
-                _wham.estimate(
-                    self.state_counts, self.bias_energies,
-                    maxiter=self.maxiter, maxerr=self.maxerr,
-                    therm_energies=self.therm_energies, conf_energies=self.conf_energies,
-                    save_convergence_info=self.save_convergence_info,
-                    callback=_ConvergenceProgressIndicatorCallBack(
-                        pg, stage, self.maxiter, self.maxerr))
+            callback = _ConvergenceProgressIndicatorCallBack(pg, stage, self.maxiter, self.maxerr)
+            if accelerator is None:
+                self.therm_energies, self.conf_energies, self.increments, self.loglikelihoods = \
+                    _wham.estimate(
+                        self.state_counts, self.bias_energies,
+                        maxiter=self.maxiter, maxerr=self.maxerr,
+                        therm_energies=self.therm_energies, conf_energies=self.conf_energies,
+                        save_convergence_info=self.save_convergence_info,
+                        callback=callback)
+            else:
+                def step(variables):
+                    result = _wham.estimate(
+                        self.state_counts, self.bias_energies, maxiter=1, maxerr=0.0,
+                        save_convergence_info=accelerator.save_convergence_info, **variables)
+                    return result, dict(therm_energies=result[0], conf_energies=result[1]), \
+                        _last_loglikelihood(result[3])
+                (self.therm_energies, self.conf_energies, _, _), self.increments, self.loglikelihoods = \
+                    accelerator.run(
+                        step, dict(therm_energies=self.therm_energies, conf_energies=self.conf_energies),
+                        self.maxiter, self.maxerr, save_convergence_info=self.save_convergence_info,
+                        callback=callback)
 
         # get stationary models
         models = [_StationaryModel(
@@ -19,3 +19,4 @@ from .WHAM_estimator import WHAM
 from .MBAR_estimator import MBAR
 from .DTRAM_estimator import DTRAM
 from .TRAM_estimator import TRAM, EmptyState
+from ._solver import FixedPointAccelerator
@@ -49,6 +49,115 @@ class ThermoBase(object):
     def temperatures(self, value):
         self._temperatures = value
 
+    def warm_start(self, previous):
+        r"""Starts the next self-consistent iteration from the result of a previous estimation
+
+        Use this to continue from an earlier run after more data has been added or the lag time
+        has changed. Thermodynamic states are matched by their index and configurational states
+        by their label; states without a previous value start from the default initialization.
+        Lagrangian multipliers are only reused if the iteration is continued with the same lag
+        time and active set. A checkpoint_file, which already exists, takes precedence.
+
+        Parameters
+        ----------
+        previous : estimator, SolverCheckpoint or str
+            An estimated object of the same class, a
+            :class:`SolverCheckpoint <pyemma.thermo.estimators._checkpoint.SolverCheckpoint>`
+            or the name of a file containing one (see checkpoint_file).
+
+        Returns
+        -------
+        self : the estimator
+        """
+        from pyemma.thermo.estimators._checkpoint import SolverCheckpoint
+        name = self.__class__.__name__
+        if isinstance(previous, str):
+            checkpoint = SolverCheckpoint.from_file(previous, name)
+            if checkpoint is None:
+                raise ValueError('checkpoint file %s does not exist' % previous)
+        elif isinstance(previous, SolverCheckpoint):
+            checkpoint = previous
+        elif previous.__class__ is self.__class__:
+            if any(getattr(previous, v, None) is None for v in self._solver_variables):
+                raise ValueError('previous %s has not been estimated' % name)
+            checkpoint = SolverCheckpoint(
+                name, {v: getattr(previous, v) for v in self._solver_variables},
+                active_set=previous._solver_active_set(), lag=getattr(previous, 'lag', None), converged=True)
+        else:
+            raise ValueError('cannot warm start %s from %s' % (name, previous))
+        if checkpoint.estimator != name:
+            raise ValueError('cannot warm start %s from a checkpoint of %s' % (name, checkpoint.estimator))
+        self._warm_start = checkpoint
+        return self
+
+    # names of the iteration variables of the self-consistent iteration
+    _solver_variables = ()
+    # iteration variables, which are only reused when the iteration is continued with the same setup
+    _solver_multipliers = ()
+
+    def _solver_active_set(self):
+        r"""Configurational states of the last axis of the iteration variables, None if there is none."""
+        return self.active_set
+
+    def _init_solver(self, shapes, data=(), callback=None):
+        r"""Sets the initial iteration variables from the checkpoint file or the warm start
+
+        A checkpoint file is only resumed, if it has been written for the same input data;
+        otherwise, it only serves as a warm start.
+
+        Parameters
+        ----------
+        shapes : dict
+            shapes of the iteration variables of the current estimation by name.
+        data : tuple
+            input data of the current estimation, which identifies the checkpoints written for it
+            (see :func:`fingerprint <pyemma.thermo.estimators._checkpoint.fingerprint>`).
+        callback : callable or None
+            callback of the solver, which is called by the returned callback.
+
+        Returns
+        -------
+        maxiter : int
+            number of iterations of this run; a resumed iteration runs for up to maxiter further iterations.
+        callback : _CheckpointCallBack
+            solver callback, which writes the checkpoints.
+        """
+        from pyemma.thermo.estimators._checkpoint import SolverCheckpoint, _CheckpointCallBack, fingerprint
+        file_name = getattr(self, 'checkpoint_file', None)
+        active_set = self._solver_active_set()
+        checkpoint = None
+        data_fingerprint = None
+        if file_name is not None:
+            data_fingerprint = fingerprint(*data)
+            checkpoint = SolverCheckpoint.from_file(file_name, self.__class__.__name__)
+        from_file = checkpoint is not None
+        if checkpoint is None:
+            checkpoint = getattr(self, '_warm_start', None)
+        self._warm_start = None
+        offset = 0
+        if checkpoint is not None:
+            continues = checkpoint.continues(self, active_set, shapes)
+            if continues and from_file and checkpoint.fingerprint != data_fingerprint:
+                self.logger.warning('checkpoint file %s has been written for different input data, it is only used as '
+                                    'a warm start of %s', file_name, self.__class__.__name__)
+                continues = False
+            if continues:
+                for name in shapes:
+                    setattr(self, name, checkpoint.energies[name].copy())
+                offset = checkpoint.iteration
+                self.logger.info('resuming %s after %i iterations', self.__class__.__name__, offset)
+            else:
+                for name, shape in shapes.items():
+                    value = None
+                    if name in checkpoint.energies and name not in self._solver_multipliers:
+                        value = checkpoint.initial_values(name, shape, active_set=active_set)
+                    setattr(self, name, value)
+        callback = _CheckpointCallBack(
+            self, tuple(shapes), active_set, file_name=file_name,
+            interval=getattr(self, 'checkpoint_interval', 0), iteration_offset=offset, subcallback=callback,
+            fingerprint=data_fingerprint)
+        return self.maxiter, callback
+
     @property
     def dt_traj(self):
         return self._dt_traj
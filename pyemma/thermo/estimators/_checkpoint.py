@@ -0,0 +1,207 @@
+# This file is part of PyEMMA.
+#
+# Copyright (c) 2016-2017 Computational Molecular Biology Group, Freie Universitaet Berlin (GER)
+#
+# PyEMMA is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib as _hashlib
+import os as _os
+
+import numpy as _np
+
+from pyemma._base.serialization.serialization import SerializableMixIn as _SerializableMixIn
+from pyemma._base.serialization.serialization import Modifications as _Modifications
+
+__all__ = ['SolverCheckpoint']
+
+
+class SolverCheckpoint(_SerializableMixIn):
+    r"""State of the self-consistent iteration of a TRAM, DTRAM or MBAR estimation
+
+    Checkpoints are written to the checkpoint_file of these estimators every checkpoint_interval
+    iterations and after the iteration has finished. They are stored with the HDF5 serialization
+    under the name of the estimator class, i.e. they can be read with
+    ``pyemma.load(checkpoint_file, 'TRAM')``.
+
+    Parameters
+    ----------
+    estimator : str
+        class name of the estimator, e.g. 'TRAM'.
+    energies : dict of numpy.ndarray
+        the iteration variables by name, e.g. biased_conf_energies and log_lagrangian_mult for TRAM.
+    active_set : numpy.ndarray(n, dtype=int) or None
+        configurational states, which the last axis of the iteration variables refers to;
+        None if the iteration variables are only defined on the thermodynamic states.
+    iteration : int
+        number of completed iterations.
+    lag : int or None
+        lag time of the estimation, None for MBAR.
+    converged : bool
+        whether the iteration has reached maxerr.
+    fingerprint : str or None
+        hash of the input data of the estimation (see :func:`fingerprint`), None if unknown.
+    """
+    __serialize_version = 1
+    __serialize_fields = ('estimator', 'energies', 'active_set', 'iteration', 'lag', 'converged', 'fingerprint')
+    __serialize_modifications_map = {0: _Modifications().set('fingerprint', None).list()}
+
+    def __init__(self, estimator, energies, active_set=None, iteration=0, lag=None, converged=False,
+                 fingerprint=None):
+        self.estimator = estimator
+        self.energies = {name: _np.array(value, dtype=_np.float64) for name, value in energies.items()}
+        self.active_set = None if active_set is None else _np.array(active_set, dtype=int)
+        self.iteration = int(iteration)
+        self.lag = lag
+        self.converged = bool(converged)
+        self.fingerprint = fingerprint
+
+    def continues(self, estimator, active_set, shapes):
+        r"""Whether an estimation with the given setup continues the iteration of this checkpoint,
+        i.e. uses the same lag time, active set and dimensions. The input data is compared
+        separately (see :func:`fingerprint`)."""
+        if self.estimator != estimator.__class__.__name__ or self.lag != getattr(estimator, 'lag', None):
+            return False
+        if (self.active_set is None) != (active_set is None) or \
+                (active_set is not None and not _np.array_equal(self.active_set, active_set)):
+            return False
+        return all(name in self.energies and self.energies[name].shape == tuple(shape)
+                   for name, shape in shapes.items())
+
+    def initial_values(self, name, shape, active_set=None, default=0.0):
+        r"""Values of an iteration variable mapped onto a new estimation problem
+
+        Thermodynamic states are matched by their index and configurational states by their
+        label in the active sets. Values of states, which are not contained in the checkpoint
+        or which are not finite, are set to default.
+
+        Parameters
+        ----------
+        name : str
+            name of the iteration variable.
+        shape : tuple of int
+            shape of the iteration variable in the new estimation.
+        active_set : numpy.ndarray(n, dtype=int) or None
+            configurational states of the new estimation.
+        default : float, default=0.0
+            initial value of states without a valid value.
+
+        Returns
+        -------
+        values : numpy.ndarray(shape, dtype=numpy.float64)
+        """
+        old = self.energies[name]
+        new = _np.full(shape, default, dtype=_np.float64)
+        if self.active_set is None or active_set is None:
+            common = tuple(slice(0, min(a, b)) for a, b in zip(old.shape, new.shape))
+            new[common] = old[common]
+        else:
+            _, i_old, i_new = _np.intersect1d(self.active_set, active_set, return_indices=True)
+            common = tuple(slice(0, min(a, b)) for a, b in zip(old.shape[:-1], new.shape[:-1]))
+            new[common + (i_new, )] = old[common + (i_old, )]
+        new[~_np.isfinite(new)] = default
+        return new
+
+    def save_atomic(self, file_name):
+        r"""Writes this checkpoint to file_name, replacing the file only once it has been written completely."""
+        tmp = file_name + '.tmp'
+        if _os.path.exists(tmp):
+            _os.remove(tmp)
+        self.save(tmp, model_name=self.estimator, overwrite=True)
+        _os.replace(tmp, file_name)
+
+    @staticmethod
+    def from_file(file_name, estimator):
+        r"""The checkpoint of the estimator class named estimator stored in file_name or None, if there is no such file."""
+        if not _os.path.exists(file_name):
+            return None
+        checkpoint = SolverCheckpoint.load(file_name, model_name=estimator)
+        if not isinstance(checkpoint, SolverCheckpoint):
+            raise ValueError('%s does not contain a checkpoint of %s, but %s' % (file_name, estimator, checkpoint))
+        return checkpoint
+
+
+def fingerprint(*data):
+    r"""SHA-1 hex digest of the input data of an estimation
+
+    Parameters
+    ----------
+    data : numpy.ndarray, list of numpy.ndarray or None
+        arrays (e.g. count matrices, state counts and bias energies) or lists of trajectories;
+        memory-mapped arrays are hashed chunk by chunk.
+
+    Returns
+    -------
+    fingerprint : str
+    """
+    digest = _hashlib.sha1()
+    for item in data:
+        _update_fingerprint(digest, item)
+    return digest.hexdigest()
+
+
+def _update_fingerprint(digest, item):
+    if item is None:
+        digest.update(b'None;')
+    elif isinstance(item, (list, tuple)):
+        digest.update(('list%d;' % len(item)).encode())
+        for element in item:
+            _update_fingerprint(digest, element)
+    else:
+        array = _np.asarray(item)
+        digest.update(('%s%s;' % (array.dtype.str, array.shape)).encode())
+        if array.ndim == 0:
+            digest.update(array.tobytes())
+            return
+        chunksize = max(1, 2**24 // max(1, array[:1].nbytes))
+        for start in range(0, array.shape[0], chunksize):
+            digest.update(_np.ascontiguousarray(array[start:start + chunksize]).data)
+
+
+class _CheckpointCallBack(object):
+    r"""Callback writing a SolverCheckpoint every interval iterations (if file_name is given)."""
+
+    def __init__(self, estimator, variables, active_set, file_name=None, interval=0, iteration_offset=0,
+                 subcallback=None, fingerprint=None):
+        self.estimator = estimator
+        self.variables = variables
+        self.active_set = active_set
+        self.fingerprint = fingerprint
+        self.file_name = file_name
+        self.interval = interval
+        self.iteration_offset = iteration_offset
+        self.iteration = iteration_offset
+        self.converged = False
+        self.subcallback = subcallback
+
+    def __call__(self, *args, **kwargs):
+        if self.subcallback is not None:
+            self.subcallback(*args, **kwargs)
+        if 'iteration_step' in kwargs:
+            self.iteration = self.iteration_offset + kwargs['iteration_step'] + 1
+        if 'err' in kwargs and 'maxerr' in kwargs:
+            self.converged = kwargs['err'] < kwargs['maxerr']
+        if self.file_name is None or not self.interval or self.iteration % self.interval != 0:
+            return
+        if all(name in kwargs for name in self.variables):
+            self.save({name: kwargs[name] for name in self.variables})
+
+    def save(self, energies, converged=None):
+        r"""Writes the iteration variables given by energies to the checkpoint file."""
+        if self.file_name is None:
+            return
+        SolverCheckpoint(
+            self.estimator.__class__.__name__, energies, active_set=self.active_set, iteration=self.iteration,
+            lag=getattr(self.estimator, 'lag', None),
+            converged=self.converged if converged is None else converged,
+            fingerprint=self.fingerprint).save_atomic(self.file_name)
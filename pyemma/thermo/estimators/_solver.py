@@ -0,0 +1,207 @@
+# This file is part of PyEMMA.
+#
+# Copyright (c) 2016-2017 Computational Molecular Biology Group, Freie Universitaet Berlin (GER)
+#
+# PyEMMA is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import deque as _deque
+
+import numpy as _np
+
+__all__ = ['FixedPointAccelerator']
+
+
+class FixedPointAccelerator(object):
+    r"""Anderson mixing / DIIS for the self-consistent iterations of the thermo estimators
+
+    The estimators evaluate a single step of their self-consistent iteration x -> G(x) on the
+    log-space iteration variables (e.g. free energies and Lagrangian multipliers) and this class
+    extrapolates the next iterate from the last memory iterates and their residuals G(x) - x.
+
+    Parameters
+    ----------
+    method : str, default='anderson'
+        'anderson' : Anderson mixing (type II), the next iterate is G(x_k) corrected by the
+        least-squares combination of the previous differences, which minimizes the linearized
+        residual.
+        'diis' : direct inversion in the iterative subspace (Pulay mixing), the next iterate is
+        the affine combination of the G(x_i) with the smallest combined residual.
+    memory : int, default=8
+        number of previous iterates used for the extrapolation.
+    regularization : float, default=1.0E-10
+        relative Tikhonov regularization of the least-squares problems.
+    safeguard : bool, default=True
+        reject extrapolated iterates, which decrease the log-likelihood (or increase the residual
+        by more than a factor of two for estimators without likelihood), and restart the mixing
+        from the last plain iteration step.
+    """
+
+    def __init__(self, method='anderson', memory=8, regularization=1.0E-10, safeguard=True):
+        if method not in ('anderson', 'diis'):
+            raise ValueError('unknown acceleration method %s, use \'anderson\' or \'diis\'' % method)
+        if memory < 1:
+            raise ValueError('memory has to be positive, but was %s' % memory)
+        self.method = method
+        self.memory = int(memory)
+        self.regularization = regularization
+        self.safeguard = safeguard
+
+    @property
+    def save_convergence_info(self):
+        r"""save_convergence_info for the single iteration steps, the log-likelihood is only needed by the safeguard."""
+        return 1 if self.safeguard else 0
+
+    def __repr__(self):
+        return '%s(method=%r, memory=%i)' % (self.__class__.__name__, self.method, self.memory)
+
+    def _extrapolate(self, gs, rs, mask):
+        if len(gs) < 2:
+            return gs[-1]
+        G = _np.array([g[mask] for g in gs])
+        R = _np.array([r[mask] for r in rs])
+        x = gs[-1].copy()
+        if self.method == 'anderson':
+            dG = _np.diff(G, axis=0)
+            dR = _np.diff(R, axis=0)
+            A = dR.dot(dR.T)
+            A[_np.diag_indices_from(A)] += self.regularization * max(_np.trace(A), 1.0E-300)
+            gamma = _np.linalg.solve(A, dR.dot(R[-1]))
+            x[mask] = G[-1] - gamma.dot(dG)
+        else:
+            n = len(gs)
+            B = _np.ones((n + 1, n + 1))
+            B[:n, :n] = R.dot(R.T)
+            B[:n, :n][_np.diag_indices(n)] += self.regularization * max(_np.trace(B[:n, :n]), 1.0E-300)
+            B[n, n] = 0.0
+            rhs = _np.zeros(n + 1)
+            rhs[n] = 1.0
+            c = _np.linalg.solve(B, rhs)[:n]
+            x[mask] = c.dot(G)
+        return x
+
+    def run(self, step, variables, maxiter, maxerr, save_convergence_info=0, callback=None):
+        r"""Runs the accelerated self-consistent iteration
+
+        Parameters
+        ----------
+        step : callable
+            step(variables) evaluates one iteration step of the estimator and returns a tuple
+            (result, variables, loglikelihood) of the return value of the underlying
+            estimation, the updated iteration variables (dict of numpy.ndarray) and the
+            log-likelihood (or None, if the estimator does not provide one).
+        variables : dict
+            initial iteration variables by name; None values are initialized by the first step.
+        maxiter : int
+            maximum number of iteration steps.
+        maxerr : float
+            convergence criterion for the maximal change of the iteration variables.
+        save_convergence_info : int, default=0
+            every save_convergence_info iteration steps, store the increment and the
+            log-likelihood; 0 means no storage.
+        callback : callable, optional
+            called after every iteration step with the iteration variables and iteration_step,
+            err, maxerr and maxiter as keyword arguments.
+
+        Returns
+        -------
+        result : the result of the last accepted iteration step
+        increments : numpy.ndarray or None
+        loglikelihoods : numpy.ndarray or None
+        """
+        names = list(variables.keys())
+        shapes = {}
+
+        def pack(values):
+            for n in names:
+                shapes[n] = _np.shape(values[n])
+            return _np.concatenate([_np.asarray(values[n], dtype=_np.float64).ravel() for n in names])
+
+        def unpack(vector):
+            values, offset = {}, 0
+            for n in names:
+                size = int(_np.prod(shapes[n]))
+                values[n] = _np.ascontiguousarray(vector[offset:offset + size].reshape(shapes[n]))
+                offset += size
+            return values
+
+        increments, loglikelihoods = [], []
+        gs, rs = _deque(maxlen=self.memory + 1), _deque(maxlen=self.memory + 1)
+        accepted = None  # (G(x), err, loglikelihood) of the last accepted iterate
+        x = None if any(v is None for v in variables.values()) else pack(variables)
+        current = variables
+        extrapolated = False
+        result = accepted_result = None
+        for iteration_step in range(maxiter):
+            result, updated, loglikelihood = step(current)
+            gx = pack(updated)
+            if x is None:
+                # the estimator initialized the variables, continue with a plain step
+                err = _np.inf
+                mask = _np.isfinite(gx)
+            else:
+                mask = _np.isfinite(gx) & _np.isfinite(x)
+                err = _np.max(_np.abs(gx[mask] - x[mask])) if _np.any(mask) else 0.0
+            if self.safeguard and extrapolated and accepted is not None:
+                if loglikelihood is not None and accepted[2] is not None:
+                    worse = loglikelihood < accepted[2]
+                else:
+                    worse = err > 2.0 * accepted[1]
+                if worse:
+                    # restart the mixing from the plain step of the last accepted iterate
+                    gs.clear()
+                    rs.clear()
+                    extrapolated = False
+                    x = accepted[0]
+                    current = unpack(x)
+                    continue
+            accepted_result = result
+            if save_convergence_info > 0 and iteration_step % save_convergence_info == 0:
+                increments.append(err)
+                loglikelihoods.append(_np.nan if loglikelihood is None else loglikelihood)
+            if callback is not None:
+                callback(iteration_step=iteration_step, err=err, maxerr=maxerr, maxiter=maxiter, **updated)
+            if err < maxerr:
+                break
+            accepted = (gx, err, loglikelihood)
+            if x is not None:
+                gs.append(gx)
+                r = _np.zeros_like(gx)
+                r[mask] = gx[mask] - x[mask]
+                rs.append(r)
+            x = self._extrapolate(list(gs), list(rs), _np.logical_and.reduce([_np.isfinite(g) for g in gs])) \
+                if len(gs) > 1 else gx
+            extrapolated = len(gs) > 1
+            current = unpack(x)
+        if save_convergence_info == 0:
+            return accepted_result, None, None
+        return accepted_result, _np.array(increments, dtype=_np.float64), _np.array(loglikelihoods, dtype=_np.float64)
+
+
+def _last_loglikelihood(loglikelihoods):
+    r"""Log-likelihood of a single iteration step as returned by thermotools, None if it was not computed."""
+    if loglikelihoods is None or len(loglikelihoods) == 0 or not _np.isfinite(loglikelihoods[-1]):
+        return None
+    return float(loglikelihoods[-1])
+
+
+def _accelerator(solver):
+    r"""FixedPointAccelerator for the solver parameter of the estimators, None for the built-in iteration."""
+    if solver is None or (isinstance(solver, str) and solver == 'default'):
+        return None
+    if isinstance(solver, FixedPointAccelerator):
+        return solver
+    if isinstance(solver, str):
+        return FixedPointAccelerator(method=solver)
+    raise ValueError('solver has to be \'default\', \'anderson\', \'diis\' or a FixedPointAccelerator, but was %s'
+                     % solver)
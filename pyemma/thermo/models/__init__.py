@@ -16,5 +16,5 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from .stationary import StationaryModel
-from .multi_therm import MultiThermModel
+from .multi_therm import MultiThermModel, LazyModels
 from .memm import MEMM
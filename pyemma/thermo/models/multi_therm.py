@@ -16,6 +16,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import numpy as _np
+import threading as _threading
+from collections.abc import Sequence as _Sequence
 
 from pyemma.thermo.models.stationary import StationaryModel as _StationaryModel
 from pyemma._base.model import call_member as _call_member
@@ -25,6 +27,76 @@ from pyemma.util import types as _types
 __author__ = 'noe'
 
 
+def _model_list(models):
+    return list(models)
+
+
+class LazyModels(_Sequence):
+    r"""Read-only list of models, which are constructed on first access
+
+    Parameters
+    ----------
+    n : int
+        number of models.
+    construct : callable
+        construct(i) returns the i'th model.
+    n_jobs : int or None, default=None
+        number of threads used to construct all remaining models at once (e.g. on iteration).
+        None uses :func:`pyemma._base.parallel.get_n_jobs`.
+    """
+
+    def __init__(self, n, construct, n_jobs=None):
+        self._construct = construct
+        self._models = [None] * n
+        self._locks = [_threading.Lock() for _ in range(n)]
+        self.n_jobs = n_jobs
+
+    def __len__(self):
+        return len(self._models)
+
+    def _get(self, i):
+        with self._locks[i]:
+            if self._models[i] is None:
+                self._models[i] = self._construct(i)
+            return self._models[i]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._get(i) for i in range(*item.indices(len(self)))]
+        if not -len(self) <= item < len(self):
+            raise IndexError('model index %s out of range' % item)
+        return self._get(item % len(self))
+
+    def __iter__(self):
+        self.construct_all()
+        return iter(self._models)
+
+    @property
+    def constructed(self):
+        """Boolean array, True for the models which have already been constructed."""
+        return _np.array([m is not None for m in self._models], dtype=bool)
+
+    def construct_all(self):
+        """Constructs all remaining models concurrently."""
+        missing = [i for i, m in enumerate(self._models) if m is None]
+        if len(missing) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            from pyemma._base.parallel import get_n_jobs
+            n_jobs = get_n_jobs() if self.n_jobs is None else self.n_jobs
+            with ThreadPoolExecutor(max_workers=max(1, min(n_jobs, len(missing)))) as pool:
+                list(pool.map(self._get, missing))
+        elif missing:
+            self._get(missing[0])
+        return self
+
+    def __reduce__(self):
+        # stored as a plain list of the constructed models
+        return _model_list, (list(self),)
+
+    def __repr__(self):
+        return '%s(n=%i, constructed=%i)' % (self.__class__.__name__, len(self), self.constructed.sum())
+
+
 class MultiThermModel(_StationaryModel):
     r"""Coupled set of stationary models at multiple thermodynamic states"""
     __serialize_version = 0
@@ -47,6 +119,8 @@ class MultiThermModel(_StationaryModel):
             when obtaining data from umbrella sampling, models might be the list of stationary
             models for n umbrellas (biased ensembles), while the thermodynamic ground state is the
             unbiased ensemble. In that case, self.pi would be different from any self.models[i].pi.
+            A :class:`LazyModels <pyemma.thermo.models.multi_therm.LazyModels>` object defers the
+            construction of the models to their first access.
         f_therm : numpy.ndarray(k)
             Free energies of the different thermodynamic states.
         pi : numpy.ndarray(n), default=None
@@ -76,8 +150,9 @@ class MultiThermModel(_StationaryModel):
         # check and set other parameters
         _types.assert_array(f_therm, ndim=1, kind='numeric')
         f_therm = _np.array(f_therm, dtype=float)
-        for m in models:
-            assert issubclass(m.__class__, _Model)
+        if not isinstance(models, LazyModels):
+            for m in models:
+                assert issubclass(m.__class__, _Model)
         self.update_model_params(models=models, f_therm=f_therm)
 
     # TODO: actually this is a general construct for SampledMSMs and MTherm models. Can we generalize the code?
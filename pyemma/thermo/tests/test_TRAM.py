@@ -15,8 +15,9 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
 import unittest
-
+from tempfile import TemporaryDirectory
 
 import numpy as np
 import pyemma.thermo
@@ -153,6 +154,64 @@ class TestTRAMwith5StateDTRAMModel(unittest.TestCase):
         tram.pointwise_free_energies()
         tram.mbar_pointwise_free_energies()
 
+    def test_checkpoint_resume(self):
+        from pyemma.thermo.estimators._checkpoint import SolverCheckpoint
+        reference = pyemma.thermo.TRAM(lag=1, maxiter=100, maxerr=1E-15, init=None).estimate(self.trajs)
+        with TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'checkpoint.h5')
+            # interrupted run
+            pyemma.thermo.TRAM(lag=1, maxiter=50, maxerr=1E-15, init=None, checkpoint_file=file_name,
+                               checkpoint_interval=10).estimate(self.trajs)
+            checkpoint = pyemma.load(file_name, 'TRAM')
+            assert isinstance(checkpoint, SolverCheckpoint)
+            self.assertEqual(checkpoint.iteration, 50)
+            self.assertFalse(checkpoint.converged)
+            # resumed run continues with up to maxiter further iterations
+            tram = pyemma.thermo.TRAM(lag=1, maxiter=50, maxerr=1E-15, init=None, checkpoint_file=file_name,
+                                      save_convergence_info=1).estimate(self.trajs)
+            self.assertLessEqual(len(tram.increments), 50)
+            self.assertGreater(pyemma.load(file_name, 'TRAM').iteration, 50)
+            self.assertLessEqual(pyemma.load(file_name, 'TRAM').iteration, 100)
+        np.testing.assert_allclose(tram.therm_energies, reference.therm_energies, atol=1e-8)
+        np.testing.assert_allclose(tram.f, reference.f, atol=1e-8)
+
+    def test_checkpoint_of_other_data(self):
+        reference = pyemma.thermo.TRAM(lag=1, maxerr=1E-12, init=None).estimate(self.trajs)
+        other = tuple([traj[:len(traj) // 2] for traj in trajs] for trajs in self.trajs)
+        with TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'checkpoint.h5')
+            pyemma.thermo.TRAM(lag=1, maxiter=50, maxerr=1E-15, init=None, checkpoint_file=file_name).estimate(other)
+            self.assertEqual(pyemma.load(file_name, 'TRAM').iteration, 50)
+            # same lag time and active set, but other data: the checkpoint is only a warm start
+            tram = pyemma.thermo.TRAM(lag=1, maxerr=1E-12, init=None, checkpoint_file=file_name)
+            with self.assertLogs(tram.logger, level='WARNING'):
+                tram.estimate(self.trajs)
+            self.assertNotEqual(pyemma.load(file_name, 'TRAM').iteration, 50)
+        np.testing.assert_allclose(tram.therm_energies, reference.therm_energies, atol=1e-6)
+        np.testing.assert_allclose(tram.f, reference.f, atol=1e-6)
+
+    def test_warm_start(self):
+        cold = pyemma.thermo.TRAM(lag=1, maxerr=1E-12, init=None, save_convergence_info=1).estimate(self.trajs)
+        # a different lag time only reuses the free energies
+        for lag in (1, 2):
+            warm = pyemma.thermo.TRAM(lag=lag, maxerr=1E-12, init=None, save_convergence_info=1)
+            warm.warm_start(cold).estimate(self.trajs)
+            self.assertLess(len(warm.increments), len(cold.increments))
+            np.testing.assert_allclose(warm.therm_energies, cold.therm_energies, atol=0.1)
+        with self.assertRaises(ValueError):
+            pyemma.thermo.TRAM(lag=1).warm_start(pyemma.thermo.TRAM(lag=1))
+
+    def test_dtram_warm_start_wham(self):
+        ttrajs, dtrajs = self.trajs[0], self.trajs[1]
+        cold = pyemma.thermo.DTRAM(self.bias_energies_sh, lag=1, maxerr=1E-12, init='wham').estimate((ttrajs, dtrajs))
+        # the restored free energies are not replaced by the WHAM initialization
+        warm = {init: pyemma.thermo.DTRAM(self.bias_energies_sh, lag=1, maxiter=1, init=init).warm_start(cold)
+                for init in (None, 'wham')}
+        for dtram in warm.values():
+            dtram.estimate((ttrajs, dtrajs))
+        np.testing.assert_allclose(warm['wham'].conf_energies, warm[None].conf_energies, rtol=0, atol=1e-12)
+        np.testing.assert_allclose(warm['wham'].conf_energies, cold.conf_energies, atol=1e-6)
+
 
 class TestTRAMasReversibleMSM(unittest.TestCase):
     @classmethod
@@ -387,6 +446,26 @@ class TestTRAMwithTRAMmodel(unittest.TestCase, TRAMandTRAMMBARBaseClass):
     def test_with_TRAM_model_log_space(self):
         self.with_TRAM_model(False)
 
+    def test_parallel_post_processing(self):
+        trams = [pyemma.thermo.TRAM(lag=1, maxerr=1E-12, init='mbar', connectivity='reversible_pathways',
+                                    n_jobs=n_jobs).estimate((self.ttrajs, self.dtrajs, self.btrajs))
+                 for n_jobs in (1, 4)]
+        for tram in trams:
+            # models are only constructed on access
+            assert isinstance(tram.models, pyemma.thermo.models.LazyModels)
+            assert not np.any(tram.models.constructed)
+            tram.models[1]
+            np.testing.assert_equal(tram.models.constructed, np.arange(len(tram.models)) == 1)
+        for model_serial, model_parallel in zip(*[tram.models for tram in trams]):
+            np.testing.assert_allclose(model_serial.transition_matrix, model_parallel.transition_matrix)
+            np.testing.assert_equal(model_serial.active_set, model_parallel.active_set)
+        assert np.all(trams[1].models.constructed)
+        for k in (None, 0, 2):
+            for mu_serial, mu_parallel in zip(*[tram.pointwise_free_energies(k) for tram in trams]):
+                np.testing.assert_allclose(mu_serial, mu_parallel)
+            for mu_serial, mu_parallel in zip(*[tram.mbar_pointwise_free_energies(k) for tram in trams]):
+                np.testing.assert_allclose(mu_serial, mu_parallel)
+
 
 class TestTRAMMBARwithTRAMMBARmodel(unittest.TestCase, TRAMandTRAMMBARBaseClass):
     @classmethod
@@ -272,6 +272,31 @@ class TestUmbrellaSampling(unittest.TestCase):
         validate_kinetics(self, tram)
         check_serialization(tram)
 
+    def test_lazy_bias(self):
+        for estimator in ('wham', 'mbar'):
+            memm = estimate_umbrella_sampling(
+                self.us_trajs, self.us_dtrajs, self.us_centers, self.us_force_constants,
+                md_trajs=self.md_trajs, md_dtrajs=self.md_dtrajs,
+                maxiter=50000, maxerr=1e-13, estimator=estimator, lazy_bias=True, bias_dtype=np.float32)
+            validate_thermodynamics(self, memm, strict=False) # not strict because out of global eq.
+
+    def test_accelerated_solvers(self):
+        for estimator in ('wham', 'mbar', 'dtram', 'tram'):
+            reference = estimate_umbrella_sampling(
+                self.us_trajs, self.us_dtrajs, self.us_centers, self.us_force_constants,
+                md_trajs=self.md_trajs, md_dtrajs=self.md_dtrajs,
+                maxiter=50000, maxerr=1e-10, estimator=estimator, lag=10, save_convergence_info=1)
+            for solver in ('anderson', 'diis'):
+                memm = estimate_umbrella_sampling(
+                    self.us_trajs, self.us_dtrajs, self.us_centers, self.us_force_constants,
+                    md_trajs=self.md_trajs, md_dtrajs=self.md_dtrajs,
+                    maxiter=50000, maxerr=1e-10, estimator=estimator, lag=10, save_convergence_info=1,
+                    solver=solver)
+                npt.assert_allclose(memm.f_therm, reference.f_therm, atol=1.0E-6)
+                npt.assert_allclose(memm.f, reference.f, atol=1.0E-6)
+                self.assertLessEqual(len(memm.increments), len(reference.increments))
+                self.assertLess(memm.increments[-1], 1e-10)
+
 
 # ==================================================================================================
 # tests for the multi temperature API
@@ -18,11 +18,143 @@
 import unittest
 import numpy as np
 import pyemma.thermo.util.util as util
+from pyemma.thermo.estimators._solver import FixedPointAccelerator, _accelerator
 
 # ==================================================================================================
 # tests for protected umbrella sampling convenience functions
 # ==================================================================================================
 
+class TestAveragedBiasMatrix(unittest.TestCase):
+
+    @staticmethod
+    def _reference(bias_sequences, dtrajs, nstates):
+        # frame by frame exponential average
+        nthermo = bias_sequences[0].shape[1]
+        weights = np.zeros(shape=(nthermo, nstates))
+        counts = np.zeros(shape=(nstates,))
+        for b, d in zip(bias_sequences, dtrajs):
+            for t in range(len(d)):
+                weights[:, d[t]] += np.exp(-b[t])
+                counts[d[t]] += 1
+        with np.errstate(divide='ignore'):
+            return -np.log(weights) + np.log(np.where(counts > 0, counts, 1))[np.newaxis, :]
+
+    def test_averaged_bias_matrix(self):
+        rng = np.random.RandomState(42)
+        dtrajs = [rng.randint(0, 8, size=n) for n in (50, 1, 120)]
+        dtrajs[1][:] = 9
+        bias_sequences = [rng.normal(size=(len(d), 4)) for d in dtrajs]
+        bias_sequences[2][:, 1] = np.inf
+        ref = self._reference(bias_sequences, dtrajs, 12)
+        for n_jobs in (1, 3):
+            bias_matrix = util.get_averaged_bias_matrix(bias_sequences, dtrajs, nstates=12, n_jobs=n_jobs)
+            self.assertEqual(bias_matrix.shape, (4, 12))
+            np.testing.assert_array_equal(np.isinf(bias_matrix), np.isinf(ref))
+            np.testing.assert_allclose(bias_matrix[np.isfinite(ref)], ref[np.isfinite(ref)])
+        with self.assertRaises(ValueError):
+            util.get_averaged_bias_matrix(bias_sequences, dtrajs, nstates=5)
+
+
+class TestFixedPointAccelerator(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # slowly contracting linear map x -> A x + b with fixed point x*
+        rng = np.random.RandomState(17)
+        Q, _ = np.linalg.qr(rng.normal(size=(20, 20)))
+        cls.A = Q.dot(np.diag(np.linspace(0.5, 0.995, 20))).dot(Q.T)
+        cls.b = rng.normal(size=20)
+        cls.x_star = np.linalg.solve(np.eye(20) - cls.A, cls.b)
+
+    def _step(self, variables):
+        x = self.A.dot(variables['x']) + self.b
+        return x, dict(x=x), None
+
+    def test_convergence(self):
+        for method in ('anderson', 'diis'):
+            accelerator = FixedPointAccelerator(method=method)
+            x, increments, loglikelihoods = accelerator.run(
+                self._step, dict(x=np.zeros(20)), 5000, 1.0E-12, save_convergence_info=1)
+            np.testing.assert_allclose(x, self.x_star, atol=1.0E-8)
+            self.assertLess(increments[-1], 1.0E-12)
+            self.assertLess(len(increments), 1000)
+            self.assertTrue(np.all(np.isnan(loglikelihoods)))
+
+    def test_callback(self):
+        steps = []
+        def callback(**kwargs):
+            steps.append(kwargs['iteration_step'])
+            self.assertIn('x', kwargs)
+        FixedPointAccelerator(memory=3).run(self._step, dict(x=np.zeros(20)), 10, 0.0, callback=callback)
+        self.assertEqual(steps[0], 0)
+        self.assertLessEqual(len(steps), 10)
+
+    def test_solver_parameter(self):
+        self.assertIsNone(_accelerator('default'))
+        self.assertIsNone(_accelerator(None))
+        self.assertEqual(_accelerator('diis').method, 'diis')
+        accelerator = FixedPointAccelerator(memory=3)
+        self.assertIs(_accelerator(accelerator), accelerator)
+        with self.assertRaises(ValueError):
+            _accelerator('newton')
+        with self.assertRaises(ValueError):
+            _accelerator(42)
+        with self.assertRaises(ValueError):
+            FixedPointAccelerator(memory=0)
+
+
+class TestLazyBiasTrajectory(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.RandomState(7)
+        cls.energy_trajs = [rng.normal(size=n) for n in (300, 41)]
+        cls.temp_trajs = [rng.choice([300.0, 310.0, 330.0], size=len(e)) for e in cls.energy_trajs]
+        cls.temperatures = np.array([300.0, 310.0, 330.0])
+        cls.dtrajs = [rng.randint(0, 6, size=len(e)) for e in cls.energy_trajs]
+
+    def _bias(self, **kwargs):
+        return util._get_multi_temperature_bias_sequences(
+            self.energy_trajs, self.temp_trajs, self.temperatures, 300.0, 'kcal/mol', 'K', **kwargs)
+
+    def test_lazy_equals_eager(self):
+        eager = self._bias()
+        lazy = self._bias(lazy=True)
+        for b, lb in zip(eager, lazy):
+            self.assertIsInstance(lb, util.LazyBiasTrajectory)
+            self.assertEqual(lb.shape, b.shape)
+            lb.chunksize = 64
+            np.testing.assert_array_equal(np.asarray(lb), b)
+            bias_array = util._as_bias_array(lb)
+            self.assertIsInstance(bias_array, np.memmap)
+            np.testing.assert_array_equal(bias_array, b)
+        np.testing.assert_allclose(
+            util.get_averaged_bias_matrix(lazy, self.dtrajs),
+            util.get_averaged_bias_matrix(eager, self.dtrajs), atol=1e-12)
+        self.assertEqual(next(self._bias(lazy=True, dtype=np.float32)[0].chunks())[1].dtype, np.float32)
+
+    def test_bias_files(self):
+        from pyemma.util.files import TemporaryDirectory
+        import os
+        eager = self._bias()
+        with TemporaryDirectory() as td:
+            files = [os.path.join(td, '%d.npy' % i) for i in range(len(eager))]
+            for f, b in zip(files, eager):
+                np.save(f, b)
+            bias_array = util._as_bias_array(files[0])
+            self.assertIsInstance(bias_array, np.memmap)
+            np.testing.assert_array_equal(bias_array, eager[0])
+            np.testing.assert_allclose(
+                util.get_averaged_bias_matrix(files, self.dtrajs),
+                util.get_averaged_bias_matrix(eager, self.dtrajs))
+            # single precision files are converted chunk by chunk
+            np.save(files[1], eager[1].astype(np.float32))
+            bias_array = util._as_bias_array(files[1])
+            self.assertEqual(bias_array.dtype, np.float64)
+            np.testing.assert_allclose(bias_array, eager[1], rtol=1e-6)
+            del bias_array
+
+
 class TestProtectedUmbrellaSamplingCenters(unittest.TestCase):
 
     def _assert_us_center(self, us_center, dimension):
@@ -19,16 +19,187 @@ import numpy as _np
 from pyemma.util import types
 
 __all__ = [
+    'LazyBiasTrajectory',
     'get_averaged_bias_matrix',
     'get_umbrella_sampling_data',
     'get_multi_temperature_data',
     'assign_unbiased_state_label']
 
+# ==================================================================================================
+# bias trajectories
+# ==================================================================================================
+
+class LazyBiasTrajectory(object):
+    r"""
+    Reduced bias energy trajectory of shape (T, num_therm_states), which is evaluated chunk by
+    chunk on demand instead of being kept in memory.
+
+    Lazy bias trajectories can be passed to the thermo API functions and estimators wherever
+    bias trajectories are expected. WHAM and dTRAM only need the averaged bias matrix, which is
+    accumulated chunk by chunk. TRAM and MBAR need the full trajectories in double precision;
+    those are written chunk by chunk to a temporary memory-mapped file (see :meth:`to_memmap`).
+
+    Parameters
+    ----------
+    n_frames : int
+        Number of frames T.
+    nthermo : int
+        Number of thermodynamic states.
+    evaluate : callable
+        evaluate(start, stop) returns the bias energies of the frames start, ..., stop-1 as
+        numpy.ndarray(shape=(stop - start, nthermo)).
+    dtype : numpy.dtype, optional, default=numpy.float64
+        Type of the evaluated chunks, e.g. numpy.float32 to halve their memory footprint.
+    chunksize : int, optional, default=None
+        Number of frames per chunk. If None, chunks of about 2**24 elements are used.
+    """
+    ndim = 2
+
+    def __init__(self, n_frames, nthermo, evaluate, dtype=_np.float64, chunksize=None):
+        self.n_frames = int(n_frames)
+        self.nthermo = int(nthermo)
+        self.evaluate = evaluate
+        self.dtype = _np.dtype(dtype)
+        if chunksize is None:
+            chunksize = max(1, 2**24 // max(1, self.nthermo))
+        self.chunksize = int(chunksize)
+
+    @property
+    def shape(self):
+        return self.n_frames, self.nthermo
+
+    def __len__(self):
+        return self.n_frames
+
+    def chunks(self, chunksize=None):
+        r""" Yields (start, bias) for consecutive chunks of frames, bias has shape (stop - start, nthermo). """
+        chunksize = self.chunksize if chunksize is None else chunksize
+        for start in range(0, self.n_frames, chunksize):
+            stop = min(start + chunksize, self.n_frames)
+            yield start, _np.asarray(self.evaluate(start, stop), dtype=self.dtype)
+
+    def __array__(self, dtype=None):
+        out = _np.empty(self.shape, dtype=self.dtype if dtype is None else dtype)
+        for start, chunk in self.chunks():
+            out[start:start + chunk.shape[0]] = chunk
+        return out
+
+    def to_memmap(self, filename=None, dtype=_np.float64):
+        r"""
+        Evaluates the bias chunk by chunk into a memory-mapped array.
+
+        Parameters
+        ----------
+        filename : str, optional, default=None
+            Name of the .npy file to create. If None, an anonymous temporary file is used, which is
+            removed as soon as the array is garbage collected.
+        dtype : numpy.dtype, optional, default=numpy.float64
+            Type of the array.
+
+        Returns
+        -------
+        bias : numpy.memmap(shape=(T, nthermo))
+        """
+        return _write_memmap(self.shape, self.chunks(), filename=filename, dtype=dtype)
+
+
+def _write_memmap(shape, chunks, filename=None, dtype=_np.float64):
+    if shape[0] * shape[1] == 0:
+        # empty files can not be mapped
+        return _np.empty(shape, dtype=dtype)
+    if filename is None:
+        import tempfile
+        out = _np.memmap(tempfile.TemporaryFile(), dtype=dtype, mode='w+', shape=shape)
+    else:
+        out = _np.lib.format.open_memmap(filename, mode='w+', dtype=dtype, shape=shape)
+    for start, chunk in chunks:
+        out[start:start + chunk.shape[0]] = chunk
+    out.flush()
+    return out
+
+
+def _open_bias_trajectory(btraj):
+    r"""
+    Memory-maps bias trajectories given as file names of .npy files, other inputs are returned as they are.
+    The maps are copy-on-write, so the data is loaded on access and the files are never modified.
+    """
+    import os
+    if isinstance(btraj, (str, os.PathLike)):
+        return _np.load(btraj, mmap_mode='c')
+    return btraj
+
+
+def _bias_chunks(btraj):
+    r""" Yields (start, bias) for consecutive chunks of frames of a bias trajectory of any supported kind. """
+    btraj = _open_bias_trajectory(btraj)
+    if isinstance(btraj, LazyBiasTrajectory):
+        for start, chunk in btraj.chunks():
+            yield start, chunk
+    else:
+        btraj = _np.asarray(btraj)
+        chunksize = max(1, 2**24 // max(1, btraj.shape[1]))
+        for start in range(0, btraj.shape[0], chunksize):
+            yield start, btraj[start:start + chunksize]
+
+
+def _as_bias_array(btraj):
+    r"""
+    Bias trajectory as C-contiguous float64 array like the thermotools estimators need it.
+
+    In-memory arrays are converted as before. Lazy bias trajectories and memory-mapped files of
+    another type or layout are converted chunk by chunk into a temporary memory map instead of
+    being loaded into memory; memory-mapped float64 files are used as they are.
+    """
+    btraj = _open_bias_trajectory(btraj)
+    if isinstance(btraj, LazyBiasTrajectory):
+        return btraj.to_memmap()
+    if isinstance(btraj, _np.memmap) and not (
+            btraj.dtype == _np.float64 and btraj.flags.c_contiguous):
+        return _write_memmap(btraj.shape, _bias_chunks(btraj))
+    return _np.require(btraj, dtype=_np.float64, requirements='C')
+
 # ==================================================================================================
 # helpers for discrete estimations
 # ==================================================================================================
 
-def get_averaged_bias_matrix(bias_sequences, dtrajs, nstates=None):
+def _state_wise_logsumexp(bias_sequence, dtraj):
+    r"""
+    Log-sum-exp of the negative bias energies of every observed state in one trajectory.
+
+    The frames are grouped by state with a single sort, the log-sum-exp is evaluated for all
+    thermodynamic states at once as segmented reductions over the groups.
+
+    Returns
+    -------
+    states : numpy.ndarray(n) of int
+        the observed states
+    counts : numpy.ndarray(n) of int
+        number of frames in each observed state
+    lse : numpy.ndarray(shape=(n, num_therm_states))
+        log(sum(exp(-b))) over the frames of each observed state
+    """
+    dtraj = _np.asarray(dtraj)
+    order = _np.argsort(dtraj, kind='stable')
+    sorted_states = dtraj[order]
+    starts = _np.concatenate(([0], _np.flatnonzero(sorted_states[1:] != sorted_states[:-1]) + 1))
+    counts = _np.diff(_np.append(starts, len(sorted_states)))
+    neg_bias = -_np.asarray(bias_sequence, dtype=_np.float64)[order]
+    shift = _np.maximum.reduceat(neg_bias, starts, axis=0)
+    # states with infinite bias energies in all frames contribute exp(-inf) = 0
+    shift[~_np.isfinite(shift)] = 0.0
+    neg_bias -= _np.repeat(shift, counts, axis=0)
+    with _np.errstate(divide='ignore'):
+        lse = shift + _np.log(_np.add.reduceat(_np.exp(neg_bias, out=neg_bias), starts, axis=0))
+    return sorted_states[starts], counts, lse
+
+
+def _chunked_state_wise_logsumexp(bias_sequence, dtraj):
+    # bounds the memory of the reductions for long (or lazy, memory-mapped) bias trajectories
+    return [_state_wise_logsumexp(chunk, dtraj[start:start + chunk.shape[0]])
+            for start, chunk in _bias_chunks(bias_sequence)]
+
+
+def get_averaged_bias_matrix(bias_sequences, dtrajs, nstates=None, n_jobs=None):
     r"""
     Computes a bias matrix via an exponential average of the observed frame wise bias energies.
 
@@ -38,13 +209,17 @@ def get_averaged_bias_matrix(bias_sequences, dtrajs, nstates=None):
         A single reduced bias energy trajectory or a list of reduced bias energy trajectories.
         For every simulation frame seen in trajectory i and time step t, btrajs[i][t, k] is the
         reduced bias energy of that frame evaluated in the k'th thermodynamic state (i.e. at
-        the k'th Umbrella/Hamiltonian/temperature)
+        the k'th Umbrella/Hamiltonian/temperature). Elements may also be file names of .npy files
+        (which are memory-mapped) or LazyBiasTrajectory objects, they are processed chunk by chunk.
     dtrajs : list of numpy.ndarray(T_i) of int
         A single discrete trajectory or a list of discrete trajectories. The integers are indexes
         in 0,...,num_conf_states-1 enumerating the num_conf_states Markov states or the bins the
         trajectory is in at any time.
     nstates : int, optional, default=None
         Number of configuration states.
+    n_jobs : int, optional, default=None
+        Number of threads processing the trajectories in parallel. If None, the setting of the
+        'PYEMMA_NJOBS' environment variable or the number of cores is used.
 
     Returns
     -------
@@ -52,30 +227,24 @@ def get_averaged_bias_matrix(bias_sequences, dtrajs, nstates=None):
         bias_energies_full[j, i] is the bias energy in units of kT for each discrete state i
         at thermodynamic state j.
     """
-    from thermotools.util import logsumexp as _logsumexp
-    from thermotools.util import logsumexp_pair as _logsumexp_pair
+    from concurrent.futures import ThreadPoolExecutor
+    from pyemma._base.parallel import get_n_jobs
     nmax = int(_np.max([dtraj.max() for dtraj in dtrajs]))
     if nstates is None:
         nstates = nmax + 1
     elif nstates < nmax + 1:
         raise ValueError("nstates is smaller than the number of observed microstates")
+    if n_jobs is None:
+        n_jobs = get_n_jobs()
+    bias_sequences = [_open_bias_trajectory(b) for b in bias_sequences]
     nthermo = bias_sequences[0].shape[1]
     bias_matrix = -_np.ones(shape=(nthermo, nstates), dtype=_np.float64) * _np.inf
     counts = _np.zeros(shape=(nstates,), dtype=_np.intc)
-    for s in range(len(bias_sequences)):
-        for i in range(nstates):
-            idx = (dtrajs[s] == i)
-            nidx = idx.sum()
-            if nidx == 0:
-                continue
-            counts[i] += nidx
-            selected_bias_sequence = bias_sequences[s][idx, :]
-            for k in range(nthermo):
-                bias_matrix[k, i] = _logsumexp_pair(
-                    bias_matrix[k, i],
-                    _logsumexp(
-                        _np.ascontiguousarray(-selected_bias_sequence[:, k]),
-                        inplace=False))
+    with ThreadPoolExecutor(max_workers=max(1, n_jobs)) as pool:
+        results = pool.map(_chunked_state_wise_logsumexp, bias_sequences, dtrajs)
+        for states, state_counts, lse in (r for chunks in results for r in chunks):
+            counts[states] += state_counts.astype(_np.intc)
+            bias_matrix[:, states] = _np.logaddexp(bias_matrix[:, states], lse.T)
     idx = counts.nonzero()
     log_counts = _np.log(counts[idx])
     bias_matrix *= -1.0
@@ -185,7 +354,8 @@ def _get_umbrella_sampling_parameters(
         force_constants /= kT
     return ttrajs, umbrella_centers, force_constants, unbiased_state
 
-def _get_umbrella_bias_sequences(trajs, umbrella_centers, force_constants, width):
+def _get_umbrella_bias_sequences(trajs, umbrella_centers, force_constants, width, lazy=False,
+                                 dtype=_np.float64):
     from thermotools.util import get_umbrella_bias as _get_umbrella_bias
     bias_sequences = []
     if not isinstance(umbrella_centers, _np.ndarray):
@@ -214,16 +384,22 @@ def _get_umbrella_bias_sequences(trajs, umbrella_centers, force_constants, width
         if traj.shape[1] != dimension:
             raise ValueError("Trajectory %d has unmatching dimension: %d!=%d" % (
                 i, traj.shape[1], dimension))
-        bias_sequences.append(_get_umbrella_bias(
-                _np.require(traj, requirements='C'),
+        def evaluate(start, stop, traj=traj):
+            return _get_umbrella_bias(
+                _np.require(traj[start:stop], requirements='C'),
                 _np.require(umbrella_centers, requirements='C'),
                 _np.require(force_constants, requirements='C'),
-                _np.require(width, requirements='C')
-        ))
+                _np.require(width, requirements='C'))
+        if lazy:
+            bias_sequences.append(LazyBiasTrajectory(
+                traj.shape[0], umbrella_centers.shape[0], evaluate, dtype=dtype))
+        else:
+            bias_sequences.append(evaluate(0, traj.shape[0]).astype(dtype, copy=False))
     return bias_sequences
 
 def get_umbrella_sampling_data(
-    us_trajs, us_centers, us_force_constants, md_trajs=None, kT=None, width=None):
+    us_trajs, us_centers, us_force_constants, md_trajs=None, kT=None, width=None,
+    lazy_bias=False, bias_dtype=_np.float64):
     r"""
     Wraps umbrella sampling data or a mix of umbrella sampling and and direct molecular dynamics.
 
@@ -248,13 +424,18 @@ def get_umbrella_sampling_data(
         Specify periodicity for individual us_traj dimensions. Each positive entry will make the
         corresponding feature periodic and use the given value as width. None/zero values will be
         treated as non-periodic.
+    lazy_bias : bool, optional, default=False
+        Return LazyBiasTrajectory objects, which evaluate the bias energies chunk by chunk when
+        needed, instead of arrays.
+    bias_dtype : numpy.dtype, optional, default=numpy.float64
+        Type of the bias energies, e.g. numpy.float32 to halve their memory footprint.
 
     Returns
     -------
     ttrajs : list of N+M int arrays, each of shape (T_i,)
         The integers are indexes in 0,...,K-1 enumerating the thermodynamic states the trajectories
         are in at any time.
-    btrajs : list of N+M float arrays, each of shape (T_i, K)
+    btrajs : list of N+M float arrays (or LazyBiasTrajectory objects), each of shape (T_i, K)
         The floats are the reduced bias energies for each thermodynamic state and configuration.
     umbrella_centers : float array of shape (K, d)
         The individual umbrella centers labelled accordingly to ttrajs.
@@ -276,7 +457,8 @@ def get_umbrella_sampling_data(
     if width.shape[0] != umbrella_centers.shape[1]:
         raise ValueError('Unmatching number of width components.')
     btrajs = _get_umbrella_bias_sequences(
-        us_trajs + md_trajs, umbrella_centers, force_constants, width)
+        us_trajs + md_trajs, umbrella_centers, force_constants, width,
+        lazy=lazy_bias, dtype=bias_dtype)
     return ttrajs, btrajs, umbrella_centers, force_constants, unbiased_state
 
 # ==================================================================================================
@@ -303,27 +485,23 @@ conversion_shift_Celsius_to_Kelvin = 273.15
 
 def _get_multi_temperature_bias_sequences(
     energy_trajs, temp_trajs, temperatures, reference_temperature,
-    energy_unit, temp_unit):
+    energy_unit, temp_unit, lazy=False, dtype=_np.float64):
     assert isinstance(energy_unit, str), 'energy_unit must be type str'
     assert isinstance(temp_unit, str), 'temp_unit must be type str'
     assert energy_unit.lower() in ('kcal/mol', 'kj/mol', 'kt'), \
         'energy_unit must be \'kcal/mol\', \'kJ/mol\' or \'kT\''
     assert temp_unit.lower() in ('kt', 'k', 'c'), \
         'temp_unit must be \'K\', \'C\' or \'kT\''
-    btrajs = []
+    # the bias energies are factors[k] * frame_energy(energy_traj, temp_traj)[t]
     if energy_unit.lower() == 'kt':
         # reduced case: energy_trajs in kT, temp_trajs unit does not matter as it cancels
-        for energy_traj, temp_traj in zip(energy_trajs, temp_trajs):
-            btrajs.append(
-                (1.0 / temperatures[_np.newaxis, :] - 1.0 / reference_temperature) * \
-                (temp_traj * energy_traj)[:, _np.newaxis])
+        factors = 1.0 / temperatures[_np.newaxis, :] - 1.0 / reference_temperature
+        frame_energy = lambda energy_traj, temp_traj: temp_traj * energy_traj
     elif temp_unit.lower() == 'kt':
         # non-reduced case with kT values instead of temperatures
         # this implicitly assumes the users' unit of k_B equals unit of energy_trajs
-        for energy_traj, temp_traj in zip(energy_trajs, temp_trajs):
-            btrajs.append(
-                (1.0 / temperatures[_np.newaxis, :] - 1.0 / reference_temperature) \
-                    * energy_traj[:, _np.newaxis])
+        factors = 1.0 / temperatures[_np.newaxis, :] - 1.0 / reference_temperature
+        frame_energy = lambda energy_traj, temp_traj: energy_traj
     else:
         # non-reduced case and temperatures given
         kT = temperatures.copy()
@@ -336,12 +514,21 @@ def _get_multi_temperature_bias_sequences(
         if energy_unit.lower() == 'kj/mol':
             kT *= conversion_factor_J_per_cal
             rT *= conversion_factor_J_per_cal
-        for energy_traj, temp_traj in zip(energy_trajs, temp_trajs):
-            btrajs.append((1.0 / kT[_np.newaxis, :] - 1.0 / rT) * energy_traj[:, _np.newaxis])
+        factors = 1.0 / kT[_np.newaxis, :] - 1.0 / rT
+        frame_energy = lambda energy_traj, temp_traj: energy_traj
+    btrajs = []
+    for energy_traj, temp_traj in zip(energy_trajs, temp_trajs):
+        def evaluate(start, stop, energy_traj=energy_traj, temp_traj=temp_traj):
+            return factors * frame_energy(energy_traj[start:stop], temp_traj[start:stop])[:, _np.newaxis]
+        if lazy:
+            btrajs.append(LazyBiasTrajectory(len(energy_traj), factors.shape[1], evaluate, dtype=dtype))
+        else:
+            btrajs.append(evaluate(0, len(energy_traj)).astype(dtype, copy=False))
     return btrajs
 
 def get_multi_temperature_data(
-    energy_trajs, temp_trajs, energy_unit, temp_unit, reference_temperature=None):
+    energy_trajs, temp_trajs, energy_unit, temp_unit, reference_temperature=None,
+    lazy_bias=False, bias_dtype=_np.float64):
     r"""
     Wraps data from multi-temperature molecular dynamics.
 
@@ -362,13 +549,18 @@ def get_multi_temperature_data(
         Reference temperature against which the bias energies are computed. If not given, the lowest
         temperature or kT value is used. If given, this parameter must have the same unit as the
         temp_trajs.
+    lazy_bias : bool, optional, default=False
+        Return LazyBiasTrajectory objects, which evaluate the bias energies chunk by chunk when
+        needed, instead of arrays.
+    bias_dtype : numpy.dtype, optional, default=numpy.float64
+        Type of the bias energies, e.g. numpy.float32 to halve their memory footprint.
 
     Returns
     -------
     ttrajs : list of N+M int arrays, each of shape (T_i,)
         The integers are indexes in 0,...,K-1 enumerating the thermodynamic states the trajectories
         are in at any time.
-    btrajs : list of N+M float arrays, each of shape (T_i, K)
+    btrajs : list of N+M float arrays (or LazyBiasTrajectory objects), each of shape (T_i, K)
         The floats are the reduced bias energies for each thermodynamic state and configuration.
     temperatures : float array of length K
         The individual temperatures labelled accordingly to ttrajs.
@@ -383,7 +575,8 @@ def get_multi_temperature_data(
             'reference_temperature must be numeric'
         assert reference_temperature > 0.0, 'reference_temperature must be positive'
     btrajs = _get_multi_temperature_bias_sequences(
-        energy_trajs, temp_trajs, temperatures, reference_temperature, energy_unit, temp_unit)
+        energy_trajs, temp_trajs, temperatures, reference_temperature, energy_unit, temp_unit,
+        lazy=lazy_bias, dtype=bias_dtype)
     if reference_temperature in temperatures:
         unbiased_state = _np.where(temperatures == reference_temperature)[0]
         try:
@@ -128,6 +128,16 @@ def extensions():
                   language='c++',
                   extra_compile_args=common_cflags)
 
+    distances_module = \
+        Extension('pyemma.coordinates.data.featurization.distances_c._kernels',
+                  sources=['pyemma/coordinates/data/featurization/distances_c/_kernels.cpp'],
+                  include_dirs=['pyemma/coordinates/data/featurization/distances_c/',
+                                np_inc,
+                                pybind_inc,
+                                ],
+                  language='c++',
+                  extra_compile_args=common_cflags)
+
     eig_qr_module = \
         Extension('pyemma._ext.variational.solvers.eig_qr.eig_qr',
                   sources=['pyemma/_ext/variational/solvers/eig_qr/eig_qr.pyx'],
@@ -142,6 +152,7 @@ def extensions():
 
     exts += [clustering_module,
              covar_module,
+             distances_module,
              eig_qr_module,
              orderedset
              ]